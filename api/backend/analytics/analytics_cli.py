@@ -0,0 +1,126 @@
+#------------------------------------------------------------
+# `flask analytics ...` commands, e.g. from inside the api container:
+#   flask --app backend_app analytics backfill-volume
+#------------------------------------------------------------
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from backend.db_connection import db
+from backend.analytics.attendance import benchmark_attendance
+from backend.analytics.gym_rollup import rollup_gyms
+from backend.analytics.retention import refresh_retention
+from backend.analytics.utilization import rollup
+from backend.analytics.volume import DEFAULT_BATCH_SIZE, backfill_volume, refresh_volume
+from backend.members.goals import backfill_goals
+from backend.tenancy import gyms, using_gym
+
+analytics_cli = AppGroup('analytics', help='Analytics summary tables (training volume, retention cohorts, class utilization, goal progress, per-gym daily totals) and benchmarks.')
+
+
+@analytics_cli.command('backfill-volume')
+@click.option('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, show_default=True,
+              help='Exercise rows read and aggregated per batch.')
+def backfill_volume_command(batch_size):
+    """Rebuild MEMBER_WEEKLY_VOLUME from the whole workout history."""
+    conn = db.connect()
+    try:
+        summary = backfill_volume(conn, batch_size=batch_size, logger=current_app.logger)
+    finally:
+        conn.close()
+
+    click.echo(
+        f"Volume backfill: {summary['summary_rows']} member/week/category rows "
+        f"from {summary['rows_read']} logged exercises in {summary['elapsed_seconds']}s."
+    )
+
+
+@analytics_cli.command('refresh-volume')
+def refresh_volume_command():
+    """Summarise new and changed workout logs into MEMBER_WEEKLY_VOLUME."""
+    conn = db.connect()
+    try:
+        summary = refresh_volume(conn, logger=current_app.logger)
+    finally:
+        conn.close()
+
+    click.echo(f"Volume refresh: {summary['weeks_recomputed']} member weeks recomputed "
+               f"({summary['new_rows']} new logged exercises).")
+
+
+@analytics_cli.command('refresh-retention')
+@click.option('--full', is_flag=True, help='Recompute every month from the first signup.')
+def refresh_retention_command(full):
+    """Update the COHORT_RETENTION matrix (from the last computed month unless --full)."""
+    conn = db.connect()
+    try:
+        months = refresh_retention(conn, full=full, logger=current_app.logger)
+    finally:
+        conn.close()
+
+    if months:
+        click.echo(f"Retention: computed {len(months)} activity months ({months[0]} to {months[-1]}).")
+    else:
+        click.echo("Retention: no members yet, nothing to compute.")
+
+
+@analytics_cli.command('rollup-utilization')
+def rollup_utilization_command():
+    """Roll up completed days into CLASS_UTILIZATION_DAILY."""
+    conn = db.connect()
+    try:
+        days = rollup(conn, logger=current_app.logger)
+    finally:
+        conn.close()
+
+    click.echo(f"Class utilization: rolled up {days} days.")
+
+
+@analytics_cli.command('backfill-goals')
+def backfill_goals_command():
+    """Recompute GOAL.current_value for every tracked goal from the full log history."""
+    conn = db.connect()
+    try:
+        summary = backfill_goals(conn, logger=current_app.logger)
+    finally:
+        conn.close()
+
+    click.echo(f"Goal backfill: {summary['goals_updated']} goals recomputed in {summary['elapsed_seconds']}s.")
+
+
+@analytics_cli.command('rollup-gyms')
+@click.option('--full', is_flag=True, help='Recompute every day from the first activity.')
+def rollup_gyms_command(full):
+    """Update GYM_DAILY_STATS in every gym database (from the last rolled-up day unless --full)."""
+    for gym in gyms.by_database():
+        with using_gym(gym):
+            conn = db.connect()
+            try:
+                days = rollup_gyms(conn, full=full, logger=current_app.logger)
+            finally:
+                conn.close()
+
+        click.echo(f"Gym rollup ({gym['schema_name'] or 'shared database'}): recomputed {days} days.")
+
+
+@analytics_cli.command('bench-attendance')
+@click.option('--rows', 'synthetic_rows', type=int, default=100000, show_default=True,
+              help='Synthetic attendance rows added for the run (rolled back afterwards).')
+@click.option('--repeat', type=int, default=5, show_default=True, help='Runs per query; medians are reported.')
+@click.option('--trainer-id', type=int, default=None, help='Only this trainer\'s classes.')
+def bench_attendance_command(synthetic_rows, repeat, trainer_id):
+    """Time the attendance log with names joined in vs. from the name directories."""
+    conn = db.connect()
+    try:
+        result = benchmark_attendance(conn, synthetic_rows=synthetic_rows, repeat=repeat, trainer_id=trainer_id)
+    finally:
+        conn.close()
+
+    click.echo(
+        f"Attendance pull: {result['rows']} rows ({result['synthetic_rows']} synthetic), "
+        f"median of {result['repeat']} runs.\n"
+        f"  joined TRAINER + GYM_MEMBER:   {result['joined_seconds']}s\n"
+        f"  join-free + name directories: {result['join_free_seconds']}s "
+        f"(x{result['speedup']}; directories loaded once in {result['directory_load_seconds']}s)\n"
+        f"  same results: {'yes' if result['same_results'] else 'NO'}"
+    )
@@ -0,0 +1,166 @@
+#------------------------------------------------------------
+# Class attendance rows for the manager's attendance log.
+#
+# The query reads CLASS_ATTENDANCE and CLASS_SESSION only; trainer
+# and member names come from the in-process name directories
+# (backend.cache.member_names / trainer_names) instead of joining
+# TRAINER and GYM_MEMBER for every row.
+#
+# benchmark_attendance() times it against the joined query it
+# replaced (`flask analytics bench-attendance`).
+#------------------------------------------------------------
+import statistics
+import time
+
+from backend.cache import member_names, trainer_names
+
+ATTENDANCE_SQL = """
+    SELECT
+        ca.attendance_id,
+        ca.session_id,
+        ca.member_id,
+        ca.status,
+        cs.class_name,
+        cs.date AS class_datetime,
+        cs.cost,
+        cs.trainer_id
+    FROM CLASS_ATTENDANCE ca
+    JOIN CLASS_SESSION cs ON ca.session_id = cs.session_id
+    WHERE 1=1
+"""
+
+# the same rows with the names joined in (for the benchmark)
+JOINED_ATTENDANCE_SQL = """
+    SELECT
+        ca.attendance_id,
+        ca.session_id,
+        ca.member_id,
+        ca.status,
+        cs.class_name,
+        cs.date AS class_datetime,
+        cs.cost,
+        cs.trainer_id,
+        t.first_name AS trainer_first_name,
+        t.last_name AS trainer_last_name,
+        gm.first_name AS member_first_name,
+        gm.last_name AS member_last_name
+    FROM CLASS_ATTENDANCE ca
+    JOIN CLASS_SESSION cs ON ca.session_id = cs.session_id
+    JOIN TRAINER t ON cs.trainer_id = t.trainer_id
+    JOIN GYM_MEMBER gm ON ca.member_id = gm.member_id
+    WHERE 1=1
+"""
+
+
+def _filtered(sql, trainer_id, start, end, gym_id=None):
+    params = []
+    if gym_id is not None:
+        sql += " AND cs.gym_id = %s"
+        params.append(gym_id)
+    if trainer_id:
+        sql += " AND cs.trainer_id = %s"
+        params.append(trainer_id)
+    if start and end:
+        sql += " AND cs.date BETWEEN %s AND %s"
+        params.extend([start, end])
+    sql += " ORDER BY cs.date DESC, cs.class_name ASC"
+    return sql, params
+
+
+def get_attendance(conn, trainer_id=None, start=None, end=None, gym_id=None):
+    """Attendance rows (newest class first) with trainer_/member_first_name and _last_name."""
+    sql, params = _filtered(ATTENDANCE_SQL, trainer_id, start, end, gym_id)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    trainer_names.decorate(conn, rows, 'trainer_id', 'trainer_first_name', 'trainer_last_name')
+    member_names.decorate(conn, rows, 'member_id', 'member_first_name', 'member_last_name')
+    return rows
+
+
+def _get_joined(conn, trainer_id=None, start=None, end=None):
+    sql, params = _filtered(JOINED_ATTENDANCE_SQL, trainer_id, start, end)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def _add_synthetic_attendance(conn, count):
+    """Insert count CLASS_ATTENDANCE rows pairing existing sessions and members."""
+    cursor = conn.cursor()
+    try:
+        added = 0
+        while added < count:
+            cursor.execute(
+                """
+                INSERT INTO CLASS_ATTENDANCE (session_id, member_id, status)
+                SELECT cs.session_id, gm.member_id, 'registered'
+                FROM CLASS_SESSION cs CROSS JOIN GYM_MEMBER gm
+                LIMIT %s
+                """,
+                (count - added,)
+            )
+            if not cursor.rowcount:
+                raise ValueError("Synthetic rows need at least one class session and one member")
+            added += cursor.rowcount
+        return added
+    finally:
+        cursor.close()
+
+
+def _by_id(rows):
+    return sorted(rows, key=lambda row: row['attendance_id'])
+
+
+def _timed(func, repeat):
+    """(median seconds, last result) over repeat calls."""
+    seconds = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        seconds.append(time.perf_counter() - started)
+    return statistics.median(seconds), result
+
+
+def benchmark_attendance(conn, synthetic_rows=0, repeat=5, trainer_id=None):
+    """
+    Median time of the joined attendance query and of get_attendance()
+    (warm name directories) over repeat runs, on the current data plus
+    synthetic_rows extra attendance rows. Everything runs in one
+    transaction that is rolled back, so the extra rows are never kept.
+    """
+    conn.begin()
+    try:
+        added = _add_synthetic_attendance(conn, synthetic_rows) if synthetic_rows else 0
+
+        # the first load of each directory is a one-off per process
+        started = time.perf_counter()
+        for names in (member_names, trainer_names):
+            names.invalidate()
+            names.all(conn)
+        directory_load = time.perf_counter() - started
+
+        joined, joined_rows = _timed(lambda: _get_joined(conn, trainer_id), repeat)
+        join_free, rows = _timed(lambda: get_attendance(conn, trainer_id), repeat)
+    finally:
+        conn.rollback()
+
+    return {
+        "rows": len(rows),
+        "synthetic_rows": added,
+        "repeat": repeat,
+        "joined_seconds": round(joined, 4),
+        "join_free_seconds": round(join_free, 4),
+        "directory_load_seconds": round(directory_load, 4),
+        "speedup": round(joined / join_free, 2) if join_free else None,
+        # rows tied on date and class may come back in either order
+        "same_results": _by_id(joined_rows) == _by_id(rows),
+    }
@@ -0,0 +1,204 @@
+#------------------------------------------------------------
+# Per-gym daily totals for the owner dashboards: signups, classes,
+# attendance and invoicing per gym per day in GYM_DAILY_STATS, plus
+# each day's active members (snapshotted the day the job runs).
+#
+# The gym-rollup job redoes the days after its watermark (JOB_WATERMARK,
+# YYYYMMDD) and the LOOKBACK_DAYS before it, so backdated rows are
+# picked up without re-reading history; `flask analytics rollup-gyms
+# --full` redoes everything. The dashboards then read a few rows per
+# gym per day instead of every gym's members and invoices.
+#
+# Gyms with a schema of their own have their own GYM_DAILY_STATS
+# (the scheduler runs the job once per database); get_gym_summary()
+# reads them all in one query.
+#------------------------------------------------------------
+import time
+from datetime import date, timedelta
+
+from backend.analytics.utilization import _from_yyyymmdd, _yyyymmdd
+from backend.db_connection import db
+
+WATERMARK_JOB = 'gym_daily_stats'
+
+# days before the watermark redone every run
+LOOKBACK_DAYS = 7
+
+ACTIVITY_COLUMNS = ('new_members', 'classes', 'class_attendance', 'billed_amount', 'paid_amount')
+
+# one row per (gym, day) with activity in [start, end); every branch
+# is a range on an indexed date column
+_ACTIVITY_SQL = """
+    SELECT gym_id, day,
+           SUM(new_members) AS new_members,
+           SUM(classes) AS classes,
+           SUM(class_attendance) AS class_attendance,
+           SUM(billed_amount) AS billed_amount,
+           SUM(paid_amount) AS paid_amount
+    FROM (
+        SELECT gym_id, joined_date AS day, COUNT(*) AS new_members,
+               0 AS classes, 0 AS class_attendance, 0 AS billed_amount, 0 AS paid_amount
+        FROM GYM_MEMBER
+        WHERE joined_date >= %s AND joined_date < %s
+        GROUP BY gym_id, joined_date
+        UNION ALL
+        SELECT gym_id, DATE(date), 0, COUNT(*), 0, 0, 0
+        FROM CLASS_SESSION
+        WHERE date >= %s AND date < %s
+        GROUP BY gym_id, DATE(date)
+        UNION ALL
+        SELECT cs.gym_id, DATE(cs.date), 0, 0, COUNT(*), 0, 0
+        FROM CLASS_ATTENDANCE ca
+        JOIN CLASS_SESSION cs ON cs.session_id = ca.session_id
+        WHERE ca.status = 'attended' AND cs.date >= %s AND cs.date < %s
+        GROUP BY cs.gym_id, DATE(cs.date)
+        UNION ALL
+        SELECT gym_id, DATE(date), 0, 0, 0, SUM(amount),
+               SUM(CASE WHEN status = 'paid' THEN amount ELSE 0 END)
+        FROM INVOICE
+        WHERE date >= %s AND date < %s
+        GROUP BY gym_id, DATE(date)
+    ) activity
+    GROUP BY gym_id, day
+"""
+
+_FIRST_DAY_SQL = """
+    SELECT MIN(day) AS first_day FROM (
+        SELECT MIN(joined_date) AS day FROM GYM_MEMBER
+        UNION ALL SELECT MIN(DATE(date)) FROM CLASS_SESSION
+        UNION ALL SELECT MIN(DATE(date)) FROM INVOICE
+    ) firsts
+"""
+
+
+def rolled_up_through(cursor):
+    """Last day whose totals are final, or None."""
+    cursor.execute("SELECT last_id FROM JOB_WATERMARK WHERE job_name = %s", (WATERMARK_JOB,))
+    row = cursor.fetchone()
+    return _from_yyyymmdd(row['last_id']) if row and row['last_id'] else None
+
+
+def rollup_gyms(conn, full=False, today=None, logger=None):
+    """
+    Recompute GYM_DAILY_STATS from the watermark (less LOOKBACK_DAYS, or
+    the first day with any activity if full) through today, in one
+    transaction, and snapshot today's active members. Returns the days
+    recomputed.
+    """
+    started = time.monotonic()
+    today = today or date.today()
+
+    cursor = conn.cursor()
+    try:
+        last = None if full else rolled_up_through(cursor)
+        if last is not None:
+            start = min(last + timedelta(days=1), today) - timedelta(days=LOOKBACK_DAYS)
+        else:
+            cursor.execute(_FIRST_DAY_SQL)
+            start = cursor.fetchone()['first_day'] or today
+        end = today + timedelta(days=1)
+
+        # days that no longer have any activity keep their row, at zero
+        cursor.execute(
+            f"UPDATE GYM_DAILY_STATS SET {', '.join(f'{column} = 0' for column in ACTIVITY_COLUMNS)}, "
+            f"updated_at = NOW() WHERE day >= %s AND day < %s",
+            (start, end)
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO GYM_DAILY_STATS (gym_id, day, {', '.join(ACTIVITY_COLUMNS)}, updated_at)
+            SELECT gym_id, day, {', '.join(ACTIVITY_COLUMNS)}, NOW()
+            FROM ({_ACTIVITY_SQL}) rolled
+            ON DUPLICATE KEY UPDATE
+                {', '.join(f'{column} = VALUES({column})' for column in ACTIVITY_COLUMNS)},
+                updated_at = VALUES(updated_at)
+            """,
+            (start, end) * 4
+        )
+        cursor.execute(
+            """
+            INSERT INTO GYM_DAILY_STATS (gym_id, day, active_members, updated_at)
+            SELECT gym_id, %s, COUNT(*), NOW()
+            FROM GYM_MEMBER
+            WHERE status = 'active'
+            GROUP BY gym_id
+            ON DUPLICATE KEY UPDATE active_members = VALUES(active_members), updated_at = VALUES(updated_at)
+            """,
+            (today,)
+        )
+        cursor.execute(
+            """
+            INSERT INTO JOB_WATERMARK (job_name, last_id, updated_at)
+            VALUES (%s, %s, NOW())
+            ON DUPLICATE KEY UPDATE last_id = VALUES(last_id), updated_at = VALUES(updated_at)
+            """,
+            (WATERMARK_JOB, _yyyymmdd(today - timedelta(days=1)))
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    days = (end - start).days
+    if logger:
+        logger.info(f"[GYM ROLLUP] recomputed {days} days from {start} in {time.monotonic() - started:.2f}s")
+    return days
+
+
+def gym_rollup_job(app):
+    """Scheduler entry point (run once per database)."""
+    conn = db.connect()
+    try:
+        rollup_gyms(conn, logger=app.logger)
+    finally:
+        conn.close()
+
+
+def _stats_table(schema):
+    return f"`{schema.replace('`', '')}`.GYM_DAILY_STATS" if schema else "GYM_DAILY_STATS"
+
+
+def get_gym_summary(conn, start, end, gyms):
+    """
+    Totals per gym for days in [start, end), with the active members of
+    the last day snapshotted, and across all gyms. gyms is gym_id -> GYM
+    row; conn is a connection to the default database.
+    """
+    schemas = [None] + sorted({gym['schema_name'] for gym in gyms.values() if gym['schema_name']})
+    query = " UNION ALL ".join(
+        f"SELECT gym_id, day, active_members, {', '.join(ACTIVITY_COLUMNS)} "
+        f"FROM {_stats_table(schema)} WHERE day >= %s AND day < %s"
+        for schema in schemas
+    )
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query + " ORDER BY gym_id, day", [start, end] * len(schemas))
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    by_gym = {}
+    for row in rows:
+        gym = gyms.get(row['gym_id'])
+        if gym is None:
+            continue
+        totals = by_gym.setdefault(row['gym_id'], dict(
+            {column: 0 for column in ACTIVITY_COLUMNS},
+            gym_id=row['gym_id'], name=gym['name'], active_members=None,
+        ))
+        for column in ACTIVITY_COLUMNS:
+            totals[column] += row[column] or 0
+        # rows come oldest first
+        if row['active_members'] is not None:
+            totals['active_members'] = row['active_members']
+
+    summary = sorted(by_gym.values(), key=lambda totals: totals['gym_id'])
+    for totals in summary:
+        for column in ('billed_amount', 'paid_amount'):
+            totals[column] = float(totals[column])
+
+    overall = {column: sum(totals[column] for totals in summary) for column in ACTIVITY_COLUMNS}
+    overall["active_members"] = sum(totals['active_members'] or 0 for totals in summary)
+    return {"start_date": start, "end_date": end, "gyms": summary, "totals": overall}
@@ -0,0 +1,188 @@
+#------------------------------------------------------------
+# Cohort retention: members grouped by signup month (joined_date)
+# and, for every month since, how many of them were active -
+# logged a workout (WORKOUT_LOG) or attended a class
+# (CLASS_ATTENDANCE.status = 'attended').
+#
+# The matrix is kept in COHORT_RETENTION per gym, one activity
+# month at a time (every gym of the database together). A refresh
+# recomputes the months from the JOB_WATERMARK (the last month
+# computed, which may have been partial) up to the current month;
+# earlier months are left as they are.
+#------------------------------------------------------------
+import time
+from datetime import date
+
+from backend.db_connection import db
+
+WATERMARK_JOB = 'cohort_retention'
+
+
+def month_start(d):
+    return date(d.year, d.month, 1)
+
+
+def next_month(d):
+    return date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+
+def to_yyyymm(d):
+    return d.year * 100 + d.month
+
+
+def from_yyyymm(value):
+    return date(value // 100, value % 100, 1)
+
+
+def compute_month(cursor, activity_month):
+    """Upsert the COHORT_RETENTION cells of one activity month for every gym's cohorts that existed by then."""
+    start = month_start(activity_month)
+    end = next_month(start)
+    cursor.execute(
+        """
+        INSERT INTO COHORT_RETENTION
+            (gym_id, cohort_month, months_since, cohort_size, active_members, retention_rate, computed_at)
+        SELECT c.gym_id,
+               c.cohort_month,
+               PERIOD_DIFF(%s, c.cohort_ym),
+               c.cohort_size,
+               COALESCE(a.active_members, 0),
+               COALESCE(a.active_members, 0) / c.cohort_size,
+               NOW()
+        FROM (
+            SELECT gym_id,
+                   DATE_FORMAT(joined_date, '%%Y-%%m') AS cohort_month,
+                   EXTRACT(YEAR_MONTH FROM joined_date) AS cohort_ym,
+                   COUNT(*) AS cohort_size
+            FROM GYM_MEMBER
+            WHERE joined_date < %s
+            GROUP BY gym_id, cohort_month, cohort_ym
+        ) c
+        LEFT JOIN (
+            SELECT gm.gym_id,
+                   DATE_FORMAT(gm.joined_date, '%%Y-%%m') AS cohort_month,
+                   COUNT(*) AS active_members
+            FROM (
+                SELECT member_id FROM WORKOUT_LOG
+                WHERE date >= %s AND date < %s
+                UNION
+                SELECT ca.member_id
+                FROM CLASS_SESSION cs
+                JOIN CLASS_ATTENDANCE ca ON ca.session_id = cs.session_id
+                WHERE cs.date >= %s AND cs.date < %s AND ca.status = 'attended'
+            ) active
+            JOIN GYM_MEMBER gm ON gm.member_id = active.member_id
+            GROUP BY gm.gym_id, cohort_month
+        ) a ON a.gym_id = c.gym_id AND a.cohort_month = c.cohort_month
+        ON DUPLICATE KEY UPDATE cohort_size = VALUES(cohort_size),
+                                active_members = VALUES(active_members),
+                                retention_rate = VALUES(retention_rate),
+                                computed_at = VALUES(computed_at)
+        """,
+        (to_yyyymm(start), end, start, end, start, end)
+    )
+    return cursor.rowcount
+
+
+def refresh_retention(conn, full=False, today=None, logger=None):
+    """
+    Recompute the activity months from the watermark (or from the first
+    signup month when full=True or nothing was computed yet) through the
+    current month, one commit per month. Returns the months computed.
+    """
+    started = time.monotonic()
+    current = month_start(today or date.today())
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT last_id FROM JOB_WATERMARK WHERE job_name = %s", (WATERMARK_JOB,))
+        row = cursor.fetchone()
+
+        if full or not row or not row['last_id']:
+            cursor.execute("SELECT MIN(joined_date) AS first_joined FROM GYM_MEMBER")
+            first_joined = cursor.fetchone()['first_joined']
+            if first_joined is None:
+                return []
+            month = month_start(first_joined)
+            if full:
+                cursor.execute("DELETE FROM COHORT_RETENTION")
+        else:
+            month = from_yyyymm(row['last_id'])
+
+        months = []
+        while month <= current:
+            compute_month(cursor, month)
+            cursor.execute(
+                """
+                INSERT INTO JOB_WATERMARK (job_name, last_id, updated_at)
+                VALUES (%s, %s, NOW())
+                ON DUPLICATE KEY UPDATE last_id = VALUES(last_id), updated_at = VALUES(updated_at)
+                """,
+                (WATERMARK_JOB, to_yyyymm(month))
+            )
+            conn.commit()
+            months.append(month.strftime('%Y-%m'))
+            month = next_month(month)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    if logger:
+        logger.info(f"[RETENTION] computed {len(months)} activity months "
+                    f"({', '.join(months[:1] + months[-1:])}) in {time.monotonic() - started:.2f}s")
+    return months
+
+
+def retention_job(app):
+    """Scheduler entry point: incremental refresh on its own connection."""
+    conn = db.connect()
+    try:
+        refresh_retention(conn, logger=app.logger)
+    finally:
+        conn.close()
+
+
+def get_retention(conn, gym_id, from_month=None, to_month=None, max_months=12):
+    """gym_id's cohort matrix: one entry per cohort with its retention by months since signup."""
+    query = """
+        SELECT cohort_month, months_since, cohort_size, active_members, retention_rate, computed_at
+        FROM COHORT_RETENTION
+        WHERE gym_id = %s AND months_since <= %s
+    """
+    params = [gym_id, max_months]
+    if from_month:
+        query += " AND cohort_month >= %s"
+        params.append(from_month)
+    if to_month:
+        query += " AND cohort_month <= %s"
+        params.append(to_month)
+    query += " ORDER BY cohort_month, months_since"
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    cohorts = {}
+    computed_at = None
+    for row in rows:
+        cohort = cohorts.setdefault(row['cohort_month'], {
+            "cohort_month": row['cohort_month'],
+            "cohort_size": row['cohort_size'],
+            "retention": [],
+        })
+        # cohorts only grow by backdated signups; report the latest size
+        cohort["cohort_size"] = row['cohort_size']
+        cohort["retention"].append({
+            "months_since": row['months_since'],
+            "active_members": row['active_members'],
+            "retention_rate": float(row['retention_rate']),
+        })
+        if computed_at is None or row['computed_at'] > computed_at:
+            computed_at = row['computed_at']
+
+    return {"computed_at": computed_at, "cohorts": list(cohorts.values())}
@@ -0,0 +1,211 @@
+#------------------------------------------------------------
+# Class utilization: sessions, capacity, bookings, attendance and
+# no-shows per gym x day x trainer x class x hour, rolled up from
+# CLASS_SESSION x CLASS_ATTENDANCE into CLASS_UTILIZATION_DAILY.
+#
+# Completed days are rolled up by the class-utilization job
+# (JOB_WATERMARK holds the last rolled-up day as YYYYMMDD).
+# Days after that - normally just today - are aggregated live
+# when the heatmap is requested, so it is current without
+# re-reading history.
+#------------------------------------------------------------
+import time
+from datetime import date, timedelta
+
+from backend.db_connection import db
+
+WATERMARK_JOB = 'class_utilization'
+
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+# one row per (gym, day, trainer, class, hour) for sessions in [start, end)
+_SESSION_ROLLUP_SQL = """
+    SELECT cs.gym_id,
+           DATE(cs.date) AS day,
+           cs.trainer_id,
+           cs.class_name,
+           HOUR(cs.date) AS hour,
+           WEEKDAY(cs.date) AS weekday,
+           COUNT(*) AS sessions,
+           SUM(cs.capacity) AS capacity,
+           COALESCE(SUM(a.booked), 0) AS booked,
+           COALESCE(SUM(a.attended), 0) AS attended,
+           COALESCE(SUM(a.no_shows), 0) AS no_shows
+    FROM CLASS_SESSION cs
+    LEFT JOIN (
+        SELECT ca.session_id,
+               SUM(ca.status <> 'cancelled') AS booked,
+               SUM(ca.status = 'attended') AS attended,
+               SUM(ca.status = 'no-show') AS no_shows
+        FROM CLASS_ATTENDANCE ca
+        JOIN CLASS_SESSION s ON s.session_id = ca.session_id
+        WHERE s.date >= %s AND s.date < %s
+        GROUP BY ca.session_id
+    ) a ON a.session_id = cs.session_id
+    WHERE cs.date >= %s AND cs.date < %s
+"""
+_SESSION_ROLLUP_GROUP = " GROUP BY cs.gym_id, day, cs.trainer_id, cs.class_name, hour, weekday"
+
+
+def _yyyymmdd(d):
+    return d.year * 10000 + d.month * 100 + d.day
+
+
+def _from_yyyymmdd(value):
+    return date(value // 10000, value // 100 % 100, value % 100)
+
+
+def rolled_up_through(cursor):
+    """Last day fully rolled up, or None."""
+    cursor.execute("SELECT last_id FROM JOB_WATERMARK WHERE job_name = %s", (WATERMARK_JOB,))
+    row = cursor.fetchone()
+    return _from_yyyymmdd(row['last_id']) if row and row['last_id'] else None
+
+
+def mark_session_dirty(cursor, session_id):
+    """
+    Move the watermark back before a session's day so the next rollup
+    redoes it. Call before changing or deleting the session (and after
+    changing its date).
+    """
+    cursor.execute(
+        """
+        UPDATE JOB_WATERMARK w
+        JOIN CLASS_SESSION cs ON cs.session_id = %s
+        SET w.last_id = LEAST(w.last_id, DATE_FORMAT(DATE(cs.date) - INTERVAL 1 DAY, '%%Y%%m%%d') + 0)
+        WHERE w.job_name = %s
+        """,
+        (session_id, WATERMARK_JOB)
+    )
+
+
+def rollup(conn, today=None, logger=None):
+    """
+    Roll up every completed day after the watermark (one commit per day)
+    into CLASS_UTILIZATION_DAILY. Returns the number of days rolled up.
+    """
+    started = time.monotonic()
+    today = today or date.today()
+
+    cursor = conn.cursor()
+    try:
+        last = rolled_up_through(cursor)
+        if last is None:
+            cursor.execute("SELECT MIN(DATE(date)) AS first_day FROM CLASS_SESSION")
+            first_day = cursor.fetchone()['first_day']
+            if first_day is None:
+                return 0
+            last = first_day - timedelta(days=1)
+
+        days = 0
+        day = last + timedelta(days=1)
+        while day < today:
+            start, end = day, day + timedelta(days=1)
+            cursor.execute("DELETE FROM CLASS_UTILIZATION_DAILY WHERE day = %s", (day,))
+            cursor.execute(
+                f"""
+                INSERT INTO CLASS_UTILIZATION_DAILY
+                    (gym_id, day, trainer_id, class_name, hour, weekday, sessions, capacity,
+                     booked, attended, no_shows, computed_at)
+                SELECT gym_id, day, trainer_id, class_name, hour, weekday, sessions, capacity,
+                       booked, attended, no_shows, NOW()
+                FROM ({_SESSION_ROLLUP_SQL}{_SESSION_ROLLUP_GROUP}) rolled
+                """,
+                (start, end, start, end)
+            )
+            cursor.execute(
+                """
+                INSERT INTO JOB_WATERMARK (job_name, last_id, updated_at)
+                VALUES (%s, %s, NOW())
+                ON DUPLICATE KEY UPDATE last_id = VALUES(last_id), updated_at = VALUES(updated_at)
+                """,
+                (WATERMARK_JOB, _yyyymmdd(day))
+            )
+            conn.commit()
+            days += 1
+            day = end
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    if logger and days:
+        logger.info(f"[UTILIZATION] rolled up {days} days in {time.monotonic() - started:.2f}s")
+    return days
+
+
+def utilization_job(app):
+    """Scheduler entry point; a no-op until another day has completed."""
+    conn = db.connect()
+    try:
+        rollup(conn, logger=app.logger)
+    finally:
+        conn.close()
+
+
+def _rates(bucket):
+    bucket["fill_rate"] = round(bucket["booked"] / bucket["capacity"], 4) if bucket["capacity"] else None
+    bucket["no_show_rate"] = round(bucket["no_shows"] / bucket["booked"], 4) if bucket["booked"] else None
+    return bucket
+
+
+def _add(buckets, key, fields, row):
+    bucket = buckets.setdefault(key, dict(fields, sessions=0, capacity=0, booked=0, attended=0, no_shows=0))
+    for column in ('sessions', 'capacity', 'booked', 'attended', 'no_shows'):
+        bucket[column] += int(row[column] or 0)
+
+
+def get_utilization(conn, gym_id, start, end, trainer_id=None):
+    """
+    Weekday x hour heatmap and per-class totals for gym_id's sessions on
+    days start..end (inclusive): rolled-up days from
+    CLASS_UTILIZATION_DAILY, later days aggregated live.
+    """
+    cursor = conn.cursor()
+    try:
+        last = rolled_up_through(cursor)
+        trainer_filter = " AND trainer_id = %s" if trainer_id else ""
+
+        rows = []
+        if last is not None and start <= last:
+            cursor.execute(
+                f"""
+                SELECT weekday, hour, class_name,
+                       SUM(sessions) AS sessions, SUM(capacity) AS capacity,
+                       SUM(booked) AS booked, SUM(attended) AS attended, SUM(no_shows) AS no_shows
+                FROM CLASS_UTILIZATION_DAILY
+                WHERE gym_id = %s AND day >= %s AND day <= %s{trainer_filter}
+                GROUP BY weekday, hour, class_name
+                """,
+                [gym_id, start, min(end, last)] + ([trainer_id] if trainer_id else [])
+            )
+            rows.extend(cursor.fetchall())
+
+        live_from = max(start, last + timedelta(days=1)) if last is not None else start
+        if live_from <= end:
+            live_end = end + timedelta(days=1)
+            cursor.execute(
+                _SESSION_ROLLUP_SQL + " AND cs.gym_id = %s"
+                + (" AND cs.trainer_id = %s" if trainer_id else "") + _SESSION_ROLLUP_GROUP,
+                [live_from, live_end, live_from, live_end, gym_id] + ([trainer_id] if trainer_id else [])
+            )
+            rows.extend(cursor.fetchall())
+    finally:
+        cursor.close()
+
+    heatmap, by_class, totals = {}, {}, {}
+    for row in rows:
+        weekday, hour = int(row['weekday']), int(row['hour'])
+        _add(heatmap, (weekday, hour), {"weekday": weekday, "weekday_name": WEEKDAYS[weekday], "hour": hour}, row)
+        _add(by_class, row['class_name'], {"class_name": row['class_name']}, row)
+        _add(totals, 'all', {}, row)
+
+    return {
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "rolled_up_through": last.isoformat() if last else None,
+        "totals": _rates(totals.get('all', dict(sessions=0, capacity=0, booked=0, attended=0, no_shows=0))),
+        "heatmap": [_rates(heatmap[key]) for key in sorted(heatmap)],
+        "by_class": sorted((_rates(b) for b in by_class.values()), key=lambda b: b["class_name"]),
+    }
@@ -0,0 +1,373 @@
+#------------------------------------------------------------
+# Training volume analytics: weekly tonnage (sets x reps x weight),
+# per-category volume and estimated 1RM per member, summarised
+# from LOG_EXERCISE x EXERCISE into MEMBER_WEEKLY_VOLUME.
+#
+#   refresh_volume   incremental; run by the scheduler. Picks up
+#                    LOG_EXERCISE rows past the JOB_WATERMARK and
+#                    weeks queued in VOLUME_DIRTY_WEEK by routes
+#                    that edit or delete logs and exercises.
+#   backfill_volume  rebuilds the whole table from a streamed read
+#                    of the full history, aggregated with numpy.
+#------------------------------------------------------------
+import time
+from datetime import date, datetime
+
+import numpy as np
+import pymysql.cursors
+
+from backend.db_connection import db
+
+WATERMARK_JOB = 'member_weekly_volume'
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_BATCH_SIZE = 50000
+
+# MySQL TO_DAYS() counts from year 0, Python ordinals from 0001-01-01
+TO_DAYS_OFFSET = 365
+
+# Monday of the week a workout log falls in
+WEEK_START_SQL = "DATE_SUB(wl.date, INTERVAL WEEKDAY(wl.date) DAY)"
+
+# Epley: weight x (1 + reps / 30); a single rep is the 1RM itself
+EST_1RM_SQL = """
+    CASE WHEN e.weight > 0 AND e.reps = 1 THEN e.weight
+         WHEN e.weight > 0 AND e.reps > 1 THEN e.weight * (1 + e.reps / 30)
+    END
+"""
+
+
+# --- marking weeks for recomputation (called by routes, inside their transaction) ---
+
+def mark_log_dirty(cursor, log_id):
+    """Queue the week of a workout log; call before and after changing its date, or before deleting it."""
+    cursor.execute(
+        f"""
+        INSERT IGNORE INTO VOLUME_DIRTY_WEEK (member_id, week_start)
+        SELECT wl.member_id, {WEEK_START_SQL}
+        FROM WORKOUT_LOG wl
+        WHERE wl.log_id = %s
+        """,
+        (log_id,)
+    )
+
+
+def mark_exercise_dirty(cursor, exercise_id):
+    """Queue every member week that logged an exercise; call when the exercise changes."""
+    cursor.execute(
+        f"""
+        INSERT IGNORE INTO VOLUME_DIRTY_WEEK (member_id, week_start)
+        SELECT DISTINCT wl.member_id, {WEEK_START_SQL}
+        FROM LOG_EXERCISE le
+        JOIN WORKOUT_LOG wl ON wl.log_id = le.log_id
+        WHERE le.exercise_id = %s
+        """,
+        (exercise_id,)
+    )
+
+
+# --- incremental refresh ---
+
+def _get_watermark(cursor):
+    cursor.execute("SELECT last_id FROM JOB_WATERMARK WHERE job_name = %s", (WATERMARK_JOB,))
+    row = cursor.fetchone()
+    return row['last_id'] if row else 0
+
+
+def _set_watermark(cursor, last_id):
+    cursor.execute(
+        """
+        INSERT INTO JOB_WATERMARK (job_name, last_id, updated_at)
+        VALUES (%s, %s, NOW())
+        ON DUPLICATE KEY UPDATE last_id = VALUES(last_id), updated_at = VALUES(updated_at)
+        """,
+        (WATERMARK_JOB, last_id)
+    )
+
+
+def _recompute_weeks(cursor, weeks):
+    """Replace the MEMBER_WEEKLY_VOLUME rows of the given (member_id, week_start) pairs."""
+    keys = ", ".join(["(%s, %s)"] * len(weeks))
+    params = [value for week in weeks for value in week]
+    members = sorted({member_id for member_id, _ in weeks})
+    member_list = ", ".join(["%s"] * len(members))
+
+    cursor.execute(
+        f"DELETE FROM MEMBER_WEEKLY_VOLUME WHERE (member_id, week_start) IN ({keys})",
+        params
+    )
+    cursor.execute(
+        f"""
+        INSERT INTO MEMBER_WEEKLY_VOLUME
+            (member_id, week_start, category, exercise_count, total_sets, total_reps,
+             tonnage, best_est_1rm, updated_at)
+        SELECT wl.member_id,
+               {WEEK_START_SQL} AS week_start,
+               e.category,
+               COUNT(*),
+               SUM(COALESCE(e.sets, 0)),
+               SUM(COALESCE(e.sets, 0) * COALESCE(e.reps, 0)),
+               SUM(COALESCE(e.sets, 0) * COALESCE(e.reps, 0) * COALESCE(e.weight, 0)),
+               MAX({EST_1RM_SQL}),
+               NOW()
+        FROM LOG_EXERCISE le
+        JOIN WORKOUT_LOG wl ON wl.log_id = le.log_id
+        JOIN EXERCISE e ON e.exercise_id = le.exercise_id
+        WHERE wl.member_id IN ({member_list})
+          AND (wl.member_id, {WEEK_START_SQL}) IN ({keys})
+        GROUP BY wl.member_id, week_start, e.category
+        """,
+        members + params
+    )
+    cursor.execute(
+        f"DELETE FROM VOLUME_DIRTY_WEEK WHERE (member_id, week_start) IN ({keys})",
+        params
+    )
+
+
+def refresh_volume(conn, chunk_size=DEFAULT_CHUNK_SIZE, logger=None):
+    """
+    Bring MEMBER_WEEKLY_VOLUME up to date: queue the weeks of new
+    LOG_EXERCISE rows, then recompute queued weeks chunk by chunk
+    (one commit per chunk). Returns {"new_rows", "weeks_recomputed"}.
+    """
+    started = time.monotonic()
+    cursor = conn.cursor()
+    try:
+        last_id = _get_watermark(cursor)
+        cursor.execute("SELECT COALESCE(MAX(log_exercise_id), 0) AS max_id FROM LOG_EXERCISE")
+        max_id = cursor.fetchone()['max_id']
+
+        new_rows = 0
+        if max_id > last_id:
+            cursor.execute(
+                f"""
+                INSERT IGNORE INTO VOLUME_DIRTY_WEEK (member_id, week_start)
+                SELECT DISTINCT wl.member_id, {WEEK_START_SQL}
+                FROM LOG_EXERCISE le
+                JOIN WORKOUT_LOG wl ON wl.log_id = le.log_id
+                WHERE le.log_exercise_id > %s AND le.log_exercise_id <= %s
+                """,
+                (last_id, max_id)
+            )
+            new_rows = max_id - last_id
+            _set_watermark(cursor, max_id)
+            conn.commit()
+
+        recomputed = 0
+        while True:
+            cursor.execute(
+                "SELECT member_id, week_start FROM VOLUME_DIRTY_WEEK ORDER BY member_id, week_start LIMIT %s",
+                (chunk_size,)
+            )
+            weeks = [(row['member_id'], row['week_start']) for row in cursor.fetchall()]
+            if not weeks:
+                break
+            _recompute_weeks(cursor, weeks)
+            conn.commit()
+            recomputed += len(weeks)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    if logger and (new_rows or recomputed):
+        logger.info(f"[VOLUME] refreshed {recomputed} member weeks "
+                    f"({new_rows} new exercise rows) in {time.monotonic() - started:.2f}s")
+    return {"new_rows": new_rows, "weeks_recomputed": recomputed}
+
+
+def volume_job(app):
+    """Scheduler entry point: incremental refresh on its own connection."""
+    conn = db.connect()
+    try:
+        refresh_volume(conn, logger=app.logger)
+    finally:
+        conn.close()
+
+
+# --- full backfill ---
+
+def _group(keys, exercises, sets, reps, tonnage, est_1rm):
+    """Collapse rows with equal (member, week, category) keys: sums, and max for est. 1RM."""
+    unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    n = len(unique_keys)
+
+    best = np.full(n, np.nan)
+    has_1rm = ~np.isnan(est_1rm)
+    np.fmax.at(best, inverse[has_1rm], est_1rm[has_1rm])
+
+    return (unique_keys,
+            np.bincount(inverse, weights=exercises, minlength=n),
+            np.bincount(inverse, weights=sets, minlength=n),
+            np.bincount(inverse, weights=reps, minlength=n),
+            np.bincount(inverse, weights=tonnage, minlength=n),
+            best)
+
+
+def _aggregate_batch(rows, categories):
+    """Per-row volume for one fetched batch, grouped to per-key partials."""
+    member_ids, week_days, category_names, sets, reps, weight = zip(*rows)
+
+    codes = np.fromiter((categories.setdefault(c, len(categories)) for c in category_names),
+                        dtype=np.int64, count=len(rows))
+    keys = np.column_stack((np.asarray(member_ids, dtype=np.int64),
+                            np.asarray(week_days, dtype=np.int64),
+                            codes))
+
+    # NULL columns arrive as None -> nan -> 0
+    sets = np.nan_to_num(np.array(sets, dtype=float))
+    reps = np.nan_to_num(np.array(reps, dtype=float))
+    weight = np.nan_to_num(np.array(weight, dtype=float))
+
+    est_1rm = np.where(reps > 1, weight * (1 + reps / 30), weight)
+    est_1rm = np.where((weight > 0) & (reps >= 1), est_1rm, np.nan)
+
+    return _group(keys, np.ones(len(rows)), sets, sets * reps, sets * reps * weight, est_1rm)
+
+
+def backfill_volume(conn, batch_size=DEFAULT_BATCH_SIZE, logger=None):
+    """
+    Rebuild MEMBER_WEEKLY_VOLUME from the whole LOG_EXERCISE history.
+    Rows are streamed with an unbuffered cursor and each batch is
+    reduced with numpy to per-(member, week, category) partials, which
+    are merged at the end and written with executemany. Weeks queued
+    while it runs are left for the next refresh_volume.
+    Returns {"rows_read", "summary_rows", "elapsed_seconds"}.
+    """
+    started = time.monotonic()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COALESCE(MAX(log_exercise_id), 0) AS max_id FROM LOG_EXERCISE")
+        max_id = cursor.fetchone()['max_id']
+        # everything queued so far is covered by the full read below
+        cursor.execute("DELETE FROM VOLUME_DIRTY_WEEK")
+        conn.commit()
+    finally:
+        cursor.close()
+
+    categories = {}
+    partials = []
+    rows_read = 0
+
+    stream = conn.cursor(pymysql.cursors.SSCursor)
+    try:
+        stream.execute(
+            f"""
+            SELECT wl.member_id, TO_DAYS({WEEK_START_SQL}), e.category, e.sets, e.reps, e.weight
+            FROM LOG_EXERCISE le
+            JOIN WORKOUT_LOG wl ON wl.log_id = le.log_id
+            JOIN EXERCISE e ON e.exercise_id = le.exercise_id
+            WHERE le.log_exercise_id <= %s
+            """,
+            (max_id,)
+        )
+        while True:
+            rows = stream.fetchmany(batch_size)
+            if not rows:
+                break
+            rows_read += len(rows)
+            partials.append(_aggregate_batch(rows, categories))
+    finally:
+        stream.close()
+
+    if partials:
+        merged_keys = np.concatenate([p[0] for p in partials])
+        merged = [np.concatenate([p[i] for p in partials]) for i in range(1, 6)]
+        keys, exercises, sets, reps, tonnage, best = _group(merged_keys, *merged)
+    else:
+        keys, exercises, sets, reps, tonnage, best = np.empty((0, 3), dtype=np.int64), [], [], [], [], []
+
+    # plain %s placeholders only, so executemany sends multi-row INSERTs
+    names = {code: name for name, code in categories.items()}
+    now = datetime.now()
+    values = [
+        (int(k[0]), date.fromordinal(int(k[1]) - TO_DAYS_OFFSET), names[int(k[2])],
+         int(exercises[i]), int(sets[i]), int(reps[i]), round(float(tonnage[i]), 2),
+         None if np.isnan(best[i]) else round(float(best[i]), 2), now)
+        for i, k in enumerate(keys)
+    ]
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM MEMBER_WEEKLY_VOLUME")
+        for start in range(0, len(values), DEFAULT_CHUNK_SIZE):
+            cursor.executemany(
+                """
+                INSERT INTO MEMBER_WEEKLY_VOLUME
+                    (member_id, week_start, category, exercise_count, total_sets, total_reps,
+                     tonnage, best_est_1rm, updated_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                values[start:start + DEFAULT_CHUNK_SIZE]
+            )
+        _set_watermark(cursor, max_id)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    elapsed = time.monotonic() - started
+    if logger:
+        logger.info(f"[VOLUME] backfilled {len(values)} summary rows from {rows_read} exercise rows in {elapsed:.2f}s")
+    return {"rows_read": rows_read, "summary_rows": len(values), "elapsed_seconds": round(elapsed, 2)}
+
+
+# --- reading ---
+
+def get_member_volume(conn, member_id, weeks=12, category=None):
+    """Weekly totals (with per-category breakdown) and est. 1RM progression for the last `weeks` weeks."""
+    query = """
+        SELECT week_start, category, exercise_count, total_sets, total_reps, tonnage, best_est_1rm
+        FROM MEMBER_WEEKLY_VOLUME
+        WHERE member_id = %s
+          AND week_start >= DATE_SUB(DATE_SUB(CURDATE(), INTERVAL WEEKDAY(CURDATE()) DAY), INTERVAL %s WEEK)
+    """
+    params = [member_id, weeks - 1]
+    if category:
+        query += " AND category = %s"
+        params.append(category)
+    query += " ORDER BY week_start, category"
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        cursor.execute("SELECT updated_at FROM JOB_WATERMARK WHERE job_name = %s", (WATERMARK_JOB,))
+        watermark = cursor.fetchone()
+    finally:
+        cursor.close()
+
+    by_week = {}
+    progression = {}
+    for row in rows:
+        week = row['week_start'].isoformat()
+        totals = by_week.setdefault(week, {
+            "week_start": week, "exercise_count": 0, "total_sets": 0,
+            "total_reps": 0, "tonnage": 0.0, "categories": {},
+        })
+        totals["exercise_count"] += row['exercise_count']
+        totals["total_sets"] += row['total_sets']
+        totals["total_reps"] += row['total_reps']
+        totals["tonnage"] += float(row['tonnage'])
+        totals["categories"][row['category']] = {
+            "exercise_count": row['exercise_count'],
+            "total_sets": row['total_sets'],
+            "total_reps": row['total_reps'],
+            "tonnage": float(row['tonnage']),
+            "best_est_1rm": float(row['best_est_1rm']) if row['best_est_1rm'] is not None else None,
+        }
+        if row['best_est_1rm'] is not None:
+            progression.setdefault(row['category'], []).append(
+                {"week_start": week, "best_est_1rm": float(row['best_est_1rm'])}
+            )
+
+    return {
+        "member_id": member_id,
+        "weeks": list(by_week.values()),
+        "est_1rm_progression": progression,
+        "refreshed_at": watermark['updated_at'] if watermark else None,
+    }
@@ -0,0 +1,180 @@
+#------------------------------------------------------------
+# Invoice aging: moves pending invoices past their due date to
+# 'overdue' and snapshots the overdue totals per gym and aging
+# bucket. One pass covers every gym of the database.
+#------------------------------------------------------------
+from datetime import date, timedelta
+
+from backend.db_connection import db
+
+DEFAULT_TERMS_DAYS = 30
+DEFAULT_BATCH_SIZE = 1000
+
+# (label, first day overdue, last day overdue); None means open-ended
+AGING_BUCKETS = (
+    ('0-30', 0, 30),
+    ('31-60', 31, 60),
+    ('61-90', 61, 90),
+    ('90+', 91, None),
+)
+
+
+def mark_overdue(conn, as_of, terms_days=DEFAULT_TERMS_DAYS, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Flip pending invoices issued more than terms_days before as_of to
+    'overdue'. Each batch is a single UPDATE ... LIMIT served by the
+    (status, date_issued) index and committed on its own, so row locks
+    are held only briefly. Returns the number of invoices moved.
+    """
+    cutoff = as_of - timedelta(days=terms_days)
+    moved = 0
+
+    cursor = conn.cursor()
+    try:
+        while True:
+            cursor.execute(
+                """
+                UPDATE INVOICE SET status = 'overdue'
+                WHERE status = 'pending' AND date_issued < %s
+                LIMIT %s
+                """,
+                (cutoff, batch_size)
+            )
+            conn.commit()
+            moved += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                break
+    finally:
+        cursor.close()
+
+    return moved
+
+
+def _bucket_case():
+    whens = []
+    for label, low, high in AGING_BUCKETS:
+        if high is None:
+            whens.append(f"ELSE '{label}'")
+        else:
+            whens.append(f"WHEN days_overdue <= {high} THEN '{label}'")
+    return "CASE " + " ".join(whens) + " END"
+
+
+def compute_aging(conn, as_of, terms_days=DEFAULT_TERMS_DAYS):
+    """
+    Aggregate overdue invoices into the aging buckets (days past the due
+    date) per gym and upsert them into INVOICE_AGING for as_of. Every
+    gym with invoices gets a row per bucket, empty buckets included.
+    Returns the bucket rows, totalled over the gyms.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            f"""
+            SELECT gym_id,
+                   {_bucket_case()} AS bucket,
+                   COUNT(*) AS invoice_count,
+                   SUM(amount) AS total_amount
+            FROM (
+                SELECT gym_id, amount, DATEDIFF(%s, date_issued) - %s AS days_overdue
+                FROM INVOICE
+                WHERE status = 'overdue'
+            ) overdue
+            GROUP BY gym_id, bucket
+            """,
+            (as_of, terms_days)
+        )
+        totals = {(row['gym_id'], row['bucket']): row for row in cursor.fetchall()}
+
+        # gyms with nothing overdue get empty buckets, not a stale snapshot
+        cursor.execute("SELECT DISTINCT gym_id FROM INVOICE")
+        gym_ids = [row['gym_id'] for row in cursor.fetchall()]
+
+        rows = []
+        for gym_id in gym_ids:
+            for label, _, _ in AGING_BUCKETS:
+                row = totals.get((gym_id, label)) or {}
+                rows.append((as_of, gym_id, label, row.get('invoice_count') or 0, row.get('total_amount') or 0))
+
+        if rows:
+            cursor.executemany(
+                """
+                INSERT INTO INVOICE_AGING (as_of, gym_id, bucket, invoice_count, total_amount, computed_at)
+                VALUES (%s, %s, %s, %s, %s, NOW())
+                ON DUPLICATE KEY UPDATE invoice_count = VALUES(invoice_count),
+                                        total_amount = VALUES(total_amount),
+                                        computed_at = VALUES(computed_at)
+                """,
+                rows
+            )
+        conn.commit()
+    finally:
+        cursor.close()
+
+    return [
+        {
+            "bucket": label,
+            "invoice_count": sum(r[3] for r in rows if r[2] == label),
+            "total_amount": sum(r[4] for r in rows if r[2] == label),
+        }
+        for label, _, _ in AGING_BUCKETS
+    ]
+
+
+def get_aging(conn, gym_id, as_of=None):
+    """Return gym_id's INVOICE_AGING snapshot for as_of (latest when None), or None."""
+    cursor = conn.cursor()
+    try:
+        if as_of is None:
+            cursor.execute("SELECT MAX(as_of) AS as_of FROM INVOICE_AGING WHERE gym_id = %s", (gym_id,))
+            as_of = cursor.fetchone()['as_of']
+            if as_of is None:
+                return None
+
+        cursor.execute(
+            """
+            SELECT bucket, invoice_count, total_amount, computed_at
+            FROM INVOICE_AGING
+            WHERE gym_id = %s AND as_of = %s
+            """,
+            (gym_id, as_of)
+        )
+        rows = {row['bucket']: row for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+    if not rows:
+        return None
+
+    return {
+        "as_of": as_of.isoformat() if hasattr(as_of, 'isoformat') else str(as_of),
+        "computed_at": max(row['computed_at'] for row in rows.values()),
+        "buckets": [
+            {
+                "bucket": label,
+                "invoice_count": rows[label]['invoice_count'] if label in rows else 0,
+                "total_amount": float(rows[label]['total_amount']) if label in rows else 0.0,
+            }
+            for label, _, _ in AGING_BUCKETS
+        ],
+    }
+
+
+def run_aging(conn, as_of=None, terms_days=DEFAULT_TERMS_DAYS, batch_size=DEFAULT_BATCH_SIZE):
+    """Mark overdue invoices, then refresh the aging snapshot. Returns a summary dict."""
+    as_of = as_of or date.today()
+    moved = mark_overdue(conn, as_of, terms_days, batch_size)
+    buckets = compute_aging(conn, as_of, terms_days)
+    return {"as_of": as_of.isoformat(), "marked_overdue": moved, "buckets": buckets}
+
+
+def aging_job(app):
+    """Scheduler entry point: one aging pass on its own connection."""
+    conn = db.connect()
+    try:
+        summary = run_aging(conn, terms_days=app.config['INVOICE_TERMS_DAYS'])
+        app.logger.info(
+            f"[AGING] {summary['as_of']}: {summary['marked_overdue']} invoices marked overdue"
+        )
+    finally:
+        conn.close()
@@ -0,0 +1,94 @@
+#------------------------------------------------------------
+# `flask billing ...` commands, e.g. from inside the api container:
+#   flask --app backend_app billing run 2025-11
+#
+# Each command works on one gym: --gym-id, else DEFAULT_GYM_ID.
+#------------------------------------------------------------
+from decimal import Decimal
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from backend.db_connection import db
+from backend.billing.billing_run import (
+    DEFAULT_CATEGORY, DEFAULT_CHUNK_SIZE, get_run, parse_period, run_billing
+)
+from backend.billing.reconcile import DEFAULT_BATCH_SIZE, MAX_BATCH_SIZE, reconcile
+from backend.tenancy import gyms, using_gym
+
+billing_cli = AppGroup('billing', help='Billing jobs (invoice runs, payment reconciliation).')
+
+gym_option = click.option('--gym-id', type=int, default=None, help='Gym to work on (defaults to DEFAULT_GYM_ID).')
+
+
+def _gym(gym_id):
+    """The GYM row for --gym-id; a CLI error if there is none."""
+    gym = gyms.get(gym_id if gym_id is not None else gyms.default_gym_id)
+    if gym is None:
+        raise click.BadParameter(f"no gym {gym_id}", param_hint='--gym-id')
+    return gym
+
+
+@billing_cli.command('run')
+@click.argument('period')
+@click.option('--amount', type=Decimal, default=None,
+              help='Invoice amount (defaults to MEMBERSHIP_FEE).')
+@click.option('--category', default=DEFAULT_CATEGORY, show_default=True)
+@click.option('--chunk-size', type=click.IntRange(min=1), default=DEFAULT_CHUNK_SIZE, show_default=True)
+@gym_option
+def run_command(period, amount, category, chunk_size, gym_id):
+    """Generate invoices for all active members of the gym for PERIOD (YYYY-MM)."""
+    try:
+        _, period = parse_period(period)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='PERIOD')
+
+    if amount is None:
+        amount = current_app.config['MEMBERSHIP_FEE']
+
+    gym = _gym(gym_id)
+    with using_gym(gym):
+        conn = db.connect()
+        try:
+            summary = run_billing(conn, period, amount, category, chunk_size,
+                                  logger=current_app.logger)
+            run = get_run(conn, period, category)
+        finally:
+            conn.close()
+
+    click.echo(
+        f"Billing run {gym['name']} {period} / {category}: {summary['invoices_created']} invoices created "
+        f"in {summary['elapsed_seconds']}s ({summary['invoices_per_second']}/s); "
+        f"{run['invoices_created']} invoices in total for this period."
+    )
+
+
+@billing_cli.command('reconcile')
+@click.argument('settlement_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--dry-run', is_flag=True, help='Report what would happen without writing.')
+@click.option('--batch-size', type=click.IntRange(min=1, max=MAX_BATCH_SIZE), default=DEFAULT_BATCH_SIZE,
+              show_default=True)
+@gym_option
+def reconcile_command(settlement_file, dry_run, batch_size, gym_id):
+    """Match a settlement CSV against one gym's invoices and record the payments."""
+    gym = _gym(gym_id)
+    with using_gym(gym):
+        conn = db.connect()
+        try:
+            with open(settlement_file, newline='', encoding='utf-8-sig') as f:
+                report = reconcile(conn, f, dry_run=dry_run, batch_size=batch_size,
+                                   gym_id=gym['gym_id'], logger=current_app.logger)
+        finally:
+            conn.close()
+
+    click.echo(f"{report['lines']} lines in {report['elapsed_seconds']}s"
+               f"{' (dry run, nothing written)' if dry_run else ''}")
+    for outcome, count in report['counts'].items():
+        click.echo(f"  {outcome:<16} {count}")
+    click.echo(f"  matched amount   {report['matched_amount']}")
+    click.echo(f"  unmatched amount {report['unmatched_amount']}")
+    for problem in report['exceptions']:
+        click.echo(f"  line {problem['line']}: {problem['outcome']} - {problem['detail']}")
+    if report['exceptions_truncated']:
+        click.echo("  ... more problem lines not shown")
@@ -0,0 +1,269 @@
+#------------------------------------------------------------
+# Month-end billing run: creates one invoice per active member
+# for a billing period, a chunk of members at a time.
+#
+# Runs are per gym: the current request's or job's gym
+# (backend.tenancy) bills its own members and keeps its own
+# BILLING_RUN checkpoint.
+#------------------------------------------------------------
+import threading
+import time
+from datetime import date, datetime
+
+from backend.db_connection import db
+from backend.tenancy import current_gym_id, gyms, using_gym
+
+DEFAULT_CATEGORY = 'Monthly Membership'
+DEFAULT_CHUNK_SIZE = 500
+
+
+def parse_period(period):
+    """
+    Turn a 'YYYY-MM' billing period into (the date invoices are issued
+    on, the period in canonical form). strptime also takes '2025-1', so
+    runs, invoices and lookups use the canonical '2025-01' to keep one
+    run per month. Raises ValueError for anything else.
+    """
+    try:
+        parsed = datetime.strptime(period, '%Y-%m')
+    except (TypeError, ValueError):
+        raise ValueError("billing_period must be in the format YYYY-MM")
+    return date(parsed.year, parsed.month, 1), parsed.strftime('%Y-%m')
+
+
+def get_run(conn, period, category=DEFAULT_CATEGORY):
+    """Return the current gym's BILLING_RUN row for a period/category (or None) with progress figures added."""
+    _, period = parse_period(period)
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT * FROM BILLING_RUN WHERE gym_id = %s AND billing_period = %s AND category = %s",
+        (current_gym_id(), period, category)
+    )
+    run = cursor.fetchone()
+    cursor.close()
+
+    if run:
+        run.update(_progress(run))
+    return run
+
+
+def _progress(run):
+    total = run['members_total'] or 0
+    elapsed = (run['updated_at'] - run['started_at']).total_seconds()
+    return {
+        "percent_complete": round(100.0 * run['members_scanned'] / total, 1) if total else 100.0,
+        "invoices_per_second": round(run['invoices_created'] / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def _start_or_resume(conn, gym_id, period, amount, category):
+    cursor = conn.cursor()
+
+    cursor.execute(
+        "SELECT COUNT(*) AS total FROM GYM_MEMBER WHERE gym_id = %s AND status = 'active'",
+        (gym_id,)
+    )
+    members_total = cursor.fetchone()['total']
+
+    # The unique key on (gym_id, billing_period, category) makes this a
+    # no-op when the run already exists, so a crashed run picks up where
+    # its checkpoint left off instead of starting over.
+    cursor.execute(
+        """
+        INSERT INTO BILLING_RUN (gym_id, billing_period, category, amount, status,
+                                 members_total, started_at, updated_at)
+        VALUES (%s, %s, %s, %s, 'running', %s, NOW(), NOW())
+        ON DUPLICATE KEY UPDATE run_id = run_id
+        """,
+        (gym_id, period, category, amount, members_total)
+    )
+    cursor.execute(
+        "SELECT * FROM BILLING_RUN WHERE gym_id = %s AND billing_period = %s AND category = %s",
+        (gym_id, period, category)
+    )
+    run = cursor.fetchone()
+
+    if run['status'] != 'completed':
+        cursor.execute(
+            "UPDATE BILLING_RUN SET status = 'running', members_total = %s WHERE run_id = %s",
+            (members_total, run['run_id'])
+        )
+        run['members_total'] = members_total
+
+    conn.commit()
+    cursor.close()
+    return run
+
+
+def _mark_failed(conn, run_id):
+    # best effort: the connection itself may be what failed
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE BILLING_RUN SET status = 'failed', updated_at = NOW() WHERE run_id = %s",
+            (run_id,)
+        )
+        conn.commit()
+        cursor.close()
+    except Exception:
+        pass
+
+
+def run_billing(conn, period, amount, category=DEFAULT_CATEGORY,
+                chunk_size=DEFAULT_CHUNK_SIZE, logger=None):
+    """
+    Generate invoices for every active member of the current gym for the
+    given billing period.
+
+    Members are processed in member_id order, chunk_size at a time. Each
+    chunk is one set-based INSERT ... SELECT plus a checkpoint update,
+    committed together, so a crash loses at most the chunk in flight and
+    re-running the same period never creates duplicate invoices.
+
+    Args:
+        conn: an open pymysql connection (DictCursor)
+        period: billing period as 'YYYY-MM'
+        amount: invoice amount used when the run is first created
+        category: invoice category, also part of the idempotency key
+        chunk_size: number of members per transaction (at least 1)
+        logger: optional logger for progress messages
+
+    Returns:
+        dict summarising the run and the throughput of this invocation
+    """
+    issue_date, period = parse_period(period)
+    # a chunk of no members would end the loop at once and mark the
+    # run completed without billing anyone
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    gym_id = current_gym_id()
+    run = _start_or_resume(conn, gym_id, period, amount, category)
+
+    if run['status'] == 'completed':
+        if logger:
+            logger.info(f"[BILLING] {period} / {category} already completed, nothing to do")
+        return {"run_id": run['run_id'], "status": "completed", "invoices_created": 0,
+                "elapsed_seconds": 0.0, "invoices_per_second": None}
+
+    run_id = run['run_id']
+    last_member_id = run['last_member_id']
+    created_total = 0
+    started = time.monotonic()
+
+    cursor = conn.cursor()
+    try:
+        while True:
+            # upper member_id bound of the next chunk
+            cursor.execute(
+                """
+                SELECT MAX(member_id) AS upper_id, COUNT(*) AS scanned FROM (
+                    SELECT member_id FROM GYM_MEMBER
+                    WHERE gym_id = %s AND status = 'active' AND member_id > %s
+                    ORDER BY member_id
+                    LIMIT %s
+                ) chunk
+                """,
+                (gym_id, last_member_id, chunk_size)
+            )
+            chunk = cursor.fetchone()
+            if not chunk or chunk['upper_id'] is None:
+                break
+
+            cursor.execute(
+                """
+                INSERT INTO INVOICE (gym_id, member_id, trainer_id, amount, date_issued, status,
+                                     category, date, billing_period)
+                SELECT gym_id, member_id, trainer_id, %s, %s, 'pending', %s, %s, %s
+                FROM GYM_MEMBER
+                WHERE gym_id = %s AND status = 'active' AND member_id > %s AND member_id <= %s
+                ON DUPLICATE KEY UPDATE invoice_id = invoice_id
+                """,
+                (run['amount'], issue_date, category, issue_date, period,
+                 gym_id, last_member_id, chunk['upper_id'])
+            )
+            created = cursor.rowcount
+
+            cursor.execute(
+                """
+                UPDATE BILLING_RUN
+                SET last_member_id = %s,
+                    members_scanned = members_scanned + %s,
+                    invoices_created = invoices_created + %s,
+                    updated_at = NOW()
+                WHERE run_id = %s
+                """,
+                (chunk['upper_id'], chunk['scanned'], created, run_id)
+            )
+            conn.commit()
+
+            last_member_id = chunk['upper_id']
+            created_total += created
+
+            if logger:
+                elapsed = max(time.monotonic() - started, 1e-6)
+                logger.info(
+                    f"[BILLING] {period}: up to member {last_member_id}, "
+                    f"{created_total} invoices ({created_total / elapsed:.0f}/s)"
+                )
+
+        cursor.execute(
+            "UPDATE BILLING_RUN SET status = 'completed', finished_at = NOW(), updated_at = NOW() "
+            "WHERE run_id = %s",
+            (run_id,)
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        _mark_failed(conn, run_id)
+        raise
+    finally:
+        cursor.close()
+
+    elapsed = time.monotonic() - started
+    return {
+        "run_id": run_id,
+        "status": "completed",
+        "invoices_created": created_total,
+        "elapsed_seconds": round(elapsed, 2),
+        "invoices_per_second": round(created_total / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+# (gym_id, period, category) with a run currently executing in this process
+_active_runs = set()
+_active_lock = threading.Lock()
+
+
+def start_background_run(app, period, amount, category=DEFAULT_CATEGORY,
+                         chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Run run_billing for the current gym on its own connection in a daemon
+    thread so the HTTP request can return straight away. Returns False if
+    the same run is already executing in this process.
+    """
+    _, period = parse_period(period)
+    # the thread has no request: it runs as the request's gym
+    gym = gyms.current_gym()
+    key = (current_gym_id(), period, category)
+    with _active_lock:
+        if key in _active_runs:
+            return False
+        _active_runs.add(key)
+
+    def work():
+        conn = None
+        try:
+            with using_gym(gym):
+                conn = db.connect()
+                summary = run_billing(conn, period, amount, category, chunk_size, logger=app.logger)
+            app.logger.info(f"[BILLING] gym {key[0]} {period} / {category} finished: {summary}")
+        except Exception as e:
+            app.logger.error(f"[BILLING] gym {key[0]} {period} / {category} failed: {str(e)}")
+        finally:
+            if conn:
+                conn.close()
+            with _active_lock:
+                _active_runs.discard(key)
+
+    threading.Thread(target=work, name=f"billing-run-{period}", daemon=True).start()
+    return True
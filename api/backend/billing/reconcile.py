@@ -0,0 +1,265 @@
+#------------------------------------------------------------
+# Payment reconciliation: streams a bank/processor settlement
+# file, matches each line to an INVOICE and records PAYMENTs.
+# With a gym_id, only that gym's invoices match; lines for other
+# gyms' invoices come out as not_found.
+#
+# Expected CSV header (card_details and bank_info are optional):
+#   reference,invoice_id,amount,paid_date,card_details,bank_info
+#------------------------------------------------------------
+import csv
+import time
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10000
+
+# only the first few problem lines are kept so memory stays flat
+MAX_EXCEPTIONS = 100
+
+# references and invoices a dry run remembers from earlier batches
+# (nothing is written, so the database can't tell it about them)
+DRY_RUN_MEMORY = 100000
+
+# invoice states a settlement line is allowed to settle
+PAYABLE_STATUSES = ('pending', 'overdue')
+
+OUTCOMES = (
+    'matched',          # payment recorded, invoice flipped to paid
+    'invalid',          # line could not be parsed
+    'not_found',        # no such invoice
+    'duplicate',        # reference already recorded, or repeated in the file
+    'already_paid',     # invoice is paid/voided already
+    'amount_mismatch',  # amount differs from the invoice amount
+)
+
+
+def _parse_line(row):
+    invoice_id = int(row['invoice_id'])
+    amount = Decimal(row['amount'].strip())
+    paid_date = datetime.strptime(row['paid_date'].strip(), '%Y-%m-%d').date()
+    reference = (row.get('reference') or '').strip()
+    if not reference:
+        raise ValueError("missing reference")
+    return {
+        "reference": reference,
+        "invoice_id": invoice_id,
+        "amount": amount,
+        "paid_date": paid_date,
+        "card_details": (row.get('card_details') or None),
+        "bank_info": (row.get('bank_info') or None),
+    }
+
+
+def _batches(reader, size):
+    # (line_number, row) pairs; line 1 is the header
+    numbered = enumerate(reader, start=2)
+    while True:
+        batch = list(islice(numbered, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _in_clause(values):
+    return ', '.join(['%s'] * len(values))
+
+
+def _new_report(dry_run):
+    return {
+        "dry_run": dry_run,
+        "lines": 0,
+        "counts": {outcome: 0 for outcome in OUTCOMES},
+        "matched_amount": Decimal('0'),
+        "unmatched_amount": Decimal('0'),
+        "exceptions": [],
+        "exceptions_truncated": False,
+    }
+
+
+def _record(report, outcome, line_number=None, amount=None, detail=None):
+    report['counts'][outcome] += 1
+
+    if outcome == 'matched':
+        report['matched_amount'] += amount
+        return
+
+    if amount is not None:
+        report['unmatched_amount'] += amount
+
+    if len(report['exceptions']) < MAX_EXCEPTIONS:
+        report['exceptions'].append({"line": line_number, "outcome": outcome, "detail": detail})
+    else:
+        report['exceptions_truncated'] = True
+
+
+class _Recent:
+    """The last max_size values added, for membership tests."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._values = OrderedDict()
+
+    def add(self, value):
+        self._values[value] = None
+        self._values.move_to_end(value)
+        if len(self._values) > self.max_size:
+            self._values.popitem(last=False)
+
+    def __contains__(self, value):
+        return value in self._values
+
+
+def _gym_filter(gym_id):
+    return " AND gym_id = %s" if gym_id is not None else ""
+
+
+def _reconcile_batch(cursor, batch, report, gym_id=None, recent=None):
+    """
+    Classify one batch of lines and return the payments to write.
+
+    Earlier batches' payments are in PAYMENT and their invoices are paid,
+    so the lookups below catch repeats across batches. In a dry run they
+    were never written; recent = (references, invoice ids) remembered
+    from earlier batches stands in for them.
+    """
+    parsed = []
+    for line_number, row in batch:
+        try:
+            parsed.append((line_number, _parse_line(row)))
+        except (KeyError, TypeError, ValueError, InvalidOperation) as e:
+            _record(report, 'invalid', line_number, detail=str(e))
+
+    if not parsed:
+        return []
+
+    invoice_ids = list({line['invoice_id'] for _, line in parsed})
+    cursor.execute(
+        f"SELECT invoice_id, amount, status FROM INVOICE "
+        f"WHERE invoice_id IN ({_in_clause(invoice_ids)}){_gym_filter(gym_id)}",
+        invoice_ids + ([gym_id] if gym_id is not None else [])
+    )
+    invoices = {row['invoice_id']: row for row in cursor.fetchall()}
+
+    references = list({line['reference'] for _, line in parsed})
+    cursor.execute(
+        f"SELECT reference FROM PAYMENT WHERE reference IN ({_in_clause(references)})",
+        references
+    )
+    seen_references = {row['reference'] for row in cursor.fetchall()}
+    settled_invoices = set()
+    if recent is not None:
+        recent_references, recent_invoices = recent
+        seen_references.update(r for r in references if r in recent_references)
+        settled_invoices.update(i for i in invoice_ids if i in recent_invoices)
+
+    payments = []
+    for line_number, line in parsed:
+        invoice = invoices.get(line['invoice_id'])
+
+        if line['reference'] in seen_references:
+            _record(report, 'duplicate', line_number, line['amount'],
+                    f"reference {line['reference']} already recorded")
+        elif invoice is None:
+            _record(report, 'not_found', line_number, line['amount'],
+                    f"invoice {line['invoice_id']} does not exist")
+        elif line['invoice_id'] in settled_invoices:
+            _record(report, 'already_paid', line_number, line['amount'],
+                    f"invoice {line['invoice_id']} is settled by an earlier line")
+        elif invoice['status'] not in PAYABLE_STATUSES:
+            _record(report, 'already_paid', line_number, line['amount'],
+                    f"invoice {line['invoice_id']} is {invoice['status']}")
+        elif invoice['amount'] != line['amount']:
+            _record(report, 'amount_mismatch', line_number, line['amount'],
+                    f"invoice {line['invoice_id']} is {invoice['amount']}, paid {line['amount']}")
+        else:
+            _record(report, 'matched', amount=line['amount'])
+            payments.append(line)
+            settled_invoices.add(line['invoice_id'])
+            if recent is not None:
+                recent_invoices.add(line['invoice_id'])
+
+        seen_references.add(line['reference'])
+        if recent is not None:
+            recent_references.add(line['reference'])
+
+    return payments
+
+
+def reconcile(conn, lines, dry_run=False, batch_size=DEFAULT_BATCH_SIZE, gym_id=None, logger=None):
+    """
+    Reconcile a settlement file against INVOICE.
+
+    The file is read batch_size lines at a time. For each batch the
+    matching invoices and already-recorded references are fetched with one
+    IN (...) query each, the matched payments are inserted with a single
+    executemany, and the invoices are flipped to 'paid' with a single
+    set-based UPDATE. Each batch is its own transaction; in dry-run mode
+    nothing is written, and the last DRY_RUN_MEMORY references and
+    settled invoices are remembered instead so repeats in later batches
+    are still reported. Memory is bounded by batch_size and
+    DRY_RUN_MEMORY, not by the size of the file.
+
+    Args:
+        conn: an open pymysql connection (DictCursor)
+        lines: iterable of text lines (an open file, an upload stream, ...)
+        dry_run: classify the lines but do not write anything
+        batch_size: lines per batch/transaction (1..MAX_BATCH_SIZE)
+        gym_id: only settle this gym's invoices (None: any invoice)
+        logger: optional logger for progress messages
+
+    Returns:
+        dict report with per-outcome counts, totals and the first problem lines
+    """
+    if not 1 <= batch_size <= MAX_BATCH_SIZE:
+        raise ValueError(f"batch_size must be between 1 and {MAX_BATCH_SIZE}")
+
+    report = _new_report(dry_run)
+    recent = (_Recent(DRY_RUN_MEMORY), _Recent(DRY_RUN_MEMORY)) if dry_run else None
+    started = time.monotonic()
+    reader = csv.DictReader(lines)
+
+    cursor = conn.cursor()
+    try:
+        for batch in _batches(reader, batch_size):
+            report['lines'] += len(batch)
+            payments = _reconcile_batch(cursor, batch, report, gym_id, recent)
+
+            if payments and not dry_run:
+                cursor.executemany(
+                    """
+                    INSERT INTO PAYMENT (invoice_id, paid_date, card_details, bank_info, amount, reference)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    """,
+                    [(p['invoice_id'], p['paid_date'], p['card_details'], p['bank_info'],
+                      p['amount'], p['reference']) for p in payments]
+                )
+                invoice_ids = [p['invoice_id'] for p in payments]
+                cursor.execute(
+                    f"""
+                    UPDATE INVOICE SET status = 'paid'
+                    WHERE invoice_id IN ({_in_clause(invoice_ids)})
+                      AND status IN ('pending', 'overdue'){_gym_filter(gym_id)}
+                    """,
+                    invoice_ids + ([gym_id] if gym_id is not None else [])
+                )
+                conn.commit()
+
+            if logger:
+                logger.info(
+                    f"[RECONCILE] {report['lines']} lines, "
+                    f"{report['counts']['matched']} matched{' (dry run)' if dry_run else ''}"
+                )
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    elapsed = time.monotonic() - started
+    report['elapsed_seconds'] = round(elapsed, 2)
+    report['lines_per_second'] = round(report['lines'] / elapsed, 1) if elapsed > 0 else None
+    return report
@@ -0,0 +1,46 @@
+#------------------------------------------------------------
+# This file creates the in-process caches shared by the routes.
+#------------------------------------------------------------
+from backend.db_connection import unit_of_work
+from backend.cache.entity_cache import EntityCache
+from backend.cache.name_directory import NameDirectory
+from backend.cache.per_tenant import PerTenant
+from backend.cache.single_flight import SingleFlight
+from backend.cache.versioned import VersionedTableCache
+
+
+# The EXERCISE catalog rarely changes and is read for every expanded
+# workout plan or log. Exercise write routes bump its version. It is
+# shared by the gyms in a database.
+exercise_catalog = PerTenant(lambda schema: VersionedTableCache(
+    'exercise_catalog',
+    "SELECT exercise_id, category, sets, reps, weight FROM EXERCISE",
+    'exercise_id',
+), per='database')
+
+# Member and trainer names for list and report rows, instead of
+# joining GYM_MEMBER / TRAINER for them; one directory per gym.
+# Write routes that insert or rename keep them current.
+member_names = PerTenant(
+    lambda gym_id: NameDirectory(f'member_names:{gym_id}', 'GYM_MEMBER', 'member_id', gym_id=gym_id)
+)
+trainer_names = PerTenant(
+    lambda gym_id: NameDirectory(f'trainer_names:{gym_id}', 'TRAINER', 'trainer_id', gym_id=gym_id)
+)
+
+# Hot single-row reads (trainer, client profile, plans, ...), kept
+# per gym. Write routes call entity_cache.invalidate() after committing.
+entity_cache = EntityCache()
+
+# Identical concurrent GETs (of one gym) share one query: @single_flight.coalesce
+single_flight = SingleFlight()
+
+
+def cached_row(entity_type, key, query, params):
+    """One row from query, read through entity_cache; None if there is no such row."""
+    def load():
+        with unit_of_work() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchone()
+
+    return entity_cache.get_or_load(entity_type, key, load)
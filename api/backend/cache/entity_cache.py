@@ -0,0 +1,191 @@
+#------------------------------------------------------------
+# Read-through cache for single rows that are read on almost
+# every page load (a trainer, a client profile, a plan, ...).
+#
+# Each entity type has its own TTL and size limit. Entries are
+# kept per gym (backend.tenancy): ids are only unique within a
+# gym's database, and one busy gym can't evict another's rows.
+# Write routes call invalidate() after they commit. Backends:
+#
+#   ENTITY_CACHE_BACKEND=local   (default) per process; other API
+#                                workers see a change after the TTL
+#   ENTITY_CACHE_BACKEND=redis   shared by all workers at REDIS_URL
+#                                (needs the `redis` package)
+#------------------------------------------------------------
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from backend.metrics import metrics
+from backend.tenancy import current_gym_id
+
+# entity type -> seconds an entry lives, most entries kept (per gym and
+# process for the local backend)
+ENTITY_TYPES = {
+    "trainer":        {"ttl": 300, "max_entries": 1000},
+    "nutritionist":   {"ttl": 300, "max_entries": 1000},
+    "client_profile": {"ttl": 60,  "max_entries": 5000},
+    "workout_plan":   {"ttl": 120, "max_entries": 5000},
+    "meal_plan":      {"ttl": 120, "max_entries": 5000},
+}
+
+
+class LocalBackend:
+    """One LRU dict per entity type and gym, in this process."""
+
+    def __init__(self, entity_types):
+        self._entity_types = entity_types
+        self._entries = {}  # (entity type, gym) -> OrderedDict
+        self._lock = threading.Lock()
+
+    def _partition(self, entity_type, gym):
+        entries = self._entries.get((entity_type, gym))
+        if entries is None:
+            entries = self._entries[(entity_type, gym)] = OrderedDict()
+        return entries
+
+    def get(self, entity_type, gym, key):
+        with self._lock:
+            entries = self._partition(entity_type, gym)
+            item = entries.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return value
+
+    def set(self, entity_type, gym, key, value):
+        spec = self._entity_types[entity_type]
+        with self._lock:
+            entries = self._partition(entity_type, gym)
+            entries[key] = (value, time.monotonic() + spec["ttl"])
+            entries.move_to_end(key)
+            while len(entries) > spec["max_entries"]:
+                entries.popitem(last=False)
+
+    def delete(self, entity_type, gym, key):
+        with self._lock:
+            self._partition(entity_type, gym).pop(key, None)
+
+    def clear(self, entity_type):
+        with self._lock:
+            for (name, _), entries in self._entries.items():
+                if name == entity_type:
+                    entries.clear()
+
+    def sizes(self):
+        sizes = dict.fromkeys(self._entity_types, 0)
+        with self._lock:
+            for (name, _), entries in self._entries.items():
+                sizes[name] += len(entries)
+        return sizes
+
+
+class RedisBackend:
+    """
+    Entries shared by every API worker. Rows are pickled (they hold
+    dates and Decimals); size is bounded by the TTLs and Redis'
+    own maxmemory policy rather than max_entries.
+    """
+
+    PREFIX = 'soma:entity'
+
+    def __init__(self, url, entity_types):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("ENTITY_CACHE_BACKEND=redis needs the `redis` package installed")
+        self._redis = redis.Redis.from_url(url)
+        self._entity_types = entity_types
+
+    def _key(self, entity_type, gym, key):
+        return f"{self.PREFIX}:{entity_type}:{gym}:{key}"
+
+    def get(self, entity_type, gym, key):
+        raw = self._redis.get(self._key(entity_type, gym, key))
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, entity_type, gym, key, value):
+        self._redis.setex(self._key(entity_type, gym, key), self._entity_types[entity_type]["ttl"],
+                          pickle.dumps(value))
+
+    def delete(self, entity_type, gym, key):
+        self._redis.delete(self._key(entity_type, gym, key))
+
+    def clear(self, entity_type):
+        keys = list(self._redis.scan_iter(match=f"{self.PREFIX}:{entity_type}:*", count=500))
+        if keys:
+            self._redis.delete(*keys)
+
+    def sizes(self):
+        return {}
+
+
+class EntityCache:
+    def __init__(self, entity_types=None):
+        self.entity_types = dict(entity_types or ENTITY_TYPES)
+        self.enabled = True
+        self.backend = LocalBackend(self.entity_types)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("ENTITY_CACHE_ENABLED", True)
+        if app.config.get("ENTITY_CACHE_BACKEND", "local") == "redis":
+            self.backend = RedisBackend(app.config["REDIS_URL"], self.entity_types)
+        app.extensions['entity_cache'] = self
+
+        metrics.gauge("entity_cache.hit_rate", self.hit_rates)
+        metrics.gauge("entity_cache.size", self.backend.sizes)
+
+    def get_or_load(self, entity_type, key, loader):
+        """
+        Cached row for (entity_type, key) in the current gym, else loader()
+        stored under it.
+        A None result (not found) is not cached. Backend errors fall
+        back to loader() so a cache outage never fails the request.
+        """
+        if not self.enabled:
+            return loader()
+
+        gym = current_gym_id()
+        try:
+            value = self.backend.get(entity_type, gym, key)
+        except Exception:
+            metrics.incr("entity_cache.error", entity=entity_type)
+            return loader()
+
+        if value is not None:
+            metrics.incr("entity_cache.hit", entity=entity_type)
+            return value
+
+        metrics.incr("entity_cache.miss", entity=entity_type)
+        value = loader()
+        if value is not None:
+            try:
+                self.backend.set(entity_type, gym, key, value)
+            except Exception:
+                metrics.incr("entity_cache.error", entity=entity_type)
+        return value
+
+    def invalidate(self, entity_type, key=None):
+        """Drop one entry of the current gym, or every entry of entity_type (all gyms) when key is None."""
+        try:
+            if key is None:
+                self.backend.clear(entity_type)
+            else:
+                self.backend.delete(entity_type, current_gym_id(), key)
+            metrics.incr("entity_cache.invalidation", entity=entity_type)
+        except Exception:
+            metrics.incr("entity_cache.error", entity=entity_type)
+
+    def hit_rates(self):
+        rates = {}
+        for entity_type in self.entity_types:
+            hits = metrics.counter("entity_cache.hit", entity=entity_type)
+            misses = metrics.counter("entity_cache.miss", entity=entity_type)
+            if hits or misses:
+                rates[entity_type] = round(hits / (hits + misses), 4)
+        return rates
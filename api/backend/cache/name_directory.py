@@ -0,0 +1,56 @@
+#------------------------------------------------------------
+# First and last names by id (members, trainers), kept in
+# process memory so list routes don't join GYM_MEMBER or TRAINER
+# just to show a name:
+#
+#   cursor.execute("SELECT log_id, member_id, date ... FROM WORKOUT_LOG ...")
+#   rows = cursor.fetchall()
+#   member_names.decorate(db.get_db(), rows, 'member_id')
+#
+# decorate() adds first_name/last_name (or the keys given) to
+# each row; ids without a row get None, like a LEFT JOIN.
+#
+# Each entry is a (first_name, last_name) tuple, loaded once with
+# one query and reloaded when CACHE_VERSION moves (see
+# versioned.py). Write routes keep it current:
+#
+#   new row     remember(id, first_name, last_name) after commit;
+#               other API workers load it on their first miss
+#   rename      bump_version(cursor) in the transaction and
+#               invalidate() after commit
+#
+# With gym_id, only that gym's rows are loaded (one directory per
+# gym, see backend.cache.per_tenant).
+#------------------------------------------------------------
+from backend.cache.versioned import VersionedTableCache
+
+
+class NameDirectory(VersionedTableCache):
+    def __init__(self, name, table, id_column, check_seconds=5, gym_id=None):
+        query = f"SELECT {id_column}, first_name, last_name FROM {table}"
+        super().__init__(
+            name,
+            query if gym_id is None else query + " WHERE gym_id = %s",
+            id_column,
+            check_seconds=check_seconds,
+            load_params=() if gym_id is None else (gym_id,),
+        )
+
+    def _index(self, rows):
+        return {row[self.id_column]: (row['first_name'], row['last_name']) for row in rows}
+
+    def decorate(self, conn, rows, id_key=None, first_key='first_name', last_key='last_name'):
+        """Add the names for row[id_key] to each row (in place); returns rows."""
+        id_key = id_key or self.id_column
+        ids = {row[id_key] for row in rows if row.get(id_key) is not None}
+        names = self.get_many(conn, ids) if ids else {}
+        for row in rows:
+            row[first_key], row[last_key] = names.get(row.get(id_key), (None, None))
+        return rows
+
+    def remember(self, key, first_name, last_name):
+        """Add a row this process just inserted, without reloading the table."""
+        with self._lock:
+            if self._rows is not None:
+                # copy on write: readers may be holding the current dict
+                self._rows = {**self._rows, key: (first_name, last_name)}
@@ -0,0 +1,53 @@
+#------------------------------------------------------------
+# One cache per gym (or per database), behind one name:
+#
+#   member_names = PerTenant(lambda gym_id: NameDirectory(...))
+#   member_names.decorate(conn, rows)    # the current gym's copy
+#
+# Caches are made on first use by factory(key), where key is the
+# current gym_id (per='gym') or schema (per='database', None for
+# the shared default database; for tables without a gym_id, such
+# as EXERCISE). Attribute access goes to the copy of the gym the
+# request or job is for (backend.tenancy), so a busy gym reloads
+# and evicts only its own copy.
+#------------------------------------------------------------
+import threading
+
+from backend.tenancy import gyms
+
+
+class PerTenant:
+    def __init__(self, factory, per='gym'):
+        if per not in ('gym', 'database'):
+            raise ValueError("per must be 'gym' or 'database'")
+        self._factory = factory
+        self._per = per
+        self._caches = {}
+        self._lock = threading.Lock()
+        self.app = None
+
+    def init_app(self, app):
+        with self._lock:
+            self.app = app
+            for cache in self._caches.values():
+                cache.init_app(app)
+
+    def _current_key(self):
+        return gyms.current_gym_id() if self._per == 'gym' else gyms.current_schema()
+
+    def current(self):
+        """The current gym's cache, made on first use."""
+        key = self._current_key()
+        cache = self._caches.get(key)
+        if cache is None:
+            with self._lock:
+                cache = self._caches.get(key)
+                if cache is None:
+                    cache = self._factory(key)
+                    if self.app is not None:
+                        cache.init_app(self.app)
+                    self._caches[key] = cache
+        return cache
+
+    def __getattr__(self, name):
+        return getattr(self.current(), name)
@@ -0,0 +1,88 @@
+#------------------------------------------------------------
+# Single-flight for GET routes: while a request for a given URL
+# is running, identical requests that arrive wait for it and get
+# a copy of its response instead of running the same SQL again.
+#
+# Nothing is kept once the first request finishes, so this only
+# merges truly concurrent reads (e.g. a whole class opening their
+# dashboards when a session ends) and never serves stale data.
+#------------------------------------------------------------
+import threading
+from functools import wraps
+
+from flask import Response, make_response, request
+
+from backend.metrics import metrics
+from backend.tenancy import current_gym_id
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None    # (body, status, headers)
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        app.extensions['single_flight'] = self
+        metrics.gauge("singleflight.in_flight", self.in_flight)
+
+    def do(self, key, func):
+        """
+        Run func() once for all concurrent callers with the same key.
+        Returns (result, shared) where shared is True for callers that
+        waited on another caller's run. An exception from func() is
+        raised in every caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.response, True
+
+        try:
+            call.response = func()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.response, False
+
+    def in_flight(self):
+        return len(self._calls)
+
+    def coalesce(self, view):
+        """Decorator for GET routes: identical concurrent requests share one run of the view."""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # the same URL reads different rows for each gym
+            key = (current_gym_id(), request.full_path)
+
+            def run():
+                response = make_response(view(*args, **kwargs))
+                return response.get_data(), response.status_code, list(response.headers)
+
+            (body, status, headers), shared = self.do(key, run)
+            if shared:
+                metrics.incr("singleflight.coalesced", endpoint=request.endpoint)
+            else:
+                metrics.incr("singleflight.executed", endpoint=request.endpoint)
+            return Response(body, status=status, headers=headers)
+
+        return wrapper
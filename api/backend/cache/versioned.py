@@ -0,0 +1,90 @@
+#------------------------------------------------------------
+# A whole small table (e.g. the EXERCISE catalog) kept in
+# process memory, keyed by id.
+#
+# Writers bump a counter in CACHE_VERSION in the same transaction
+# as their change. Readers compare that counter with the one their
+# copy was loaded at, at most every check_seconds, and reload the
+# table when it moved. Writes made by this process are seen right
+# away (invalidate()); writes from other API workers within
+# check_seconds.
+#------------------------------------------------------------
+import threading
+import time
+
+from backend.metrics import metrics
+
+
+class VersionedTableCache:
+    def __init__(self, name, load_query, id_column, check_seconds=5, load_params=()):
+        self.name = name
+        self.load_query = load_query
+        self.load_params = tuple(load_params)
+        self.id_column = id_column
+        self.check_seconds = check_seconds
+        self._rows = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.check_seconds = app.config.get("CACHE_VERSION_CHECK_SECONDS", self.check_seconds)
+
+    def _db_version(self, cursor):
+        cursor.execute("SELECT version FROM CACHE_VERSION WHERE name = %s", (self.name,))
+        row = cursor.fetchone()
+        return row['version'] if row else 0
+
+    def _refresh(self, conn, force=False):
+        """Return the cached rows, reloading them when the stored version moved."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._rows is not None and now - self._checked_at < self.check_seconds:
+                metrics.incr("cache.hit", cache=self.name)
+                return self._rows
+
+            cursor = conn.cursor()
+            try:
+                version = self._db_version(cursor)
+                if force or self._rows is None or version != self._version:
+                    cursor.execute(self.load_query, self.load_params or None)
+                    self._rows = self._index(cursor.fetchall())
+                    self._version = version
+                    metrics.incr("cache.load", cache=self.name)
+                else:
+                    metrics.incr("cache.hit", cache=self.name)
+                self._checked_at = now
+            finally:
+                cursor.close()
+            return self._rows
+
+    def _index(self, rows):
+        """The in-memory copy: id -> row. Subclasses may keep less of each row."""
+        return {row[self.id_column]: row for row in rows}
+
+    def all(self, conn):
+        return list(self._refresh(conn).values())
+
+    def get_many(self, conn, ids):
+        """Rows for ids (as a dict); ids missing from the copy trigger one reload."""
+        rows = self._refresh(conn)
+        if any(i not in rows for i in ids):
+            rows = self._refresh(conn, force=True)
+        return {i: rows[i] for i in ids if i in rows}
+
+    def bump_version(self, cursor):
+        """Mark the table changed; call inside the writing transaction, before commit."""
+        cursor.execute(
+            """
+            INSERT INTO CACHE_VERSION (name, version, updated_at)
+            VALUES (%s, 1, NOW())
+            ON DUPLICATE KEY UPDATE version = version + 1, updated_at = NOW()
+            """,
+            (self.name,)
+        )
+
+    def invalidate(self):
+        """Drop this process's copy; call after the writing transaction commits."""
+        with self._lock:
+            self._rows = None
+            self._version = None
@@ -1,10 +1,18 @@
 #------------------------------------------------------------
 # This file creates a shared DB connection resource
 #------------------------------------------------------------
-from flaskext.mysql import MySQL
 from pymysql import cursors
 
+from backend.db_connection.circuit_breaker import CircuitBreaker
+from backend.db_connection.errors import DBError, db_error_response
+from backend.db_connection.routing import RoutedMySQL
+from backend.db_connection.unit_of_work import retry_on_deadlock, unit_of_work
 
-# the parameter instructs the connection to return data 
-# as a dictionary object. 
-db = MySQL(cursorclass=cursors.DictCursor)
\ No newline at end of file
+
+# the parameter instructs the connection to return data
+# as a dictionary object. Connections go to the current gym's
+# schema (see routing.py).
+db = RoutedMySQL(cursorclass=cursors.DictCursor)
+
+# fails requests fast while MySQL is unreachable (see circuit_breaker.py)
+breaker = CircuitBreaker()
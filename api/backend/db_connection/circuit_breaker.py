@@ -0,0 +1,97 @@
+#------------------------------------------------------------
+# Circuit breaker in front of MySQL.
+#
+# After DB_BREAKER_FAILURES connection-level failures in a row
+# (can't connect, gone away, too many connections, ...) the
+# breaker opens: requests are answered 503 straight away instead
+# of each waiting for a connect timeout, and a background thread
+# tries `SELECT 1` every DB_BREAKER_PROBE_SECONDS. The first probe
+# that succeeds closes the breaker again.
+#
+# /ops stays reachable while it is open, so the state can be
+# watched through /ops/metrics (db.circuit_open).
+#------------------------------------------------------------
+import threading
+import time
+
+from flask import jsonify, request
+
+from backend.metrics import metrics
+
+EXEMPT_BLUEPRINTS = {'ops'}
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, probe_interval=5):
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.enabled = True
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+        self._probe_thread = None
+        self.app = None
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get("DB_BREAKER_ENABLED", True)
+        self.failure_threshold = app.config.get("DB_BREAKER_FAILURES", self.failure_threshold)
+        self.probe_interval = app.config.get("DB_BREAKER_PROBE_SECONDS", self.probe_interval)
+        app.extensions['db_breaker'] = self
+        app.before_request(self._before_request)
+        metrics.gauge("db.circuit_open", lambda: int(self.is_open))
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def _before_request(self):
+        if not self.is_open or request.blueprint in EXEMPT_BLUEPRINTS:
+            return None
+        metrics.incr("db.circuit_rejected", endpoint=request.endpoint)
+        response = jsonify({"error": "The database is temporarily unavailable, try again shortly",
+                            "error_type": "transient"})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(self.probe_interval)
+        return response
+
+    def record_success(self):
+        self._failures = 0
+
+    def record_failure(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._failures += 1
+            if self._failures < self.failure_threshold or self.is_open:
+                return
+            self._opened_at = time.monotonic()
+            self._probe_thread = threading.Thread(target=self._probe, name='db-breaker-probe', daemon=True)
+            self._probe_thread.start()
+        metrics.incr("db.circuit_opened")
+        if self.app:
+            self.app.logger.error(f"[DB BREAKER] open after {self._failures} connection failures")
+
+    def _probe(self):
+        from backend.db_connection import db
+
+        while True:
+            time.sleep(self.probe_interval)
+            try:
+                with self.app.app_context():
+                    conn = db.connect()
+                    try:
+                        with conn.cursor() as cursor:
+                            cursor.execute("SELECT 1")
+                    finally:
+                        conn.close()
+            except Exception as e:
+                self.app.logger.warning(f"[DB BREAKER] probe failed: {e!r}")
+                continue
+
+            with self._lock:
+                outage = time.monotonic() - self._opened_at
+                self._opened_at = None
+                self._failures = 0
+            self.app.logger.info(f"[DB BREAKER] closed, database back after {outage:.0f}s")
+            return
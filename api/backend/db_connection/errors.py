@@ -0,0 +1,107 @@
+#------------------------------------------------------------
+# What a MySQL (pymysql) error means for the client:
+#
+#   transient    the database is unreachable or the statement
+#                lost a lock race; 503 + Retry-After, worth a
+#                retry
+#   constraint   the request's data broke a key, foreign key,
+#                NOT NULL or type rule; 409 or 400 with the
+#                reason, a retry won't help
+#   fatal        a bug (bad SQL, missing table, ...); 500 with
+#                a generic message, the details go to the log
+#
+# Routes catch DBError and return db_error_response(e).
+#------------------------------------------------------------
+from flask import current_app, g, jsonify
+from pymysql import InterfaceError, MySQLError
+
+from backend.db_connection.unit_of_work import is_deadlock
+
+DBError = MySQLError
+
+# the server can't be reached or dropped us; these trip the circuit breaker
+UNAVAILABLE = {
+    1040,   # too many connections
+    1053,   # server shutdown in progress
+    2003,   # can't connect
+    2006,   # server has gone away
+    2013,   # lost connection during query
+}
+
+# lost a race with other transactions or ran out of time; retry soon
+CONTENTION = {
+    1205,   # lock wait timeout
+    1213,   # deadlock
+    1317,   # query interrupted
+    3024,   # max_execution_time exceeded
+}
+
+# error code -> (HTTP status, message)
+CONSTRAINT = {
+    1062: (409, "A record with these values already exists"),
+    1451: (409, "The record is still referenced by other records"),
+    1452: (400, "A referenced record does not exist"),
+    1048: (400, "A required value is missing"),
+    1364: (400, "A required value is missing"),
+    1406: (400, "A value is too long"),
+    1264: (400, "A value is out of range"),
+    1265: (400, "A value was truncated"),
+    1292: (400, "A date or number has an invalid format"),
+    1366: (400, "A value has the wrong type"),
+    3819: (400, "A value violates a check constraint"),
+}
+
+
+def error_code(error):
+    return error.args[0] if error.args and isinstance(error.args[0], int) else None
+
+
+def is_unavailable(error):
+    # InterfaceError: the connection was already closed under us
+    return error_code(error) in UNAVAILABLE or isinstance(error, InterfaceError)
+
+
+def classify(error):
+    """{'kind', 'status', 'message', 'retry_after'} for a DBError."""
+    code = error_code(error)
+    if is_unavailable(error):
+        return {"kind": "transient", "status": 503, "retry_after": 5,
+                "message": "The database is temporarily unavailable, try again shortly"}
+    if code in CONTENTION:
+        return {"kind": "transient", "status": 503, "retry_after": 1,
+                "message": "The database is busy, try again"}
+    if code in CONSTRAINT:
+        status, message = CONSTRAINT[code]
+        return {"kind": "constraint", "status": status, "retry_after": None, "message": message}
+    return {"kind": "fatal", "status": 500, "retry_after": None, "message": "Internal database error"}
+
+
+def db_error_response(error, message=None):
+    """
+    The JSON response for a DBError. message replaces the generic text
+    of fatal errors. Inside @retry_on_deadlock, deadlocks are raised
+    again so the route is re-run instead.
+    """
+    if is_deadlock(error) and g.get('retry_on_deadlock'):
+        raise error
+
+    info = classify(error)
+    if info["kind"] == "fatal":
+        current_app.logger.error(f"[DB ERROR] {error!r}")
+    else:
+        current_app.logger.warning(f"[DB {info['kind'].upper()}] {error!r}")
+
+    if is_unavailable(error):
+        from backend.db_connection import breaker
+        breaker.record_failure()
+
+    body = {"error": message if message and info["kind"] == "fatal" else info["message"],
+            "error_type": info["kind"]}
+    if info["kind"] == "constraint" and len(error.args) > 1:
+        body["detail"] = error.args[1]
+
+    response = jsonify(body)
+    response.status_code = info["status"]
+    if info["retry_after"]:
+        response.headers["Retry-After"] = str(info["retry_after"])
+    return response
@@ -0,0 +1,31 @@
+#------------------------------------------------------------
+# Connections routed to the current gym's schema.
+#
+# Gyms share the default database (MYSQL_DATABASE_DB) unless their
+# GYM row names a schema of their own. db.connect() - and so the
+# request's db.get_db() - opens the connection as before and then
+# switches to the schema schema_for_context() returns for the
+# current request or job (backend.tenancy sets it), so routes and
+# jobs never name a schema themselves.
+#------------------------------------------------------------
+from flaskext.mysql import MySQL
+
+
+class RoutedMySQL(MySQL):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # () -> schema name or None (the default database)
+        self.schema_for_context = None
+
+    def connect(self, schema=None):
+        """A new connection to schema, else the current gym's schema, else the default database."""
+        conn = super().connect()
+        if schema is None and self.schema_for_context is not None:
+            schema = self.schema_for_context()
+        if schema and schema != self.app.config['MYSQL_DATABASE_DB']:
+            try:
+                conn.select_db(schema)
+            except Exception:
+                conn.close()
+                raise
+        return conn
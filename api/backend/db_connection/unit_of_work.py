@@ -0,0 +1,114 @@
+#------------------------------------------------------------
+# One transaction with one cursor:
+#
+#   with unit_of_work() as cursor:
+#       cursor.execute(...)
+#       ...
+#
+# The block commits when it ends normally (including an early
+# `return`) and rolls back when it raises; the cursor is always
+# closed. The connection is the request's db.get_db() unless one
+# is passed in, so it never goes back to the request teardown
+# with an open transaction.
+#
+# A unit of work opened inside another on the same connection
+# joins it: only the outermost one commits or rolls back.
+#
+# @retry_on_deadlock re-runs a whole route when MySQL picked its
+# transaction as a deadlock victim (or a row lock wait timed
+# out). Everything the failed attempt wrote was rolled back, so
+# the route must keep its non-DB side effects (cache
+# invalidation, pushes, ...) after its unit of work.
+#------------------------------------------------------------
+import random
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import g
+from pymysql import MySQLError
+
+ER_LOCK_WAIT_TIMEOUT = 1205
+ER_LOCK_DEADLOCK = 1213
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class UnitOfWork:
+    """The block's cursor; executemany() sends large inputs in batches."""
+
+    def __init__(self, cursor, batch_size=DEFAULT_BATCH_SIZE):
+        self._cursor = cursor
+        self.batch_size = batch_size
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def executemany(self, query, args, batch_size=None):
+        """executemany() batch_size rows at a time; returns the total rows affected."""
+        batch_size = batch_size or self.batch_size
+        args = list(args)
+        total = 0
+        for start in range(0, len(args), batch_size):
+            total += self._cursor.executemany(query, args[start:start + batch_size]) or 0
+        return total
+
+
+@contextmanager
+def unit_of_work(conn=None, batch_size=DEFAULT_BATCH_SIZE):
+    from backend.db_connection import breaker, db
+    if conn is None:
+        conn = db.get_db()
+
+    outermost = not getattr(conn, '_unit_of_work_depth', 0)
+    conn._unit_of_work_depth = getattr(conn, '_unit_of_work_depth', 0) + 1
+    cursor = conn.cursor()
+    try:
+        yield UnitOfWork(cursor, batch_size)
+        if outermost:
+            conn.commit()
+            breaker.record_success()
+    except BaseException:
+        if outermost:
+            try:
+                conn.rollback()
+            except MySQLError:
+                pass    # the connection is gone; the original error is what matters
+        raise
+    finally:
+        conn._unit_of_work_depth -= 1
+        cursor.close()
+
+
+def is_deadlock(error):
+    return isinstance(error, MySQLError) and bool(error.args) and \
+        error.args[0] in (ER_LOCK_DEADLOCK, ER_LOCK_WAIT_TIMEOUT)
+
+
+def retry_on_deadlock(func=None, attempts=3, backoff=0.05):
+    """
+    Re-run func when its transaction is rolled back by a deadlock or a
+    lock wait timeout, after backoff * 2**n seconds (with jitter).
+    """
+    if func is None:
+        return lambda f: retry_on_deadlock(f, attempts=attempts, backoff=backoff)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(1, attempts + 1):
+            # routes hand deadlocks back to us (db_error_response) except
+            # on the last attempt, where they answer 503 themselves
+            g.retry_on_deadlock = attempt < attempts
+            try:
+                return func(*args, **kwargs)
+            except MySQLError as e:
+                if not is_deadlock(e) or attempt == attempts:
+                    raise
+                time.sleep(backoff * 2 ** (attempt - 1) * (0.5 + random.random()))
+            finally:
+                g.retry_on_deadlock = False
+
+    return wrapper
@@ -0,0 +1,84 @@
+#------------------------------------------------------------
+# Idempotency-Key support for POST routes.
+#
+# A client that may resend a request (flaky Wi-Fi, double clicks)
+# sends the same Idempotency-Key header on every attempt. The
+# first attempt runs the route; repeats get its saved response
+# back with an Idempotent-Replayed: true header. A repeat that
+# arrives while the first is still running waits for it.
+#
+# Requests without the header behave exactly as before. Keys are
+# per gym: two gyms' clients may send the same key.
+#------------------------------------------------------------
+import hashlib
+from functools import wraps
+
+from flask import Response, current_app, jsonify, make_response, request
+
+from backend.idempotency.key_store import IdempotencyStore
+from backend.tenancy import current_gym_id
+
+MAX_KEY_LENGTH = 255
+
+store = IdempotencyStore()
+
+
+def _fingerprint():
+    digest = hashlib.sha256()
+    digest.update(f"{current_gym_id()} {request.method} {request.path}\n".encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _replay(entry):
+    body, status, headers = entry.response
+    response = Response(body, status=status, headers=headers)
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(view):
+    """Decorator for POST routes: honour the Idempotency-Key request header."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({"error": f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters"}), 400
+
+        fingerprint = _fingerprint()
+        key = (current_gym_id(), key)
+        wait_seconds = current_app.config.get("IDEMPOTENCY_WAIT_SECONDS", 30)
+
+        while True:
+            entry, owner = store.claim(key, fingerprint)
+            if owner:
+                break
+            if entry.fingerprint != fingerprint:
+                return jsonify({"error": "Idempotency-Key was already used for a different request"}), 422
+            if not entry.done.wait(wait_seconds):
+                response = jsonify({"error": "A request with this Idempotency-Key is still in progress"})
+                response.headers['Retry-After'] = '1'
+                return response, 409
+            if entry.response is not None:
+                current_app.logger.info(f'[IDEMPOTENCY] replaying {request.path} for gym {key[0]} key {key[1]}')
+                return _replay(entry)
+            # the first attempt failed without a response to replay; try to claim again
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            store.release(key, entry)
+            raise
+
+        # server errors are not saved so the client can retry them
+        if response.status_code >= 500:
+            store.release(key, entry)
+        else:
+            store.complete(key, entry, response.get_data(), response.status_code, list(response.headers))
+        return response
+
+    # lets the OpenAPI document list the Idempotency-Key header
+    wrapper.idempotent = True
+    return wrapper
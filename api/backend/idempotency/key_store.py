@@ -0,0 +1,88 @@
+#------------------------------------------------------------
+# Bounded, TTL'd store of Idempotency-Key responses.
+#
+# A key is claimed by the first request that sends it; later
+# requests with the same key wait for that one to finish and
+# then get its saved response instead of running the route again.
+#------------------------------------------------------------
+import threading
+import time
+from collections import OrderedDict
+
+
+class KeyEntry:
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.response = None      # (body, status, headers) once completed
+        self.expires_at = None    # set on completion; in-flight entries never expire
+
+    @property
+    def in_flight(self):
+        return not self.done.is_set()
+
+
+class IdempotencyStore:
+    def __init__(self, ttl_seconds=86400, max_keys=10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl_seconds = app.config.get("IDEMPOTENCY_TTL_SECONDS", self.ttl_seconds)
+        self.max_keys = app.config.get("IDEMPOTENCY_MAX_KEYS", self.max_keys)
+        app.extensions['idempotency'] = self
+
+    def claim(self, key, fingerprint):
+        """
+        Return (entry, owner). owner is True when this caller claimed the
+        key and must run the request, then call complete() or release().
+        Otherwise entry belongs to an earlier request with the same key.
+        """
+        with self._lock:
+            now = time.monotonic()
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= now:
+                del self._entries[key]
+                entry = None
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry, False
+
+            entry = KeyEntry(fingerprint)
+            self._entries[key] = entry
+            self._evict()
+            return entry, True
+
+    def complete(self, key, entry, body, status, headers):
+        with self._lock:
+            entry.response = (body, status, headers)
+            entry.expires_at = time.monotonic() + self.ttl_seconds
+        entry.done.set()
+
+    def release(self, key, entry):
+        """Forget a claimed key without saving a response, so it can be retried."""
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+        entry.done.set()
+
+    def _evict(self):
+        # over max_keys: drop the least recently used completed keys,
+        # expired ones included (in-flight keys are kept)
+        excess = len(self._entries) - self.max_keys
+        if excess <= 0:
+            return
+        victims = []
+        for key, entry in self._entries.items():
+            if not entry.in_flight:
+                victims.append(key)
+                if len(victims) == excess:
+                    break
+        for key in victims:
+            del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,6 +1,24 @@
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+
 from flask import Blueprint, jsonify, request, current_app
-from backend.db_connection import db
-from mysql.connector import Error
+from backend.db_connection import DBError, db, db_error_response, unit_of_work
+from backend.idempotency import idempotent
+from backend.manager import schemas
+from backend.ratelimit import limiter
+from backend.billing.billing_run import (
+    DEFAULT_CATEGORY, get_run, parse_period, start_background_run
+)
+from backend.billing.reconcile import reconcile
+from backend.billing.aging import get_aging
+from backend.analytics.retention import get_retention
+from backend.analytics.utilization import get_utilization
+from backend.analytics.attendance import get_attendance
+from backend.analytics.gym_rollup import get_gym_summary
+from backend.cache import trainer_names
+from backend.tenancy import current_gym_id, gyms
+from backend.validation import validation_error
 
 managers = Blueprint('managers', __name__)
 
@@ -27,23 +45,20 @@ def revenue_summary():
 
         current_app.logger.info(f"[SUMMARY] Fetching revenue from {start} to {end}")
 
-        conn = db.get_db()
-        cur = conn.cursor()
-
-        # Simple total & status breakdown
-        query = """
-            SELECT
-                SUM(amount) AS total,
-                SUM(CASE WHEN status = 'paid' THEN amount ELSE 0 END) AS paid,
-                SUM(CASE WHEN status = 'pending' THEN amount ELSE 0 END) AS pending,
-                SUM(CASE WHEN status = 'overdue' THEN amount ELSE 0 END) AS overdue
-            FROM INVOICE
-            WHERE date >= %s AND date < %s
-        """
-
-        cur.execute(query, (start, end))
-        result = cur.fetchone()
-        cur.close()
+        with unit_of_work() as cur:
+            # Simple total & status breakdown
+            query = """
+                SELECT
+                    SUM(amount) AS total,
+                    SUM(CASE WHEN status = 'paid' THEN amount ELSE 0 END) AS paid,
+                    SUM(CASE WHEN status = 'pending' THEN amount ELSE 0 END) AS pending,
+                    SUM(CASE WHEN status = 'overdue' THEN amount ELSE 0 END) AS overdue
+                FROM INVOICE
+                WHERE gym_id = %s AND date >= %s AND date < %s
+            """
+
+            cur.execute(query, (current_gym_id(), start, end))
+            result = cur.fetchone()
 
         # Build response with fallback zeros
         response = {
@@ -57,13 +72,54 @@ def revenue_summary():
 
         return jsonify(response), 200
 
-    except Error as e:
-        current_app.logger.error(f"[DB ERROR] Revenue summary blew up: {str(e)}")
-        return jsonify({"error": "Something went wrong fetching revenue summary."}), 500
+    except DBError as e:
+        return db_error_response(e, "Something went wrong fetching revenue summary.")
+
+
+# --- Revenue Aging: overdue totals per aging bucket (0-30, 31-60, 61-90, 90+ days) ---
+# Served from the INVOICE_AGING snapshot kept current by the invoice-aging job.
+@managers.route('/revenue/aging', methods=['GET'])
+def revenue_aging():
+    try:
+        as_of = request.args.get('as_of')
+
+        current_app.logger.info(f"[AGING] Fetching aging buckets as of {as_of or 'latest'}")
+
+        aging = get_aging(db.get_db(), current_gym_id(), as_of)
+        if not aging:
+            return jsonify({"error": "No aging snapshot available yet"}), 404
+
+        return jsonify(aging), 200
+
+    except DBError as e:
+        return db_error_response(e, "Could not fetch revenue aging")
+
+
+# --- Retention: monthly signup cohorts x share still active N months later ---
+# Served from COHORT_RETENTION, kept current by the cohort-retention job.
+# Query params: from, to (cohort months, YYYY-MM), max_months (default 12)
+@managers.route('/retention', methods=['GET'])
+def retention():
+    try:
+        from_month = request.args.get('from')
+        to_month = request.args.get('to')
+        max_months = min(max(request.args.get('max_months', 12, type=int), 0), 120)
+
+        current_app.logger.info(f"[RETENTION] Fetching cohorts {from_month or '*'} to {to_month or '*'}")
+
+        matrix = get_retention(db.get_db(), current_gym_id(), from_month, to_month, max_months)
+        if not matrix["cohorts"]:
+            return jsonify({"error": "No retention data computed yet"}), 404
+
+        return jsonify(matrix), 200
+
+    except DBError as e:
+        return db_error_response(e, "Could not fetch retention cohorts")
 
 
 # --- Trainer Revenue: Lists revenue per trainer ---
 @managers.route('/revenue/by-trainer', methods=['GET'])
+@limiter.concurrency('analytics')
 def trainer_revenue():
     try:
         start, end, error = parse_date_range()
@@ -72,26 +128,23 @@ def trainer_revenue():
 
         current_app.logger.info(f"[BY TRAINER] Pulling data from {start} to {end}")
 
-        db_conn = db.get_db()
-        cursor = db_conn.cursor()
-
-        sql = """
-            SELECT
-                t.trainer_id,
-                t.first_name,
-                t.last_name,
-                SUM(i.amount) AS total_billed,
-                SUM(CASE WHEN i.status = 'paid' THEN i.amount ELSE 0 END) AS paid_revenue
-            FROM INVOICE i
-            JOIN TRAINER t ON t.trainer_id = i.trainer_id
-            WHERE i.date >= %s AND i.date < %s
-            GROUP BY t.trainer_id, t.first_name, t.last_name
-            ORDER BY paid_revenue DESC
-        """
-
-        cursor.execute(sql, (start, end))
-        rows = cursor.fetchall()
-        cursor.close()
+        with unit_of_work() as cursor:
+            sql = """
+                SELECT
+                    i.trainer_id,
+                    SUM(i.amount) AS total_billed,
+                    SUM(CASE WHEN i.status = 'paid' THEN i.amount ELSE 0 END) AS paid_revenue
+                FROM INVOICE i
+                WHERE i.gym_id = %s
+                  AND i.trainer_id IS NOT NULL
+                  AND i.date >= %s AND i.date < %s
+                GROUP BY i.trainer_id
+                ORDER BY paid_revenue DESC
+            """
+
+            cursor.execute(sql, (current_gym_id(), start, end))
+            rows = cursor.fetchall()
+        trainer_names.decorate(db.get_db(), rows)
 
         data = []
         for row in rows:
@@ -109,12 +162,12 @@ def trainer_revenue():
             "trainers": data
         }), 200
 
-    except Error as err:
-        current_app.logger.error(f"[DB ERROR] Could not fetch trainer revenue: {str(err)}")
-        return jsonify({"error": "Trainer revenue query failed"}), 500
+    except DBError as err:
+        return db_error_response(err, "Trainer revenue query failed")
 
 
 @managers.route('/revenue/class-trend', methods=['GET'])
+@limiter.concurrency('analytics')
 def revenue_trend_by_class():
     try:
         start, end, error = parse_date_range()
@@ -125,36 +178,33 @@ def revenue_trend_by_class():
 
         current_app.logger.info(f"[TREND] Date range: {start} to {end} | Trainer: {tid}")
 
-        conn = db.get_db()
-        cur = conn.cursor()
-
-        query = """
-            SELECT
-                t.trainer_id,
-                t.first_name,
-                t.last_name,
-                DATE(i.date) AS revenue_date,
-                SUM(i.amount) AS total_revenue
-            FROM INVOICE i
-            JOIN TRAINER t ON t.trainer_id = i.trainer_id
-            WHERE i.status = 'paid'
-              AND i.category LIKE %s
-              AND i.date >= %s AND i.date < %s
-        """
-        params = ['%Class%', start, end]
-
-        if tid:
-            query += " AND t.trainer_id = %s"
-            params.append(tid)
-
-        query += """
-            GROUP BY t.trainer_id, t.first_name, t.last_name, DATE(i.date)
-            ORDER BY revenue_date ASC, t.last_name ASC
-        """
-
-        cur.execute(query, params)
-        rows = cur.fetchall()
-        cur.close()
+        with unit_of_work() as cur:
+            query = """
+                SELECT
+                    i.trainer_id,
+                    DATE(i.date) AS revenue_date,
+                    SUM(i.amount) AS total_revenue
+                FROM INVOICE i
+                WHERE i.gym_id = %s
+                  AND i.status = 'paid'
+                  AND i.trainer_id IS NOT NULL
+                  AND i.category LIKE %s
+                  AND i.date >= %s AND i.date < %s
+            """
+            params = [current_gym_id(), '%Class%', start, end]
+
+            if tid:
+                query += " AND i.trainer_id = %s"
+                params.append(tid)
+
+            query += """
+                GROUP BY i.trainer_id, DATE(i.date)
+            """
+
+            cur.execute(query, params)
+            rows = cur.fetchall()
+        trainer_names.decorate(db.get_db(), rows)
+        rows.sort(key=lambda r: (r['revenue_date'], r['last_name'] or ''))
 
         trend = []
         for r in rows:
@@ -173,13 +223,13 @@ def revenue_trend_by_class():
             "data": trend
         }), 200
 
-    except Error as db_err:
-        current_app.logger.error(f"Trend query failed: {str(db_err)}")
-        return jsonify({"error": "Failed to retrieve revenue trend data"}), 500
+    except DBError as db_err:
+        return db_error_response(db_err, "Failed to retrieve revenue trend data")
 
 
 # --- Attendance: Class attendance logs ---
 @managers.route('/class-attendance', methods=['GET'])
+@limiter.concurrency('analytics')
 def attendance_log():
     try:
         trainer = request.args.get('trainer_id')
@@ -188,44 +238,7 @@ def attendance_log():
 
         current_app.logger.info(f"[ATTENDANCE] Filtering by trainer={trainer}, from={start}, to={end}")
 
-        conn = db.get_db()
-        cur = conn.cursor()
-
-        sql = """
-            SELECT
-                ca.attendance_id,
-                ca.session_id,
-                ca.member_id,
-                ca.status,
-                cs.class_name,
-                cs.date AS class_datetime,
-                cs.cost,
-                cs.trainer_id,
-                t.first_name AS trainer_first_name,
-                t.last_name AS trainer_last_name,
-                gm.first_name AS member_first_name,
-                gm.last_name AS member_last_name
-            FROM CLASS_ATTENDANCE ca
-            JOIN CLASS_SESSION cs ON ca.session_id = cs.session_id
-            JOIN TRAINER t ON cs.trainer_id = t.trainer_id
-            JOIN GYM_MEMBER gm ON ca.member_id = gm.member_id
-            WHERE 1=1
-        """
-        params = []
-
-        if trainer:
-            sql += " AND cs.trainer_id = %s"
-            params.append(trainer)
-
-        if start and end:
-            sql += " AND cs.date BETWEEN %s AND %s"
-            params.extend([start, end])
-
-        sql += " ORDER BY cs.date DESC, cs.class_name ASC"
-
-        cur.execute(sql, params)
-        rows = cur.fetchall()
-        cur.close()
+        rows = get_attendance(db.get_db(), trainer, start, end, gym_id=current_gym_id())
 
         attendance = []
         for entry in rows:
@@ -244,13 +257,39 @@ def attendance_log():
 
         return jsonify(attendance), 200
 
-    except Error as e:
-        current_app.logger.error(f"[DB ERROR] Attendance data error: {str(e)}")
-        return jsonify({"error": "Could not get class attendance"}), 500
+    except DBError as e:
+        return db_error_response(e, "Could not get class attendance")
+
+
+# --- Class Utilization: weekday x hour heatmap and per-class fill / no-show rates ---
+# Completed days come from CLASS_UTILIZATION_DAILY (class-utilization job);
+# later days (normally today) are aggregated live.
+# Query params: start_date, end_date (default: the last 90 days), trainer_id
+@managers.route('/class-utilization', methods=['GET'])
+@limiter.concurrency('analytics')
+def class_utilization():
+    try:
+        try:
+            end = date.fromisoformat(request.args['end_date']) if request.args.get('end_date') else date.today()
+            start = date.fromisoformat(request.args['start_date']) if request.args.get('start_date') else end - timedelta(days=89)
+        except ValueError:
+            return jsonify({"error": "start_date and end_date must be YYYY-MM-DD"}), 400
+        if start > end:
+            return jsonify({"error": "start_date must not be after end_date"}), 400
+
+        trainer = request.args.get('trainer_id', type=int)
+
+        current_app.logger.info(f"[UTILIZATION] trainer={trainer}, from={start}, to={end}")
+
+        return jsonify(get_utilization(db.get_db(), current_gym_id(), start, end, trainer)), 200
+
+    except DBError as e:
+        return db_error_response(e, "Could not fetch class utilization")
 
 
 # --- Revenue by Category: Analyze different revenue streams ---
 @managers.route('/revenue/by-category', methods=['GET'])
+@limiter.concurrency('analytics')
 def revenue_by_category():
     try:
         start, end, error = parse_date_range()
@@ -259,24 +298,22 @@ def revenue_by_category():
 
         current_app.logger.info(f"[CATEGORY] Revenue breakdown from {start} to {end}")
 
-        cur = db.get_db().cursor()
-
-        sql = """
-            SELECT
-                DATE(date) AS revenue_date,
-                category,
-                SUM(amount) AS total_revenue,
-                SUM(CASE WHEN status = 'paid' THEN amount ELSE 0 END) AS paid_revenue
-            FROM INVOICE
-            WHERE date >= %s AND date < %s
-              AND category IS NOT NULL
-            GROUP BY DATE(date), category
-            ORDER BY revenue_date ASC, category ASC
-        """
-
-        cur.execute(sql, (start, end))
-        rows = cur.fetchall()
-        cur.close()
+        with unit_of_work() as cur:
+            sql = """
+                SELECT
+                    DATE(date) AS revenue_date,
+                    category,
+                    SUM(amount) AS total_revenue,
+                    SUM(CASE WHEN status = 'paid' THEN amount ELSE 0 END) AS paid_revenue
+                FROM INVOICE
+                WHERE gym_id = %s AND date >= %s AND date < %s
+                  AND category IS NOT NULL
+                GROUP BY DATE(date), category
+                ORDER BY revenue_date ASC, category ASC
+            """
+
+            cur.execute(sql, (current_gym_id(), start, end))
+            rows = cur.fetchall()
 
         category_results = []
         for row in rows:
@@ -293,6 +330,114 @@ def revenue_by_category():
             "data": category_results
         }), 200
 
-    except Error as err:
-        current_app.logger.error(f"[ERROR] Category revenue query failed: {str(err)}")
-        return jsonify({"error": "Couldn’t fetch revenue breakdown"}), 500
+    except DBError as err:
+        return db_error_response(err, "Couldn’t fetch revenue breakdown")
+
+
+# --- Gyms: totals per location, for the owner ---
+# Unlike the routes above this covers every gym, whatever X-Gym-Id says.
+# Served from GYM_DAILY_STATS, kept current by the gym-rollup job.
+# Query params: start_date, end_date (YYYY-MM-DD, end exclusive)
+@managers.route('/gyms/summary', methods=['GET'])
+def gyms_summary():
+    try:
+        start, end, error = parse_date_range()
+        if error:
+            return error
+
+        current_app.logger.info(f"[GYMS] Summary from {start} to {end}")
+
+        conn = db.connect(schema=current_app.config['MYSQL_DATABASE_DB'])
+        try:
+            summary = get_gym_summary(conn, start, end, gyms.all())
+        finally:
+            conn.close()
+
+        return jsonify(summary), 200
+
+    except DBError as err:
+        return db_error_response(err, "Could not fetch the gym summary")
+
+
+# --- Billing Runs: month-end invoices for every active member ---
+# Body: billing_period (YYYY-MM), optional amount, category, chunk_size.
+# The run happens in the background; poll the GET route for progress.
+@managers.route('/billing/runs', methods=['POST'])
+@idempotent
+def start_billing_run():
+    data, errors = schemas.START_BILLING_RUN.load(request.get_json(silent=True) or {})
+    if errors:
+        return validation_error(errors)
+
+    try:
+        _, period = parse_period(data['billing_period'])
+    except ValueError as e:
+        return validation_error({"billing_period": str(e)})
+
+    amount = data.get('amount')
+    if amount is None:
+        amount = Decimal(str(current_app.config['MEMBERSHIP_FEE']))
+    category = data['category']
+    chunk_size = data['chunk_size']
+
+    current_app.logger.info(f"[BILLING] Starting run for {period} / {category} at {amount}")
+
+    started = start_background_run(
+        current_app._get_current_object(), period, amount, category, chunk_size
+    )
+    if not started:
+        return jsonify({"error": f"Billing run for {period} is already in progress"}), 409
+
+    return jsonify({
+        "message": "Billing run started",
+        "billing_period": period,
+        "category": category,
+        "status_url": f"/managers/billing/runs/{period}"
+    }), 202
+
+
+@managers.route('/billing/runs/<period>', methods=['GET'])
+def get_billing_run(period):
+    try:
+        category = request.args.get('category', DEFAULT_CATEGORY)
+        try:
+            _, period = parse_period(period)
+        except ValueError as e:
+            return validation_error({"period": str(e)}, "Invalid billing period")
+
+        run = get_run(db.get_db(), period, category)
+        if not run:
+            return jsonify({"error": "No billing run found for this period"}), 404
+
+        return jsonify(run), 200
+
+    except DBError as e:
+        return db_error_response(e, "Could not fetch billing run")
+
+
+# --- Payment Reconciliation: upload a settlement CSV as the 'file' form field ---
+# ?dry_run=true classifies every line without recording anything;
+# ?batch_size=N (1..MAX_BATCH_SIZE) lines are matched per transaction.
+@managers.route('/payments/reconcile', methods=['POST'])
+def reconcile_payments():
+    try:
+        upload = request.files.get('file')
+        if not upload:
+            return jsonify({"error": "Missing settlement file (multipart field 'file')"}), 400
+
+        dry_run = request.args.get('dry_run', 'false').lower() in ('1', 'true', 'yes')
+        query, errors = schemas.RECONCILE_QUERY.load(request.args.to_dict())
+        if errors:
+            return validation_error(errors, "Invalid query parameters")
+
+        current_app.logger.info(f"[RECONCILE] {upload.filename}, dry_run={dry_run}")
+
+        # read the upload as a text stream so it is never held in memory whole
+        lines = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+        report = reconcile(db.get_db(), lines, dry_run=dry_run, batch_size=query["batch_size"],
+                           gym_id=current_gym_id(), logger=current_app.logger)
+
+        return jsonify(report), 200
+
+    except DBError as e:
+        return db_error_response(e, "Payment reconciliation failed")
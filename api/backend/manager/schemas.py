@@ -0,0 +1,20 @@
+#------------------------------------------------------------
+# Request body and query parameter schemas for the manager
+# routes (see backend/validation).
+#------------------------------------------------------------
+from backend.billing.billing_run import DEFAULT_CATEGORY, DEFAULT_CHUNK_SIZE
+from backend.billing.reconcile import DEFAULT_BATCH_SIZE, MAX_BATCH_SIZE
+from backend.validation import Decimal, Int, Schema, Str
+
+# amount falls back to MEMBERSHIP_FEE in the route
+START_BILLING_RUN = Schema({
+    "billing_period": Str(required=True, max_length=7),
+    "amount": Decimal(digits=10, places=2, min=0),
+    "category": Str(nullable=False, max_length=50, default=DEFAULT_CATEGORY),
+    "chunk_size": Int(min=1, nullable=False, default=DEFAULT_CHUNK_SIZE),
+})
+
+# query parameters of POST /payments/reconcile
+RECONCILE_QUERY = Schema({
+    "batch_size": Int(min=1, max=MAX_BATCH_SIZE, nullable=False, default=DEFAULT_BATCH_SIZE),
+})
@@ -0,0 +1,58 @@
+#------------------------------------------------------------
+# ?expand=exercises for workout plans and logs.
+#
+# The plan (or log) and its PLAN_EXERCISE (or LOG_EXERCISE) links
+# come back from one LEFT JOIN; the exercise details are filled in
+# from the in-process EXERCISE catalog instead of joining it too.
+#------------------------------------------------------------
+from backend.cache import exercise_catalog
+from backend.db_connection import unit_of_work
+
+EXPANSIONS = {'exercises'}
+
+# parent table, its key, the link table and the link table's key
+PARENTS = {
+    "plan": ("WORKOUT_PLAN", "plan_id", "PLAN_EXERCISE", "plan_exercise_id"),
+    "log": ("WORKOUT_LOG", "log_id", "LOG_EXERCISE", "log_exercise_id"),
+}
+
+
+def parse_expand(value):
+    """'exercises' -> {'exercises'}; raises ValueError for anything unknown."""
+    requested = {part.strip() for part in (value or '').split(',') if part.strip()}
+    unknown = requested - EXPANSIONS
+    if unknown:
+        raise ValueError(f"Unknown expand value(s): {', '.join(sorted(unknown))}")
+    return requested
+
+
+def fetch_with_exercises(conn, kind, parent_id):
+    """One plan/log with an 'exercises' list, or None if it does not exist."""
+    table, key, link_table, link_key = PARENTS[kind]
+
+    with unit_of_work(conn) as cursor:
+        cursor.execute(
+            f"""
+            SELECT p.*, l.{link_key} AS link_id, l.exercise_id AS linked_exercise_id
+            FROM {table} p
+            LEFT JOIN {link_table} l ON l.{key} = p.{key}
+            WHERE p.{key} = %s
+            ORDER BY l.{link_key}
+            """,
+            (parent_id,)
+        )
+        rows = cursor.fetchall()
+
+    if not rows:
+        return None
+
+    links = [(row['link_id'], row['linked_exercise_id']) for row in rows if row['link_id'] is not None]
+    catalog = exercise_catalog.get_many(conn, {exercise_id for _, exercise_id in links})
+
+    result = {k: v for k, v in rows[0].items() if k not in ('link_id', 'linked_exercise_id')}
+    result['exercises'] = [
+        {link_key: link_id, **catalog[exercise_id]}
+        for link_id, exercise_id in links
+        if exercise_id in catalog
+    ]
+    return result
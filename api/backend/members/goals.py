@@ -0,0 +1,250 @@
+#------------------------------------------------------------
+# Goal progress: GOAL.current_value follows the member's
+# PROGRESS, WORKOUT_LOG and FOOD_LOG rows for the goal types
+# below. Other goal types are tracked by hand (PUT current_value).
+#
+#   record_event      one new event; called by the routes that
+#                     insert one, inside their transaction. One
+#                     indexed UPDATE per matching goal type.
+#   recompute_goals   from the full history; used when a goal is
+#                     created or an event is edited or deleted,
+#                     and by `flask analytics backfill-goals`.
+#   goal_progress     completion percentage and ETA of a goal row.
+#------------------------------------------------------------
+import math
+import time
+from datetime import datetime, timedelta
+
+# goal_type -> (source table, column)
+#   PROGRESS     the newest measurement (weight, body fat)
+#   WORKOUT_LOG  sessions logged since the goal's start_date
+#   FOOD_LOG     the total of the newest day logged
+GOAL_TYPES = {
+    'weight': ('PROGRESS', 'weight'),
+    'body_fat': ('PROGRESS', 'body_fat_percentage'),
+    'workout_sessions': ('WORKOUT_LOG', 'sessions'),
+    'daily_calories': ('FOOD_LOG', 'calories'),
+    'daily_protein': ('FOOD_LOG', 'proteins'),
+}
+
+
+def goal_types_for(source):
+    return [goal_type for goal_type, (table, _) in GOAL_TYPES.items() if table == source]
+
+
+# --- one new event (O(1): a GOAL lookup on (member_id, goal_type) per type) ---
+
+# MySQL assigns left to right, so current_value still sees the old last_event_at
+EVENT_SQL = {
+    # a newer (or same-day, later-entered) measurement replaces the value
+    'PROGRESS': """
+        UPDATE GOAL
+        SET start_value = COALESCE(start_value, %(value)s),
+            current_value = %(value)s,
+            last_event_at = %(at)s,
+            updated_at = NOW()
+        WHERE member_id = %(member_id)s AND goal_type = %(goal_type)s
+          AND (last_event_at IS NULL OR last_event_at <= %(at)s)
+    """,
+    'WORKOUT_LOG': """
+        UPDATE GOAL
+        SET current_value = COALESCE(current_value, 0) + %(value)s,
+            last_event_at = GREATEST(COALESCE(last_event_at, %(at)s), %(at)s),
+            updated_at = NOW()
+        WHERE member_id = %(member_id)s AND goal_type = %(goal_type)s
+          AND start_date <= %(at)s
+    """,
+    # a later day starts a new total; earlier days no longer count
+    'FOOD_LOG': """
+        UPDATE GOAL
+        SET current_value = CASE
+                WHEN last_event_at IS NULL OR DATE(last_event_at) < DATE(%(at)s) THEN %(value)s
+                WHEN DATE(last_event_at) = DATE(%(at)s) THEN current_value + %(value)s
+                ELSE current_value
+            END,
+            last_event_at = GREATEST(COALESCE(last_event_at, %(at)s), %(at)s),
+            updated_at = NOW()
+        WHERE member_id = %(member_id)s AND goal_type = %(goal_type)s
+          AND start_date <= DATE(%(at)s)
+    """,
+}
+
+
+def record_event(cursor, source, member_id, at, values):
+    """
+    Apply a row just inserted into source (PROGRESS, WORKOUT_LOG or
+    FOOD_LOG) to the member's goals. at is its date or timestamp,
+    values its columns by name (the ones left out or None are skipped).
+    """
+    for goal_type in goal_types_for(source):
+        value = values.get(GOAL_TYPES[goal_type][1])
+        if value is None:
+            continue
+        cursor.execute(
+            EVENT_SQL[source],
+            {"member_id": member_id, "goal_type": goal_type, "at": at, "value": value}
+        )
+
+
+# --- from the full history ---
+
+# {column}: the source column; s.member_id, s.<time> are indexed (see 0011_list_indexes)
+RECOMPUTE_SQL = {
+    # start: the last measurement up to start_date, else the first after it
+    'PROGRESS': """
+        UPDATE GOAL g
+        SET g.start_value = COALESCE(
+                g.start_value,
+                (SELECT s.{column} FROM PROGRESS s
+                 WHERE s.member_id = g.member_id AND s.{column} IS NOT NULL AND s.date <= g.start_date
+                 ORDER BY s.date DESC, s.progress_id DESC LIMIT 1),
+                (SELECT s.{column} FROM PROGRESS s
+                 WHERE s.member_id = g.member_id AND s.{column} IS NOT NULL AND s.date > g.start_date
+                 ORDER BY s.date, s.progress_id LIMIT 1)
+            ),
+            g.current_value = (
+                SELECT s.{column} FROM PROGRESS s
+                WHERE s.member_id = g.member_id AND s.{column} IS NOT NULL
+                ORDER BY s.date DESC, s.progress_id DESC LIMIT 1
+            ),
+            g.last_event_at = (
+                SELECT MAX(s.date) FROM PROGRESS s
+                WHERE s.member_id = g.member_id AND s.{column} IS NOT NULL
+            ),
+            g.updated_at = NOW()
+    """,
+    'WORKOUT_LOG': """
+        UPDATE GOAL g
+        SET g.start_value = COALESCE(g.start_value, 0),
+            g.current_value = (
+                SELECT COALESCE(SUM(s.{column}), 0) FROM WORKOUT_LOG s
+                WHERE s.member_id = g.member_id AND s.date >= g.start_date
+            ),
+            g.last_event_at = (
+                SELECT MAX(s.date) FROM WORKOUT_LOG s
+                WHERE s.member_id = g.member_id AND s.date >= g.start_date AND s.{column} IS NOT NULL
+            ),
+            g.updated_at = NOW()
+    """,
+    # last_event_at first: the day's total is read for the new value
+    'FOOD_LOG': """
+        UPDATE GOAL g
+        SET g.start_value = COALESCE(g.start_value, 0),
+            g.last_event_at = (
+                SELECT MAX(s.timestamp) FROM FOOD_LOG s
+                WHERE s.member_id = g.member_id AND s.timestamp >= g.start_date AND s.{column} IS NOT NULL
+            ),
+            g.current_value = (
+                SELECT SUM(s.{column}) FROM FOOD_LOG s
+                WHERE s.member_id = g.member_id
+                  AND s.timestamp >= DATE(g.last_event_at)
+                  AND s.timestamp < DATE(g.last_event_at) + INTERVAL 1 DAY
+            ),
+            g.updated_at = NOW()
+    """,
+}
+
+
+def recompute_goals(cursor, goal_types=None, member_id=None, goal_id=None):
+    """Recompute tracked goals (of goal_types, default all) from the full history; returns goals updated."""
+    updated = 0
+    for goal_type in goal_types or GOAL_TYPES:
+        source, column = GOAL_TYPES[goal_type]
+        sql = RECOMPUTE_SQL[source].format(column=column) + " WHERE g.goal_type = %s"
+        params = [goal_type]
+        if member_id is not None:
+            sql += " AND g.member_id = %s"
+            params.append(member_id)
+        if goal_id is not None:
+            sql += " AND g.goal_id = %s"
+            params.append(goal_id)
+        cursor.execute(sql, params)
+        updated += cursor.rowcount
+    return updated
+
+
+def recompute_member_goals(cursor, source, member_id):
+    """After editing or deleting one of member_id's source rows."""
+    return recompute_goals(cursor, goal_types_for(source), member_id=member_id)
+
+
+def track_goal(cursor, goal_id, goal_type, restart=False):
+    """
+    Fill in a goal just created (or changed) from the history, if its
+    type is tracked; restart re-reads start_value (new type or start_date).
+    """
+    if goal_type not in GOAL_TYPES:
+        return
+    if restart:
+        cursor.execute("UPDATE GOAL SET start_value = NULL WHERE goal_id = %s", (goal_id,))
+    recompute_goals(cursor, [goal_type], goal_id=goal_id)
+
+
+def backfill_goals(conn, logger=None):
+    """Recompute every tracked goal in one transaction (`flask analytics backfill-goals`)."""
+    started = time.monotonic()
+    cursor = conn.cursor()
+    try:
+        updated = recompute_goals(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    elapsed = time.monotonic() - started
+    if logger:
+        logger.info(f"[GOALS] recomputed {updated} goals in {elapsed:.2f}s")
+    return {"goals_updated": updated, "elapsed_seconds": round(elapsed, 2)}
+
+
+# --- reading ---
+
+def _day(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def goal_progress(goal):
+    """
+    completion_pct (0-100, from start_value to target_value), achieved,
+    eta (when target_value is reached at the pace since start_date) and
+    on_track (eta by the deadline) for a GOAL row. Daily goals restart
+    every day, so they have no ETA.
+    """
+    target = goal['target_value']
+    current = goal['current_value']
+    start = goal['start_value'] if goal['start_value'] is not None else 0
+    progress = {"completion_pct": None, "achieved": False, "eta": None, "on_track": None}
+    if current is None or target is None:
+        return progress
+
+    span = target - start
+    if span:
+        pct = float((current - start) / span) * 100
+    else:
+        pct = 100.0 if current == target else 0.0
+    progress["completion_pct"] = round(min(max(pct, 0.0), 100.0), 1)
+    progress["achieved"] = pct >= 100
+
+    source = GOAL_TYPES.get(goal['goal_type'], (None,))[0]
+    if progress["achieved"] or source == 'FOOD_LOG':
+        return progress
+
+    # hand-tracked goals move when they are updated
+    last = _day(goal['last_event_at'] if source else goal['updated_at'])
+    start_date = _day(goal['start_date'])
+    if last is None or start_date is None:
+        return progress
+    elapsed = (last - start_date).days
+    gained = current - start
+    remaining = target - current
+    if elapsed <= 0 or not gained or (gained > 0) != (remaining > 0):
+        return progress
+
+    eta = last + timedelta(days=math.ceil(float(remaining / gained) * elapsed))
+    progress["eta"] = eta
+    deadline = goal.get('deadline')
+    if deadline:
+        progress["on_track"] = eta <= deadline
+    return progress
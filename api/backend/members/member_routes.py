@@ -1,666 +1,763 @@
+from datetime import datetime
+
 from flask import Blueprint, jsonify, request
-from backend.db_connection import db
-from mysql.connector import Error
+from backend.db_connection import DBError, db, db_error_response, retry_on_deadlock, unit_of_work
+from backend.cache import cached_row, entity_cache, member_names, single_flight, trainer_names
+from backend.idempotency import idempotent
+from backend.members.exercise_expansion import fetch_with_exercises, parse_expand
+from backend.members.goals import goal_progress, record_event, recompute_member_goals, track_goal
+from backend.members.status_history import record_signup, record_status_change
+from backend.members.message_counters import adjust_unread, get_unread, mark_read
+from backend.members import schemas
+from backend.messaging import hub
+from backend.messaging.message_hub import member_channel
+from backend.messaging.sse import message_stream
+from backend.tenancy import current_gym_id
+from backend.validation import validation_error
 from flask import current_app
 
 # Create Blueprint
 members = Blueprint('members', __name__)
 
-# GET all members (filtered by status, trainer, or nutritionist)
+# GET all members
+# Query params: fields, sort, and filters such as status, trainer_id,
+# nutritionist_id, last_name__prefix (see schemas.LIST_MEMBERS)
 @members.route('/members', methods=['GET'])
 def get_all_members():
     try:
         print("error check in member_routes.py")
         current_app.logger.info('Starting get_all_members request')
-        cursor = db.get_db().cursor()
-        
-        # Get query parameters for filtering
-        status = request.args.get('status')
-        trainer_id = request.args.get('trainer_id')
-        nutritionist_id = request.args.get('nutritionist_id')
-        
-        current_app.logger.debug(f'Query parameters - status: {status}, trainer_id: {trainer_id}, nutritionist_id: {nutritionist_id}')
-
-        # Prepare the Base query
-        query = "SELECT * FROM GYM_MEMBER WHERE 1=1"
-        params = []
-        
-        # Add filters
-        if status:
-            query += " AND status = %s"
-            params.append(status)
-        if trainer_id:
-            query += " AND trainer_id = %s"
-            params.append(trainer_id)
-        if nutritionist_id:
-            query += " AND nutritionist_id = %s"
-            params.append(nutritionist_id)
-        
-        current_app.logger.debug(f'Executing query: {query} with params: {params}')
-        cursor.execute(query, params)
-        members = cursor.fetchall()
-        cursor.close()
+        listing, errors = schemas.LIST_MEMBERS.parse(request.args)
+        if errors:
+            return validation_error(errors, "Invalid query parameters")
+
+        with unit_of_work() as cursor:
+            query, params = listing.sql("gym_id = %s", [current_gym_id()])
+
+            current_app.logger.debug(f'Executing query: {query} with params: {params}')
+            cursor.execute(query, params)
+            members = cursor.fetchall()
         
         current_app.logger.info(f'Successfully retrieved {len(members)} MEMBERS')
         return jsonify(members), 200
-    except Error as e:
-        current_app.logger.error(f'Database error in get_all_members: {str(e)}')
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # GET specific member profile
 @members.route('/<int:member_id>', methods=['GET'])
 def get_member(member_id):
     try:
-        cursor = db.get_db().cursor()
+        with unit_of_work() as cursor:
+            # Get member details
+            query = """
+                SELECT member_id, first_name, last_name, trainer_id, nutritionist_id, status, joined_date
+                FROM GYM_MEMBER WHERE member_id = %s
+            """
+            cursor.execute(query, (member_id,))
+            member = cursor.fetchone()
 
-        # Get member details
-        query = "SELECT * FROM GYM WHERE member_id = %s"
-        cursor.execute(query, (member_id,))
-        member = cursor.fetchone()
-        
-        if not member:
-            return jsonify({"error": "Member not found"}), 404
-        
-        cursor.close()
+            if not member:
+                return jsonify({"error": "Member not found"}), 404
         return jsonify(member), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
     
+# a member's trainer and nutritionist must work at the member's gym
+STAFF_TABLES = {'trainer_id': 'TRAINER', 'nutritionist_id': 'NUTRITIONIST'}
+
+
+def _staff_errors(cursor, data):
+    """Field errors for a trainer_id or nutritionist_id in data that isn't in the current gym."""
+    errors = {}
+    for field, table in STAFF_TABLES.items():
+        if data.get(field) is None:
+            continue
+        cursor.execute(f"SELECT {field} FROM {table} WHERE {field} = %s AND gym_id = %s",
+                       (data[field], current_gym_id()))
+        if not cursor.fetchone():
+            errors[field] = "not found in this gym"
+    return errors
+
 # POST - Create new member
-# Required fields: first_name, last_name, email
-# Optional: trainer_id, nutritionist_id, status
+# Required fields: first_name, last_name
+# Optional: trainer_id, nutritionist_id, status, joined_date (defaults to today)
 @members.route('/members', methods=['POST'])
+@idempotent
+@retry_on_deadlock
 def create_member():
     try:
-        data = request.get_json()
-        
-        # Validate required fields (only first_name and last_name are required)
-        required_fields = ["first_name", "last_name"]
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        cursor = db.get_db().cursor()
+        data, errors = schemas.CREATE_MEMBER.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+        
+        with unit_of_work() as cursor:
+            staff_errors = _staff_errors(cursor, data)
+            if staff_errors:
+                return validation_error(staff_errors)
 
-        # Insert new member
-        query = """
-        INSERT INTO GYM_MEMBER (first_name, last_name, trainer_id, nutritionist_id, status)
-        VALUES (%s, %s, %s, %s, %s)
-        """
-        cursor.execute(
-            query,
-            (
-                data["first_name"],
-                data["last_name"],
-                data.get("trainer_id"),
-                data.get("nutritionist_id"),
-                data.get("status", "active"),
-            ),
-        )
-        
-        db.get_db().commit()
-        new_member_id = cursor.lastrowid
-        cursor.close()
+            # Insert new member
+            query = """
+            INSERT INTO GYM_MEMBER (gym_id, first_name, last_name, trainer_id, nutritionist_id, status, joined_date)
+            VALUES (%s, %s, %s, %s, %s, %s, COALESCE(%s, CURRENT_DATE))
+            """
+            cursor.execute(
+                query,
+                (
+                    current_gym_id(),
+                    data["first_name"],
+                    data["last_name"],
+                    data.get("trainer_id"),
+                    data.get("nutritionist_id"),
+                    data["status"],
+                    data.get("joined_date"),
+                ),
+            )
+            new_member_id = cursor.lastrowid
+            record_signup(cursor, new_member_id)
+        member_names.remember(new_member_id, data["first_name"], data["last_name"])
         
         return (
             jsonify({"message": "Member created successfully", "member_id": new_member_id}),
             201,
         )
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # Update an existing member's information
 # Can update any field except member_id
 @members.route('/<int:member_id>', methods=['PUT'])
+@retry_on_deadlock
 def update_member(member_id):
     try:
-        data = request.get_json()
-        
-        # Check if member exists
-        cursor = db.get_db().cursor()
-        cursor.execute("SELECT * FROM GYM_MEMBER WHERE member_id = %s", (member_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Member not found"}), 404
-        
-        # Build update query based on fields
-        update_fields = []
-        params = []
-        allowed_fields = ["first_name", "last_name", "email", "trainer_id", "nutritionist_id", "status"]
-        
-        for field in allowed_fields:
-            if field in data:
-                update_fields.append(f"{field} = %s")
-                params.append(data[field])
-        
+        data, errors = schemas.UPDATE_MEMBER.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+
+        update_fields, params = schemas.UPDATE_MEMBER.update_clause(data)
         if not update_fields:
             return jsonify({"error": "No valid fields to update"}), 400
+        renamed = "first_name" in data or "last_name" in data
         
-        params.append(member_id)
-        query = f"UPDATE GYM_MEMBER SET {', '.join(update_fields)} WHERE member_id = %s"
-        
-        cursor.execute(query, params)
-        db.get_db().commit()
-        cursor.close()
+        # Check if member exists
+        with unit_of_work() as cursor:
+            cursor.execute("SELECT member_id FROM GYM_MEMBER WHERE member_id = %s", (member_id,))
+            if not cursor.fetchone():
+                return jsonify({"error": "Member not found"}), 404
+            staff_errors = _staff_errors(cursor, data)
+            if staff_errors:
+                return validation_error(staff_errors)
+
+            params.append(member_id)
+            query = f"UPDATE GYM_MEMBER SET {update_fields} WHERE member_id = %s"
+
+            if "status" in data:
+                record_status_change(cursor, member_id, data["status"])
+            cursor.execute(query, params)
+            if renamed:
+                member_names.bump_version(cursor)
+        if renamed:
+            member_names.invalidate()
+        entity_cache.invalidate('client_profile', member_id)
         
         return jsonify({"message": "Member updated successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # DELETE - Deactivate member (soft delete)
 @members.route('/<int:member_id>', methods=['DELETE'])
+@retry_on_deadlock
 def deactivate_member(member_id):
     try:
-        cursor = db.get_db().cursor()
-        query = "UPDATE GYM_MEMBER SET status = 'cancelled' WHERE member_id = %s"
-        cursor.execute(query, (member_id,))
-        db.get_db().commit()
-        cursor.close()
+        with unit_of_work() as cursor:
+            query = "UPDATE GYM_MEMBER SET status = 'cancelled' WHERE member_id = %s"
+            record_status_change(cursor, member_id, 'cancelled')
+            cursor.execute(query, (member_id,))
+        entity_cache.invalidate('client_profile', member_id)
         
         return jsonify({"message": "Member deactivated"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # GOALS commands
-# GET all goals for a member
+# GET all goals for a member, with completion_pct, achieved, eta and on_track
 @members.route('/<int:member_id>/goals', methods=['GET'])
 def get_member_goals(member_id):
     try:
-        cursor = db.get_db().cursor()
-        query = "SELECT * FROM goal WHERE member_id = %s"
-        cursor.execute(query, (member_id,))
-        goals = cursor.fetchall()
-        cursor.close()
+        with unit_of_work() as cursor:
+            query = """
+            SELECT goal_id, member_id, goal_type, target_value, start_value, current_value,
+                   start_date, deadline, last_event_at, created_at, updated_at
+            FROM GOAL
+            WHERE member_id = %s
+            ORDER BY goal_id
+            """
+            cursor.execute(query, (member_id,))
+            goals = cursor.fetchall()
+
+        for goal in goals:
+            goal.update(goal_progress(goal))
         
         return jsonify(goals), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # POST - Create new goal
 # Required fields: goal_type, target_value
 @members.route('/<int:member_id>/goals', methods=['POST'])
+@idempotent
 def create_goal(member_id):
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ["goal_type", "target_value"]
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        cursor = db.get_db().cursor()
-        
-        # Insert new goal
-        query = """
-        INSERT INTO goal (member_id, goal_type, target_value, current_value, deadline)
-        VALUES (%s, %s, %s, %s, %s)
-        """
-        cursor.execute(
-            query,
-            (
-                member_id,
-                data["goal_type"],
-                data["target_value"],
-                data.get("current_value"),
-                data.get("deadline"),
-            ),
-        )
-        
-        db.get_db().commit()
-        new_goal_id = cursor.lastrowid
-        cursor.close()
+        data, errors = schemas.CREATE_GOAL.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+        
+        with unit_of_work() as cursor:
+            # Insert new goal
+            query = """
+            INSERT INTO GOAL (member_id, goal_type, target_value, current_value, start_date, deadline)
+            VALUES (%s, %s, %s, %s, COALESCE(%s, CURRENT_DATE), %s)
+            """
+            cursor.execute(
+                query,
+                (
+                    member_id,
+                    data["goal_type"],
+                    data["target_value"],
+                    data.get("current_value"),
+                    data.get("start_date"),
+                    data.get("deadline"),
+                ),
+            )
+
+            new_goal_id = cursor.lastrowid
+            track_goal(cursor, new_goal_id, data["goal_type"])
         
         return (
             jsonify({"message": "Goal created successfully", "goal_id": new_goal_id}),
             201,
         )
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # PUT - Update goal
 @members.route('/goals/<int:goal_id>', methods=['PUT'])
 def update_goal(goal_id):
     try:
-        data = request.get_json()
-        
-        # Check if goal exists
-        cursor = db.get_db().cursor()
-        cursor.execute("SELECT * FROM goal WHERE goal_id = %s", (goal_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Goal not found"}), 404
-        
-        # Build update query 
-        update_fields = []
-        params = []
-        allowed_fields = ["target_value", "current_value", "deadline", "goal_type"]
-        
-        for field in allowed_fields:
-            if field in data:
-                update_fields.append(f"{field} = %s")
-                params.append(data[field])
-        
+        data, errors = schemas.UPDATE_GOAL.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+
+        update_fields, params = schemas.UPDATE_GOAL.update_clause(data)
         if not update_fields:
             return jsonify({"error": "No valid fields to update"}), 400
         
-        params.append(goal_id)
-        query = f"UPDATE goal SET {', '.join(update_fields)} WHERE goal_id = %s"
-        
-        cursor.execute(query, params)
-        db.get_db().commit()
-        cursor.close()
+        # Check if goal exists
+        with unit_of_work() as cursor:
+            cursor.execute("SELECT goal_id, goal_type FROM GOAL WHERE goal_id = %s", (goal_id,))
+            goal = cursor.fetchone()
+            if not goal:
+                return jsonify({"error": "Goal not found"}), 404
+
+            params.append(goal_id)
+            query = f"UPDATE GOAL SET {update_fields}, updated_at = NOW() WHERE goal_id = %s"
+
+            cursor.execute(query, params)
+            # a tracked goal's current_value comes from the member's logs
+            track_goal(cursor, goal_id, data.get("goal_type", goal["goal_type"]),
+                       restart="goal_type" in data or "start_date" in data)
         
         return jsonify({"message": "Goal updated successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # DELETE - Delete goal
 @members.route('/goals/<int:goal_id>', methods=['DELETE'])
 def delete_goal(goal_id):
     try:
-        cursor = db.get_db().cursor()
-        cursor.execute("DELETE FROM goal WHERE goal_id = %s", (goal_id,))
-        db.get_db().commit()
-        cursor.close()
+        with unit_of_work() as cursor:
+            cursor.execute("DELETE FROM GOAL WHERE goal_id = %s", (goal_id,))
         
         return jsonify({"message": "Goal deleted"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # WORKOUT LOGS commands
 # GET workout logs for a member
+# Query params: fields, sort, date__gte/date__lte, ... (see schemas.LIST_WORKOUT_LOGS)
 @members.route('/<int:member_id>/workout-logs', methods=['GET'])
+@single_flight.coalesce
 def get_workout_logs(member_id):
     try:
-        cursor = db.get_db().cursor()
-        query = """
-            SELECT * FROM WORKOUT_LOG
-            WHERE member_id = %s 
-            ORDER BY date DESC
-        """
-        cursor.execute(query, (member_id,))
-        logs = cursor.fetchall()
-        cursor.close()
+        listing, errors = schemas.LIST_WORKOUT_LOGS.parse(request.args)
+        if errors:
+            return validation_error(errors, "Invalid query parameters")
+
+        with unit_of_work() as cursor:
+            query, params = listing.sql("member_id = %s", [member_id])
+            cursor.execute(query, params)
+            logs = cursor.fetchall()
         
         return jsonify(logs), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
+
+# GET specific workout log
+# Optional query param: expand=exercises (adds the exercises logged)
+@members.route('/workout-logs/<int:log_id>', methods=['GET'])
+def get_workout_log(log_id):
+    try:
+        try:
+            expand = parse_expand(request.args.get('expand'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if 'exercises' in expand:
+            log = fetch_with_exercises(db.get_db(), 'log', log_id)
+        else:
+            with unit_of_work() as cursor:
+                cursor.execute(
+                    "SELECT log_id, member_id, trainer_id, date, notes, sessions FROM WORKOUT_LOG WHERE log_id = %s",
+                    (log_id,)
+                )
+                log = cursor.fetchone()
+
+        if not log:
+            return jsonify({"error": "Workout log not found"}), 404
+
+        return jsonify(log), 200
+    except DBError as e:
+        return db_error_response(e)
 
 # POST - Log new workout
 # Required fields: workout_date
 @members.route('/<int:member_id>/workout-logs', methods=['POST'])
+@idempotent
 def create_workout_log(member_id):
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ["workout_date"]
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        cursor = db.get_db().cursor()
-        
-        # Insert new workout log
-        query = """
-        INSERT INTO WORKOUT_LOG (member_id, trainer_id, date, notes, sessions)
-        VALUES (%s, %s, %s, %s, %s)
-        """
-        cursor.execute(
-            query,
-            (
-                member_id,
-                data.get("trainer_id"),
-                data["workout_date"],
-                data.get("notes"),
-                data.get("sessions", 1),
-            ),
-        )
-        
-        db.get_db().commit()
-        new_log_id = cursor.lastrowid
-        cursor.close()
+        data, errors = schemas.CREATE_WORKOUT_LOG.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+        
+        with unit_of_work() as cursor:
+            # Insert new workout log
+            query = """
+            INSERT INTO WORKOUT_LOG (member_id, trainer_id, date, notes, sessions)
+            VALUES (%s, %s, %s, %s, %s)
+            """
+            cursor.execute(
+                query,
+                (
+                    member_id,
+                    data.get("trainer_id"),
+                    data["workout_date"],
+                    data.get("notes"),
+                    data["sessions"],
+                ),
+            )
+
+            new_log_id = cursor.lastrowid
+            record_event(cursor, 'WORKOUT_LOG', member_id, data["workout_date"], data)
         
         return (
             jsonify({"message": "Workout logged successfully", "log_id": new_log_id}),
             201,
         )
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 
 # PROGRESS commands
 # GET progress for a member
+# Query params: fields, sort, date__gte/date__lte, ... (see schemas.LIST_PROGRESS)
 @members.route('/<int:member_id>/progress', methods=['GET'])
 def get_progress(member_id):
     try:
-        cursor = db.get_db().cursor()
-        query = """
-            SELECT * FROM PROGRESS 
-            WHERE member_id = %s 
-            ORDER BY date DESC
-        """
-        cursor.execute(query, (member_id,))
-        progress = cursor.fetchall()
-        cursor.close()
+        listing, errors = schemas.LIST_PROGRESS.parse(request.args)
+        if errors:
+            return validation_error(errors, "Invalid query parameters")
+
+        with unit_of_work() as cursor:
+            query, params = listing.sql("member_id = %s", [member_id])
+            cursor.execute(query, params)
+            progress = cursor.fetchall()
         
         return jsonify(progress), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # POST - Create new progress entry
 # Required fields: progress_date
 @members.route('/<int:member_id>/progress', methods=['POST'])
+@idempotent
 def create_progress(member_id):
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ["progress_date"]
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        cursor = db.get_db().cursor()
-        
-        # Insert new progress entry
-        query = """
-        INSERT INTO PROGRESS (member_id, date, weight, body_fat_percentage, measurements, photos)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(
-            query,
-            (
-                member_id,
-                data.get("progress_date"),
-                data.get("weight"),
-                data.get("body_fat_percentage"),
-                data.get("measurements"),
-                data.get("photos"),
-            ),
-        )
-        
-        db.get_db().commit()
-        new_progress_id = cursor.lastrowid
-        cursor.close()
+        data, errors = schemas.CREATE_PROGRESS.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+        
+        with unit_of_work() as cursor:
+            # Insert new progress entry
+            query = """
+            INSERT INTO PROGRESS (member_id, date, weight, body_fat_percentage, measurements, photos)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """
+            cursor.execute(
+                query,
+                (
+                    member_id,
+                    data["progress_date"],
+                    data.get("weight"),
+                    data.get("body_fat_percentage"),
+                    data.get("measurements"),
+                    data.get("photos"),
+                ),
+            )
+
+            new_progress_id = cursor.lastrowid
+            record_event(cursor, 'PROGRESS', member_id, data["progress_date"], data)
         
         return (
             jsonify({"message": "Progress recorded successfully", "progress_id": new_progress_id}),
             201,
         )
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # PUT - Update progress entry
 @members.route('/progress/<int:progress_id>', methods=['PUT'])
 def update_progress(progress_id):
     try:
-        data = request.get_json()
-        
-        # Check if progress entry exists
-        cursor = db.get_db().cursor()
-        cursor.execute("SELECT * FROM PROGRESS WHERE progress_id = %s", (progress_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Progress entry not found"}), 404
-        
-        # Build update query 
-        update_fields = []
-        params = []
-        allowed_fields = ["weight", "body_fat_percentage", "measurements", "photos"]
-        
-        for field in allowed_fields:
-            if field in data:
-                update_fields.append(f"{field} = %s")
-                params.append(data[field])
-        
+        data, errors = schemas.UPDATE_PROGRESS.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+
+        update_fields, params = schemas.UPDATE_PROGRESS.update_clause(data)
         if not update_fields:
             return jsonify({"error": "No valid fields to update"}), 400
         
-        params.append(progress_id)
-        query = f"UPDATE PROGRESS SET {', '.join(update_fields)} WHERE progress_id = %s"
-        
-        cursor.execute(query, params)
-        db.get_db().commit()
-        cursor.close()
+        # Check if progress entry exists
+        with unit_of_work() as cursor:
+            cursor.execute("SELECT progress_id, member_id FROM PROGRESS WHERE progress_id = %s", (progress_id,))
+            progress = cursor.fetchone()
+            if not progress:
+                return jsonify({"error": "Progress entry not found"}), 404
+
+            params.append(progress_id)
+            query = f"UPDATE PROGRESS SET {update_fields} WHERE progress_id = %s"
+
+            cursor.execute(query, params)
+            recompute_member_goals(cursor, 'PROGRESS', progress["member_id"])
         
         return jsonify({"message": "Progress updated successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # DELETE - Delete progress entry
 @members.route('/progress/<int:progress_id>', methods=['DELETE'])
 def delete_progress(progress_id):
     try:
-        cursor = db.get_db().cursor()
-        query = "DELETE FROM PROGRESS WHERE progress_id = %s"
-        cursor.execute(query, (progress_id,))
-        db.get_db().commit()
-        cursor.close()
+        with unit_of_work() as cursor:
+            cursor.execute("SELECT member_id FROM PROGRESS WHERE progress_id = %s", (progress_id,))
+            progress = cursor.fetchone()
+
+            query = "DELETE FROM PROGRESS WHERE progress_id = %s"
+            cursor.execute(query, (progress_id,))
+            if progress:
+                recompute_member_goals(cursor, 'PROGRESS', progress["member_id"])
         
         return jsonify({"message": "Progress entry deleted successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
     
 # WORKOUT PLANS commands
 # GET workout plans for a member
+# Query params: fields, sort, date__gte/date__lte (see schemas.LIST_WORKOUT_PLANS)
 @members.route('/<int:member_id>/workout-plans', methods=['GET'])
 def get_workout_plans(member_id):
     try:
-        cursor = db.get_db().cursor()
-        query = "SELECT * FROM WORKOUT_PLAN WHERE member_id = %s ORDER BY date DESC"
-        cursor.execute(query, (member_id,))
-        plans = cursor.fetchall()
-        cursor.close()
+        listing, errors = schemas.LIST_WORKOUT_PLANS.parse(request.args)
+        if errors:
+            return validation_error(errors, "Invalid query parameters")
+
+        with unit_of_work() as cursor:
+            query, params = listing.sql("member_id = %s", [member_id])
+            cursor.execute(query, params)
+            plans = cursor.fetchall()
         
         return jsonify(plans), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # GET specific workout plan details
+# Optional query param: expand=exercises (adds the plan's exercise breakdown)
 @members.route('/workout-plans/<int:plan_id>', methods=['GET'])
 def get_workout_plan(plan_id):
     try:
-        cursor = db.get_db().cursor()
-        query = "SELECT * FROM WORKOUT_PLAN WHERE plan_id = %s"
-        cursor.execute(query, (plan_id,))
-        plan = cursor.fetchone()
-        cursor.close()
+        try:
+            expand = parse_expand(request.args.get('expand'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if 'exercises' in expand:
+            plan = fetch_with_exercises(db.get_db(), 'plan', plan_id)
+            if not plan:
+                return jsonify({"error": "Workout plan not found"}), 404
+            return jsonify(plan), 200
+
+        query = "SELECT plan_id, member_id, goals, date FROM WORKOUT_PLAN WHERE plan_id = %s"
+        plan = cached_row('workout_plan', plan_id, query, (plan_id,))
         
         if not plan:
             return jsonify({"error": "Workout plan not found"}), 404
         
         return jsonify(plan), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # POST - Create new workout plan
 # Required fields: plan_date
 @members.route('/<int:member_id>/workout-plans', methods=['POST'])
+@idempotent
 def create_workout_plan(member_id):
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ["goals", "plan_date"]
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        cursor = db.get_db().cursor()
-        
-        # Insert new workout plan
-        query = """
-        INSERT INTO WORKOUT_PLAN (member_id, goals, date)
-        VALUES (%s, %s, %s)
-        """
-        cursor.execute(
-            query,
-            (
-                member_id,
-                data["goals"],
-                data.get("plan_date"), 
-            ),
-        )
+        data, errors = schemas.CREATE_WORKOUT_PLAN.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+        
+        with unit_of_work() as cursor:
+            # Insert new workout plan
+            query = """
+            INSERT INTO WORKOUT_PLAN (member_id, goals, date)
+            VALUES (%s, %s, %s)
+            """
+            cursor.execute(
+                query,
+                (
+                    member_id,
+                    data["goals"],
+                    data["plan_date"],
+                ),
+            )
 
-        
-        db.get_db().commit()
-        new_plan_id = cursor.lastrowid
-        cursor.close()
+
+            new_plan_id = cursor.lastrowid
         
         return (
             jsonify({"message": "Workout plan created successfully", "plan_id": new_plan_id}),
             201,
         )
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # PUT - Update workout plan
 @members.route('/workout-plans/<int:plan_id>', methods=['PUT'])
 def update_workout_plan(plan_id):
     try:
-        data = request.get_json()
-        
-        # Check if workout plan exists
-        cursor = db.get_db().cursor()
-        cursor.execute("SELECT * FROM WORKOUT_PLAN WHERE plan_id = %s", (plan_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Workout plan not found"}), 404
-        
-        # Build update query 
-        update_fields = []
-        params = []
-        allowed_fields = ["plan_date", "goals", "plan_name", "status"]
-        
-        for field in allowed_fields:
-            if field in data:
-                update_fields.append(f"{field} = %s")
-                params.append(data[field])
-        
+        data, errors = schemas.UPDATE_WORKOUT_PLAN.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+
+        update_fields, params = schemas.UPDATE_WORKOUT_PLAN.update_clause(data)
         if not update_fields:
             return jsonify({"error": "No valid fields to update"}), 400
         
-        params.append(plan_id)
-        query = f"UPDATE WORKOUT_PLAN SET {', '.join(update_fields)} WHERE plan_id = %s"
-        
-        cursor.execute(query, params)
-        db.get_db().commit()
-        cursor.close()
+        # Check if workout plan exists
+        with unit_of_work() as cursor:
+            cursor.execute("SELECT plan_id FROM WORKOUT_PLAN WHERE plan_id = %s", (plan_id,))
+            if not cursor.fetchone():
+                return jsonify({"error": "Workout plan not found"}), 404
+
+            params.append(plan_id)
+            query = f"UPDATE WORKOUT_PLAN SET {update_fields} WHERE plan_id = %s"
+
+            cursor.execute(query, params)
+        entity_cache.invalidate('workout_plan', plan_id)
         
         return jsonify({"message": "Workout plan updated successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # MESSAGES commands
 # GET messages for a member
+# Optional: since=<message_id> or since=<YYYY-MM-DD HH:MM:SS> returns only
+# the messages newer than that, so clients can sync incrementally
 @members.route('/<int:member_id>/messages', methods=['GET'])
 def get_member_messages(member_id):
     try:
-        cursor = db.get_db().cursor()
+        # trainer names come from the name directory, not a join
         query = """
-            SELECT m.*, t.first_name as trainer_first_name, t.last_name as trainer_last_name
+            SELECT m.message_id, m.member_id, m.trainer_id, m.content, m.message_timestamp, m.read_status
             FROM MESSAGE m
-            LEFT JOIN TRAINER t ON m.trainer_id = t.trainer_id
             WHERE m.member_id = %s
-            ORDER BY m.message_timestamp DESC
         """
-        cursor.execute(query, (member_id,))
-        messages = cursor.fetchall()
-        cursor.close()
+        params = [member_id]
+
+        since = request.args.get('since')
+        if since:
+            if since.isdigit():
+                query += " AND m.message_id > %s"
+                params.append(int(since))
+            else:
+                try:
+                    since_ts = datetime.fromisoformat(since)
+                except ValueError:
+                    return jsonify({"error": "since must be a message_id or a timestamp (YYYY-MM-DD HH:MM:SS)"}), 400
+                query += " AND m.message_timestamp > %s"
+                params.append(since_ts)
+
+        query += " ORDER BY m.message_timestamp DESC, m.message_id DESC"
+
+        with unit_of_work() as cursor:
+            cursor.execute(query, params)
+            messages = cursor.fetchall()
+        trainer_names.decorate(db.get_db(), messages, 'trainer_id', 'trainer_first_name', 'trainer_last_name')
         
         return jsonify(messages), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
+
+# GET live stream of new messages for a member (Server-Sent Events)
+# Reconnecting clients send Last-Event-ID to receive what they missed
+@members.route('/<int:member_id>/messages/stream', methods=['GET'])
+def stream_member_messages(member_id):
+    try:
+        return message_stream(member_channel(current_gym_id(), member_id), "member_id = %s", (member_id,))
+    except DBError as e:
+        return db_error_response(e)
 
 # GET specific message
 @members.route('/messages/<int:message_id>', methods=['GET'])
 def get_message(message_id):
     try:
-        cursor = db.get_db().cursor()
-        query = "SELECT * FROM MESSAGE WHERE message_id = %s"
-        cursor.execute(query, (message_id,))
-        message = cursor.fetchone()
-        cursor.close()
+        with unit_of_work() as cursor:
+            query = "SELECT * FROM MESSAGE WHERE message_id = %s"
+            cursor.execute(query, (message_id,))
+            message = cursor.fetchone()
         
         if not message:
             return jsonify({"error": "Message not found"}), 404
         
         return jsonify(message), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # POST - Send new message
 # Required fields: content
 @members.route('/<int:member_id>/messages', methods=['POST'])
+@idempotent
+@retry_on_deadlock
 def create_message(member_id):
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ["content"]
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        cursor = db.get_db().cursor()
-        
-        # Insert new message
-        query = """
-        INSERT INTO MESSAGE (member_id, trainer_id, content, message_timestamp, read_status)
-        VALUES (%s, %s, %s, NOW(), %s)
-        """
-        cursor.execute(
-            query,
-            (
-                member_id,
-                data.get("trainer_id"),
-                data["content"],
-                data.get("read_status", "unread"),
-            ),
-        )
-        
-        db.get_db().commit()
-        new_message_id = cursor.lastrowid
-        cursor.close()
+        data, errors = schemas.CREATE_MESSAGE.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+        
+        with unit_of_work() as cursor:
+            # Insert new message
+            query = """
+            INSERT INTO MESSAGE (member_id, trainer_id, content, message_timestamp, read_status)
+            VALUES (%s, %s, %s, NOW(), %s)
+            """
+            read_status = data["read_status"]
+            cursor.execute(
+                query,
+                (
+                    member_id,
+                    data.get("trainer_id"),
+                    data["content"],
+                    read_status,
+                ),
+            )
+            new_message_id = cursor.lastrowid
+
+            # keep the conversation's unread counter in the same transaction
+            if read_status == "unread":
+                adjust_unread(cursor, member_id, data.get("trainer_id"), 1)
+
+            cursor.execute("SELECT * FROM MESSAGE WHERE message_id = %s", (new_message_id,))
+            new_message = cursor.fetchone()
+
+        # push the committed message to anyone streaming this conversation;
+        # the message is saved either way, so a push failure is only logged
+        try:
+            hub.publish(new_message, current_gym_id())
+        except Exception as e:
+            current_app.logger.warning(f'Could not push message {new_message_id}: {str(e)}')
         
         return (
             jsonify({"message": "Message sent successfully", "message_id": new_message_id}),
             201,
         )
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # PUT - Mark message as read/archived
 @members.route('/messages/<int:message_id>', methods=['PUT'])
+@retry_on_deadlock
 def update_message(message_id):
     try:
-        data = request.get_json()
-        
-        # Check if message exists
-        cursor = db.get_db().cursor()
-        cursor.execute("SELECT * FROM MESSAGE WHERE message_id = %s", (message_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Message not found"}), 404
-        
-        # Build update query 
-        update_fields = []
-        params = []
-        allowed_fields = ["read_status"]
-        
-        for field in allowed_fields:
-            if field in data:
-                update_fields.append(f"{field} = %s")
-                params.append(data[field])
-        
+        data, errors = schemas.UPDATE_MESSAGE.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+
+        update_fields, params = schemas.UPDATE_MESSAGE.update_clause(data)
         if not update_fields:
             return jsonify({"error": "No valid fields to update"}), 400
         
-        params.append(message_id)
-        query = f"UPDATE MESSAGE SET {', '.join(update_fields)} WHERE message_id = %s"
-        
-        cursor.execute(query, params)
-        db.get_db().commit()
-        cursor.close()
+        # Check if message exists
+        with unit_of_work() as cursor:
+            cursor.execute("SELECT * FROM MESSAGE WHERE message_id = %s FOR UPDATE", (message_id,))
+            message = cursor.fetchone()
+            if not message:
+                return jsonify({"error": "Message not found"}), 404
+
+            params.append(message_id)
+            query = f"UPDATE MESSAGE SET {update_fields} WHERE message_id = %s"
+
+            cursor.execute(query, params)
+
+            # read -> unread or unread -> read moves the conversation's counter
+            if "read_status" in data:
+                was_unread = message["read_status"] == "unread"
+                is_unread = data["read_status"] == "unread"
+                if was_unread != is_unread:
+                    adjust_unread(cursor, message["member_id"], message["trainer_id"], 1 if is_unread else -1)
         
         return jsonify({"message": "Message updated successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
+
+# GET unread message counts for a member, per trainer
+@members.route('/<int:member_id>/messages/unread', methods=['GET'])
+def get_unread_counts(member_id):
+    try:
+        with unit_of_work() as cursor:
+            counts = get_unread(cursor, member_id)
+
+        return jsonify(counts), 200
+    except DBError as e:
+        return db_error_response(e)
+
+# PUT - Mark many messages as read at once
+# Optional fields: trainer_id, message_ids, up_to_id (with none of them,
+# every unread message of the member is marked)
+@members.route('/<int:member_id>/messages/read', methods=['PUT'])
+@retry_on_deadlock
+def mark_messages_read(member_id):
+    try:
+        data, errors = schemas.MARK_MESSAGES_READ.load(request.get_json(silent=True) or {})
+        if errors:
+            return validation_error(errors)
+
+        with unit_of_work() as cursor:
+            marked = mark_read(
+                cursor,
+                member_id,
+                trainer_id=data.get("trainer_id"),
+                message_ids=data.get("message_ids"),
+                up_to_id=data.get("up_to_id"),
+            )
 
+        return jsonify({"message": "Messages marked as read", "marked_read": marked}), 200
+    except DBError as e:
+        return db_error_response(e)
@@ -0,0 +1,91 @@
+#------------------------------------------------------------
+# Unread message counters (MESSAGE_UNREAD), one row per
+# member/trainer conversation. These helpers take the route's
+# cursor so the counter change commits together with the
+# MESSAGE write that caused it.
+#------------------------------------------------------------
+
+# messages without a trainer are counted under trainer_id 0
+NO_TRAINER = 0
+
+
+def trainer_key(trainer_id):
+    return trainer_id if trainer_id is not None else NO_TRAINER
+
+
+def adjust_unread(cursor, member_id, trainer_id, delta):
+    """Add delta (may be negative) to a conversation's unread count, never going below 0."""
+    cursor.execute(
+        """
+        INSERT INTO MESSAGE_UNREAD (member_id, trainer_id, unread_count)
+        VALUES (%s, %s, GREATEST(%s, 0))
+        ON DUPLICATE KEY UPDATE unread_count = GREATEST(unread_count + %s, 0)
+        """,
+        (member_id, trainer_key(trainer_id), delta, delta)
+    )
+
+
+def get_unread(cursor, member_id):
+    cursor.execute(
+        """
+        SELECT trainer_id, unread_count
+        FROM MESSAGE_UNREAD
+        WHERE member_id = %s AND unread_count > 0
+        ORDER BY trainer_id
+        """,
+        (member_id,)
+    )
+    by_trainer = [
+        {"trainer_id": row['trainer_id'] or None, "unread_count": row['unread_count']}
+        for row in cursor.fetchall()
+    ]
+    return {
+        "member_id": member_id,
+        "total_unread": sum(row['unread_count'] for row in by_trainer),
+        "by_trainer": by_trainer,
+    }
+
+
+def mark_read(cursor, member_id, trainer_id=None, message_ids=None, up_to_id=None):
+    """
+    Mark a member's unread messages as read in one UPDATE, optionally
+    limited to one trainer, a list of message ids and/or ids <= up_to_id,
+    and take the same amounts off the counters. Returns how many
+    messages were marked.
+    """
+    where = ["member_id = %s", "read_status = 'unread'"]
+    params = [member_id]
+
+    if trainer_id is not None:
+        where.append("COALESCE(trainer_id, 0) = %s")
+        params.append(trainer_key(trainer_id))
+    if message_ids:
+        where.append(f"message_id IN ({', '.join(['%s'] * len(message_ids))})")
+        params.extend(message_ids)
+    if up_to_id is not None:
+        where.append("message_id <= %s")
+        params.append(up_to_id)
+
+    where_clause = " AND ".join(where)
+
+    # lock the rows and count them per conversation before flipping them
+    cursor.execute(
+        f"""
+        SELECT COALESCE(trainer_id, 0) AS trainer_id, COUNT(*) AS marked
+        FROM MESSAGE
+        WHERE {where_clause}
+        GROUP BY COALESCE(trainer_id, 0)
+        FOR UPDATE
+        """,
+        params
+    )
+    per_trainer = cursor.fetchall()
+    if not per_trainer:
+        return 0
+
+    cursor.execute(f"UPDATE MESSAGE SET read_status = 'read' WHERE {where_clause}", params)
+
+    for row in per_trainer:
+        adjust_unread(cursor, member_id, row['trainer_id'], -row['marked'])
+
+    return sum(row['marked'] for row in per_trainer)
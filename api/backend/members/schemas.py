@@ -0,0 +1,112 @@
+#------------------------------------------------------------
+# Request body schemas for the member routes (see
+# backend/validation). Field names are what clients send;
+# column= is where it goes when that differs. LIST_* are the
+# query strings the list routes accept (validation/listing.py).
+#------------------------------------------------------------
+from backend.validation import Date, Decimal, Filter, Int, List, ListQuery, Schema, Str
+
+MEMBER_STATUSES = ('active', 'inactive', 'suspended', 'cancelled')
+READ_STATUSES = ('unread', 'read', 'archived')
+
+CREATE_MEMBER = Schema({
+    "first_name": Str(required=True, max_length=50),
+    "last_name": Str(required=True, max_length=50),
+    "trainer_id": Int(min=1),
+    "nutritionist_id": Int(min=1),
+    "status": Str(nullable=False, default='active', choices=MEMBER_STATUSES),
+    "joined_date": Date(),
+})
+UPDATE_MEMBER = CREATE_MEMBER.partial("first_name", "last_name", "trainer_id", "nutritionist_id", "status")
+
+# goal types in backend.members.goals.GOAL_TYPES fill in current_value themselves
+CREATE_GOAL = Schema({
+    "goal_type": Str(required=True, max_length=50),
+    "target_value": Decimal(required=True, digits=10, places=2),
+    "current_value": Decimal(digits=10, places=2),
+    "start_date": Date(nullable=False),
+    "deadline": Date(),
+})
+UPDATE_GOAL = CREATE_GOAL.partial()
+
+CREATE_WORKOUT_LOG = Schema({
+    "workout_date": Date(required=True, column="date"),
+    "trainer_id": Int(min=1),
+    "notes": Str(),
+    "sessions": Int(min=0, nullable=False, default=1),
+})
+
+CREATE_PROGRESS = Schema({
+    "progress_date": Date(required=True, column="date"),
+    "weight": Decimal(digits=5, places=2, min=0),
+    "body_fat_percentage": Decimal(digits=4, places=2, min=0),
+    "measurements": Str(max_length=200),
+    "photos": Str(max_length=500),
+})
+UPDATE_PROGRESS = CREATE_PROGRESS.partial("weight", "body_fat_percentage", "measurements", "photos")
+
+CREATE_WORKOUT_PLAN = Schema({
+    "goals": Str(required=True, max_length=500),
+    "plan_date": Date(required=True, column="date", aliases=("date",)),
+})
+UPDATE_WORKOUT_PLAN = CREATE_WORKOUT_PLAN.partial()
+
+CREATE_MESSAGE = Schema({
+    "content": Str(required=True),
+    "trainer_id": Int(min=1),
+    "read_status": Str(nullable=False, default='unread', choices=READ_STATUSES),
+})
+UPDATE_MESSAGE = CREATE_MESSAGE.partial("read_status")
+
+MARK_MESSAGES_READ = Schema({
+    "trainer_id": Int(min=1),
+    "message_ids": List(Int(min=1, nullable=False)),
+    "up_to_id": Int(min=1),
+})
+
+MEMBER_COLUMNS = ("member_id", "first_name", "last_name", "trainer_id", "nutritionist_id",
+                  "status", "joined_date")
+
+LIST_MEMBERS = ListQuery(
+    "GYM_MEMBER",
+    columns=MEMBER_COLUMNS,
+    filters={
+        "member_id": Int(min=1),
+        "first_name": Str(),
+        "last_name": Str(),
+        "trainer_id": Int(min=1),
+        "nutritionist_id": Int(min=1),
+        "status": Filter(Str(choices=MEMBER_STATUSES), ops=('eq', 'ne', 'in')),
+        "joined_date": Date(),
+    },
+    sort=("member_id", "first_name", "last_name", "status", "joined_date"),
+    default_sort="member_id",
+)
+
+# the routes below are per member (WHERE member_id = %s), newest first
+
+LIST_WORKOUT_LOGS = ListQuery(
+    "WORKOUT_LOG",
+    columns=("log_id", "member_id", "trainer_id", "date", "notes", "sessions"),
+    filters={"trainer_id": Int(min=1), "date": Date(), "sessions": Int(min=0)},
+    sort=("date", "log_id", "sessions"),
+    default_sort="-date",
+)
+
+LIST_PROGRESS = ListQuery(
+    "PROGRESS",
+    columns=("progress_id", "member_id", "date", "weight", "body_fat_percentage",
+             "measurements", "photos"),
+    filters={"date": Date(), "weight": Decimal(digits=5, places=2),
+             "body_fat_percentage": Decimal(digits=4, places=2)},
+    sort=("date", "progress_id", "weight", "body_fat_percentage"),
+    default_sort="-date",
+)
+
+LIST_WORKOUT_PLANS = ListQuery(
+    "WORKOUT_PLAN",
+    columns=("plan_id", "member_id", "goals", "date"),
+    filters={"date": Date()},
+    sort=("date", "plan_id"),
+    default_sort="-date",
+)
@@ -0,0 +1,31 @@
+#------------------------------------------------------------
+# GYM_MEMBER.status change history (MEMBER_STATUS_HISTORY).
+# Called by every route that writes a member's status, inside
+# the same transaction as the write.
+#------------------------------------------------------------
+
+
+def record_signup(cursor, member_id):
+    """First history row for a member just inserted."""
+    cursor.execute(
+        """
+        INSERT INTO MEMBER_STATUS_HISTORY (member_id, old_status, new_status, changed_at)
+        SELECT member_id, NULL, status, NOW()
+        FROM GYM_MEMBER
+        WHERE member_id = %s
+        """,
+        (member_id,)
+    )
+
+
+def record_status_change(cursor, member_id, new_status):
+    """Log a status change; call before the UPDATE. Does nothing if the status is unchanged."""
+    cursor.execute(
+        """
+        INSERT INTO MEMBER_STATUS_HISTORY (member_id, old_status, new_status, changed_at)
+        SELECT member_id, status, %s, NOW()
+        FROM GYM_MEMBER
+        WHERE member_id = %s AND NOT (status <=> %s)
+        """,
+        (new_status, member_id, new_status)
+    )
@@ -0,0 +1,10 @@
+#------------------------------------------------------------
+# This file creates the shared message hub used to push new
+# MESSAGE rows to connected Server-Sent Events clients.
+#------------------------------------------------------------
+from backend.messaging.message_hub import MessageHub
+
+
+# Routes publish to it after committing a message; the SSE
+# routes subscribe to a member or trainer channel.
+hub = MessageHub()
@@ -0,0 +1,140 @@
+#------------------------------------------------------------
+# Process-local fan-out of message events to SSE subscribers,
+# with a pluggable backplane so several API workers see each
+# other's events.
+#
+#   MESSAGE_BACKPLANE=local   (default) single process only
+#   MESSAGE_BACKPLANE=redis   Redis pub/sub at REDIS_URL
+#                             (needs the `redis` package)
+#
+# Channels are named per gym: ids are only unique within a gym's
+# schema, so member 7 of one gym never hears another gym's member 7.
+#------------------------------------------------------------
+import json
+import queue
+import threading
+
+# events a slow client may fall behind by before it is dropped;
+# it reconnects with Last-Event-ID and catches up from the DB
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def member_channel(gym_id, member_id):
+    return f"gym:{gym_id}:member:{member_id}"
+
+
+def trainer_channel(gym_id, trainer_id):
+    return f"gym:{gym_id}:trainer:{trainer_id}"
+
+
+def channels_for(event):
+    channels = [member_channel(event['gym_id'], event['member_id'])]
+    if event.get('trainer_id'):
+        channels.append(trainer_channel(event['gym_id'], event['trainer_id']))
+    return channels
+
+
+def to_event(message_row):
+    """MESSAGE row -> JSON-safe event dict."""
+    return {
+        key: value.isoformat(sep=' ') if hasattr(value, 'isoformat') else value
+        for key, value in message_row.items()
+    }
+
+
+class Subscription:
+    def __init__(self, channel):
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        """Next event, or None if nothing arrived within timeout seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class LocalBackplane:
+    """Events only reach subscribers of this process."""
+
+    def start(self, deliver):
+        self._deliver = deliver
+
+    def publish(self, event):
+        self._deliver(event)
+
+
+class RedisBackplane:
+    """Events go through a Redis pub/sub channel shared by every worker."""
+
+    CHANNEL = 'soma:messages'
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("MESSAGE_BACKPLANE=redis needs the 'redis' package installed")
+        self._client = redis.Redis.from_url(url)
+
+    def start(self, deliver):
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.CHANNEL: lambda msg: deliver(json.loads(msg['data']))})
+        pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def publish(self, event):
+        self._client.publish(self.CHANNEL, json.dumps(event))
+
+
+class MessageHub:
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._backplane = None
+
+    def init_app(self, app):
+        kind = app.config.get('MESSAGE_BACKPLANE', 'local')
+        if kind == 'redis':
+            self._backplane = RedisBackplane(app.config['REDIS_URL'])
+        elif kind == 'local':
+            self._backplane = LocalBackplane()
+        else:
+            raise RuntimeError(f"Unknown MESSAGE_BACKPLANE '{kind}'")
+        self._backplane.start(self._deliver)
+        app.extensions['message_hub'] = self
+
+    def subscribe(self, channel):
+        subscription = Subscription(channel)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subs) for subs in self._subscribers.values())
+
+    def publish(self, message_row, gym_id):
+        """Send a committed MESSAGE row of gym_id to every worker's subscribers."""
+        self._backplane.publish(dict(to_event(message_row), gym_id=gym_id))
+
+    def _deliver(self, event):
+        for channel in channels_for(event):
+            with self._lock:
+                subscribers = list(self._subscribers.get(channel, ()))
+            for subscription in subscribers:
+                subscription.offer(event)
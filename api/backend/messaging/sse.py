@@ -0,0 +1,81 @@
+#------------------------------------------------------------
+# Server-Sent Events response shared by the member and trainer
+# message streams.
+#------------------------------------------------------------
+import json
+
+from flask import Response, request
+
+from backend.db_connection import unit_of_work
+from backend.messaging import hub
+from backend.messaging.message_hub import to_event
+
+# comment line sent when idle so proxies keep the connection open
+HEARTBEAT_SECONDS = 15
+
+# most messages replayed to a reconnecting client
+REPLAY_LIMIT = 500
+
+
+def _last_event_id():
+    value = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    return int(value) if value and value.isdigit() else None
+
+
+def _format(event):
+    return f"id: {event['message_id']}\nevent: message\ndata: {json.dumps(event)}\n\n"
+
+
+def message_stream(channel, replay_where, replay_params):
+    """
+    Stream new messages for a hub channel as text/event-stream.
+
+    When the client reconnects with Last-Event-ID, the messages it missed
+    (replay_where, e.g. "member_id = %s") are read from MESSAGE first, in
+    the request gym's database, as the channel is the gym's.
+    The subscription is taken before that read so nothing committed in
+    between is lost. The DB connection is released before streaming
+    starts; the generator only waits on the subscription queue.
+    """
+    subscription = hub.subscribe(channel)
+
+    try:
+        after = _last_event_id()
+        replay = []
+        if after is not None:
+            with unit_of_work() as cursor:
+                cursor.execute(
+                    f"SELECT * FROM MESSAGE WHERE {replay_where} AND message_id > %s "
+                    f"ORDER BY message_id LIMIT {REPLAY_LIMIT}",
+                    (*replay_params, after)
+                )
+                replay = [to_event(row) for row in cursor.fetchall()]
+    except Exception:
+        hub.unsubscribe(subscription)
+        raise
+
+    def generate():
+        replayed_ids = {event['message_id'] for event in replay}
+        try:
+            # tell the browser how soon to reconnect if we drop it
+            yield "retry: 3000\n\n"
+
+            for event in replay:
+                yield _format(event)
+
+            while not subscription.overflowed:
+                event = subscription.get(timeout=HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                elif event['message_id'] not in replayed_ids:
+                    yield _format(event)
+            # fell too far behind: end the stream, the client reconnects
+            # with Last-Event-ID and catches up from the database
+        finally:
+            hub.unsubscribe(subscription)
+
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
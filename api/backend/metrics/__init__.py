@@ -0,0 +1,8 @@
+#------------------------------------------------------------
+# This file creates the shared metrics registry. Any module can
+# count events on it; /ops/metrics returns a snapshot.
+#------------------------------------------------------------
+from backend.metrics.registry import MetricsRegistry
+
+
+metrics = MetricsRegistry()
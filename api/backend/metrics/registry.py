@@ -0,0 +1,58 @@
+#------------------------------------------------------------
+# In-process counters and gauges, exposed at /ops/metrics.
+#
+# Counters are named with dots and may carry labels:
+#   metrics.incr("ratelimit.limited", role="manager", endpoint="managers.attendance_log")
+# Gauges are callables read when a snapshot is taken.
+#------------------------------------------------------------
+import threading
+import time
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def incr(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def gauge(self, name, func):
+        """Register func() as the current value of gauge name."""
+        self._gauges[name] = func
+
+    def counter(self, name, **labels):
+        return self._counters.get((name, _label_key(labels)), 0)
+
+    def snapshot(self):
+        with self._lock:
+            counters = list(self._counters.items())
+
+        grouped = {}
+        for (name, labels), value in sorted(counters, key=lambda item: (item[0][0], item[0][1])):
+            grouped.setdefault(name, []).append({"labels": dict(labels), "value": value})
+
+        gauges = {}
+        for name, func in self._gauges.items():
+            try:
+                gauges[name] = func()
+            except Exception as e:
+                gauges[name] = f"error: {e}"
+
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "counters": grouped,
+            "gauges": gauges,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
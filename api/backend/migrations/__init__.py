@@ -0,0 +1,17 @@
+#------------------------------------------------------------
+# Versioned schema migrations for databases that already hold
+# data (create_tables.sql drops and recreates the whole schema,
+# so it is only for new containers).
+#
+#   versions/NNNN_name.py    one migration: up(schema) / down(schema)
+#   runner.py                applies them in order, recorded in
+#                            SCHEMA_MIGRATIONS
+#   online.py                ALTERs that don't block reads/writes
+#   backfill.py              batched, throttled data changes
+#
+# Run with `flask db ...` (migrations_cli.py).
+#------------------------------------------------------------
+
+
+class MigrationError(Exception):
+    """A migration could not be applied safely (nothing was recorded)."""
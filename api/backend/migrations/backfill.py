@@ -0,0 +1,132 @@
+#------------------------------------------------------------
+# Batched data changes for migrations (filling a new column,
+# seeding a new table from an existing one).
+#
+# The statement runs once per key range of a driving table and
+# commits after each batch, so row locks are short and the binlog
+# gets many small transactions instead of one huge one. Between
+# batches the Throttle pauses while the primary is busy
+# (Threads_running) or a replica is behind (Seconds_Behind_Source).
+#------------------------------------------------------------
+import time
+
+import pymysql
+from pymysql import cursors
+
+from backend.migrations import MigrationError
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Throttle:
+    def __init__(self, max_threads_running=20, max_replica_lag=5, replicas=(),
+                 pause=0.05, max_wait=600, logger=None):
+        self.max_threads_running = max_threads_running
+        self.max_replica_lag = max_replica_lag
+        self.replicas = list(replicas)
+        self.pause = pause
+        self.max_wait = max_wait
+        self.logger = logger
+
+    @classmethod
+    def from_config(cls, config, logger=None):
+        """Replicas (MIGRATION_REPLICA_HOSTS, 'host:port,...') use the primary's credentials."""
+        replicas = []
+        for address in filter(None, (a.strip() for a in config.get("MIGRATION_REPLICA_HOSTS", "").split(','))):
+            host, _, port = address.partition(':')
+            replicas.append(pymysql.connect(
+                host=host,
+                port=int(port or 3306),
+                user=config["MYSQL_DATABASE_USER"],
+                password=config["MYSQL_DATABASE_PASSWORD"],
+                cursorclass=cursors.DictCursor,
+            ))
+        return cls(
+            max_threads_running=config.get("MIGRATION_MAX_THREADS_RUNNING", 20),
+            max_replica_lag=config.get("MIGRATION_MAX_REPLICA_LAG_SECONDS", 5),
+            replicas=replicas,
+            logger=logger,
+        )
+
+    def close(self):
+        for replica in self.replicas:
+            replica.close()
+
+    def threads_running(self, conn):
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SHOW GLOBAL STATUS LIKE 'Threads_running'")
+            return int(cursor.fetchone()['Value'])
+        finally:
+            cursor.close()
+
+    def replica_lag(self):
+        """Worst Seconds_Behind_Source; None when a replica isn't replicating."""
+        worst = 0
+        for replica in self.replicas:
+            with replica.cursor() as cursor:
+                cursor.execute("SHOW REPLICA STATUS")
+                row = cursor.fetchone()
+            lag = row and row.get('Seconds_Behind_Source')
+            if lag is None:
+                return None
+            worst = max(worst, lag)
+        return worst
+
+    def wait(self, conn):
+        """Sleep until the primary and replicas have caught up (MigrationError after max_wait)."""
+        waited = 0.0
+        delay = self.pause
+        while True:
+            running = self.threads_running(conn)
+            lag = self.replica_lag()
+            if running <= self.max_threads_running and lag is not None and lag <= self.max_replica_lag:
+                time.sleep(self.pause)
+                return waited
+            if waited >= self.max_wait:
+                raise MigrationError(
+                    f"backfill paused for {waited:.0f}s (Threads_running={running}, replica lag={lag}); giving up"
+                )
+            if self.logger:
+                self.logger.info(f"[MIGRATE] backfill throttled: Threads_running={running}, replica lag={lag}")
+            time.sleep(delay)
+            waited += delay
+            delay = min(delay * 2, 10)
+
+
+def backfill(conn, table, key, statement, batch_size=DEFAULT_BATCH_SIZE, throttle=None, logger=None):
+    """
+    Run statement for every range [lo, hi) of the integer column table.key,
+    batch_size keys at a time, committing after each. The statement uses
+    %(lo)s and %(hi)s to select its rows (and %% for a literal %).
+    Returns the total rows affected.
+    """
+    started = time.monotonic()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT MIN({key}) AS lo, MAX({key}) AS hi FROM {table}")
+        bounds = cursor.fetchone()
+        if bounds['lo'] is None:
+            return 0
+
+        rows = batches = 0
+        lo = bounds['lo']
+        while lo <= bounds['hi']:
+            hi = lo + batch_size
+            cursor.execute(statement, {"lo": lo, "hi": hi})
+            rows += cursor.rowcount
+            conn.commit()
+            batches += 1
+            lo = hi
+            if throttle and lo <= bounds['hi']:
+                throttle.wait(conn)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    if logger:
+        logger.info(f"[MIGRATE] backfill over {table}.{key}: {rows} rows in {batches} batches "
+                    f"({time.monotonic() - started:.2f}s)")
+    return rows
@@ -0,0 +1,113 @@
+#------------------------------------------------------------
+# `flask db ...` commands, e.g. from inside the api container:
+#   flask --app backend_app db status
+#   flask --app backend_app db upgrade
+#
+# Every command covers the shared database and each gym with its
+# own schema (GYM.schema_name), as each has its own tables and
+# SCHEMA_MIGRATIONS.
+#------------------------------------------------------------
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from backend.db_connection import db
+from backend.migrations import MigrationError
+from backend.migrations.backfill import Throttle
+from backend.migrations.online import OnlineSchema
+from backend.migrations.runner import downgrade, status, stamp, upgrade
+
+db_cli = AppGroup('db', help='Schema migrations (backend/migrations/versions).')
+
+
+def _gym_schemas():
+    """GYM.schema_name of every gym with its own database (none before GYM exists)."""
+    conn = db.connect(schema=current_app.config['MYSQL_DATABASE_DB'])
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SHOW TABLES LIKE 'GYM'")
+        if not cursor.fetchone():
+            return []
+        cursor.execute("SELECT DISTINCT schema_name FROM GYM WHERE schema_name IS NOT NULL ORDER BY schema_name")
+        return [row['schema_name'] for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+def _label(schema_name):
+    return schema_name if schema_name != current_app.config['MYSQL_DATABASE_DB'] else 'shared database'
+
+
+def _run(schema_name, func, *args, **kwargs):
+    """func(conn, schema, ...) on its own connection to schema_name; MigrationError becomes a CLI error."""
+    conn = db.connect(schema=schema_name)
+    throttle = Throttle.from_config(current_app.config, logger=current_app.logger)
+    try:
+        schema = OnlineSchema.from_config(conn, current_app.config, throttle=throttle, logger=current_app.logger)
+        return func(conn, schema, *args, **kwargs)
+    except MigrationError as e:
+        raise click.ClickException(f"{_label(schema_name)}: {e}")
+    finally:
+        throttle.close()
+        conn.close()
+
+
+@db_cli.command('status')
+def status_command():
+    """List migrations and whether they are applied, per database."""
+    for schema_name in [current_app.config['MYSQL_DATABASE_DB']] + _gym_schemas():
+        conn = db.connect(schema=schema_name)
+        try:
+            entries = status(conn)
+        finally:
+            conn.close()
+
+        click.echo(f"{_label(schema_name)}:")
+        for entry in entries:
+            applied_at = entry['applied_at'] or ''
+            click.echo(f"  {entry['version']:04d}  {entry['state']:<8} {entry['name']:<32} {applied_at}")
+
+
+def _report_upgrade(schema_name, applied):
+    if applied:
+        click.echo(f"{_label(schema_name)}: applied {len(applied)} migrations: {', '.join(map(repr, applied))}.")
+    else:
+        click.echo(f"{_label(schema_name)}: schema is up to date.")
+
+
+@db_cli.command('upgrade')
+@click.option('--target', type=int, help='Stop after this version (default: apply all).')
+def upgrade_command(target):
+    """Apply pending migrations to the shared database, then to every gym schema."""
+    # the shared database first: it holds GYM, which names the gym schemas
+    default = current_app.config['MYSQL_DATABASE_DB']
+    applied = _run(default, upgrade, target=target, logger=current_app.logger)
+    _report_upgrade(default, applied)
+    for schema_name in _gym_schemas():
+        _report_upgrade(schema_name, _run(schema_name, upgrade, target=target, logger=current_app.logger))
+
+
+@db_cli.command('downgrade')
+@click.option('--target', type=int, required=True, help='Revert every migration above this version.')
+def downgrade_command(target):
+    """Revert applied migrations, newest first: every gym schema, then the shared database."""
+    for schema_name in _gym_schemas() + [current_app.config['MYSQL_DATABASE_DB']]:
+        reverted = _run(schema_name, downgrade, target, logger=current_app.logger)
+        click.echo(f"{_label(schema_name)}: reverted {len(reverted)} migrations"
+                   f"{': ' + ', '.join(map(repr, reverted)) if reverted else ''}.")
+
+
+@db_cli.command('stamp')
+@click.argument('version', type=int)
+def stamp_command(version):
+    """Mark migrations up to VERSION as applied without running them, in every database."""
+    for schema_name in [current_app.config['MYSQL_DATABASE_DB']] + _gym_schemas():
+        conn = db.connect(schema=schema_name)
+        try:
+            recorded = stamp(conn, version)
+        except MigrationError as e:
+            raise click.ClickException(f"{_label(schema_name)}: {e}")
+        finally:
+            conn.close()
+
+        click.echo(f"{_label(schema_name)}: stamped {len(recorded)} migrations as applied.")
@@ -0,0 +1,197 @@
+#------------------------------------------------------------
+# The `schema` object handed to a migration's up()/down().
+#
+# ALTERs are tried as online DDL first (ALGORITHM=INSTANT or
+# INPLACE with LOCK=NONE, so reads and writes carry on while the
+# table is changed). If MySQL can't do the change online it only
+# falls back to a locking ALTER when the table isn't guarded:
+# FOOD_LOG and INVOICE (MIGRATION_GUARDED_TABLES) refuse during
+# business hours (MIGRATION_BUSINESS_HOURS) instead.
+#
+# Every DDL statement waits at most MIGRATION_LOCK_WAIT_SECONDS
+# for its metadata lock and is then retried: an ALTER queued
+# behind a long query would otherwise block every query on that
+# table that arrives after it.
+#
+# The helpers skip changes that are already there, so a migration
+# that failed half way (DDL commits as it goes) can simply be run
+# again.
+#------------------------------------------------------------
+import time
+from datetime import datetime
+
+from pymysql import MySQLError
+
+from backend.migrations import MigrationError
+from backend.migrations.backfill import DEFAULT_BATCH_SIZE, backfill
+
+# MySQL can't make this change with the requested ALGORITHM / LOCK
+ER_ALTER_OPERATION_NOT_SUPPORTED = 1845
+ER_ALTER_OPERATION_NOT_SUPPORTED_REASON = 1846
+# lock_wait_timeout exceeded (here: waiting for the metadata lock)
+ER_LOCK_WAIT_TIMEOUT = 1205
+
+DDL_ATTEMPTS = 5
+
+
+def parse_business_hours(value):
+    """'06:00-22:00' -> (time(6), time(22)); '' -> None (no business hours)."""
+    if not value:
+        return None
+    start, end = value.split('-')
+    return (datetime.strptime(start.strip(), '%H:%M').time(),
+            datetime.strptime(end.strip(), '%H:%M').time())
+
+
+class OnlineSchema:
+    def __init__(self, conn, business_hours=None, guarded_tables=(), lock_wait_seconds=5,
+                 throttle=None, logger=None, now=None):
+        self.conn = conn
+        self.business_hours = business_hours
+        self.guarded_tables = {table.upper() for table in guarded_tables}
+        self.lock_wait_seconds = lock_wait_seconds
+        self.throttle = throttle
+        self.logger = logger
+        self._now = now or datetime.now
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SET SESSION lock_wait_timeout = %s", (lock_wait_seconds,))
+        finally:
+            cursor.close()
+
+    @classmethod
+    def from_config(cls, conn, config, throttle=None, logger=None):
+        return cls(
+            conn,
+            business_hours=parse_business_hours(config.get("MIGRATION_BUSINESS_HOURS", "")),
+            guarded_tables=[t.strip() for t in config.get("MIGRATION_GUARDED_TABLES", "").split(',') if t.strip()],
+            lock_wait_seconds=config.get("MIGRATION_LOCK_WAIT_SECONDS", 5),
+            throttle=throttle,
+            logger=logger,
+        )
+
+    def _log(self, message):
+        if self.logger:
+            self.logger.info(f"[MIGRATE] {message}")
+
+    def in_business_hours(self):
+        if self.business_hours is None:
+            return False
+        start, end = self.business_hours
+        now = self._now().time()
+        return start <= now < end if start <= end else (now >= start or now < end)
+
+    def locking_allowed(self, table):
+        return table.upper() not in self.guarded_tables or not self.in_business_hours()
+
+    # --- statements ---
+
+    def execute(self, sql, params=None):
+        """Run one statement (CREATE TABLE, DML, ...) and commit."""
+        started = time.monotonic()
+        for attempt in range(1, DDL_ATTEMPTS + 1):
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute(sql, params)
+                self.conn.commit()
+                rows = cursor.rowcount
+                break
+            except MySQLError as e:
+                self.conn.rollback()
+                if e.args[0] != ER_LOCK_WAIT_TIMEOUT or attempt == DDL_ATTEMPTS:
+                    raise
+                self._log(f"metadata lock busy, retry {attempt}/{DDL_ATTEMPTS - 1}: {' '.join(sql.split())[:80]}")
+                time.sleep(2 ** attempt)
+            finally:
+                cursor.close()
+
+        self._log(f"{' '.join(sql.split())[:100]} ({time.monotonic() - started:.2f}s)")
+        return rows
+
+    def _scalar(self, sql, params):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+        return next(iter(row.values())) if row else None
+
+    def table_exists(self, table):
+        return bool(self._scalar(
+            "SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (table,)
+        ))
+
+    def column_exists(self, table, column):
+        return bool(self._scalar(
+            "SELECT COUNT(*) FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+            (table, column)
+        ))
+
+    def index_exists(self, table, index):
+        return bool(self._scalar(
+            "SELECT COUNT(*) FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s",
+            (table, index)
+        ))
+
+    # --- online ALTER TABLE ---
+
+    def alter(self, table, clause, algorithms=('INPLACE',)):
+        """
+        ALTER TABLE table clause, trying each online algorithm in turn.
+        Falls back to a plain (possibly locking) ALTER unless the table
+        is guarded and it is business hours, which raises MigrationError.
+        """
+        last_error = None
+        for algorithm in algorithms:
+            options = "ALGORITHM=INSTANT" if algorithm == 'INSTANT' else f"ALGORITHM={algorithm}, LOCK=NONE"
+            try:
+                return self.execute(f"ALTER TABLE {table} {clause}, {options}")
+            except MySQLError as e:
+                if e.args[0] not in (ER_ALTER_OPERATION_NOT_SUPPORTED, ER_ALTER_OPERATION_NOT_SUPPORTED_REASON):
+                    raise
+                last_error = e
+
+        if not self.locking_allowed(table):
+            raise MigrationError(
+                f"ALTER TABLE {table} {clause} can't run online ({last_error.args[1]}) and {table} "
+                f"must not be locked during business hours; run the migration outside them"
+            )
+        self._log(f"{table}: {clause} can't run online, running it with locks")
+        return self.execute(f"ALTER TABLE {table} {clause}")
+
+    def add_column(self, table, column, definition, after=None):
+        if self.column_exists(table, column):
+            return
+        clause = f"ADD COLUMN {column} {definition}" + (f" AFTER {after}" if after else "")
+        self.alter(table, clause, algorithms=('INSTANT', 'INPLACE'))
+
+    def drop_column(self, table, column):
+        if not self.column_exists(table, column):
+            return
+        self.alter(table, f"DROP COLUMN {column}", algorithms=('INSTANT', 'INPLACE'))
+
+    def add_index(self, table, index, columns, kind='INDEX'):
+        """kind: INDEX, UNIQUE INDEX or FULLTEXT INDEX; columns: '(a, b)'."""
+        if self.index_exists(table, index):
+            return
+        self.alter(table, f"ADD {kind} {index} {columns}")
+
+    def drop_index(self, table, index):
+        if not self.index_exists(table, index):
+            return
+        self.alter(table, f"DROP INDEX {index}", algorithms=('INSTANT', 'INPLACE'))
+
+    def drop_table(self, table):
+        self.execute(f"DROP TABLE IF EXISTS {table}")
+
+    # --- data ---
+
+    def backfill(self, table, key, statement, batch_size=DEFAULT_BATCH_SIZE):
+        """Batched, throttled data change; see backfill.backfill()."""
+        return backfill(self.conn, table, key, statement, batch_size=batch_size,
+                        throttle=self.throttle, logger=self.logger)
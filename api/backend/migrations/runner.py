@@ -0,0 +1,201 @@
+#------------------------------------------------------------
+# Finds the migrations in versions/ (NNNN_name.py, each with
+# up(schema) and down(schema)) and applies them in order.
+#
+# SCHEMA_MIGRATIONS records every applied version with a checksum
+# of its file, so editing an applied migration shows up in
+# `flask db status`. Databases created from create_tables.sql
+# are stamped with the versions that file already contains.
+# A MySQL named lock keeps two API containers from migrating at
+# the same time.
+#------------------------------------------------------------
+import hashlib
+import importlib.util
+import os
+import re
+import time
+
+from backend.migrations import MigrationError
+
+VERSIONS_DIR = os.path.join(os.path.dirname(__file__), 'versions')
+LOCK_NAME = 'schema_migrations'
+
+_FILENAME = re.compile(r'^(\d{4})_(\w+)\.py$')
+
+_LEDGER_DDL = """
+    CREATE TABLE IF NOT EXISTS SCHEMA_MIGRATIONS (
+       version INT PRIMARY KEY,
+       name VARCHAR(100) NOT NULL,
+       checksum CHAR(64),
+       applied_at DATETIME NOT NULL,
+       execution_ms INT
+    )
+"""
+
+
+class Migration:
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+        with open(path, 'rb') as f:
+            self.checksum = hashlib.sha256(f.read()).hexdigest()
+        self._module = None
+
+    @property
+    def module(self):
+        if self._module is None:
+            spec = importlib.util.spec_from_file_location(f"migration_{self.version:04d}_{self.name}", self.path)
+            self._module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(self._module)
+        return self._module
+
+    @property
+    def description(self):
+        return (self.module.__doc__ or '').strip().split('\n')[0]
+
+    def __repr__(self):
+        return f"{self.version:04d}_{self.name}"
+
+
+def discover(directory=VERSIONS_DIR):
+    """Every migration in directory, by version."""
+    migrations = {}
+    for filename in os.listdir(directory):
+        match = _FILENAME.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f"two migrations with version {version:04d}: {migrations[version]!r} and {filename}")
+        migrations[version] = Migration(version, match.group(2), os.path.join(directory, filename))
+    return [migrations[v] for v in sorted(migrations)]
+
+
+def _applied(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(_LEDGER_DDL)
+        cursor.execute("SELECT version, name, checksum, applied_at, execution_ms FROM SCHEMA_MIGRATIONS")
+        return {row['version']: row for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def status(conn, directory=VERSIONS_DIR):
+    """One entry per known or applied version: applied, pending, changed (file edited since) or missing (no file)."""
+    applied = _applied(conn)
+    entries = []
+    for migration in discover(directory):
+        row = applied.pop(migration.version, None)
+        if row is None:
+            state = 'pending'
+        elif row['checksum'] and row['checksum'] != migration.checksum:
+            state = 'changed'
+        else:
+            state = 'applied'
+        entries.append({
+            "version": migration.version,
+            "name": migration.name,
+            "state": state,
+            "applied_at": row['applied_at'] if row else None,
+        })
+    for version, row in applied.items():
+        entries.append({"version": version, "name": row['name'], "state": 'missing', "applied_at": row['applied_at']})
+    return sorted(entries, key=lambda e: e["version"])
+
+
+class _MigrationLock:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT GET_LOCK(%s, 0) AS acquired", (LOCK_NAME,))
+            if not cursor.fetchone()['acquired']:
+                raise MigrationError("another process is running migrations")
+        finally:
+            cursor.close()
+
+    def __exit__(self, *exc):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+        finally:
+            cursor.close()
+
+
+def upgrade(conn, schema, target=None, directory=VERSIONS_DIR, logger=None):
+    """Apply the pending migrations up to target (default: all). Returns those applied."""
+    done = []
+    with _MigrationLock(conn):
+        applied = _applied(conn)
+        for migration in discover(directory):
+            if migration.version in applied or (target is not None and migration.version > target):
+                continue
+
+            if logger:
+                logger.info(f"[MIGRATE] applying {migration!r}: {migration.description}")
+            started = time.monotonic()
+            migration.module.up(schema)
+            elapsed_ms = int((time.monotonic() - started) * 1000)
+
+            cursor = conn.cursor()
+            try:
+                cursor.execute(
+                    """
+                    INSERT INTO SCHEMA_MIGRATIONS (version, name, checksum, applied_at, execution_ms)
+                    VALUES (%s, %s, %s, NOW(), %s)
+                    """,
+                    (migration.version, migration.name, migration.checksum, elapsed_ms)
+                )
+                conn.commit()
+            finally:
+                cursor.close()
+            done.append(migration)
+    return done
+
+
+def downgrade(conn, schema, target, directory=VERSIONS_DIR, logger=None):
+    """Revert the applied migrations above target, newest first. Returns those reverted."""
+    done = []
+    with _MigrationLock(conn):
+        applied = _applied(conn)
+        for migration in reversed(discover(directory)):
+            if migration.version <= target or migration.version not in applied:
+                continue
+
+            if logger:
+                logger.info(f"[MIGRATE] reverting {migration!r}: {migration.description}")
+            migration.module.down(schema)
+
+            cursor = conn.cursor()
+            try:
+                cursor.execute("DELETE FROM SCHEMA_MIGRATIONS WHERE version = %s", (migration.version,))
+                conn.commit()
+            finally:
+                cursor.close()
+            done.append(migration)
+    return done
+
+
+def stamp(conn, version, directory=VERSIONS_DIR):
+    """Record every migration up to version as applied without running it. Returns those recorded."""
+    done = []
+    with _MigrationLock(conn):
+        applied = _applied(conn)
+        cursor = conn.cursor()
+        try:
+            for migration in discover(directory):
+                if migration.version > version or migration.version in applied:
+                    continue
+                cursor.execute(
+                    "INSERT INTO SCHEMA_MIGRATIONS (version, name, checksum, applied_at) VALUES (%s, %s, %s, NOW())",
+                    (migration.version, migration.name, migration.checksum)
+                )
+                done.append(migration)
+            conn.commit()
+        finally:
+            cursor.close()
+    return done
@@ -0,0 +1,14 @@
+"""Baseline: the schema of the original create_tables.sql.
+
+Databases created from that file already have these tables; this
+version only marks the point the later migrations start from.
+"""
+from backend.migrations import MigrationError
+
+
+def up(schema):
+    pass
+
+
+def down(schema):
+    raise MigrationError("the baseline can't be reverted; recreate the database from create_tables.sql instead")
@@ -0,0 +1,30 @@
+"""Month-end billing runs: INVOICE.billing_period and BILLING_RUN."""
+
+
+def up(schema):
+    schema.add_column('INVOICE', 'billing_period', 'CHAR(7)')
+    schema.add_index('INVOICE', 'uq_invoice_billing_period', '(member_id, billing_period, category)',
+                     kind='UNIQUE INDEX')
+    schema.execute("""
+        CREATE TABLE IF NOT EXISTS BILLING_RUN (
+           run_id INT AUTO_INCREMENT PRIMARY KEY,
+           billing_period CHAR(7) NOT NULL,
+           category VARCHAR(50) NOT NULL,
+           amount DECIMAL(10,2) NOT NULL,
+           status VARCHAR(20) DEFAULT 'running',
+           members_total INT DEFAULT 0,
+           members_scanned INT DEFAULT 0,
+           invoices_created INT DEFAULT 0,
+           last_member_id INT DEFAULT 0,
+           started_at DATETIME NOT NULL,
+           updated_at DATETIME NOT NULL,
+           finished_at DATETIME,
+           UNIQUE KEY uq_billing_run (billing_period, category)
+        )
+    """)
+
+
+def down(schema):
+    schema.drop_table('BILLING_RUN')
+    schema.drop_index('INVOICE', 'uq_invoice_billing_period')
+    schema.drop_column('INVOICE', 'billing_period')
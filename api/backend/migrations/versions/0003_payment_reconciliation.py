@@ -0,0 +1,13 @@
+"""Payment reconciliation: PAYMENT.amount and PAYMENT.reference."""
+
+
+def up(schema):
+    schema.add_column('PAYMENT', 'amount', 'DECIMAL(10,2)')
+    schema.add_column('PAYMENT', 'reference', 'VARCHAR(100)')
+    schema.add_index('PAYMENT', 'uq_payment_reference', '(reference)', kind='UNIQUE INDEX')
+
+
+def down(schema):
+    schema.drop_index('PAYMENT', 'uq_payment_reference')
+    schema.drop_column('PAYMENT', 'reference')
+    schema.drop_column('PAYMENT', 'amount')
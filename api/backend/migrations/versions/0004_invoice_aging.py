@@ -0,0 +1,20 @@
+"""Invoice aging: the (status, date_issued) index and INVOICE_AGING."""
+
+
+def up(schema):
+    schema.add_index('INVOICE', 'idx_invoice_status_issued', '(status, date_issued)')
+    schema.execute("""
+        CREATE TABLE IF NOT EXISTS INVOICE_AGING (
+           as_of DATE NOT NULL,
+           bucket VARCHAR(10) NOT NULL,
+           invoice_count INT NOT NULL DEFAULT 0,
+           total_amount DECIMAL(12,2) NOT NULL DEFAULT 0,
+           computed_at DATETIME NOT NULL,
+           PRIMARY KEY (as_of, bucket)
+        )
+    """)
+
+
+def down(schema):
+    schema.drop_table('INVOICE_AGING')
+    schema.drop_index('INVOICE', 'idx_invoice_status_issued')
@@ -0,0 +1,17 @@
+"""Full-text search: FULLTEXT indexes on MESSAGE, FOOD_LOG and WORKOUT_LOG.
+
+InnoDB can't add a table's first FULLTEXT index without blocking
+writes, so the FOOD_LOG index is refused during business hours.
+"""
+
+
+def up(schema):
+    schema.add_index('MESSAGE', 'ft_message_content', '(content)', kind='FULLTEXT INDEX')
+    schema.add_index('WORKOUT_LOG', 'ft_workout_log_notes', '(notes)', kind='FULLTEXT INDEX')
+    schema.add_index('FOOD_LOG', 'ft_food_log_food', '(food)', kind='FULLTEXT INDEX')
+
+
+def down(schema):
+    schema.drop_index('FOOD_LOG', 'ft_food_log_food')
+    schema.drop_index('WORKOUT_LOG', 'ft_workout_log_notes')
+    schema.drop_index('MESSAGE', 'ft_message_content')
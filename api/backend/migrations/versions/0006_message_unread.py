@@ -0,0 +1,26 @@
+"""Unread message counters: MESSAGE_UNREAD, filled from MESSAGE."""
+
+
+def up(schema):
+    schema.add_index('MESSAGE', 'idx_message_member_time', '(member_id, message_timestamp)')
+    schema.execute("""
+        CREATE TABLE IF NOT EXISTS MESSAGE_UNREAD (
+           member_id INT NOT NULL,
+           trainer_id INT NOT NULL DEFAULT 0,
+           unread_count INT NOT NULL DEFAULT 0,
+           PRIMARY KEY (member_id, trainer_id),
+           FOREIGN KEY (member_id) REFERENCES GYM_MEMBER(member_id) ON DELETE CASCADE
+        )
+    """)
+    schema.backfill('GYM_MEMBER', 'member_id', """
+        REPLACE INTO MESSAGE_UNREAD (member_id, trainer_id, unread_count)
+        SELECT member_id, COALESCE(trainer_id, 0), COUNT(*)
+        FROM MESSAGE
+        WHERE read_status = 'unread' AND member_id >= %(lo)s AND member_id < %(hi)s
+        GROUP BY member_id, COALESCE(trainer_id, 0)
+    """)
+
+
+def down(schema):
+    schema.drop_table('MESSAGE_UNREAD')
+    schema.drop_index('MESSAGE', 'idx_message_member_time')
@@ -0,0 +1,15 @@
+"""CACHE_VERSION counters for data cached in the API processes."""
+
+
+def up(schema):
+    schema.execute("""
+        CREATE TABLE IF NOT EXISTS CACHE_VERSION (
+           name VARCHAR(50) PRIMARY KEY,
+           version INT NOT NULL DEFAULT 0,
+           updated_at DATETIME NOT NULL
+        )
+    """)
+
+
+def down(schema):
+    schema.drop_table('CACHE_VERSION')
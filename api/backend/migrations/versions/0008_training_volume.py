@@ -0,0 +1,42 @@
+"""Weekly training volume: MEMBER_WEEKLY_VOLUME, VOLUME_DIRTY_WEEK and JOB_WATERMARK.
+
+The summary starts empty; fill it with `flask analytics backfill-volume`.
+"""
+
+
+def up(schema):
+    schema.execute("""
+        CREATE TABLE IF NOT EXISTS MEMBER_WEEKLY_VOLUME (
+           member_id INT NOT NULL,
+           week_start DATE NOT NULL,
+           category VARCHAR(50) NOT NULL,
+           exercise_count INT NOT NULL DEFAULT 0,
+           total_sets INT NOT NULL DEFAULT 0,
+           total_reps INT NOT NULL DEFAULT 0,
+           tonnage DECIMAL(14,2) NOT NULL DEFAULT 0,
+           best_est_1rm DECIMAL(8,2),
+           updated_at DATETIME NOT NULL,
+           PRIMARY KEY (member_id, week_start, category),
+           FOREIGN KEY (member_id) REFERENCES GYM_MEMBER(member_id) ON DELETE CASCADE
+        )
+    """)
+    schema.execute("""
+        CREATE TABLE IF NOT EXISTS VOLUME_DIRTY_WEEK (
+           member_id INT NOT NULL,
+           week_start DATE NOT NULL,
+           PRIMARY KEY (member_id, week_start)
+        )
+    """)
+    schema.execute("""
+        CREATE TABLE IF NOT EXISTS JOB_WATERMARK (
+           job_name VARCHAR(50) PRIMARY KEY,
+           last_id BIGINT NOT NULL DEFAULT 0,
+           updated_at DATETIME NOT NULL
+        )
+    """)
+
+
+def down(schema):
+    schema.drop_table('JOB_WATERMARK')
+    schema.drop_table('VOLUME_DIRTY_WEEK')
+    schema.drop_table('MEMBER_WEEKLY_VOLUME')
@@ -0,0 +1,72 @@
+"""Retention cohorts: GYM_MEMBER.joined_date, MEMBER_STATUS_HISTORY and COHORT_RETENTION.
+
+Existing members get joined_date = the day this runs; it is then
+moved back to their first workout log or invoice, and their
+current status becomes their first history row. Fill the matrix
+with `flask analytics refresh-retention --full`.
+"""
+
+
+def up(schema):
+    schema.add_column('GYM_MEMBER', 'joined_date', 'DATE NOT NULL DEFAULT (CURRENT_DATE)')
+    schema.add_index('GYM_MEMBER', 'idx_member_joined', '(joined_date)')
+    schema.add_index('WORKOUT_LOG', 'idx_workout_log_date_member', '(date, member_id)')
+    schema.add_index('CLASS_SESSION', 'idx_class_session_date', '(date)')
+
+    schema.backfill('GYM_MEMBER', 'member_id', """
+        UPDATE GYM_MEMBER gm
+        JOIN (
+           SELECT member_id, MIN(first_date) AS first_date
+           FROM (
+              SELECT member_id, MIN(date) AS first_date FROM WORKOUT_LOG
+              WHERE member_id >= %(lo)s AND member_id < %(hi)s GROUP BY member_id
+              UNION ALL
+              SELECT member_id, MIN(date_issued) FROM INVOICE
+              WHERE member_id >= %(lo)s AND member_id < %(hi)s GROUP BY member_id
+           ) firsts
+           GROUP BY member_id
+        ) f ON f.member_id = gm.member_id
+        SET gm.joined_date = f.first_date
+        WHERE f.first_date < gm.joined_date
+    """)
+
+    schema.execute("""
+        CREATE TABLE IF NOT EXISTS MEMBER_STATUS_HISTORY (
+           history_id INT AUTO_INCREMENT PRIMARY KEY,
+           member_id INT NOT NULL,
+           old_status VARCHAR(20),
+           new_status VARCHAR(20) NOT NULL,
+           changed_at DATETIME NOT NULL,
+           INDEX idx_status_history_member (member_id, changed_at),
+           FOREIGN KEY (member_id) REFERENCES GYM_MEMBER(member_id) ON DELETE CASCADE
+        )
+    """)
+    schema.backfill('GYM_MEMBER', 'member_id', """
+        INSERT INTO MEMBER_STATUS_HISTORY (member_id, old_status, new_status, changed_at)
+        SELECT gm.member_id, NULL, gm.status, gm.joined_date
+        FROM GYM_MEMBER gm
+        WHERE gm.member_id >= %(lo)s AND gm.member_id < %(hi)s
+          AND NOT EXISTS (SELECT 1 FROM MEMBER_STATUS_HISTORY h WHERE h.member_id = gm.member_id)
+    """)
+
+    schema.execute("""
+        CREATE TABLE IF NOT EXISTS COHORT_RETENTION (
+           cohort_month CHAR(7) NOT NULL,
+           months_since INT NOT NULL,
+           cohort_size INT NOT NULL,
+           active_members INT NOT NULL DEFAULT 0,
+           retention_rate DECIMAL(5,4) NOT NULL DEFAULT 0,
+           computed_at DATETIME NOT NULL,
+           PRIMARY KEY (cohort_month, months_since)
+        )
+    """)
+
+
+def down(schema):
+    schema.execute("DELETE FROM JOB_WATERMARK WHERE job_name = 'cohort_retention'")
+    schema.drop_table('COHORT_RETENTION')
+    schema.drop_table('MEMBER_STATUS_HISTORY')
+    schema.drop_index('CLASS_SESSION', 'idx_class_session_date')
+    schema.drop_index('WORKOUT_LOG', 'idx_workout_log_date_member')
+    schema.drop_index('GYM_MEMBER', 'idx_member_joined')
+    schema.drop_column('GYM_MEMBER', 'joined_date')
@@ -0,0 +1,30 @@
+"""Class utilization: CLASS_SESSION.capacity and CLASS_UTILIZATION_DAILY.
+
+The class-utilization job rolls up past days on its next run.
+"""
+
+
+def up(schema):
+    schema.add_column('CLASS_SESSION', 'capacity', 'INT NOT NULL DEFAULT 20')
+    schema.execute("""
+        CREATE TABLE IF NOT EXISTS CLASS_UTILIZATION_DAILY (
+           day DATE NOT NULL,
+           trainer_id INT NOT NULL,
+           class_name VARCHAR(100) NOT NULL,
+           hour TINYINT NOT NULL,
+           weekday TINYINT NOT NULL,
+           sessions INT NOT NULL DEFAULT 0,
+           capacity INT NOT NULL DEFAULT 0,
+           booked INT NOT NULL DEFAULT 0,
+           attended INT NOT NULL DEFAULT 0,
+           no_shows INT NOT NULL DEFAULT 0,
+           computed_at DATETIME NOT NULL,
+           PRIMARY KEY (day, trainer_id, class_name, hour)
+        )
+    """)
+
+
+def down(schema):
+    schema.execute("DELETE FROM JOB_WATERMARK WHERE job_name = 'class_utilization'")
+    schema.drop_table('CLASS_UTILIZATION_DAILY')
+    schema.drop_column('CLASS_SESSION', 'capacity')
@@ -0,0 +1,34 @@
+"""List indexes: composite indexes behind the list routes' filters and sort orders.
+
+Each list reads one owner's rows (a member's logs, a trainer's clients,
+...) newest first, so its index leads with the owner column and ends
+with the default sort column (see the LIST_* schemas).
+"""
+
+# (table, index, columns, foreign key column the index also serves)
+INDEXES = [
+    ('GYM_MEMBER', 'idx_member_trainer_status', '(trainer_id, status, last_name)', 'trainer_id'),
+    ('GYM_MEMBER', 'idx_member_status_name', '(status, last_name)', None),
+    ('WORKOUT_LOG', 'idx_workout_log_member_date', '(member_id, date)', 'member_id'),
+    ('WORKOUT_LOG', 'idx_workout_log_trainer_date', '(trainer_id, date)', 'trainer_id'),
+    ('PROGRESS', 'idx_progress_member_date', '(member_id, date)', 'member_id'),
+    ('WORKOUT_PLAN', 'idx_workout_plan_member_date', '(member_id, date)', 'member_id'),
+    ('MEAL_PLAN', 'idx_meal_plan_member_date', '(member_id, date)', 'member_id'),
+    ('FOOD_LOG', 'idx_food_log_member_time', '(member_id, timestamp)', 'member_id'),
+    ('CLASS_SESSION', 'idx_class_session_trainer_date', '(trainer_id, date)', 'trainer_id'),
+    ('INVOICE', 'idx_invoice_trainer_status', '(trainer_id, status, date_issued)', 'trainer_id'),
+]
+
+
+def up(schema):
+    for table, index, columns, _ in INDEXES:
+        schema.add_index(table, index, columns)
+
+
+def down(schema):
+    for table, index, _, fk_column in reversed(INDEXES):
+        if fk_column:
+            # MySQL drops the foreign key's own index once a composite one
+            # covers it, and won't drop the last index a foreign key can use
+            schema.add_index(table, f'idx_{table.lower()}_{fk_column}', f'({fk_column})')
+        schema.drop_index(table, index)
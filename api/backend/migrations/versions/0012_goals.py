@@ -0,0 +1,28 @@
+"""Goals: the GOAL table behind the goal routes, with the columns
+backend.members.goals keeps current from PROGRESS, WORKOUT_LOG and
+FOOD_LOG (start_date, start_value, last_event_at).
+"""
+
+
+def up(schema):
+    schema.execute("""
+        CREATE TABLE IF NOT EXISTS GOAL (
+           goal_id INT AUTO_INCREMENT PRIMARY KEY,
+           member_id INT NOT NULL,
+           goal_type VARCHAR(50) NOT NULL,
+           target_value DECIMAL(10,2) NOT NULL,
+           start_value DECIMAL(10,2),
+           current_value DECIMAL(10,2),
+           start_date DATE NOT NULL DEFAULT (CURRENT_DATE),
+           deadline DATE,
+           last_event_at DATETIME,
+           created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+           updated_at DATETIME,
+           INDEX idx_goal_member_type (member_id, goal_type),
+           FOREIGN KEY (member_id) REFERENCES GYM_MEMBER(member_id) ON DELETE CASCADE
+        )
+    """)
+
+
+def down(schema):
+    schema.drop_table('GOAL')
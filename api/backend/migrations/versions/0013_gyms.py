@@ -0,0 +1,103 @@
+"""Gyms: the GYM registry, a gym_id on every row-owning table and
+GYM_DAILY_STATS, the per-gym daily rollup behind the owner dashboards.
+
+Existing rows all belong to gym 1, the location this database served
+so far. Rows that hang off a member, trainer or class (logs, plans,
+attendance, payments, ...) belong to that row's gym and don't carry
+their own gym_id. Billing runs are per gym: BILLING_RUN is keyed on
+(gym_id, billing_period, category), and the aging, retention and
+utilization snapshots gain gym_id in front of their primary keys.
+Fill the rollup with `flask analytics rollup-gyms --full`.
+"""
+
+# tables that own their rows, with the column to put gym_id after
+GYM_TABLES = [
+    ('TRAINER', 'trainer_id'),
+    ('NUTRITIONIST', 'nutritionist_id'),
+    ('GYM_MEMBER', 'member_id'),
+    ('CLASS_SESSION', 'session_id'),
+    ('INVOICE', 'invoice_id'),
+]
+
+# each gym's lists and reports read only its own rows
+INDEXES = [
+    ('TRAINER', 'idx_trainer_gym_name', '(gym_id, last_name)'),
+    ('NUTRITIONIST', 'idx_nutritionist_gym_name', '(gym_id, last_name)'),
+    ('GYM_MEMBER', 'idx_member_gym_status', '(gym_id, status, last_name)'),
+    ('CLASS_SESSION', 'idx_class_session_gym_date', '(gym_id, date)'),
+    ('INVOICE', 'idx_invoice_gym_date', '(gym_id, date)'),
+]
+
+# per-gym snapshots, with their primary key before and after
+SNAPSHOT_KEYS = [
+    ('INVOICE_AGING', '(as_of, bucket)'),
+    ('COHORT_RETENTION', '(cohort_month, months_since)'),
+    ('CLASS_UTILIZATION_DAILY', '(day, trainer_id, class_name, hour)'),
+]
+
+
+def up(schema):
+    schema.execute("""
+        CREATE TABLE IF NOT EXISTS GYM (
+           gym_id INT AUTO_INCREMENT PRIMARY KEY,
+           name VARCHAR(100) NOT NULL,
+           schema_name VARCHAR(64),
+           created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    schema.execute("INSERT IGNORE INTO GYM (gym_id, name) VALUES (1, 'Main')")
+
+    # no foreign key to GYM: a gym with its own schema keeps its rows
+    # there, while GYM stays in this one
+    for table, after in GYM_TABLES:
+        schema.add_column(table, 'gym_id', 'INT NOT NULL DEFAULT 1', after=after)
+    for table, index, columns in INDEXES:
+        schema.add_index(table, index, columns)
+
+    schema.add_column('BILLING_RUN', 'gym_id', 'INT NOT NULL DEFAULT 1', after='run_id')
+    schema.add_index('BILLING_RUN', 'uq_billing_run_gym', '(gym_id, billing_period, category)', kind='UNIQUE INDEX')
+    schema.drop_index('BILLING_RUN', 'uq_billing_run')
+
+    # rebuilding a primary key copies the table; these are small derived tables
+    for table, key in SNAPSHOT_KEYS:
+        if not schema.column_exists(table, 'gym_id'):
+            schema.alter(
+                table,
+                f"ADD COLUMN gym_id INT NOT NULL DEFAULT 1 FIRST, DROP PRIMARY KEY, "
+                f"ADD PRIMARY KEY (gym_id, {key[1:-1]})",
+                algorithms=('INPLACE', 'COPY')
+            )
+
+    schema.execute("""
+        CREATE TABLE IF NOT EXISTS GYM_DAILY_STATS (
+           gym_id INT NOT NULL,
+           day DATE NOT NULL,
+           active_members INT,
+           new_members INT NOT NULL DEFAULT 0,
+           classes INT NOT NULL DEFAULT 0,
+           class_attendance INT NOT NULL DEFAULT 0,
+           billed_amount DECIMAL(12,2) NOT NULL DEFAULT 0,
+           paid_amount DECIMAL(12,2) NOT NULL DEFAULT 0,
+           updated_at DATETIME NOT NULL,
+           PRIMARY KEY (gym_id, day),
+           INDEX idx_gym_daily_stats_day (day)
+        )
+    """)
+
+
+def down(schema):
+    schema.drop_table('GYM_DAILY_STATS')
+    for table, key in reversed(SNAPSHOT_KEYS):
+        if schema.column_exists(table, 'gym_id'):
+            # other gyms' rows would collide on the old key; they are recomputed
+            schema.execute(f"DELETE FROM {table} WHERE gym_id <> 1")
+            schema.alter(table, f"DROP PRIMARY KEY, ADD PRIMARY KEY {key}, DROP COLUMN gym_id",
+                         algorithms=('INPLACE', 'COPY'))
+    schema.add_index('BILLING_RUN', 'uq_billing_run', '(billing_period, category)', kind='UNIQUE INDEX')
+    schema.drop_index('BILLING_RUN', 'uq_billing_run_gym')
+    schema.drop_column('BILLING_RUN', 'gym_id')
+    for table, index, _ in reversed(INDEXES):
+        schema.drop_index(table, index)
+    for table, _ in reversed(GYM_TABLES):
+        schema.drop_column(table, 'gym_id')
+    schema.drop_table('GYM')
@@ -1,89 +1,89 @@
 from flask import Blueprint, jsonify, request
-from backend.db_connection import db
-from mysql.connector import Error
+from backend.db_connection import DBError, db_error_response, unit_of_work
+from backend.cache import cached_row, entity_cache
+from backend.idempotency import idempotent
+from backend.members.goals import record_event, recompute_member_goals
+from backend.nutritionists import schemas
+from backend.tenancy import current_gym_id
+from backend.validation import validation_error
 from flask import current_app
 
 # Create Blueprint for Nutritionist routes
 nutritionists = Blueprint('nutritionists', __name__)
 
+# meal plans and food logs belong to the gym of their member
+IN_GYM = "member_id IN (SELECT member_id FROM GYM_MEMBER WHERE gym_id = %s)"
+
 # GET all nutritionists 
+# Query params: fields, sort, last_name__prefix, ... (see schemas.LIST_NUTRITIONISTS)
 @nutritionists.route('/', methods=['GET'])
 def get_all_nutritionists():
     try:
         current_app.logger.info('Starting get_all_nutritionists request')
-        cursor = db.get_db().cursor()
-        
-        # Prepare the Base query
-        query = "SELECT * FROM NUTRITIONIST"
-        
-        current_app.logger.debug(f'Executing query: {query}')
-        cursor.execute(query)
-        nutritionists_list = cursor.fetchall()
-        cursor.close()
+        listing, errors = schemas.LIST_NUTRITIONISTS.parse(request.args)
+        if errors:
+            return validation_error(errors, "Invalid query parameters")
+
+        with unit_of_work() as cursor:
+            query, params = listing.sql("gym_id = %s", [current_gym_id()])
+
+            current_app.logger.debug(f'Executing query: {query} with params: {params}')
+            cursor.execute(query, params)
+            nutritionists_list = cursor.fetchall()
         
         current_app.logger.info(f'Successfully retrieved {len(nutritionists_list)} NUTRITIONISTS')
         return jsonify(nutritionists_list), 200
-    except Error as e:
-        current_app.logger.error(f'Database error in get_all_nutritionists: {str(e)}')
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # GET specific nutritionist profile
 @nutritionists.route('/<int:nutritionist_id>', methods=['GET'])
 def get_nutritionist(nutritionist_id):
     try:
-        cursor = db.get_db().cursor()
-        
         # Get nutritionist details
-        query = "SELECT * FROM NUTRITIONIST WHERE nutritionist_id = %s"
-        cursor.execute(query, (nutritionist_id,))
-        nutritionist = cursor.fetchone()
+        query = "SELECT nutritionist_id, first_name, last_name FROM NUTRITIONIST WHERE nutritionist_id = %s"
+        nutritionist = cached_row('nutritionist', nutritionist_id, query, (nutritionist_id,))
         
         if not nutritionist:
             return jsonify({"error": "Nutritionist not found"}), 404
         
-        cursor.close()
         return jsonify(nutritionist), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # POST - Create new nutritionist profile
 # Required fields: first_name, last_name
 @nutritionists.route('/', methods=['POST'])
+@idempotent
 def create_nutritionist():
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ["first_name", "last_name"]
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        cursor = db.get_db().cursor()
-        
-        # Insert new nutritionist
-        query = """
-        INSERT INTO NUTRITIONIST (first_name, last_name)
-        VALUES (%s, %s)
-        """
-        cursor.execute(
-            query,
-            (
-                data["first_name"],
-                data["last_name"],
-            ),
-        )
-        
-        db.get_db().commit()
-        new_nutritionist_id = cursor.lastrowid
-        cursor.close()
+        data, errors = schemas.CREATE_NUTRITIONIST.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+        
+        with unit_of_work() as cursor:
+            # Insert new nutritionist
+            query = """
+            INSERT INTO NUTRITIONIST (gym_id, first_name, last_name)
+            VALUES (%s, %s, %s)
+            """
+            cursor.execute(
+                query,
+                (
+                    current_gym_id(),
+                    data["first_name"],
+                    data["last_name"],
+                ),
+            )
+
+            new_nutritionist_id = cursor.lastrowid
         
         return (
             jsonify({"message": "Nutritionist created successfully", "nutritionist_id": new_nutritionist_id}),
             201,
         )
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 
 
@@ -108,65 +108,49 @@ def create_nutritionist():
 @nutritionists.route('/<int:nutritionist_id>', methods=['PUT'])
 def update_nutritionist(nutritionist_id):
     try:
-        data = request.get_json()
-        
-        # Check if nutritionist exists
-        cursor = db.get_db().cursor()
-        cursor.execute("SELECT * FROM NUTRITIONIST WHERE nutritionist_id = %s", (nutritionist_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Nutritionist not found"}), 404
-        
-        # Build update query 
-        update_fields = []
-        params = []
-        allowed_fields = ["first_name", "last_name"]
-        
-        for field in allowed_fields:
-            if field in data:
-                update_fields.append(f"{field} = %s")
-                params.append(data[field])
-        
+        data, errors = schemas.UPDATE_NUTRITIONIST.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+
+        update_fields, params = schemas.UPDATE_NUTRITIONIST.update_clause(data)
         if not update_fields:
             return jsonify({"error": "No valid fields to update"}), 400
         
-        params.append(nutritionist_id)
-        query = f"UPDATE NUTRITIONIST SET {', '.join(update_fields)} WHERE nutritionist_id = %s"
-        
-        cursor.execute(query, params)
-        db.get_db().commit()
-        cursor.close()
+        # Check if nutritionist exists
+        with unit_of_work() as cursor:
+            cursor.execute("SELECT nutritionist_id FROM NUTRITIONIST WHERE nutritionist_id = %s", (nutritionist_id,))
+            if not cursor.fetchone():
+                return jsonify({"error": "Nutritionist not found"}), 404
+
+            params.append(nutritionist_id)
+            query = f"UPDATE NUTRITIONIST SET {update_fields} WHERE nutritionist_id = %s"
+
+            cursor.execute(query, params)
+        entity_cache.invalidate('nutritionist', nutritionist_id)
         
         return jsonify({"message": "Nutritionist updated successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 
 # MEAL PLANS commands
 # GET meal plans by nutritionist or member
+# Query params: fields, sort, member_id, date__gte, ... (see schemas.LIST_MEAL_PLANS)
 @nutritionists.route('/meal-plans', methods=['GET'])
 def get_meal_plans():
     try:
-        cursor = db.get_db().cursor()
-        
-        # Filter (members)
-        member_id = request.args.get('member_id')
-        
-        query = "SELECT * FROM MEAL_PLAN WHERE 1=1"
-        params = []
-        
-        if member_id:
-            query += " AND member_id = %s"
-            params.append(member_id)
-        
-        query += " ORDER BY date DESC"
-        
-        cursor.execute(query, params)
-        plans = cursor.fetchall()
-        cursor.close()
+        listing, errors = schemas.LIST_MEAL_PLANS.parse(request.args)
+        if errors:
+            return validation_error(errors, "Invalid query parameters")
+
+        with unit_of_work() as cursor:
+            query, params = listing.sql(IN_GYM, [current_gym_id()])
+            cursor.execute(query, params)
+            plans = cursor.fetchall()
         
         return jsonify(plans), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 
 
@@ -175,230 +159,194 @@ def get_meal_plans():
 @nutritionists.route('/meal-plans/<int:plan_id>', methods=['GET'])
 def get_meal_plan(plan_id):
     try:
-        cursor = db.get_db().cursor()
-        query = "SELECT * FROM MEAL_PLAN WHERE plan_id = %s"
-        cursor.execute(query, (plan_id,))
-        plan = cursor.fetchone()
-        cursor.close()
+        query = "SELECT plan_id, member_id, calorie_goals, macro_goals, date FROM MEAL_PLAN WHERE plan_id = %s"
+        plan = cached_row('meal_plan', plan_id, query, (plan_id,))
         
         if not plan:
             return jsonify({"error": "Meal plan not found"}), 404
         
         return jsonify(plan), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 
 
 # POST - Create new meal plan
 # Required fields: member_id, calorie_goals, plan_date
 @nutritionists.route('/meal-plans', methods=['POST'])
+@idempotent
 def create_meal_plan():
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ["member_id", "calorie_goals", "plan_date"]
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        cursor = db.get_db().cursor()
-        
-        # Insert new meal plan
-        query = """
-        INSERT INTO MEAL_PLAN (member_id, calorie_goals, macro_goals, date)
-        VALUES (%s, %s, %s, %s)
-        """
-        cursor.execute(
-            query,
-            (
-                data["member_id"],
-                data["calorie_goals"],
-                data.get("macro_goals"),
-                data["plan_date"],
-            ),
-        )
-        
-        db.get_db().commit()
-        new_plan_id = cursor.lastrowid
-        cursor.close()
+        data, errors = schemas.CREATE_MEAL_PLAN.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+        
+        with unit_of_work() as cursor:
+            # Insert new meal plan
+            query = """
+            INSERT INTO MEAL_PLAN (member_id, calorie_goals, macro_goals, date)
+            VALUES (%s, %s, %s, %s)
+            """
+            cursor.execute(
+                query,
+                (
+                    data["member_id"],
+                    data["calorie_goals"],
+                    data.get("macro_goals"),
+                    data["plan_date"],
+                ),
+            )
+
+            new_plan_id = cursor.lastrowid
         
         return (
             jsonify({"message": "Meal plan created successfully", "plan_id": new_plan_id}),
             201,
         )
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # PUT - Update meal plan
 @nutritionists.route('/meal-plans/<int:plan_id>', methods=['PUT'])
 def update_meal_plan(plan_id):
     try:
-        data = request.get_json()
-        
-        # Check if meal plan exists
-        cursor = db.get_db().cursor()
-        cursor.execute("SELECT * FROM MEAL_PLAN WHERE plan_id = %s", (plan_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Meal plan not found"}), 404
-        
-        # Build update query 
-        update_fields = []
-        params = []
-        allowed_fields = ["calorie_goals", "macro_goals", "date"]
-        
-        for field in allowed_fields:
-            if field in data:
-                update_fields.append(f"{field} = %s")
-                params.append(data[field])
-        
+        data, errors = schemas.UPDATE_MEAL_PLAN.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+
+        update_fields, params = schemas.UPDATE_MEAL_PLAN.update_clause(data)
         if not update_fields:
             return jsonify({"error": "No valid fields to update"}), 400
         
-        params.append(plan_id)
-        query = f"UPDATE MEAL_PLAN SET {', '.join(update_fields)} WHERE plan_id = %s"
-        
-        cursor.execute(query, params)
-        db.get_db().commit()
-        cursor.close()
+        # Check if meal plan exists
+        with unit_of_work() as cursor:
+            cursor.execute("SELECT plan_id FROM MEAL_PLAN WHERE plan_id = %s", (plan_id,))
+            if not cursor.fetchone():
+                return jsonify({"error": "Meal plan not found"}), 404
+
+            params.append(plan_id)
+            query = f"UPDATE MEAL_PLAN SET {update_fields} WHERE plan_id = %s"
+
+            cursor.execute(query, params)
+        entity_cache.invalidate('meal_plan', plan_id)
         
         return jsonify({"message": "Meal plan updated successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # DELETE - Delete meal plan
 @nutritionists.route('/meal-plans/<int:plan_id>', methods=['DELETE'])
 def delete_meal_plan(plan_id):
     try:
-        cursor = db.get_db().cursor()
-        cursor.execute("DELETE FROM MEAL_PLAN WHERE plan_id = %s", (plan_id,))
-        db.get_db().commit()
-        cursor.close()
+        with unit_of_work() as cursor:
+            cursor.execute("DELETE FROM MEAL_PLAN WHERE plan_id = %s", (plan_id,))
+        entity_cache.invalidate('meal_plan', plan_id)
         
         return jsonify({"message": "Meal plan deleted"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 
 # FOOD LOGS commands
 # GET food log entries for a member
+# Query params: fields, sort, member_id, timestamp__gte, ... (see schemas.LIST_FOOD_LOGS)
 @nutritionists.route('/food-logs', methods=['GET'])
 def get_food_logs():
     try:
-        cursor = db.get_db().cursor()
-        
-        # Filter (members)
-        member_id = request.args.get('member_id')
-        
-        query = "SELECT * FROM FOOD_LOG WHERE 1=1"
-        params = []
-        
-        if member_id:
-            query += " AND member_id = %s"
-            params.append(member_id)
-        
-        query += " ORDER BY timestamp DESC"
-        
-        cursor.execute(query, params)
-        logs = cursor.fetchall()
-        cursor.close()
+        listing, errors = schemas.LIST_FOOD_LOGS.parse(request.args)
+        if errors:
+            return validation_error(errors, "Invalid query parameters")
+
+        with unit_of_work() as cursor:
+            query, params = listing.sql(IN_GYM, [current_gym_id()])
+            cursor.execute(query, params)
+            logs = cursor.fetchall()
         
         return jsonify(logs), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 
 # POST - Create new food log entry
 # Required fields: member_id, food, log_timestamp
 @nutritionists.route('/food-logs', methods=['POST'])
+@idempotent
 def create_food_log():
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ["member_id", "food", "log_timestamp"]
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        cursor = db.get_db().cursor()
-        
-        # Insert new food log
-        query = """
-        INSERT INTO FOOD_LOG (member_id, food, timestamp, portion_size, calories, proteins, carbs, fats)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(
-            query,
-            (
-                data["member_id"],
-                data["food"],
-                data["log_timestamp"],
-                data.get("portion_size"),
-                data.get("calories"),
-                data.get("proteins"),
-                data.get("carbs"),
-                data.get("fats"),
-            ),
-        )
-        
-        db.get_db().commit()
-        new_log_id = cursor.lastrowid
-        cursor.close()
+        data, errors = schemas.CREATE_FOOD_LOG.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+        
+        with unit_of_work() as cursor:
+            # Insert new food log
+            query = """
+            INSERT INTO FOOD_LOG (member_id, food, timestamp, portion_size, calories, proteins, carbs, fats)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """
+            cursor.execute(
+                query,
+                (
+                    data["member_id"],
+                    data["food"],
+                    data["log_timestamp"],
+                    data.get("portion_size"),
+                    data.get("calories"),
+                    data.get("proteins"),
+                    data.get("carbs"),
+                    data.get("fats"),
+                ),
+            )
+
+            new_log_id = cursor.lastrowid
+            record_event(cursor, 'FOOD_LOG', data["member_id"], data["log_timestamp"], data)
         
         return (
             jsonify({"message": "Food log created successfully", "log_id": new_log_id}),
             201,
         )
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # PUT - Update food log entry
 @nutritionists.route('/food-logs/<int:log_id>', methods=['PUT'])
 def update_food_log(log_id):
     try:
-        data = request.get_json()
-        
-        # Check if food log exists
-        cursor = db.get_db().cursor()
-        cursor.execute("SELECT * FROM FOOD_LOG WHERE log_id = %s", (log_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Food log not found"}), 404
-        
-        # Build update query 
-        update_fields = []
-        params = []
-        allowed_fields = ["food", "portion_size", "calories", "proteins", "carbs", "fats"]
-        
-        for field in allowed_fields:
-            if field in data:
-                update_fields.append(f"{field} = %s")
-                params.append(data[field])
-        
+        data, errors = schemas.UPDATE_FOOD_LOG.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+
+        update_fields, params = schemas.UPDATE_FOOD_LOG.update_clause(data)
         if not update_fields:
             return jsonify({"error": "No valid fields to update"}), 400
         
-        params.append(log_id)
-        query = f"UPDATE FOOD_LOG SET {', '.join(update_fields)} WHERE log_id = %s"
-        
-        cursor.execute(query, params)
-        db.get_db().commit()
-        cursor.close()
+        # Check if food log exists
+        with unit_of_work() as cursor:
+            cursor.execute("SELECT log_id, member_id FROM FOOD_LOG WHERE log_id = %s", (log_id,))
+            log = cursor.fetchone()
+            if not log:
+                return jsonify({"error": "Food log not found"}), 404
+
+            params.append(log_id)
+            query = f"UPDATE FOOD_LOG SET {update_fields} WHERE log_id = %s"
+
+            cursor.execute(query, params)
+            recompute_member_goals(cursor, 'FOOD_LOG', log["member_id"])
         
         return jsonify({"message": "Food log updated successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # DELETE - Delete food log entry
 @nutritionists.route('/food-logs/<int:log_id>', methods=['DELETE'])
 def delete_food_log(log_id):
     try:
-        cursor = db.get_db().cursor()
-        cursor.execute("DELETE FROM FOOD_LOG WHERE log_id = %s", (log_id,))
-        db.get_db().commit()
-        cursor.close()
+        with unit_of_work() as cursor:
+            cursor.execute("SELECT member_id FROM FOOD_LOG WHERE log_id = %s", (log_id,))
+            log = cursor.fetchone()
+            cursor.execute("DELETE FROM FOOD_LOG WHERE log_id = %s", (log_id,))
+            if log:
+                recompute_member_goals(cursor, 'FOOD_LOG', log["member_id"])
         
         return jsonify({"message": "Food log deleted"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+    except DBError as e:
+        return db_error_response(e)
\ No newline at end of file
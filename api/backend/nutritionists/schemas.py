@@ -0,0 +1,59 @@
+#------------------------------------------------------------
+# Request body schemas for the nutritionist routes (see
+# backend/validation). Field names are what clients send;
+# column= is where it goes when that differs. LIST_* are the
+# query strings the list routes accept (validation/listing.py).
+#------------------------------------------------------------
+from backend.validation import Date, DateTime, Decimal, Int, ListQuery, Schema, Str
+
+CREATE_NUTRITIONIST = Schema({
+    "first_name": Str(required=True, max_length=50),
+    "last_name": Str(required=True, max_length=50),
+})
+UPDATE_NUTRITIONIST = CREATE_NUTRITIONIST.partial()
+
+CREATE_MEAL_PLAN = Schema({
+    "member_id": Int(required=True, min=1),
+    "calorie_goals": Int(required=True, min=0),
+    "macro_goals": Str(max_length=200),
+    "plan_date": Date(required=True, column="date", aliases=("date",)),
+})
+UPDATE_MEAL_PLAN = CREATE_MEAL_PLAN.partial("calorie_goals", "macro_goals", "plan_date")
+
+CREATE_FOOD_LOG = Schema({
+    "member_id": Int(required=True, min=1),
+    "food": Str(required=True, max_length=100),
+    "log_timestamp": DateTime(required=True, column="timestamp"),
+    "portion_size": Str(max_length=50),
+    "calories": Int(min=0),
+    "proteins": Decimal(digits=6, places=2, min=0),
+    "carbs": Decimal(digits=6, places=2, min=0),
+    "fats": Decimal(digits=6, places=2, min=0),
+})
+UPDATE_FOOD_LOG = CREATE_FOOD_LOG.partial("food", "portion_size", "calories", "proteins", "carbs", "fats")
+
+LIST_NUTRITIONISTS = ListQuery(
+    "NUTRITIONIST",
+    columns=("nutritionist_id", "first_name", "last_name"),
+    filters={"nutritionist_id": Int(min=1), "first_name": Str(), "last_name": Str()},
+    sort=("nutritionist_id", "first_name", "last_name"),
+    default_sort="nutritionist_id",
+)
+
+LIST_MEAL_PLANS = ListQuery(
+    "MEAL_PLAN",
+    columns=("plan_id", "member_id", "calorie_goals", "macro_goals", "date"),
+    filters={"member_id": Int(min=1), "calorie_goals": Int(min=0), "date": Date()},
+    sort=("date", "plan_id", "calorie_goals"),
+    default_sort="-date",
+)
+
+LIST_FOOD_LOGS = ListQuery(
+    "FOOD_LOG",
+    columns=("log_id", "member_id", "food", "timestamp", "portion_size", "calories",
+             "proteins", "carbs", "fats"),
+    filters={"member_id": Int(min=1), "food": Str(), "timestamp": DateTime(),
+             "calories": Int(min=0)},
+    sort=("timestamp", "log_id", "calories"),
+    default_sort="-timestamp",
+)
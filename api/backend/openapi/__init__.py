@@ -0,0 +1,9 @@
+#------------------------------------------------------------
+# The API's OpenAPI document, built from the registered routes
+# and their request schemas (spec.py), and the Python client
+# generated from it for the Streamlit app (client_gen.py).
+#
+# Served at GET /ops/openapi.json; `flask openapi client`
+# rewrites app/src/modules/api_client.py.
+#------------------------------------------------------------
+from backend.openapi.spec import build_spec
@@ -0,0 +1,324 @@
+#------------------------------------------------------------
+# Renders the Python client for the Streamlit app from the
+# OpenAPI document (see spec.py): one class per tag (blueprint)
+# with one method per operation, path parameters positional,
+# query/body fields as keyword arguments, and a TypedDict for
+# every response whose keys are known.
+#
+# The output goes to app/src/modules/api_client.py
+# (`flask openapi client`); the app never imports anything from
+# the API package.
+#------------------------------------------------------------
+import json
+import keyword
+import re
+
+HEADER = '''\
+#------------------------------------------------------------
+# Typed client for the gym API.
+#
+# GENERATED by `flask openapi client` from the OpenAPI document
+# the API serves at /ops/openapi.json. Don't edit it by hand:
+# change the routes or their schemas and regenerate.
+#
+#   api = ApiClient(client_id="session-1")
+#   clients = api.trainers.get_trainer_clients(trainer_id)
+#   api.trainers.create_session(trainer_id, class_name="Spin",
+#                               session_date="2025-03-01 09:00:00")
+#
+# Each ApiClient keeps one requests.Session, so connections to
+# the API are reused. Answers other than 2xx raise ApiError with
+# the API's message (and per-field problems for a 400).
+#------------------------------------------------------------
+'''
+
+RUNTIME = '''\
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import IO, Any, TypedDict
+
+import requests
+
+DEFAULT_BASE_URL = os.getenv("API_BASE_URL", "http://api:4000")
+DEFAULT_TIMEOUT_SECONDS = 10
+
+# marks keyword arguments that were not passed (None is sent as null)
+_UNSET: Any = object()
+
+
+class ApiError(Exception):
+    """The API answered with an error status, or could not be reached (status None)."""
+
+    def __init__(self, status, message, error_type=None, fields=None, retry_after=None, response=None):
+        super().__init__(f"{status}: {message}" if status else message)
+        self.status = status
+        self.message = message
+        self.error_type = error_type
+        self.fields = fields or {}
+        self.retry_after = retry_after
+        self.response = response
+
+
+def _jsonable(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    return value
+
+
+def _fields(**values):
+    return {name: _jsonable(value) for name, value in values.items() if value is not _UNSET}
+
+
+class _Transport:
+    def __init__(self, base_url, timeout, session, headers):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = session if session is not None else requests.Session()
+        self.headers = {name: value for name, value in headers.items() if value}
+
+    def request(self, method, path, params=None, json=None, files=None, headers=None, stream=False):
+        request_headers = dict(self.headers)
+        request_headers.update({name: value for name, value in (headers or {}).items() if value})
+        try:
+            response = self.session.request(
+                method,
+                self.base_url + path,
+                params={name: _jsonable(value) for name, value in (params or {}).items() if value is not None},
+                json=json,
+                files=files,
+                headers=request_headers,
+                timeout=self.timeout,
+                stream=stream,
+            )
+        except requests.RequestException as e:
+            raise ApiError(None, f"Could not reach the API: {e}") from e
+
+        if response.status_code >= 400:
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+            body = body if isinstance(body, dict) else {}
+            retry_after = response.headers.get("Retry-After", "")
+            raise ApiError(
+                response.status_code,
+                body.get("error") or response.reason,
+                error_type=body.get("error_type"),
+                fields=body.get("fields"),
+                retry_after=int(retry_after) if retry_after.isdigit() else None,
+                response=response,
+            )
+        if stream:
+            return response
+        return response.json() if response.content else None
+'''
+
+
+def render_client(spec):
+    """Python source of the client module for spec."""
+    operations = {}
+    for path, methods in spec["paths"].items():
+        for method, operation in methods.items():
+            tag = operation.get("tags", ["app"])[0]
+            operations.setdefault(tag, []).append((path, method.upper(), operation))
+
+    typed_dicts = []
+    taken = set()
+    classes = []
+    for tag in sorted(operations):
+        methods = []
+        for path, method, operation in sorted(operations[tag], key=lambda o: o[2]["operationId"]):
+            methods.append(_render_method(tag, path, method, operation, typed_dicts, taken))
+        classes.append(_render_class(tag, methods))
+
+    parts = [HEADER, RUNTIME]
+    parts.extend(typed_dicts)
+    parts.extend(classes)
+    parts.append(_render_api_client(sorted(operations)))
+    return "\n\n\n".join(part.rstrip("\n") for part in parts) + "\n"
+
+
+def _str(value):
+    """A double-quoted Python string literal."""
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _camel(name):
+    return "".join(word.capitalize() for word in re.split(r"[^0-9a-zA-Z]+", name) if word)
+
+
+def _identifier(name):
+    name = re.sub(r"\W", "_", name).lower()
+    return name + "_" if keyword.iskeyword(name) else name
+
+
+def _python_type(schema, for_input=False):
+    if not schema:
+        return "Any"
+    kind, fmt = schema.get("type"), schema.get("format")
+    if kind == "integer":
+        hint = "int"
+    elif kind == "number":
+        hint = "float | Decimal" if for_input else "float"
+    elif kind == "boolean":
+        hint = "bool"
+    elif kind == "string" and fmt == "binary":
+        hint = "IO[bytes] | bytes"
+    elif kind == "string" and fmt == "date" and for_input:
+        hint = "str | date"
+    elif kind == "string" and fmt == "date-time" and for_input:
+        hint = "str | datetime"
+    elif kind == "string":
+        hint = "str"
+    elif kind == "array":
+        hint = f"list[{_python_type(schema.get('items'), for_input)}]"
+    elif kind == "object":
+        hint = "dict[str, Any]"
+    else:
+        hint = "Any"
+    if schema.get("nullable") and hint != "Any":
+        hint += " | None"
+    return hint
+
+
+def _result_type(tag, operation, typed_dicts, taken):
+    """(return annotation, is_stream) for the operation's success response."""
+    for status, response in sorted(operation["responses"].items()):
+        if not status.startswith("2"):
+            continue
+        content = response.get("content", {})
+        if "text/event-stream" in content:
+            return "requests.Response", True
+        schema = content.get("application/json", {}).get("schema", {})
+        properties = schema.get("properties")
+        if schema.get("type") == "object" and properties:
+            name = _camel(operation["operationId"].rpartition(".")[2]) + "Result"
+            if name in taken:
+                name = _camel(tag) + name
+            taken.add(name)
+            typed_dicts.append(_render_typed_dict(name, properties))
+            return name, False
+        return _python_type(schema), False
+    return "Any", False
+
+
+def _render_typed_dict(name, properties):
+    fields = {key: _python_type(value) for key, value in properties.items()}
+    if all(key.isidentifier() and not keyword.iskeyword(key) for key in fields):
+        lines = [f"class {name}(TypedDict, total=False):"]
+        lines += [f"    {key}: {hint}" for key, hint in fields.items()]
+        return "\n".join(lines)
+    items = ", ".join(f"{_str(key)}: {hint}" for key, hint in fields.items())
+    return f"{name} = TypedDict({_str(name)}, {{{items}}}, total=False)"
+
+
+def _render_method(tag, path, method, operation, typed_dicts, taken):
+    name = _identifier(operation["operationId"].rpartition(".")[2])
+    returns, stream = _result_type(tag, operation, typed_dicts, taken)
+
+    positional = []     # path parameters
+    keywords = []       # (signature entry, kind, wire name, python name)
+    used = set()
+    for param in operation.get("parameters", []):
+        pyname = _identifier(param["name"])
+        hint = _python_type(param.get("schema"), for_input=True)
+        if param["in"] == "path":
+            positional.append(f"{pyname}: {hint}")
+        else:
+            keywords.append((f"{pyname}: {hint} | None = None", param["in"], param["name"], pyname))
+        used.add(pyname)
+
+    body = operation.get("requestBody")
+    body_kind = None
+    if body:
+        content_type, content = next(iter(body["content"].items()))
+        schema = content["schema"]
+        body_kind = "files" if content_type == "multipart/form-data" else "json"
+        required = set(schema.get("required", []))
+        properties = schema.get("properties")
+        if properties is None:
+            keywords.append(("body: dict[str, Any]", "body", None, "body"))
+        for field, field_schema in (properties or {}).items():
+            pyname = _identifier(field)
+            if pyname in used:
+                pyname = f"body_{pyname}"
+            hint = _python_type(field_schema, for_input=True)
+            entry = f"{pyname}: {hint}" if field in required else f"{pyname}: {hint} = _UNSET"
+            keywords.append((entry, body_kind, field, pyname))
+
+    # required keyword arguments first
+    keywords.sort(key=lambda k: "=" in k[0])
+    signature = ["self"] + positional
+    if keywords:
+        signature += ["*"] + [k[0] for k in keywords]
+
+    url = "f" + _str(path) if positional else _str(path)
+    args = [_str(method), url]
+    queries = [(wire, py) for _, kind, wire, py in keywords if kind == "query"]
+    headers = [(wire, py) for _, kind, wire, py in keywords if kind == "header"]
+    fields = [(wire, py) for _, kind, wire, py in keywords if kind in ("json", "files")]
+    if queries:
+        args.append("params={" + ", ".join(f"{_str(wire)}: {py}" for wire, py in queries) + "}")
+    if body_kind == "json":
+        if any(kind == "body" for _, kind, _, _ in keywords):
+            args.append("json=body")
+        else:
+            args.append("json=_fields(" + ", ".join(f"{wire}={py}" for wire, py in fields) + ")")
+    elif body_kind == "files":
+        args.append("files={" + ", ".join(f"{_str(wire)}: {py}" for wire, py in fields) + "}")
+    if headers:
+        args.append("headers={" + ", ".join(f"{_str(wire)}: {py}" for wire, py in headers) + "}")
+    if stream:
+        args.append("stream=True")
+
+    summary = operation.get("summary", name).replace("\\", "\\\\").replace('"""', "'''")
+    lines = [
+        f"    def {name}({', '.join(signature)}) -> {returns}:",
+        f'        """{method} {path} - {summary}"""',
+        f"        return self._transport.request({', '.join(args)})",
+    ]
+    return "\n".join(lines)
+
+
+def _render_class(tag, methods):
+    lines = [
+        f"class {_camel(tag)}Api:",
+        f'    """The /{tag} routes."""',
+        "",
+        "    def __init__(self, transport):",
+        "        self._transport = transport",
+    ]
+    for method in methods:
+        lines += ["", method]
+    return "\n".join(lines)
+
+
+def _render_api_client(tags):
+    lines = [
+        "class ApiClient:",
+        "    def __init__(",
+        "        self,",
+        "        base_url: str = DEFAULT_BASE_URL,",
+        "        client_id: str | None = None,",
+        "        ops_token: str | None = None,",
+        "        gym_id: int | None = None,",
+        "        timeout: float = DEFAULT_TIMEOUT_SECONDS,",
+        "        session: requests.Session | None = None,",
+        "    ):",
+        "        # client_id splits the API's rate limit for this address by caller (X-Client-Id)",
+        "        transport = _Transport(base_url, timeout, session, {",
+        '            "X-Client-Id": client_id,',
+        '            "X-Ops-Token": ops_token,',
+        "            # the gym (location) every request is for; the API's default gym if None",
+        '            "X-Gym-Id": None if gym_id is None else str(gym_id),',
+        "        })",
+    ]
+    lines += [f"        self.{_identifier(tag)} = {_camel(tag)}Api(transport)" for tag in tags]
+    return "\n".join(lines)
@@ -0,0 +1,43 @@
+#------------------------------------------------------------
+# `flask openapi ...` commands, run from the api folder of a
+# checkout after changing routes or schemas:
+#   flask --app backend_app openapi client
+#   flask --app backend_app openapi spec --output openapi.json
+#------------------------------------------------------------
+import json
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from backend.openapi.client_gen import render_client
+from backend.openapi.spec import build_spec
+
+DEFAULT_CLIENT_PATH = '../app/src/modules/api_client.py'
+
+openapi_cli = AppGroup('openapi', help='OpenAPI document and the generated Streamlit client.')
+
+
+@openapi_cli.command('spec')
+@click.option('--output', type=click.Path(dir_okay=False), default=None,
+              help='Write the document here instead of printing it.')
+def spec_command(output):
+    """Print (or write) the OpenAPI document for every route."""
+    document = json.dumps(build_spec(current_app), indent=2, ensure_ascii=False)
+    if not output:
+        click.echo(document)
+        return
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(document + '\n')
+    click.echo(f"Wrote {output}")
+
+
+@openapi_cli.command('client')
+@click.option('--output', type=click.Path(dir_okay=False), default=DEFAULT_CLIENT_PATH, show_default=True)
+def client_command(output):
+    """Regenerate the app's typed API client from the OpenAPI document."""
+    spec = build_spec(current_app)
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(render_client(spec))
+    operations = sum(len(methods) for methods in spec['paths'].values())
+    click.echo(f"Wrote {output} ({operations} operations)")
@@ -0,0 +1,375 @@
+#------------------------------------------------------------
+# Builds the OpenAPI document from the app itself, so it can't
+# drift from the code:
+#
+#   paths / methods   app.url_map (path parameters from the
+#                     <int:...> converters)
+#   summary           the comment above each route
+#   query parameters  request.args.get(...) calls in the view and
+#                     in the same-module helpers it calls, and the
+#                     schemas.LIST_X.parse(request.args) of list
+#                     routes (fields, sort and each filter), and
+#                     schemas.X.load(request.args...) query schemas
+#   request body      the schemas.X.load(...) call in the view
+#                     (backend/validation), multipart for
+#                     request.files
+#   responses         the view's return statements: status codes,
+#                     and the keys of jsonify({...}) bodies
+#   Idempotency-Key   views wrapped with @idempotent
+#------------------------------------------------------------
+import ast
+import inspect
+import re
+import textwrap
+
+from backend.validation import ListQuery, Schema
+
+OPENAPI_VERSION = "3.0.3"
+API_TITLE = "Gym Management API"
+API_VERSION = "1.0.0"
+
+SKIP_METHODS = {'HEAD', 'OPTIONS'}
+SKIP_ENDPOINTS = {'static'}
+
+SECTION_HEADING = re.compile(r'^[A-Z ]+ commands$')
+METHOD_PREFIX = re.compile(r'^(GET|POST|PUT|DELETE)\b[\s-]*')
+PATH_PARAM = re.compile(r'<(?:(\w+)(?:\([^)]*\))?:)?(\w+)>')
+CONVERTER_TYPES = {
+    'int': {"type": "integer"},
+    'float': {"type": "number"},
+}
+ARG_TYPES = {
+    'int': {"type": "integer"},
+    'float': {"type": "number"},
+}
+
+ERROR_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "error": {"type": "string"},
+        "error_type": {"type": "string", "enum": ["validation", "transient", "constraint", "fatal"]},
+        "detail": {"type": "string"},
+        "fields": {"type": "object", "additionalProperties": {"type": "string"}},
+    },
+    "required": ["error"],
+}
+
+
+def build_spec(app):
+    """The OpenAPI document (a dict) for every route registered on app."""
+    paths = {}
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: (r.rule, r.endpoint)):
+        if rule.endpoint in SKIP_ENDPOINTS:
+            continue
+        view = app.view_functions[rule.endpoint]
+        path, path_params = _openapi_path(rule.rule)
+        methods = sorted(rule.methods - SKIP_METHODS)
+        for method in methods:
+            operation = _operation(rule.endpoint, view, path_params)
+            if len(methods) > 1:
+                operation["operationId"] += f"_{method.lower()}"
+            paths.setdefault(path, {})[method.lower()] = operation
+
+    return {
+        "openapi": OPENAPI_VERSION,
+        "info": {"title": API_TITLE, "version": API_VERSION},
+        "tags": [{"name": name} for name in sorted(app.blueprints)],
+        "paths": paths,
+        "components": {
+            "schemas": {"Error": ERROR_SCHEMA},
+            "responses": {
+                "Error": {
+                    "description": "Validation, database, rate limit or not-found error",
+                    "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Error"}}},
+                },
+            },
+        },
+    }
+
+
+def _openapi_path(rule):
+    params = []
+
+    def replace(match):
+        converter, name = match.groups()
+        params.append({
+            "name": name,
+            "in": "path",
+            "required": True,
+            "schema": dict(CONVERTER_TYPES.get(converter, {"type": "string"})),
+        })
+        return '{' + name + '}'
+
+    return PATH_PARAM.sub(replace, rule), params
+
+
+def _operation(endpoint, view, path_params):
+    func = inspect.unwrap(view)
+    tree = _parse(func)
+    summary, description = _comments(func)
+
+    operation = {
+        "operationId": endpoint,
+        "tags": [endpoint.rpartition('.')[0] or 'app'],
+        "summary": summary or func.__name__.replace('_', ' '),
+    }
+    if description:
+        operation["description"] = description
+
+    parameters = list(path_params) + _query_params(func, tree)
+    if _is_idempotent(view):
+        parameters.append({
+            "name": "Idempotency-Key",
+            "in": "header",
+            "required": False,
+            "description": "Repeats with the same key replay the first response instead of running again",
+            "schema": {"type": "string", "maxLength": 255},
+        })
+    if parameters:
+        operation["parameters"] = parameters
+
+    body = _request_body(func, tree)
+    if body:
+        operation["requestBody"] = body
+
+    operation["responses"] = _responses(tree)
+    return operation
+
+
+def _parse(func):
+    try:
+        source = textwrap.dedent(inspect.getsource(func))
+    except (OSError, TypeError):
+        return None
+    return ast.parse(source)
+
+
+def _comments(func):
+    try:
+        comments = inspect.getcomments(func) or ''
+    except (OSError, TypeError):
+        comments = ''
+    lines = [line.lstrip('#').strip(' -') for line in comments.splitlines()]
+    # drop section headings ("GOALS commands") above the first route of a section
+    lines = [line for line in lines if line and not SECTION_HEADING.match(line)]
+    if not lines:
+        return None, None
+    summary = METHOD_PREFIX.sub('', lines[0])
+    return summary[:1].upper() + summary[1:], '\n'.join(lines[1:]) or None
+
+
+def _is_idempotent(view):
+    while view is not None:
+        if getattr(view, 'idempotent', False):
+            return True
+        view = getattr(view, '__wrapped__', None)
+    return False
+
+
+def _is_request_attr(node, attr):
+    """node is request.<attr>"""
+    return (isinstance(node, ast.Attribute) and node.attr == attr
+            and isinstance(node.value, ast.Name) and node.value.id == 'request')
+
+
+def _reads_args(node):
+    """node (a call) is passed request.args, e.g. X.load(request.args.to_dict())."""
+    return any(_is_request_attr(child, 'args') for arg in node.args for child in ast.walk(arg))
+
+
+def _module_attr(func, node):
+    """The object a schemas.X.method(...) call is made on, or None."""
+    if isinstance(node.func.value, ast.Attribute) and isinstance(node.func.value.value, ast.Name):
+        module = func.__globals__.get(node.func.value.value.id)
+        return getattr(module, node.func.value.attr, None)
+    return None
+
+
+def _query_param(name, field, description=None):
+    schema = {"type": "string"}
+    if field is not None:
+        schema = field.json_schema()
+        schema.pop("nullable", None)
+    param = {"name": name, "in": "query", "required": False, "schema": schema}
+    if description:
+        param["description"] = description
+    return param
+
+
+def _query_params(func, tree, seen=None):
+    if tree is None:
+        return []
+    seen = seen if seen is not None else set()
+    seen.add(func)
+
+    params = {}
+    for node in ast.walk(tree):
+        name = schema = default = None
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr == 'get' and _is_request_attr(node.func.value, 'args')
+                and node.args and isinstance(node.args[0], ast.Constant)):
+            name = node.args[0].value
+            for keyword in node.keywords:
+                if keyword.arg == 'type' and isinstance(keyword.value, ast.Name):
+                    schema = ARG_TYPES.get(keyword.value.id)
+            if len(node.args) > 1 and isinstance(node.args[1], ast.Constant):
+                default = node.args[1].value
+        elif (isinstance(node, ast.Subscript) and _is_request_attr(node.value, 'args')
+                and isinstance(node.slice, ast.Constant)):
+            name = node.slice.value
+        elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr == 'parse' and isinstance(node.func.value, ast.Attribute)
+                and isinstance(node.func.value.value, ast.Name)):
+            # schemas.LIST_X.parse(request.args)
+            listing = _module_attr(func, node)
+            if isinstance(listing, ListQuery):
+                for name, field, description in listing.parameters():
+                    params.setdefault(name, _query_param(name, field, description))
+            continue
+        elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr == 'load' and _reads_args(node)):
+            # schemas.X_QUERY.load(request.args.to_dict())
+            schema = _module_attr(func, node)
+            if isinstance(schema, Schema):
+                for name, field in schema.fields.items():
+                    params.setdefault(name, _query_param(name, field))
+            continue
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            # helpers like parse_date_range() that read the query string themselves
+            helper = func.__globals__.get(node.func.id)
+            if (inspect.isfunction(helper) and helper not in seen
+                    and helper.__module__ == func.__module__):
+                for param in _query_params(helper, _parse(helper), seen):
+                    params.setdefault(param["name"], param)
+            continue
+
+        if not isinstance(name, str):
+            continue
+        param = params.setdefault(name, {"name": name, "in": "query", "required": False,
+                                         "schema": {"type": "string"}})
+        if schema:
+            param["schema"] = dict(schema)
+        if default is not None:
+            param["schema"]["default"] = default
+
+    return list(params.values())
+
+
+def _request_body(func, tree):
+    if tree is None:
+        return None
+    json_body = None
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)):
+            continue
+        # schemas.CREATE_X.load(...); loads of request.args are query parameters
+        if node.func.attr == 'load' and not _reads_args(node):
+            schema = _module_attr(func, node)
+            if isinstance(schema, Schema):
+                return {
+                    "required": any(field.required for field in schema.fields.values()),
+                    "content": {"application/json": {"schema": schema.json_schema()}},
+                }
+        # request.files.get('file')
+        if (node.func.attr == 'get' and _is_request_attr(node.func.value, 'files')
+                and node.args and isinstance(node.args[0], ast.Constant)):
+            name = node.args[0].value
+            return {
+                "required": True,
+                "content": {"multipart/form-data": {"schema": {
+                    "type": "object",
+                    "properties": {name: {"type": "string", "format": "binary"}},
+                    "required": [name],
+                }}},
+            }
+        # request.get_json() read by hand
+        if node.func.attr == 'get_json' and isinstance(node.func.value, ast.Name) \
+                and node.func.value.id == 'request':
+            json_body = {"required": True, "content": {"application/json": {"schema": {"type": "object"}}}}
+    return json_body
+
+
+def _value_schema(node, assignments):
+    """What a jsonify() argument or dict value looks like, as far as the source tells."""
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool):
+            return {"type": "boolean"}
+        if isinstance(node.value, int):
+            return {"type": "integer"}
+        if isinstance(node.value, str):
+            return {"type": "string"}
+        return {}
+    if isinstance(node, ast.JoinedStr):
+        return {"type": "string"}
+    if isinstance(node, ast.Dict):
+        properties = {}
+        for key, value in zip(node.keys, node.values):
+            if isinstance(key, ast.Constant) and isinstance(key.value, str):
+                properties[key.value] = _value_schema(value, assignments)
+        return {"type": "object", "properties": properties}
+    if isinstance(node, (ast.List, ast.ListComp)):
+        return {"type": "array", "items": {}}
+    if isinstance(node, ast.Name):
+        source = assignments.get(node.id)
+        if source == 'fetchall':
+            return {"type": "array", "items": {"type": "object"}}
+        if source in ('fetchone', 'cached_row'):
+            return {"type": "object"}
+        if node.id.endswith('_id'):
+            return {"type": "integer"}
+    return {}
+
+
+def _assignments(tree):
+    """variable -> 'fetchall' / 'fetchone' / 'cached_row' for rows read in the view"""
+    found = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Call):
+            call = node.value.func
+            name = call.attr if isinstance(call, ast.Attribute) else getattr(call, 'id', None)
+            for target in node.targets:
+                if isinstance(target, ast.Name) and name in ('fetchall', 'fetchone', 'cached_row'):
+                    found[target.id] = name
+    return found
+
+
+def _responses(tree):
+    responses = {}
+    if tree is not None:
+        assignments = _assignments(tree)
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Return) or node.value is None:
+                continue
+            value, status = node.value, 200
+            if isinstance(value, ast.Tuple) and len(value.elts) == 2 \
+                    and isinstance(value.elts[1], ast.Constant) and isinstance(value.elts[1].value, int):
+                value, status = value.elts
+                status = status.value
+            if status >= 400:
+                responses[str(status)] = {"$ref": "#/components/responses/Error"}
+                continue
+            if not isinstance(value, ast.Call):
+                continue
+            called = value.func.id if isinstance(value.func, ast.Name) else getattr(value.func, 'attr', None)
+
+            if called == 'message_stream':
+                responses["200"] = {"description": "Server-Sent Events stream",
+                                    "content": {"text/event-stream": {"schema": {"type": "string"}}}}
+            elif called == 'jsonify' and value.args:
+                schema = _value_schema(value.args[0], assignments)
+                existing = responses.get(str(status))
+                if existing:
+                    old = existing["content"]["application/json"]["schema"]
+                    if old.get("type") == "object" and schema.get("type") == "object":
+                        old.setdefault("properties", {}).update(schema.get("properties", {}))
+                    continue
+                responses[str(status)] = {"description": "OK",
+                                          "content": {"application/json": {"schema": schema}}}
+            elif called == 'validation_error':
+                responses["400"] = {"$ref": "#/components/responses/Error"}
+
+    if not any(code.startswith('2') for code in responses):
+        responses["200"] = {"description": "OK", "content": {"application/json": {"schema": {}}}}
+    # database, rate limit and circuit breaker errors can reach any route
+    responses["default"] = {"$ref": "#/components/responses/Error"}
+    return dict(sorted(responses.items()))
@@ -0,0 +1,60 @@
+from flask import Blueprint, jsonify, request, current_app
+from backend.metrics import metrics
+from backend.openapi import build_spec
+from backend.ratelimit import limiter
+
+# Create Blueprint for operational endpoints (never rate limited)
+ops = Blueprint('ops', __name__)
+
+
+# Every ops route needs the X-Ops-Token header when OPS_TOKEN is set.
+# Without OPS_TOKEN the read-only routes stay open but changes are refused.
+@ops.before_request
+def check_ops_token():
+    token = current_app.config.get("OPS_TOKEN")
+    if not token:
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            return jsonify({"error": "Ops changes are disabled until OPS_TOKEN is set"}), 403
+        return None
+    if request.headers.get('X-Ops-Token') != token:
+        return jsonify({"error": "Missing or invalid X-Ops-Token header"}), 403
+
+
+# GET counters and gauges for the API process
+@ops.route('/metrics', methods=['GET'])
+def get_metrics():
+    return jsonify(metrics.snapshot()), 200
+
+
+# GET the OpenAPI document for every route (built once per process)
+@ops.route('/openapi.json', methods=['GET'])
+def get_openapi():
+    spec = current_app.extensions.get('openapi_spec')
+    if spec is None:
+        spec = current_app.extensions['openapi_spec'] = build_spec(current_app)
+    return jsonify(spec), 200
+
+
+# GET current rate, concurrency and load shedding limits
+@ops.route('/limits', methods=['GET'])
+def get_limits():
+    return jsonify(limiter.get_limits()), 200
+
+
+# PUT - Change limits at runtime (only the keys sent are changed)
+# Example: {"roles": {"manager": {"rate": 2, "burst": 5}},
+#           "endpoints": {"managers.attendance_log": null},
+#           "concurrency": {"analytics": 2}, "max_in_flight": 32}
+@ops.route('/limits', methods=['PUT'])
+def update_limits():
+    data = request.get_json()
+    if not isinstance(data, dict) or not data:
+        return jsonify({"error": "Request body must be a JSON object of limits to change"}), 400
+
+    try:
+        limits = limiter.update_limits(data)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid limits: {e}"}), 400
+
+    current_app.logger.info(f'[OPS] limits updated: {data}')
+    return jsonify(limits), 200
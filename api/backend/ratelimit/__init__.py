@@ -0,0 +1,9 @@
+#------------------------------------------------------------
+# This file creates the shared rate limiter. create_app() hooks
+# it into every request; expensive routes also use
+# @limiter.concurrency("<group>").
+#------------------------------------------------------------
+from backend.ratelimit.limiter import RateLimiter
+
+
+limiter = RateLimiter()
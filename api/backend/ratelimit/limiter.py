@@ -0,0 +1,289 @@
+#------------------------------------------------------------
+# Request admission control, run before every request:
+#
+#  1. load shedding   - when too many requests are already in
+#                       flight in this process new ones get 503 +
+#                       Retry-After. This counts requests, not DB
+#                       connections: flask-mysql has no pool to
+#                       measure, so MAX_IN_FLIGHT caps how many
+#                       requests may open one at a time
+#  2. rate limits     - a token bucket per (gym, role, endpoint,
+#                       client); an empty bucket gives 429 +
+#                       Retry-After
+#  3. concurrency     - expensive routes are grouped (e.g.
+#                       "analytics") and only N of a group run at
+#                       once; the rest get 503 + Retry-After
+#
+# No gym (backend.tenancy) may hold more than gym_share of the
+# in-flight slots or of a concurrency group, so one busy location
+# leaves room for the others.
+#
+# The role comes from the route's blueprint (members -> member,
+# ...), never from the request. The client is the remote address
+# plus X-Client-Id if sent; a client that sends an id is also
+# held to its address's bucket (CLIENTS_PER_ADDRESS times the
+# limit), so rotating ids doesn't buy fresh tokens. All limits
+# live in self.config and can be changed at runtime through
+# /ops/limits.
+#------------------------------------------------------------
+import copy
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import g, jsonify, request
+
+from backend.metrics import metrics
+from backend.tenancy import current_gym_id
+
+# role used for requests outside the blueprints below
+DEFAULT_ROLE = 'default'
+
+BLUEPRINT_ROLES = {
+    'members': 'member',
+    'trainers': 'trainer',
+    'nutritionists': 'nutritionist',
+    'managers': 'manager',
+}
+
+# tokens per second and bucket size
+DEFAULT_LIMITS = {
+    "enabled": True,
+    "roles": {
+        "default":      {"rate": 10, "burst": 20},
+        "member":       {"rate": 10, "burst": 20},
+        "trainer":      {"rate": 20, "burst": 40},
+        "nutritionist": {"rate": 20, "burst": 40},
+        "manager":      {"rate": 5,  "burst": 10},
+    },
+    # per-endpoint overrides, by Flask endpoint name
+    "endpoints": {
+        "managers.attendance_log":          {"rate": 1, "burst": 5},
+        "managers.revenue_trend_by_class":  {"rate": 1, "burst": 5},
+        "managers.trainer_revenue":         {"rate": 1, "burst": 5},
+        "managers.revenue_by_category":     {"rate": 1, "burst": 5},
+        "managers.class_utilization":       {"rate": 2, "burst": 10},
+        "search.search_caseload":           {"rate": 2, "burst": 10},
+    },
+    # how many requests of each concurrency group may run at once
+    "concurrency": {
+        "analytics": 4,
+        "search": 8,
+    },
+    # shed new requests above this many in flight (0 = never)
+    "max_in_flight": 64,
+    # the most of max_in_flight and of each concurrency group one gym
+    # may use (at least one slot; 1 = no per-gym cap)
+    "gym_share": 0.5,
+}
+
+# token buckets kept; the least recently used are dropped first
+MAX_BUCKETS = 10000
+
+# clients' worth of tokens one remote address may use across
+# X-Client-Ids (e.g. the Streamlit app, one id per browser session)
+CLIENTS_PER_ADDRESS = 10
+
+# blueprints that are never limited (so limits can always be changed)
+EXEMPT_BLUEPRINTS = {'ops'}
+
+
+class TokenBucket:
+    __slots__ = ('tokens', 'updated_at')
+
+    def __init__(self, burst):
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+
+    def take(self, rate, burst):
+        """Take one token. Returns 0 on success, else seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(float(burst), self.tokens + (now - self.updated_at) * rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / rate if rate > 0 else 60
+
+
+def _retry_response(status, message, retry_after):
+    response = jsonify({"error": message})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+class RateLimiter:
+    def __init__(self, app=None):
+        self.config = copy.deepcopy(DEFAULT_LIMITS)
+        self._buckets = OrderedDict()
+        self._active = {}
+        self._in_flight = 0
+        self._gym_active = {}       # (group, gym_id) -> running
+        self._gym_in_flight = {}    # gym_id -> in flight
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.config["enabled"] = app.config.get("RATE_LIMIT_ENABLED", True)
+        self.config["max_in_flight"] = app.config.get("MAX_IN_FLIGHT", self.config["max_in_flight"])
+        self.config["gym_share"] = app.config.get("GYM_SHARE", self.config["gym_share"])
+        app.extensions['rate_limiter'] = self
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+        metrics.gauge("requests.in_flight", lambda: self._in_flight)
+        metrics.gauge("concurrency.active", lambda: dict(self._active))
+        metrics.gauge("requests.in_flight_by_gym", lambda: dict(self._gym_in_flight))
+
+    # --- runtime configuration ---
+
+    def get_limits(self):
+        with self._lock:
+            return copy.deepcopy(self.config)
+
+    def update_limits(self, changes):
+        """
+        Merge changes into the current limits, e.g.
+        {"roles": {"manager": {"rate": 2, "burst": 5}}, "concurrency": {"analytics": 2},
+         "gym_share": 0.25}.
+        Raises ValueError for unknown keys or bad values.
+        """
+        with self._lock:
+            updated = copy.deepcopy(self.config)
+            for key, value in changes.items():
+                if key in ("roles", "endpoints"):
+                    if not isinstance(value, dict):
+                        raise ValueError(f"'{key}' must be an object")
+                    for name, limit in value.items():
+                        if limit is None:
+                            updated[key].pop(name, None)
+                            continue
+                        rate, burst = float(limit["rate"]), float(limit["burst"])
+                        if rate < 0 or burst < 1:
+                            raise ValueError(f"{key}.{name}: rate must be >= 0 and burst >= 1")
+                        updated[key][name] = {"rate": rate, "burst": burst}
+                elif key == "concurrency":
+                    if not isinstance(value, dict):
+                        raise ValueError("'concurrency' must be an object")
+                    for group, limit in value.items():
+                        if int(limit) < 1:
+                            raise ValueError(f"concurrency.{group} must be >= 1")
+                        updated["concurrency"][group] = int(limit)
+                elif key == "max_in_flight":
+                    if int(value) < 0:
+                        raise ValueError("max_in_flight must be >= 0")
+                    updated["max_in_flight"] = int(value)
+                elif key == "gym_share":
+                    if not 0 < float(value) <= 1:
+                        raise ValueError("gym_share must be > 0 and <= 1")
+                    updated["gym_share"] = float(value)
+                elif key == "enabled":
+                    updated["enabled"] = bool(value)
+                else:
+                    raise ValueError(f"unknown limit '{key}'")
+            self.config = updated
+            return copy.deepcopy(updated)
+
+    # --- per-request hooks ---
+
+    def _gym_limit(self, limit):
+        """How much of limit one gym may use."""
+        return max(1, int(limit * self.config["gym_share"]))
+
+    def _before_request(self):
+        if request.blueprint in EXEMPT_BLUEPRINTS or not self.config["enabled"]:
+            return None
+
+        gym_id = current_gym_id()
+        with self._lock:
+            max_in_flight = self.config["max_in_flight"]
+            if max_in_flight and self._in_flight >= max_in_flight:
+                shed = "Server is busy, please retry shortly"
+            elif max_in_flight and self._gym_in_flight.get(gym_id, 0) >= self._gym_limit(max_in_flight):
+                shed = "Too many requests for this gym in progress, please retry shortly"
+            else:
+                shed = None
+                self._in_flight += 1
+                self._gym_in_flight[gym_id] = self._gym_in_flight.get(gym_id, 0) + 1
+                g.rate_limit_counted = gym_id
+
+        role = BLUEPRINT_ROLES.get(request.blueprint, DEFAULT_ROLE)
+        endpoint = request.endpoint or 'unknown'
+
+        if shed:
+            metrics.incr("ratelimit.shed", role=role, gym=gym_id)
+            return _retry_response(503, shed, 1)
+
+        address = request.remote_addr or 'unknown'
+        client_id = request.headers.get('X-Client-Id')
+        wait = self._take_token(gym_id, role, endpoint, (address, client_id))
+        if not wait and client_id:
+            wait = self._take_token(gym_id, role, endpoint, address, scale=CLIENTS_PER_ADDRESS)
+        if wait:
+            metrics.incr("ratelimit.limited", role=role, endpoint=endpoint)
+            return _retry_response(429, "Too many requests", wait)
+        return None
+
+    def _teardown_request(self, exc=None):
+        gym_id = g.pop('rate_limit_counted', None)
+        if gym_id is not None:
+            with self._lock:
+                self._in_flight -= 1
+                self._gym_in_flight[gym_id] -= 1
+
+    def _take_token(self, gym_id, role, endpoint, client, scale=1):
+        with self._lock:
+            limit = (self.config["endpoints"].get(endpoint)
+                     or self.config["roles"].get(role)
+                     or self.config["roles"][DEFAULT_ROLE])
+            rate, burst = limit["rate"] * scale, limit["burst"] * scale
+            key = (gym_id, role, endpoint, client)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(burst)
+                if len(self._buckets) > MAX_BUCKETS:
+                    self._buckets.popitem(last=False)
+                    metrics.incr("ratelimit.buckets_evicted")
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.take(rate, burst)
+
+    # --- concurrency groups ---
+
+    def concurrency(self, group):
+        """
+        Decorator: run the route only while fewer than concurrency[group]
+        of its group are running, and fewer than the gym's share of them
+        for the request's gym.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                gym_key = (group, current_gym_id())
+                with self._lock:
+                    limit = self.config["concurrency"].get(group)
+                    if self.config["enabled"] and limit and (
+                            self._active.get(group, 0) >= limit
+                            or self._gym_active.get(gym_key, 0) >= self._gym_limit(limit)):
+                        admitted = False
+                    else:
+                        admitted = True
+                        self._active[group] = self._active.get(group, 0) + 1
+                        self._gym_active[gym_key] = self._gym_active.get(gym_key, 0) + 1
+
+                if not admitted:
+                    metrics.incr("concurrency.rejected", group=group, gym=gym_key[1])
+                    return _retry_response(503, f"Too many {group} requests running, please retry shortly", 2)
+
+                try:
+                    return view(*args, **kwargs)
+                finally:
+                    with self._lock:
+                        self._active[group] -= 1
+                        self._gym_active[gym_key] -= 1
+            return wrapper
+        return decorator
@@ -4,11 +4,29 @@ import os
 import logging
 from logging.handlers import RotatingFileHandler
 
-from backend.db_connection import db
+from backend.db_connection import DBError, breaker, db, db_error_response
+from backend.messaging import hub
+from backend.idempotency import store as idempotency_store
+from backend.ratelimit import limiter
+from backend.tenancy import gyms, row_ownership
+from backend.cache import entity_cache, exercise_catalog, member_names, single_flight, trainer_names
 from backend.members.member_routes import members
 from backend.nutritionists.nutritionist_routes import nutritionists
 from backend.trainer.trainer_routes import trainers
 from backend.manager.manager_routes import managers
+from backend.search.search_routes import search
+from backend.ops.ops_routes import ops
+from backend.billing.billing_cli import billing_cli
+from backend.billing.aging import aging_job
+from backend.analytics.analytics_cli import analytics_cli
+from backend.migrations.migrations_cli import db_cli
+from backend.openapi.openapi_cli import openapi_cli
+from backend.analytics.volume import volume_job
+from backend.analytics.retention import retention_job
+from backend.analytics.utilization import utilization_job
+from backend.analytics.gym_rollup import gym_rollup_job
+from backend.scheduler import Scheduler
+from backend.scheduler.scheduler_cli import scheduler_cli
 
 
 def create_app():
@@ -44,9 +62,99 @@ def create_app():
         "DB_NAME"
     ).strip()  # Change this to your DB name
 
+    # default invoice amount for month-end billing runs
+    app.config["MEMBERSHIP_FEE"] = os.getenv("MEMBERSHIP_FEE", "150.00").strip()
+
+    # invoices still pending this many days after date_issued become overdue
+    app.config["INVOICE_TERMS_DAYS"] = int(os.getenv("INVOICE_TERMS_DAYS", "30"))
+    app.config["AGING_INTERVAL_SECONDS"] = int(os.getenv("AGING_INTERVAL_SECONDS", "3600"))
+
+    # how often new workout logs are summarised into MEMBER_WEEKLY_VOLUME
+    app.config["VOLUME_INTERVAL_SECONDS"] = int(os.getenv("VOLUME_INTERVAL_SECONDS", "300"))
+    # how often the current month of the retention cohort matrix is recomputed
+    app.config["RETENTION_INTERVAL_SECONDS"] = int(os.getenv("RETENTION_INTERVAL_SECONDS", "21600"))
+    # how often the class-utilization job checks for a newly completed day to roll up
+    app.config["UTILIZATION_INTERVAL_SECONDS"] = int(os.getenv("UTILIZATION_INTERVAL_SECONDS", "3600"))
+    # how often GYM_DAILY_STATS (the owner's per-gym totals) is brought up to date
+    app.config["GYM_ROLLUP_INTERVAL_SECONDS"] = int(os.getenv("GYM_ROLLUP_INTERVAL_SECONDS", "900"))
+
+    # set SCHEDULER_ENABLED=false when the jobs run in a `flask scheduler run` sidecar
+    app.config["SCHEDULER_ENABLED"] = os.getenv("SCHEDULER_ENABLED", "true").strip().lower() == "true"
+
+    # how new messages reach SSE clients served by other API workers
+    # ("local" = this process only, "redis" = pub/sub at REDIS_URL)
+    app.config["MESSAGE_BACKPLANE"] = os.getenv("MESSAGE_BACKPLANE", "local").strip()
+    app.config["REDIS_URL"] = os.getenv("REDIS_URL", "redis://localhost:6379/0").strip()
+
+    # how long Idempotency-Key responses are kept for replay, how many
+    # keys are kept at most, and how long a repeat waits for the first try
+    app.config["IDEMPOTENCY_TTL_SECONDS"] = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    app.config["IDEMPOTENCY_MAX_KEYS"] = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+    app.config["IDEMPOTENCY_WAIT_SECONDS"] = int(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))
+
+    # request admission control; the per-role/endpoint limits themselves
+    # are changed at runtime through PUT /ops/limits
+    app.config["RATE_LIMIT_ENABLED"] = os.getenv("RATE_LIMIT_ENABLED", "true").strip().lower() == "true"
+    # requests running at once in this process (not a DB pool wait)
+    app.config["MAX_IN_FLIGHT"] = int(os.getenv("MAX_IN_FLIGHT", "64"))
+    # the most of MAX_IN_FLIGHT (and of each concurrency group) one gym may use
+    app.config["GYM_SHARE"] = float(os.getenv("GYM_SHARE", "0.5"))
+    # when set, /ops/* requires a matching X-Ops-Token header; when
+    # unset, PUT /ops/limits and any other change is refused
+    app.config["OPS_TOKEN"] = os.getenv("OPS_TOKEN", "").strip()
+
+    # how often cached catalogs (EXERCISE) check CACHE_VERSION for writes
+    # made by other API workers
+    app.config["CACHE_VERSION_CHECK_SECONDS"] = int(os.getenv("CACHE_VERSION_CHECK_SECONDS", "5"))
+
+    # read-through cache for hot single-row reads (TTLs per entity type
+    # are in backend/cache/entity_cache.py); "local" or "redis" (REDIS_URL)
+    app.config["ENTITY_CACHE_ENABLED"] = os.getenv("ENTITY_CACHE_ENABLED", "true").strip().lower() == "true"
+    app.config["ENTITY_CACHE_BACKEND"] = os.getenv("ENTITY_CACHE_BACKEND", "local").strip()
+
+    # schema migrations (`flask db upgrade`): FOOD_LOG and INVOICE are
+    # only changed online (no table locks) during business hours
+    app.config["MIGRATION_BUSINESS_HOURS"] = os.getenv("MIGRATION_BUSINESS_HOURS", "05:00-23:00").strip()
+    app.config["MIGRATION_GUARDED_TABLES"] = os.getenv("MIGRATION_GUARDED_TABLES", "FOOD_LOG,INVOICE").strip()
+    # how long a DDL statement waits for its metadata lock before retrying
+    app.config["MIGRATION_LOCK_WAIT_SECONDS"] = int(os.getenv("MIGRATION_LOCK_WAIT_SECONDS", "5"))
+    # backfills pause while the server or replicas (host:port,...) are busy
+    app.config["MIGRATION_MAX_THREADS_RUNNING"] = int(os.getenv("MIGRATION_MAX_THREADS_RUNNING", "20"))
+    app.config["MIGRATION_MAX_REPLICA_LAG_SECONDS"] = int(os.getenv("MIGRATION_MAX_REPLICA_LAG_SECONDS", "5"))
+    app.config["MIGRATION_REPLICA_HOSTS"] = os.getenv("MIGRATION_REPLICA_HOSTS", "").strip()
+
+    # requests without an X-Gym-Id header are for this gym; the GYM
+    # table (gyms and their schemas) is re-read this often
+    app.config["DEFAULT_GYM_ID"] = int(os.getenv("DEFAULT_GYM_ID", "1"))
+    app.config["GYM_REGISTRY_SECONDS"] = int(os.getenv("GYM_REGISTRY_SECONDS", "60"))
+
+    # give up connecting to MySQL after this long instead of hanging the request
+    app.config["DB_CONNECT_TIMEOUT_SECONDS"] = int(os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "5"))
+    # after this many connection failures in a row, answer 503 right away
+    # and probe MySQL in the background until it is back
+    app.config["DB_BREAKER_ENABLED"] = os.getenv("DB_BREAKER_ENABLED", "true").strip().lower() == "true"
+    app.config["DB_BREAKER_FAILURES"] = int(os.getenv("DB_BREAKER_FAILURES", "5"))
+    app.config["DB_BREAKER_PROBE_SECONDS"] = int(os.getenv("DB_BREAKER_PROBE_SECONDS", "5"))
+
     # Initialize the database object with the settings above.
     app.logger.info("current_app(): starting the database connection")
     db.init_app(app)
+    db.connect_args["connect_timeout"] = app.config["DB_CONNECT_TIMEOUT_SECONDS"]
+    breaker.init_app(app)
+    # DB errors a route doesn't catch itself get the same responses
+    app.register_error_handler(DBError, db_error_response)
+    hub.init_app(app)
+    idempotency_store.init_app(app)
+    # the request's gym is known before admission control, and rows of
+    # other gyms are turned away only once a request is admitted
+    gyms.init_app(app)
+    limiter.init_app(app)
+    row_ownership.init_app(app)
+    exercise_catalog.init_app(app)
+    member_names.init_app(app)
+    trainer_names.init_app(app)
+    entity_cache.init_app(app)
+    single_flight.init_app(app)
 
     # Register the routes from each Blueprint with the app object
     # and give a url prefix to each
@@ -55,6 +163,24 @@ def create_app():
     app.register_blueprint(managers, url_prefix="/managers")
     app.register_blueprint(nutritionists, url_prefix="/nutritionists")
     app.register_blueprint(trainers, url_prefix="/trainers")
+    app.register_blueprint(search, url_prefix="/search")
+    app.register_blueprint(ops, url_prefix="/ops")
+
+    # Register `flask ...` command groups for the batch jobs
+    app.cli.add_command(billing_cli)
+    app.cli.add_command(scheduler_cli)
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(db_cli)
+    app.cli.add_command(openapi_cli)
+
+    # Periodic background jobs. They are started by backend_app.py
+    # (or run in a sidecar via `flask scheduler run`).
+    scheduler = Scheduler(app)
+    scheduler.add_job("invoice-aging", aging_job, app.config["AGING_INTERVAL_SECONDS"])
+    scheduler.add_job("training-volume", volume_job, app.config["VOLUME_INTERVAL_SECONDS"])
+    scheduler.add_job("cohort-retention", retention_job, app.config["RETENTION_INTERVAL_SECONDS"])
+    scheduler.add_job("class-utilization", utilization_job, app.config["UTILIZATION_INTERVAL_SECONDS"])
+    scheduler.add_job("gym-rollup", gym_rollup_job, app.config["GYM_ROLLUP_INTERVAL_SECONDS"])
 
 
     # Don't forget to return the app object
@@ -0,0 +1,99 @@
+#------------------------------------------------------------
+# A small in-process scheduler for periodic background jobs
+# (invoice aging, nightly rollups, ...).
+#
+# Jobs are plain functions taking the Flask app. They run one
+# at a time on a single daemon thread, inside an app context -
+# once per gym database (backend.tenancy), as a gym of that
+# database, so db.connect() reaches its tables.
+#------------------------------------------------------------
+import threading
+import time
+
+from backend.tenancy import using_gym
+
+
+class Scheduler:
+    def __init__(self, app=None):
+        self._jobs = []
+        self._stop = threading.Event()
+        self._thread = None
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['scheduler'] = self
+
+    def add_job(self, name, func, interval_seconds, run_at_start=True):
+        """Run func(app) every interval_seconds (first run right away unless run_at_start=False)."""
+        first_run = time.monotonic() if run_at_start else time.monotonic() + interval_seconds
+        self._jobs.append({
+            "name": name,
+            "func": func,
+            "interval": interval_seconds,
+            "next_run": first_run,
+        })
+
+    @property
+    def jobs(self):
+        return [job['name'] for job in self._jobs]
+
+    def run_pending(self):
+        """Run every job that is due. Returns the seconds until the next one is due."""
+        for job in self._jobs:
+            if time.monotonic() >= job['next_run']:
+                self._run_job(job)
+                job['next_run'] = time.monotonic() + job['interval']
+
+        if not self._jobs:
+            return 60
+        return max(0.0, min(job['next_run'] for job in self._jobs) - time.monotonic())
+
+    def run_job(self, name):
+        """Run a single job immediately (used by the CLI)."""
+        for job in self._jobs:
+            if job['name'] == name:
+                self._run_job(job)
+                return True
+        return False
+
+    def _run_job(self, job):
+        with self.app.app_context():
+            gyms = self.app.extensions.get('gyms')
+            try:
+                databases = gyms.by_database() if gyms else [None]
+            except Exception as e:
+                self.app.logger.error(f"[SCHEDULER] job {job['name']} skipped, gyms unavailable: {str(e)}")
+                return
+
+            for gym in databases:
+                # one failing job (or gym database) must not stop the others
+                # or kill the scheduler thread
+                try:
+                    self.app.logger.debug(f"[SCHEDULER] running {job['name']}"
+                                          + (f" for {gym['schema_name']}" if gym and gym['schema_name'] else ""))
+                    if gym is None:
+                        job['func'](self.app)
+                    else:
+                        with using_gym(gym):
+                            job['func'](self.app)
+                except Exception as e:
+                    self.app.logger.error(f"[SCHEDULER] job {job['name']} failed: {str(e)}")
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            self._stop.wait(self.run_pending())
+
+    def start(self):
+        """Start the scheduler on a daemon thread (no-op if already running)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name='scheduler', daemon=True)
+        self._thread.start()
+        self.app.logger.info(f"[SCHEDULER] started with jobs: {', '.join(self.jobs)}")
+
+    def stop(self):
+        self._stop.set()
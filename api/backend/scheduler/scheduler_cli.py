@@ -0,0 +1,31 @@
+#------------------------------------------------------------
+# `flask scheduler ...` commands. `run` turns the scheduler into
+# a sidecar process for deployments where the API workers
+# should not run background jobs themselves.
+#------------------------------------------------------------
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+scheduler_cli = AppGroup('scheduler', help='Background job scheduler.')
+
+
+@scheduler_cli.command('run')
+def run_command():
+    """Run all scheduled jobs in the foreground until interrupted."""
+    scheduler = current_app.extensions['scheduler']
+    click.echo(f"Scheduler running jobs: {', '.join(scheduler.jobs)}")
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+@scheduler_cli.command('run-job')
+@click.argument('name')
+def run_job_command(name):
+    """Run the job NAME once."""
+    scheduler = current_app.extensions['scheduler']
+    if not scheduler.run_job(name):
+        raise click.BadParameter(f"unknown job (known: {', '.join(scheduler.jobs)})", param_hint='NAME')
+    click.echo(f"Ran {name}")
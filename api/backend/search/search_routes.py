@@ -0,0 +1,172 @@
+import html
+import re
+
+from flask import Blueprint, jsonify, request
+from backend.db_connection import DBError, db_error_response, unit_of_work
+from backend.ratelimit import limiter
+from backend.tenancy import row_ownership
+from backend.tenancy.ownership import ARGUMENT_TABLES
+from flask import current_app
+
+# Create Blueprint for search routes
+search = Blueprint('search', __name__)
+
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+MAX_TERMS = 10
+SNIPPET_LENGTH = 160
+
+# What can be searched. Each scope is one FULLTEXT-indexed column, plus
+# how to restrict it to the caller's caseload. Messages are between a
+# member and a trainer, so only trainers can search them.
+SCOPES = {
+    "messages": {
+        "source": "message",
+        "table": "MESSAGE",
+        "id": "message_id",
+        "text": "content",
+        "occurred_at": "message_timestamp",
+        "caseload": {"trainer_id": "x.trainer_id = %s"},
+    },
+    "workout_notes": {
+        "source": "workout_log",
+        "table": "WORKOUT_LOG",
+        "id": "log_id",
+        "text": "notes",
+        "occurred_at": "date",
+        "caseload": {"trainer_id": "gm.trainer_id = %s",
+                     "nutritionist_id": "gm.nutritionist_id = %s"},
+    },
+    "food": {
+        "source": "food_log",
+        "table": "FOOD_LOG",
+        "id": "log_id",
+        "text": "food",
+        "occurred_at": "timestamp",
+        "caseload": {"trainer_id": "gm.trainer_id = %s",
+                     "nutritionist_id": "gm.nutritionist_id = %s"},
+    },
+}
+
+
+# --- Helper: turn free text into a BOOLEAN MODE query ---
+# Every word is required and prefix-matched ("squat" finds "squats");
+# operator characters typed by the user are dropped.
+def build_boolean_query(q):
+    terms = [t for t in re.findall(r"\w+", q or "") if len(t) > 1][:MAX_TERMS]
+    return terms, " ".join(f"+{term}*" for term in terms)
+
+
+# --- Helper: short HTML-escaped excerpt with the matches wrapped in <mark> ---
+def highlight(text, terms):
+    text = text or ""
+    pattern = re.compile(r"\b(" + "|".join(re.escape(t) for t in terms) + r")\w*", re.IGNORECASE)
+
+    # centre the snippet on the first match
+    first = pattern.search(text)
+    start = max(0, first.start() - SNIPPET_LENGTH // 3) if first else 0
+    snippet = text[start:start + SNIPPET_LENGTH]
+
+    marked = pattern.sub(lambda m: f"\0{m.group(0)}\1", snippet)
+    marked = html.escape(marked).replace("\0", "<mark>").replace("\1", "</mark>")
+
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + SNIPPET_LENGTH < len(text) else ""
+    return prefix + marked + suffix
+
+
+def scope_query(scope, caller_column, limit):
+    """
+    One ranked, caseload-restricted FULLTEXT query for a single scope.
+    Each branch is limited on its own so MySQL only has to rank the top
+    rows per index, not every matching row.
+    """
+    spec = SCOPES[scope]
+    caseload = spec["caseload"][caller_column]
+    member_join = "JOIN GYM_MEMBER gm ON gm.member_id = x.member_id" if "gm." in caseload else ""
+    return f"""
+        (SELECT '{spec['source']}' AS source,
+                x.{spec['id']} AS id,
+                x.member_id,
+                x.{spec['occurred_at']} AS occurred_at,
+                x.{spec['text']} AS text,
+                MATCH(x.{spec['text']}) AGAINST (%s IN BOOLEAN MODE) AS score
+         FROM {spec['table']} x
+         {member_join}
+         WHERE MATCH(x.{spec['text']}) AGAINST (%s IN BOOLEAN MODE)
+           AND {caseload}
+         ORDER BY score DESC
+         LIMIT {int(limit)})
+    """
+
+
+# GET search across messages, workout notes and food entries
+# Query params: q (required), scope (all|messages|workout_notes|food),
+# trainer_id or nutritionist_id (whose caseload to search), page, per_page
+@search.route('', methods=['GET'])
+@limiter.concurrency('search')
+def search_caseload():
+    try:
+        q = request.args.get('q', '')
+        scope = request.args.get('scope', 'all')
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', DEFAULT_PER_PAGE, type=int), 1), MAX_PER_PAGE)
+
+        if request.args.get('trainer_id'):
+            caller_column, caller_id = 'trainer_id', request.args.get('trainer_id', type=int)
+        elif request.args.get('nutritionist_id'):
+            caller_column, caller_id = 'nutritionist_id', request.args.get('nutritionist_id', type=int)
+        else:
+            return jsonify({"error": "Missing required 'trainer_id' or 'nutritionist_id' query parameter"}), 400
+
+        if not row_ownership.owns(ARGUMENT_TABLES[caller_column], caller_id):
+            return jsonify({"error": "Not found"}), 404
+
+        terms, boolean_query = build_boolean_query(q)
+        if not terms:
+            return jsonify({"error": "Missing search text in 'q'"}), 400
+
+        if scope == 'all':
+            scopes = [s for s, spec in SCOPES.items() if caller_column in spec["caseload"]]
+        elif scope in SCOPES:
+            if caller_column not in SCOPES[scope]["caseload"]:
+                return jsonify({"error": f"Scope '{scope}' is not available to this caller"}), 403
+            scopes = [scope]
+        else:
+            return jsonify({"error": f"Unknown scope '{scope}'"}), 400
+
+        current_app.logger.info(f'[SEARCH] q={q!r} scope={scope} {caller_column}={caller_id} page={page}')
+
+        # fetch one extra row to know whether there is a next page
+        offset = (page - 1) * per_page
+        branch_limit = offset + per_page + 1
+
+        query = " UNION ALL ".join(scope_query(s, caller_column, branch_limit) for s in scopes)
+        query += f" ORDER BY score DESC, occurred_at DESC LIMIT {branch_limit - offset} OFFSET {offset}"
+        params = [boolean_query, boolean_query, caller_id] * len(scopes)
+
+        with unit_of_work() as cursor:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+        results = []
+        for row in rows[:per_page]:
+            results.append({
+                "source": row['source'],
+                "id": row['id'],
+                "member_id": row['member_id'],
+                "occurred_at": row['occurred_at'].isoformat() if hasattr(row['occurred_at'], 'isoformat') else str(row['occurred_at']),
+                "score": round(float(row['score']), 4),
+                "highlight": highlight(row['text'], terms),
+            })
+
+        return jsonify({
+            "q": q,
+            "scope": scope,
+            "page": page,
+            "per_page": per_page,
+            "has_more": len(rows) > per_page,
+            "results": results,
+        }), 200
+    except DBError as e:
+        return db_error_response(e)
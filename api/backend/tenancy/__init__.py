@@ -0,0 +1,18 @@
+#------------------------------------------------------------
+# This file creates the gym registry and the row ownership check.
+# create_app() hooks both into every request: the registry picks
+# the request's gym (registry.py) before the rate limiter runs,
+# the ownership check (ownership.py) after it.
+#------------------------------------------------------------
+from backend.tenancy.ownership import RowOwnership
+from backend.tenancy.registry import GymRegistry, using_gym
+
+
+gyms = GymRegistry()
+row_ownership = RowOwnership(gyms)
+
+
+def current_gym_id():
+    """The gym of the current request (X-Gym-Id) or job (using_gym())."""
+    return gyms.current_gym_id()
+
@@ -0,0 +1,134 @@
+#------------------------------------------------------------
+# Keeps each gym to its own rows: before a route runs, every id
+# in its URL (/members/<member_id>/..., /goals/<goal_id>, ...) is
+# checked against the request's gym, and a row of another gym
+# gets the same 404 as a row that doesn't exist. Routes then only
+# filter on gym_id where they list or create gym rows.
+#
+# Members, trainers, nutritionists, classes and invoices carry a
+# gym_id; logs, plans, goals and messages belong to their member's
+# gym. A row never changes gym, so the answers are kept (LRU);
+# ids with no row are passed on for the route to 404. Routes that
+# take an id in the query string check it with owns().
+#------------------------------------------------------------
+import re
+import threading
+from collections import OrderedDict
+
+from flask import jsonify, request
+
+from backend.db_connection import unit_of_work
+from backend.metrics import metrics
+from backend.tenancy.registry import EXEMPT_BLUEPRINTS
+
+# tables with their own gym_id, by key column
+GYM_TABLES = {
+    'GYM_MEMBER': 'member_id',
+    'TRAINER': 'trainer_id',
+    'NUTRITIONIST': 'nutritionist_id',
+    'CLASS_SESSION': 'session_id',
+    'INVOICE': 'invoice_id',
+}
+# tables whose rows belong to their member's gym, by key column
+MEMBER_TABLES = {
+    'GOAL': 'goal_id',
+    'PROGRESS': 'progress_id',
+    'MESSAGE': 'message_id',
+    'WORKOUT_LOG': 'log_id',
+    'WORKOUT_PLAN': 'plan_id',
+    'FOOD_LOG': 'log_id',
+    'MEAL_PLAN': 'plan_id',
+}
+
+# URL argument -> table, where the name says which
+ARGUMENT_TABLES = {
+    'member_id': 'GYM_MEMBER',
+    'trainer_id': 'TRAINER',
+    'nutritionist_id': 'NUTRITIONIST',
+    'session_id': 'CLASS_SESSION',
+    'invoice_id': 'INVOICE',
+    'goal_id': 'GOAL',
+    'progress_id': 'PROGRESS',
+    'message_id': 'MESSAGE',
+}
+# log_id and plan_id: by the path segment before them
+SEGMENT_TABLES = {
+    'workout-logs': 'WORKOUT_LOG',
+    'food-logs': 'FOOD_LOG',
+    'workout-plans': 'WORKOUT_PLAN',
+    'meal-plans': 'MEAL_PLAN',
+}
+
+URL_ARGUMENT = re.compile(r'([^/<>]+)/<(?:\w+:)?(\w+)>')
+
+MAX_ENTRIES = 100000
+
+
+def _gym_query(table):
+    if table in GYM_TABLES:
+        return f"SELECT gym_id FROM {table} WHERE {GYM_TABLES[table]} = %s"
+    return (f"SELECT gm.gym_id FROM {table} x JOIN GYM_MEMBER gm ON gm.member_id = x.member_id "
+            f"WHERE x.{MEMBER_TABLES[table]} = %s")
+
+
+class RowOwnership:
+    def __init__(self, gyms, max_entries=MAX_ENTRIES):
+        self.gyms = gyms
+        self.max_entries = max_entries
+        self._owners = OrderedDict()
+        self._tables = {}   # URL rule -> [(argument, table)]
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        app.extensions['row_ownership'] = self
+        app.before_request(self._before_request)
+        metrics.gauge("tenancy.owners_cached", lambda: len(self._owners))
+
+    def _rule_tables(self, rule):
+        tables = self._tables.get(rule)
+        if tables is None:
+            tables = []
+            for segment, argument in URL_ARGUMENT.findall(rule):
+                table = ARGUMENT_TABLES.get(argument) or SEGMENT_TABLES.get(segment)
+                if table:
+                    tables.append((argument, table))
+            self._tables[rule] = tables
+        return tables
+
+    def gym_of(self, table, key):
+        """gym_id of a row in the current gym's database, or None if there is no such row."""
+        cache_key = (self.gyms.current_schema(), table, key)
+        with self._lock:
+            gym_id = self._owners.get(cache_key)
+            if gym_id is not None:
+                self._owners.move_to_end(cache_key)
+                return gym_id
+
+        with unit_of_work() as cursor:
+            cursor.execute(_gym_query(table), (key,))
+            row = cursor.fetchone()
+        if row is None:
+            return None
+
+        with self._lock:
+            self._owners[cache_key] = row['gym_id']
+            while len(self._owners) > self.max_entries:
+                self._owners.popitem(last=False)
+        return row['gym_id']
+
+    def owns(self, table, key):
+        """False if the row belongs to another gym (ids with no row pass)."""
+        owner = self.gym_of(table, key)
+        if owner is not None and owner != self.gyms.current_gym_id():
+            metrics.incr("tenancy.other_gym", table=table)
+            return False
+        return True
+
+    def _before_request(self):
+        if request.blueprint in EXEMPT_BLUEPRINTS or request.url_rule is None or not request.view_args:
+            return None
+
+        for argument, table in self._rule_tables(request.url_rule.rule):
+            if not self.owns(table, request.view_args[argument]):
+                return jsonify({"error": "Not found"}), 404
+        return None
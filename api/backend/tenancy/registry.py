@@ -0,0 +1,140 @@
+#------------------------------------------------------------
+# Which gym (location) a request or background job is for.
+#
+# Requests name their gym in the X-Gym-Id header (DEFAULT_GYM_ID
+# when they don't); before_request looks it up in the GYM table
+# (kept in memory, reloaded every GYM_REGISTRY_SECONDS) and keeps
+# the row in g.gym. Jobs run inside using_gym(gym). From there:
+#
+#   current_gym_id()   the gym_id routes write and filter on
+#   current_schema()   the schema db.connect() switches to
+#                      (GYM.schema_name; None = the default
+#                      database the gyms share)
+#
+# GYM itself always lives in the default database.
+#------------------------------------------------------------
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app, g, has_request_context, jsonify, request
+
+from backend.db_connection import db
+
+HEADER = 'X-Gym-Id'
+
+# blueprints that aren't about one gym (and must work without GYM)
+EXEMPT_BLUEPRINTS = {'ops'}
+
+# the gym of the job running in this thread (see using_gym)
+_job_gym = ContextVar('job_gym', default=None)
+
+
+@contextmanager
+def using_gym(gym):
+    """Run a block (a scheduler job, a CLI command) as gym: its schema, its caches."""
+    token = _job_gym.set(gym)
+    try:
+        yield gym
+    finally:
+        _job_gym.reset(token)
+
+
+class GymRegistry:
+    def __init__(self, default_gym_id=1, check_seconds=60):
+        self.default_gym_id = default_gym_id
+        self.check_seconds = check_seconds
+        self._gyms = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self.app = None
+
+    def init_app(self, app):
+        self.app = app
+        self.default_gym_id = app.config.get("DEFAULT_GYM_ID", self.default_gym_id)
+        self.check_seconds = app.config.get("GYM_REGISTRY_SECONDS", self.check_seconds)
+        app.extensions['gyms'] = self
+        app.before_request(self._before_request)
+        db.schema_for_context = self.current_schema
+
+    # --- the GYM table ---
+
+    def _load(self):
+        conn = db.connect(schema=self.app.config['MYSQL_DATABASE_DB'])
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT gym_id, name, schema_name FROM GYM ORDER BY gym_id")
+            return {row['gym_id']: row for row in cursor.fetchall()}
+        finally:
+            conn.close()
+
+    def all(self):
+        """gym_id -> GYM row."""
+        now = time.monotonic()
+        with self._lock:
+            if self._gyms is None or now - self._loaded_at >= self.check_seconds:
+                try:
+                    self._gyms = self._load()
+                except Exception as e:
+                    if self._gyms is None:
+                        raise
+                    # keep serving the gyms we know; try again next check
+                    self.app.logger.warning(f"[GYMS] reload failed, keeping the last copy: {e}")
+                self._loaded_at = now
+            return self._gyms
+
+    def get(self, gym_id):
+        return self.all().get(gym_id)
+
+    def invalidate(self):
+        with self._lock:
+            self._gyms = None
+
+    def by_database(self):
+        """
+        One gym per database holding gym rows: the first gym sharing the
+        default database, then each gym with its own schema. Jobs that
+        work on whole tables run once as each.
+        """
+        shared = []
+        own = []
+        for gym in self.all().values():
+            if gym['schema_name']:
+                own.append(gym)
+            elif not shared:
+                shared.append(gym)
+        return shared + own
+
+    # --- the current gym ---
+
+    def current_gym(self):
+        """The GYM row of this request or job; None outside both."""
+        if has_request_context() and 'gym' in g:
+            return g.gym
+        return _job_gym.get()
+
+    def current_gym_id(self):
+        gym = self.current_gym()
+        return gym['gym_id'] if gym else self.default_gym_id
+
+    def current_schema(self):
+        gym = self.current_gym()
+        return gym['schema_name'] if gym else None
+
+    def _before_request(self):
+        if request.blueprint in EXEMPT_BLUEPRINTS:
+            return None
+
+        raw = request.headers.get(HEADER)
+        try:
+            gym_id = int(raw) if raw else self.default_gym_id
+        except ValueError:
+            return jsonify({"error": f"{HEADER} must be a gym id"}), 400
+
+        gym = self.get(gym_id)
+        if gym is None:
+            current_app.logger.info(f"[GYMS] unknown gym {gym_id}")
+            return jsonify({"error": f"Unknown gym {gym_id}"}), 404
+        g.gym = gym
+        return None
@@ -0,0 +1,131 @@
+#------------------------------------------------------------
+# Request body schemas for the trainer routes (see
+# backend/validation). Field names are what clients send;
+# column= is where it goes when that differs. LIST_* are the
+# query strings the list routes accept (validation/listing.py).
+#------------------------------------------------------------
+from backend.members.schemas import CREATE_MEMBER, MEMBER_STATUSES
+from backend.validation import Date, DateTime, Decimal, Filter, Int, ListQuery, Schema, Str
+
+INVOICE_STATUSES = ('pending', 'paid', 'overdue', 'voided')
+
+CREATE_TRAINER = Schema({
+    "first_name": Str(required=True, max_length=50),
+    "last_name": Str(required=True, max_length=50),
+})
+UPDATE_TRAINER = CREATE_TRAINER.partial()
+
+UPDATE_CLIENT_PROFILE = CREATE_MEMBER.partial("first_name", "last_name", "status")
+
+CREATE_WORKOUT_PLAN = Schema({
+    "member_id": Int(required=True, min=1),
+    "goals": Str(required=True, max_length=500),
+    "plan_date": Date(required=True, column="date", aliases=("date",)),
+})
+UPDATE_WORKOUT_PLAN = CREATE_WORKOUT_PLAN.partial("goals", "plan_date")
+
+CREATE_WORKOUT_LOG = Schema({
+    "member_id": Int(required=True, min=1),
+    "workout_date": Date(required=True, column="date", aliases=("date",)),
+    "notes": Str(),
+    "sessions": Int(min=0, nullable=False, default=1),
+})
+UPDATE_WORKOUT_LOG = CREATE_WORKOUT_LOG.partial("workout_date", "notes", "sessions")
+
+CREATE_EXERCISE = Schema({
+    "category": Str(required=True, max_length=50),
+    "sets": Int(min=0),
+    "reps": Int(min=0),
+    "weight": Decimal(digits=6, places=2, min=0),
+})
+UPDATE_EXERCISE = CREATE_EXERCISE.partial()
+
+CREATE_SESSION = Schema({
+    "class_name": Str(required=True, max_length=100),
+    "session_date": DateTime(required=True, column="date", aliases=("date",)),
+    "cost": Decimal(digits=8, places=2, min=0),
+    "capacity": Int(min=1, nullable=False, default=20),
+})
+UPDATE_SESSION = CREATE_SESSION.partial()
+
+CREATE_INVOICE = Schema({
+    "member_id": Int(required=True, min=1),
+    "amount": Decimal(required=True, digits=10, places=2, min=0),
+    "invoice_date": Date(required=True),
+    "status": Str(nullable=False, default='pending', choices=INVOICE_STATUSES),
+    "category": Str(required=True, max_length=50),
+})
+UPDATE_INVOICE = CREATE_INVOICE.partial("status", "amount", "category")
+
+LIST_TRAINERS = ListQuery(
+    "TRAINER",
+    columns=("trainer_id", "first_name", "last_name"),
+    filters={"trainer_id": Int(min=1), "first_name": Str(), "last_name": Str()},
+    sort=("trainer_id", "first_name", "last_name"),
+    default_sort="trainer_id",
+)
+
+# the routes below are per trainer (the route adds the trainer_id condition)
+
+LIST_CLIENTS = ListQuery(
+    "GYM_MEMBER",
+    columns=("member_id", "first_name", "last_name", "status", "nutritionist_id", "joined_date"),
+    filters={
+        "member_id": Int(min=1),
+        "last_name": Str(),
+        "status": Filter(Str(choices=MEMBER_STATUSES), ops=('eq', 'ne', 'in')),
+        "joined_date": Date(),
+    },
+    sort=("last_name", "first_name", "member_id", "status", "joined_date"),
+    default_sort="last_name",
+)
+
+LIST_WORKOUT_PLANS = ListQuery(
+    "WORKOUT_PLAN wp JOIN GYM_MEMBER gm ON wp.member_id = gm.member_id",
+    columns={"plan_id": "wp.plan_id", "member_id": "wp.member_id", "goals": "wp.goals",
+             "date": "wp.date", "first_name": "gm.first_name", "last_name": "gm.last_name"},
+    filters={"member_id": Int(min=1), "date": Date()},
+    sort=("date", "plan_id", "last_name"),
+    default_sort="-date",
+)
+
+# first_name/last_name: the member's, from backend.cache.member_names
+MEMBER_NAMES = {"first_name": "member_id", "last_name": "member_id"}
+
+LIST_WORKOUT_LOGS = ListQuery(
+    "WORKOUT_LOG",
+    columns=("log_id", "member_id", "trainer_id", "date", "notes", "sessions"),
+    filters={"member_id": Int(min=1), "date": Date(), "sessions": Int(min=0)},
+    sort=("date", "log_id"),
+    default_sort="-date",
+    derived=MEMBER_NAMES,
+)
+
+LIST_SESSIONS = ListQuery(
+    "CLASS_SESSION cs LEFT JOIN CLASS_ATTENDANCE ca ON cs.session_id = ca.session_id",
+    columns={"session_id": "cs.session_id", "trainer_id": "cs.trainer_id",
+             "class_name": "cs.class_name", "date": "cs.date", "cost": "cs.cost",
+             "capacity": "cs.capacity", "enrolled_count": "COUNT(ca.attendance_id)"},
+    filters={"session_id": Int(min=1), "class_name": Str(), "date": DateTime(),
+             "cost": Decimal(digits=8, places=2)},
+    sort=("date", "session_id", "class_name", "enrolled_count"),
+    default_sort="-date",
+    group_by="cs.session_id",
+    aliases={"date_from": "date__gte", "date_to": "date__lte"},
+)
+
+LIST_INVOICES = ListQuery(
+    "INVOICE",
+    columns=("invoice_id", "member_id", "trainer_id", "amount", "date_issued", "status",
+             "category", "date", "billing_period"),
+    filters={
+        "member_id": Int(min=1),
+        "status": Filter(Str(choices=INVOICE_STATUSES), ops=('eq', 'ne', 'in')),
+        "category": Str(),
+        "amount": Decimal(digits=10, places=2),
+        "date_issued": Date(),
+    },
+    sort=("date_issued", "invoice_id", "amount", "status"),
+    default_sort="-date_issued",
+    derived=MEMBER_NAMES,
+)
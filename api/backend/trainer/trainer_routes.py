@@ -1,681 +1,686 @@
 from flask import Blueprint, jsonify, request
-from backend.db_connection import db
-from mysql.connector import Error
+from backend.db_connection import DBError, db, db_error_response, retry_on_deadlock, unit_of_work
+from backend.cache import (cached_row, entity_cache, exercise_catalog, member_names, single_flight,
+                           trainer_names)
+from backend.members.goals import record_event, recompute_member_goals
+from backend.members.status_history import record_status_change
+from backend.analytics.utilization import mark_session_dirty
+from backend.analytics.volume import get_member_volume, mark_exercise_dirty, mark_log_dirty
+from backend.idempotency import idempotent
+from backend.messaging.message_hub import trainer_channel
+from backend.messaging.sse import message_stream
+from backend.tenancy import current_gym_id
+from backend.trainer import schemas
+from backend.validation import validation_error
 from flask import current_app
 
 # Create Blueprint
 trainers = Blueprint('trainers', __name__)
 
 # GET all trainers
+# Query params: fields, sort, last_name__prefix, ... (see schemas.LIST_TRAINERS)
 @trainers.route('/', methods=['GET'])
 def get_all_trainers():
     try:
         current_app.logger.info('Starting get_all_trainers request')
-        cursor = db.get_db().cursor()
-        
-        specialization = request.args.get('specialization')
-        
-        current_app.logger.debug(f'Query parameters - specialization: {specialization}')
+        listing, errors = schemas.LIST_TRAINERS.parse(request.args)
+        if errors:
+            return validation_error(errors, "Invalid query parameters")
 
-        query = "SELECT * FROM TRAINER WHERE 1=1"
-        params = []
-        
-        if specialization:
-            query += " AND specialization = %s"
-            params.append(specialization)
-        
-        current_app.logger.debug(f'Executing query: {query} with params: {params}')
-        cursor.execute(query, params)
-        trainers_list = cursor.fetchall()
-        cursor.close()
+        with unit_of_work() as cursor:
+            query, params = listing.sql("gym_id = %s", [current_gym_id()])
+
+            current_app.logger.debug(f'Executing query: {query} with params: {params}')
+            cursor.execute(query, params)
+            trainers_list = cursor.fetchall()
         
         current_app.logger.info(f'Successfully retrieved {len(trainers_list)} TRAINERS')
         return jsonify(trainers_list), 200
-    except Error as e:
-        current_app.logger.error(f'Database error in get_all_trainers: {str(e)}')
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # GET specific trainer profile
 @trainers.route('/<int:trainer_id>', methods=['GET'])
 def get_trainer(trainer_id):
     try:
-        cursor = db.get_db().cursor()
-        query = "SELECT * FROM TRAINER WHERE trainer_id = %s"
-        cursor.execute(query, (trainer_id,))
-        trainer = cursor.fetchone()
+        query = "SELECT trainer_id, first_name, last_name FROM TRAINER WHERE trainer_id = %s"
+        trainer = cached_row('trainer', trainer_id, query, (trainer_id,))
         
         if not trainer:
             return jsonify({"error": "Trainer not found"}), 404
         
-        cursor.close()
         return jsonify(trainer), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # POST - Create new trainer
 @trainers.route('/', methods=['POST'])
+@idempotent
 def create_trainer():
     try:
-        data = request.get_json()
-        
-        required_fields = ["first_name", "last_name"]
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        cursor = db.get_db().cursor()
-        
-        query = """
-        INSERT INTO TRAINER (first_name, last_name)
-        VALUES (%s, %s)
-        """
-        cursor.execute(query, (data["first_name"], data["last_name"]))
-        
-        db.get_db().commit()
-        new_trainer_id = cursor.lastrowid
-        cursor.close()
+        data, errors = schemas.CREATE_TRAINER.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+        
+        with unit_of_work() as cursor:
+            query = """
+            INSERT INTO TRAINER (gym_id, first_name, last_name)
+            VALUES (%s, %s, %s)
+            """
+            cursor.execute(query, (current_gym_id(), data["first_name"], data["last_name"]))
+
+            new_trainer_id = cursor.lastrowid
+        trainer_names.remember(new_trainer_id, data["first_name"], data["last_name"])
         
         return (
             jsonify({"message": "Trainer created successfully", "trainer_id": new_trainer_id}),
             201,
         )
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # PUT - Update trainer information
 @trainers.route('/<int:trainer_id>', methods=['PUT'])
 def update_trainer(trainer_id):
     try:
-        data = request.get_json()
-        
-        cursor = db.get_db().cursor()
-        cursor.execute("SELECT * FROM TRAINER WHERE trainer_id = %s", (trainer_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Trainer not found"}), 404
-        
-        update_fields = []
-        params = []
-        allowed_fields = ["first_name", "last_name"]
-        
-        for field in allowed_fields:
-            if field in data:
-                update_fields.append(f"{field} = %s")
-                params.append(data[field])
-        
+        data, errors = schemas.UPDATE_TRAINER.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+
+        update_fields, params = schemas.UPDATE_TRAINER.update_clause(data)
         if not update_fields:
             return jsonify({"error": "No valid fields to update"}), 400
         
-        params.append(trainer_id)
-        query = f"UPDATE TRAINER SET {', '.join(update_fields)} WHERE trainer_id = %s"
-        
-        cursor.execute(query, params)
-        db.get_db().commit()
-        cursor.close()
+        with unit_of_work() as cursor:
+            cursor.execute("SELECT trainer_id FROM TRAINER WHERE trainer_id = %s", (trainer_id,))
+            if not cursor.fetchone():
+                return jsonify({"error": "Trainer not found"}), 404
+
+            params.append(trainer_id)
+            query = f"UPDATE TRAINER SET {update_fields} WHERE trainer_id = %s"
+
+            cursor.execute(query, params)
+            trainer_names.bump_version(cursor)
+        trainer_names.invalidate()
+        entity_cache.invalidate('trainer', trainer_id)
+        # client profiles carry their trainer's name
+        entity_cache.invalidate('client_profile')
         
         return jsonify({"message": "Trainer updated successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # GET all clients for a specific trainer
+# Query params: fields, sort, status, status__in, last_name__prefix, ... (see schemas.LIST_CLIENTS)
 @trainers.route('/<int:trainer_id>/clients', methods=['GET'])
 def get_trainer_clients(trainer_id):
     try:
-        cursor = db.get_db().cursor()
-        query = """
-            SELECT member_id, first_name, last_name, status
-            FROM GYM_MEMBER
-            WHERE trainer_id = %s
-            ORDER BY last_name
-        """
-        cursor.execute(query, (trainer_id,))
-        clients = cursor.fetchall()
-        cursor.close()
+        listing, errors = schemas.LIST_CLIENTS.parse(request.args)
+        if errors:
+            return validation_error(errors, "Invalid query parameters")
+
+        with unit_of_work() as cursor:
+            query, params = listing.sql("trainer_id = %s", [trainer_id])
+            cursor.execute(query, params)
+            clients = cursor.fetchall()
         
         return jsonify(clients), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # GET specific client profile
 @trainers.route('/<int:trainer_id>/clients/<int:client_id>', methods=['GET'])
 def get_client_profile(trainer_id, client_id):
     try:
-        cursor = db.get_db().cursor()
+        # cached per member; the trainer check is done on the cached row
         query = """
-            SELECT gm.*, 
+            SELECT gm.member_id, gm.first_name, gm.last_name, gm.trainer_id,
+                   gm.nutritionist_id, gm.status, gm.joined_date,
                    t.first_name as trainer_first_name, 
                    t.last_name as trainer_last_name
             FROM GYM_MEMBER gm
             LEFT JOIN TRAINER t ON gm.trainer_id = t.trainer_id
-            WHERE gm.member_id = %s AND gm.trainer_id = %s
+            WHERE gm.member_id = %s
         """
-        cursor.execute(query, (client_id, trainer_id))
-        client = cursor.fetchone()
+        client = cached_row('client_profile', client_id, query, (client_id,))
         
-        if not client:
+        if not client or client['trainer_id'] != trainer_id:
             return jsonify({"error": "Client not found or not assigned to this trainer"}), 404
         
-        cursor.close()
         return jsonify(client), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
+
+# GET weekly training volume for a client (tonnage, per-category volume, est. 1RM)
+# Query params: weeks (default 12, max 104), category
+@trainers.route('/<int:trainer_id>/clients/<int:client_id>/volume', methods=['GET'])
+def get_client_volume(trainer_id, client_id):
+    try:
+        weeks = min(max(request.args.get('weeks', 12, type=int), 1), 104)
+
+        with unit_of_work() as cursor:
+            cursor.execute(
+                "SELECT member_id FROM GYM_MEMBER WHERE member_id = %s AND trainer_id = %s",
+                (client_id, trainer_id)
+            )
+            client = cursor.fetchone()
+
+        if not client:
+            return jsonify({"error": "Client not found or not assigned to this trainer"}), 404
+
+        volume = get_member_volume(db.get_db(), client_id, weeks, request.args.get('category'))
+        return jsonify(volume), 200
+    except DBError as e:
+        return db_error_response(e)
 
 # PUT - Update client profile
 @trainers.route('/<int:trainer_id>/clients/<int:client_id>', methods=['PUT'])
+@retry_on_deadlock
 def update_client_profile(trainer_id, client_id):
     try:
-        data = request.get_json()
-        
-        cursor = db.get_db().cursor()
-        cursor.execute(
-            "SELECT * FROM GYM_MEMBER WHERE member_id = %s AND trainer_id = %s", 
-            (client_id, trainer_id)
-        )
-        if not cursor.fetchone():
-            return jsonify({"error": "Client not found or not assigned to this trainer"}), 404
-        
-        update_fields = []
-        params = []
-        allowed_fields = ["first_name", "last_name", "status"]
-        
-        for field in allowed_fields:
-            if field in data:
-                update_fields.append(f"{field} = %s")
-                params.append(data[field])
-        
+        data, errors = schemas.UPDATE_CLIENT_PROFILE.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+
+        update_fields, params = schemas.UPDATE_CLIENT_PROFILE.update_clause(data)
         if not update_fields:
             return jsonify({"error": "No valid fields to update"}), 400
-        
-        params.append(client_id)
-        query = f"UPDATE GYM_MEMBER SET {', '.join(update_fields)} WHERE member_id = %s"
-        
-        cursor.execute(query, params)
-        db.get_db().commit()
-        cursor.close()
+        renamed = "first_name" in data or "last_name" in data
+        
+        with unit_of_work() as cursor:
+            cursor.execute(
+                "SELECT member_id FROM GYM_MEMBER WHERE member_id = %s AND trainer_id = %s", 
+                (client_id, trainer_id)
+            )
+            if not cursor.fetchone():
+                return jsonify({"error": "Client not found or not assigned to this trainer"}), 404
+
+            params.append(client_id)
+            query = f"UPDATE GYM_MEMBER SET {update_fields} WHERE member_id = %s"
+
+            if "status" in data:
+                record_status_change(cursor, client_id, data["status"])
+            cursor.execute(query, params)
+            if renamed:
+                member_names.bump_version(cursor)
+        if renamed:
+            member_names.invalidate()
+        entity_cache.invalidate('client_profile', client_id)
         
         return jsonify({"message": "Client profile updated successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # GET workout plans created by trainer
+# Query params: fields, sort, member_id, date__gte, ... (see schemas.LIST_WORKOUT_PLANS)
 @trainers.route('/<int:trainer_id>/workout-plans', methods=['GET'])
 def get_trainer_workout_plans(trainer_id):
     try:
-        cursor = db.get_db().cursor()
-        
-        member_id = request.args.get('member_id')
-        
-        query = """
-            SELECT wp.*, gm.first_name, gm.last_name
-            FROM WORKOUT_PLAN wp
-            JOIN GYM_MEMBER gm ON wp.member_id = gm.member_id
-            WHERE gm.trainer_id = %s
-        """
-        params = [trainer_id]
-        
-        if member_id:
-            query += " AND wp.member_id = %s"
-            params.append(member_id)
-        
-        query += " ORDER BY wp.date DESC"
-        
-        cursor.execute(query, params)
-        plans = cursor.fetchall()
-        cursor.close()
+        listing, errors = schemas.LIST_WORKOUT_PLANS.parse(request.args)
+        if errors:
+            return validation_error(errors, "Invalid query parameters")
+
+        with unit_of_work() as cursor:
+            query, params = listing.sql("gm.trainer_id = %s", [trainer_id])
+            cursor.execute(query, params)
+            plans = cursor.fetchall()
         
         return jsonify(plans), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # POST - Create workout plan
 @trainers.route('/<int:trainer_id>/workout-plans', methods=['POST'])
+@idempotent
 def create_trainer_workout_plan(trainer_id):
     try:
-        data = request.get_json()
-        
-        required_fields = ["member_id", "goals", "plan_date"]
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        cursor = db.get_db().cursor()
-        cursor.execute(
-            "SELECT * FROM GYM_MEMBER WHERE member_id = %s AND trainer_id = %s",
-            (data["member_id"], trainer_id)
-        )
-        if not cursor.fetchone():
-            return jsonify({"error": "Client not assigned to this trainer"}), 403
-        
-        query = """
-        INSERT INTO WORKOUT_PLAN (member_id, goals, date)
-        VALUES (%s, %s, %s)
-        """
-        cursor.execute(
-            query,
-            (
-                data["member_id"],
-                data["goals"],
-                data["plan_date"],
-            ),
-        )
-        
-        db.get_db().commit()
-        new_plan_id = cursor.lastrowid
-        cursor.close()
+        data, errors = schemas.CREATE_WORKOUT_PLAN.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+        
+        with unit_of_work() as cursor:
+            cursor.execute(
+                "SELECT member_id FROM GYM_MEMBER WHERE member_id = %s AND trainer_id = %s",
+                (data["member_id"], trainer_id)
+            )
+            if not cursor.fetchone():
+                return jsonify({"error": "Client not assigned to this trainer"}), 403
+
+            query = """
+            INSERT INTO WORKOUT_PLAN (member_id, goals, date)
+            VALUES (%s, %s, %s)
+            """
+            cursor.execute(
+                query,
+                (
+                    data["member_id"],
+                    data["goals"],
+                    data["plan_date"],
+                ),
+            )
+
+            new_plan_id = cursor.lastrowid
         
         return (
             jsonify({"message": "Workout plan created successfully", "plan_id": new_plan_id}),
             201,
         )
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # PUT - Update workout plan
 @trainers.route('/workout-plans/<int:plan_id>', methods=['PUT'])
 def update_trainer_workout_plan(plan_id):
     try:
-        data = request.get_json()
-        
-        cursor = db.get_db().cursor()
-        cursor.execute("SELECT * FROM WORKOUT_PLAN WHERE plan_id = %s", (plan_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Workout plan not found"}), 404
-        
-        update_fields = []
-        params = []
-        allowed_fields = ["goals", "date"]
-        
-        for field in allowed_fields:
-            if field in data:
-                update_fields.append(f"{field} = %s")
-                if field == "date" and "plan_date" in data:
-                    params.append(data["plan_date"])
-                else:
-                    params.append(data[field])
-        
+        data, errors = schemas.UPDATE_WORKOUT_PLAN.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+
+        update_fields, params = schemas.UPDATE_WORKOUT_PLAN.update_clause(data)
         if not update_fields:
             return jsonify({"error": "No valid fields to update"}), 400
         
-        params.append(plan_id)
-        query = f"UPDATE WORKOUT_PLAN SET {', '.join(update_fields)} WHERE plan_id = %s"
-        
-        cursor.execute(query, params)
-        db.get_db().commit()
-        cursor.close()
+        with unit_of_work() as cursor:
+            cursor.execute("SELECT plan_id FROM WORKOUT_PLAN WHERE plan_id = %s", (plan_id,))
+            if not cursor.fetchone():
+                return jsonify({"error": "Workout plan not found"}), 404
+
+            params.append(plan_id)
+            query = f"UPDATE WORKOUT_PLAN SET {update_fields} WHERE plan_id = %s"
+
+            cursor.execute(query, params)
+        entity_cache.invalidate('workout_plan', plan_id)
         
         return jsonify({"message": "Workout plan updated successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # GET workout logs for trainer's clients
+# Query params: fields, sort, member_id, date__gte, ... (see schemas.LIST_WORKOUT_LOGS)
 @trainers.route('/<int:trainer_id>/workout-logs', methods=['GET'])
+@single_flight.coalesce
 def get_trainer_workout_logs(trainer_id):
     try:
-        cursor = db.get_db().cursor()
-        
-        member_id = request.args.get('member_id')
-        
-        query = """
-            SELECT wl.*, gm.first_name, gm.last_name
-            FROM WORKOUT_LOG wl
-            JOIN GYM_MEMBER gm ON wl.member_id = gm.member_id
-            WHERE wl.trainer_id = %s
-        """
-        params = [trainer_id]
-        
-        if member_id:
-            query += " AND wl.member_id = %s"
-            params.append(member_id)
-        
-        query += " ORDER BY wl.date DESC"
-        
-        cursor.execute(query, params)
-        logs = cursor.fetchall()
-        cursor.close()
-        
-        return jsonify(logs), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+        listing, errors = schemas.LIST_WORKOUT_LOGS.parse(request.args)
+        if errors:
+            return validation_error(errors, "Invalid query parameters")
+
+        with unit_of_work() as cursor:
+            query, params = listing.sql("trainer_id = %s", [trainer_id])
+            cursor.execute(query, params)
+            logs = cursor.fetchall()
+        if listing.wants('first_name', 'last_name'):
+            member_names.decorate(db.get_db(), logs, 'member_id')
+        
+        return jsonify(listing.project(logs)), 200
+    except DBError as e:
+        return db_error_response(e)
 
 # POST - Record workout log
 @trainers.route('/<int:trainer_id>/workout-logs', methods=['POST'])
+@idempotent
 def create_trainer_workout_log(trainer_id):
     try:
-        data = request.get_json()
-        
-        required_fields = ["member_id", "workout_date"]
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        cursor = db.get_db().cursor()
-        cursor.execute(
-            "SELECT * FROM GYM_MEMBER WHERE member_id = %s AND trainer_id = %s",
-            (data["member_id"], trainer_id)
-        )
-        if not cursor.fetchone():
-            return jsonify({"error": "Client not assigned to this trainer"}), 403
-        
-        query = """
-        INSERT INTO WORKOUT_LOG (member_id, trainer_id, date, notes, sessions)
-        VALUES (%s, %s, %s, %s, %s)
-        """
-        cursor.execute(
-            query,
-            (
-                data["member_id"],
-                trainer_id,
-                data["workout_date"],
-                data.get("notes"),
-                data.get("sessions", 1),
-            ),
-        )
-        
-        db.get_db().commit()
-        new_log_id = cursor.lastrowid
-        cursor.close()
+        data, errors = schemas.CREATE_WORKOUT_LOG.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+        
+        with unit_of_work() as cursor:
+            cursor.execute(
+                "SELECT member_id FROM GYM_MEMBER WHERE member_id = %s AND trainer_id = %s",
+                (data["member_id"], trainer_id)
+            )
+            if not cursor.fetchone():
+                return jsonify({"error": "Client not assigned to this trainer"}), 403
+
+            query = """
+            INSERT INTO WORKOUT_LOG (member_id, trainer_id, date, notes, sessions)
+            VALUES (%s, %s, %s, %s, %s)
+            """
+            cursor.execute(
+                query,
+                (
+                    data["member_id"],
+                    trainer_id,
+                    data["workout_date"],
+                    data.get("notes"),
+                    data["sessions"],
+                ),
+            )
+
+            new_log_id = cursor.lastrowid
+            record_event(cursor, 'WORKOUT_LOG', data["member_id"], data["workout_date"], data)
         
         return (
             jsonify({"message": "Workout log recorded successfully", "log_id": new_log_id}),
             201,
         )
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # PUT - Update workout log
 @trainers.route('/workout-logs/<int:log_id>', methods=['PUT'])
+@retry_on_deadlock
 def update_workout_log(log_id):
     try:
-        data = request.get_json()
-        
-        cursor = db.get_db().cursor()
-        cursor.execute("SELECT * FROM WORKOUT_LOG WHERE log_id = %s", (log_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Workout log not found"}), 404
-        
-        update_fields = []
-        params = []
-        allowed_fields = ["notes", "sessions", "date"]
-        
-        for field in allowed_fields:
-            if field in data:
-                update_fields.append(f"{field} = %s")
-                if field == "date" and "workout_date" in data:
-                    params.append(data["workout_date"])
-                else:
-                    params.append(data.get(field))
-        
+        data, errors = schemas.UPDATE_WORKOUT_LOG.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+
+        update_fields, params = schemas.UPDATE_WORKOUT_LOG.update_clause(data)
         if not update_fields:
             return jsonify({"error": "No valid fields to update"}), 400
         
-        params.append(log_id)
-        query = f"UPDATE WORKOUT_LOG SET {', '.join(update_fields)} WHERE log_id = %s"
-        
-        cursor.execute(query, params)
-        db.get_db().commit()
-        cursor.close()
+        with unit_of_work() as cursor:
+            cursor.execute("SELECT log_id, member_id FROM WORKOUT_LOG WHERE log_id = %s", (log_id,))
+            log = cursor.fetchone()
+            if not log:
+                return jsonify({"error": "Workout log not found"}), 404
+
+            params.append(log_id)
+            query = f"UPDATE WORKOUT_LOG SET {update_fields} WHERE log_id = %s"
+
+            # a date change moves the log's exercises to another volume week
+            mark_log_dirty(cursor, log_id)
+            cursor.execute(query, params)
+            mark_log_dirty(cursor, log_id)
+            recompute_member_goals(cursor, 'WORKOUT_LOG', log["member_id"])
         
         return jsonify({"message": "Workout log updated successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # DELETE - Delete workout log
 @trainers.route('/workout-logs/<int:log_id>', methods=['DELETE'])
+@retry_on_deadlock
 def delete_workout_log(log_id):
     try:
-        cursor = db.get_db().cursor()
-        cursor.execute("DELETE FROM WORKOUT_LOG WHERE log_id = %s", (log_id,))
-        db.get_db().commit()
-        cursor.close()
+        with unit_of_work() as cursor:
+            cursor.execute("SELECT member_id FROM WORKOUT_LOG WHERE log_id = %s", (log_id,))
+            log = cursor.fetchone()
+            mark_log_dirty(cursor, log_id)
+            cursor.execute("DELETE FROM WORKOUT_LOG WHERE log_id = %s", (log_id,))
+            if log:
+                recompute_member_goals(cursor, 'WORKOUT_LOG', log["member_id"])
         
         return jsonify({"message": "Workout log deleted successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
+
+# EXERCISE catalog commands
+# GET all exercises (served from the in-process catalog cache)
+@trainers.route('/exercises', methods=['GET'])
+def get_exercises():
+    try:
+        exercises = sorted(exercise_catalog.all(db.get_db()), key=lambda e: e['exercise_id'])
+        return jsonify(exercises), 200
+    except DBError as e:
+        return db_error_response(e)
+
+# POST - Add an exercise to the catalog
+# Required fields: category
+@trainers.route('/exercises', methods=['POST'])
+@idempotent
+@retry_on_deadlock
+def create_exercise():
+    try:
+        data, errors = schemas.CREATE_EXERCISE.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+
+        with unit_of_work() as cursor:
+            cursor.execute(
+                "INSERT INTO EXERCISE (category, sets, reps, weight) VALUES (%s, %s, %s, %s)",
+                (data["category"], data.get("sets"), data.get("reps"), data.get("weight")),
+            )
+            new_exercise_id = cursor.lastrowid
+            exercise_catalog.bump_version(cursor)
+        exercise_catalog.invalidate()
+
+        return (
+            jsonify({"message": "Exercise created successfully", "exercise_id": new_exercise_id}),
+            201,
+        )
+    except DBError as e:
+        return db_error_response(e)
+
+# PUT - Update an exercise
+@trainers.route('/exercises/<int:exercise_id>', methods=['PUT'])
+@retry_on_deadlock
+def update_exercise(exercise_id):
+    try:
+        data, errors = schemas.UPDATE_EXERCISE.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+
+        update_fields, params = schemas.UPDATE_EXERCISE.update_clause(data)
+        if not update_fields:
+            return jsonify({"error": "No valid fields to update"}), 400
+
+        with unit_of_work() as cursor:
+            cursor.execute("SELECT exercise_id FROM EXERCISE WHERE exercise_id = %s", (exercise_id,))
+            if not cursor.fetchone():
+                return jsonify({"error": "Exercise not found"}), 404
+
+            params.append(exercise_id)
+            cursor.execute(f"UPDATE EXERCISE SET {update_fields} WHERE exercise_id = %s", params)
+            exercise_catalog.bump_version(cursor)
+            mark_exercise_dirty(cursor, exercise_id)
+        exercise_catalog.invalidate()
+
+        return jsonify({"message": "Exercise updated successfully"}), 200
+    except DBError as e:
+        return db_error_response(e)
 
 # GET sessions for a trainer
+# Query params: fields, sort, date_from, date_to, class_name, ... (see schemas.LIST_SESSIONS)
 @trainers.route('/<int:trainer_id>/sessions', methods=['GET'])
+@single_flight.coalesce
 def get_trainer_sessions(trainer_id):
     try:
-        cursor = db.get_db().cursor()
-        
-        date_from = request.args.get('date_from')
-        date_to = request.args.get('date_to')
-        
-        query = """
-            SELECT cs.*, 
-                   COUNT(ca.attendance_id) as enrolled_count
-            FROM CLASS_SESSION cs
-            LEFT JOIN CLASS_ATTENDANCE ca ON cs.session_id = ca.session_id
-            WHERE cs.trainer_id = %s
-        """
-        params = [trainer_id]
-        
-        if date_from:
-            query += " AND cs.date >= %s"
-            params.append(date_from)
-        if date_to:
-            query += " AND cs.date <= %s"
-            params.append(date_to)
-        
-        query += " GROUP BY cs.session_id ORDER BY cs.date DESC"
-        
-        cursor.execute(query, params)
-        sessions = cursor.fetchall()
-        cursor.close()
+        listing, errors = schemas.LIST_SESSIONS.parse(request.args)
+        if errors:
+            return validation_error(errors, "Invalid query parameters")
+
+        with unit_of_work() as cursor:
+            query, params = listing.sql("cs.trainer_id = %s", [trainer_id])
+            cursor.execute(query, params)
+            sessions = cursor.fetchall()
         
         return jsonify(sessions), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # POST - Create session
 @trainers.route('/<int:trainer_id>/sessions', methods=['POST'])
+@idempotent
+@retry_on_deadlock
 def create_session(trainer_id):
     try:
-        data = request.get_json()
-        
-        required_fields = ["class_name", "session_date"]
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        cursor = db.get_db().cursor()
-        
-        query = """
-        INSERT INTO CLASS_SESSION (trainer_id, class_name, date, cost)
-        VALUES (%s, %s, %s, %s)
-        """
-        cursor.execute(
-            query,
-            (
-                trainer_id,
-                data["class_name"],
-                data["session_date"],
-                data.get("cost"),
-            ),
-        )
-        
-        db.get_db().commit()
-        new_session_id = cursor.lastrowid
-        cursor.close()
+        data, errors = schemas.CREATE_SESSION.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+        
+        with unit_of_work() as cursor:
+            query = """
+            INSERT INTO CLASS_SESSION (gym_id, trainer_id, class_name, date, cost, capacity)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """
+            cursor.execute(
+                query,
+                (
+                    current_gym_id(),
+                    trainer_id,
+                    data["class_name"],
+                    data["session_date"],
+                    data.get("cost"),
+                    data["capacity"],
+                ),
+            )
+            new_session_id = cursor.lastrowid
+            # sessions may be added for days already rolled up
+            mark_session_dirty(cursor, new_session_id)
         
         return (
             jsonify({"message": "Session created successfully", "session_id": new_session_id}),
             201,
         )
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # PUT - Update session
 @trainers.route('/sessions/<int:session_id>', methods=['PUT'])
+@retry_on_deadlock
 def update_session(session_id):
     try:
-        data = request.get_json()
-        
-        cursor = db.get_db().cursor()
-        cursor.execute("SELECT * FROM CLASS_SESSION WHERE session_id = %s", (session_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Session not found"}), 404
-        
-        update_fields = []
-        params = []
-        allowed_fields = ["class_name", "date", "cost"]
-        
-        for field in allowed_fields:
-            if field in data:
-                update_fields.append(f"{field} = %s")
-                if field == "date" and "session_date" in data:
-                    params.append(data["session_date"])
-                else:
-                    params.append(data.get(field))
-        
+        data, errors = schemas.UPDATE_SESSION.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+
+        update_fields, params = schemas.UPDATE_SESSION.update_clause(data)
         if not update_fields:
             return jsonify({"error": "No valid fields to update"}), 400
         
-        params.append(session_id)
-        query = f"UPDATE CLASS_SESSION SET {', '.join(update_fields)} WHERE session_id = %s"
-        
-        cursor.execute(query, params)
-        db.get_db().commit()
-        cursor.close()
+        with unit_of_work() as cursor:
+            cursor.execute("SELECT session_id FROM CLASS_SESSION WHERE session_id = %s", (session_id,))
+            if not cursor.fetchone():
+                return jsonify({"error": "Session not found"}), 404
+
+            params.append(session_id)
+            query = f"UPDATE CLASS_SESSION SET {update_fields} WHERE session_id = %s"
+
+            # the session's old and new day both need a fresh utilization rollup
+            mark_session_dirty(cursor, session_id)
+            cursor.execute(query, params)
+            mark_session_dirty(cursor, session_id)
         
         return jsonify({"message": "Session updated successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # DELETE - Cancel session
 @trainers.route('/sessions/<int:session_id>', methods=['DELETE'])
+@retry_on_deadlock
 def cancel_session(session_id):
     try:
-        cursor = db.get_db().cursor()
-        
-        cursor.execute("DELETE FROM CLASS_ATTENDANCE WHERE session_id = %s", (session_id,))
-        cursor.execute("DELETE FROM CLASS_SESSION WHERE session_id = %s", (session_id,))
-        
-        db.get_db().commit()
-        cursor.close()
+        with unit_of_work() as cursor:
+            mark_session_dirty(cursor, session_id)
+            cursor.execute("DELETE FROM CLASS_ATTENDANCE WHERE session_id = %s", (session_id,))
+            cursor.execute("DELETE FROM CLASS_SESSION WHERE session_id = %s", (session_id,))
         
         return jsonify({"message": "Session cancelled successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # GET invoices for trainer
+# Query params: fields, sort, status, status__in, member_id, ... (see schemas.LIST_INVOICES)
 @trainers.route('/<int:trainer_id>/invoices', methods=['GET'])
 def get_trainer_invoices(trainer_id):
     try:
-        cursor = db.get_db().cursor()
-        
-        status = request.args.get('status')
-        
-        query = """
-            SELECT i.*, gm.first_name, gm.last_name
-            FROM INVOICE i
-            JOIN GYM_MEMBER gm ON i.member_id = gm.member_id
-            WHERE i.trainer_id = %s
-        """
-        params = [trainer_id]
-        
-        if status:
-            query += " AND i.status = %s"
-            params.append(status)
-        
-        query += " ORDER BY i.date_issued DESC"
-        
-        cursor.execute(query, params)
-        invoices = cursor.fetchall()
-        cursor.close()
-        
-        return jsonify(invoices), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+        listing, errors = schemas.LIST_INVOICES.parse(request.args)
+        if errors:
+            return validation_error(errors, "Invalid query parameters")
+
+        with unit_of_work() as cursor:
+            query, params = listing.sql("trainer_id = %s", [trainer_id])
+            cursor.execute(query, params)
+            invoices = cursor.fetchall()
+        if listing.wants('first_name', 'last_name'):
+            member_names.decorate(db.get_db(), invoices, 'member_id')
+        
+        return jsonify(listing.project(invoices)), 200
+    except DBError as e:
+        return db_error_response(e)
 
 # POST - Create invoice
 @trainers.route('/<int:trainer_id>/invoices', methods=['POST'])
+@idempotent
 def create_invoice(trainer_id):
     try:
-        data = request.get_json()
-        
-        required_fields = ["member_id", "amount", "invoice_date", "category"]
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        cursor = db.get_db().cursor()
-        
-        query = """
-        INSERT INTO INVOICE (member_id, trainer_id, amount, date_issued, status, category, date)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(
-            query,
-            (
-                data["member_id"],
-                trainer_id,
-                data["amount"],
-                data["invoice_date"],
-                data.get("status", "pending"),
-                data["category"],
-                data["invoice_date"],
-            ),
-        )
-        
-        db.get_db().commit()
-        new_invoice_id = cursor.lastrowid
-        cursor.close()
+        data, errors = schemas.CREATE_INVOICE.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+        
+        with unit_of_work() as cursor:
+            cursor.execute(
+                "SELECT member_id FROM GYM_MEMBER WHERE member_id = %s AND trainer_id = %s",
+                (data["member_id"], trainer_id)
+            )
+            if not cursor.fetchone():
+                return jsonify({"error": "Client not assigned to this trainer"}), 403
+
+            query = """
+            INSERT INTO INVOICE (gym_id, member_id, trainer_id, amount, date_issued, status, category, date)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """
+            cursor.execute(
+                query,
+                (
+                    current_gym_id(),
+                    data["member_id"],
+                    trainer_id,
+                    data["amount"],
+                    data["invoice_date"],
+                    data["status"],
+                    data["category"],
+                    data["invoice_date"],
+                ),
+            )
+
+            new_invoice_id = cursor.lastrowid
         
         return (
             jsonify({"message": "Invoice created successfully", "invoice_id": new_invoice_id}),
             201,
         )
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # PUT - Update invoice status
 @trainers.route('/invoices/<int:invoice_id>', methods=['PUT'])
 def update_invoice(invoice_id):
     try:
-        data = request.get_json()
-        
-        cursor = db.get_db().cursor()
-        cursor.execute("SELECT * FROM INVOICE WHERE invoice_id = %s", (invoice_id,))
-        if not cursor.fetchone():
-            return jsonify({"error": "Invoice not found"}), 404
-        
-        update_fields = []
-        params = []
-        allowed_fields = ["status", "amount", "category"]
-        
-        for field in allowed_fields:
-            if field in data:
-                update_fields.append(f"{field} = %s")
-                params.append(data[field])
-        
+        data, errors = schemas.UPDATE_INVOICE.load(request.get_json(silent=True))
+        if errors:
+            return validation_error(errors)
+
+        update_fields, params = schemas.UPDATE_INVOICE.update_clause(data)
         if not update_fields:
             return jsonify({"error": "No valid fields to update"}), 400
         
-        params.append(invoice_id)
-        query = f"UPDATE INVOICE SET {', '.join(update_fields)} WHERE invoice_id = %s"
-        
-        cursor.execute(query, params)
-        db.get_db().commit()
-        cursor.close()
+        with unit_of_work() as cursor:
+            cursor.execute("SELECT invoice_id FROM INVOICE WHERE invoice_id = %s", (invoice_id,))
+            if not cursor.fetchone():
+                return jsonify({"error": "Invoice not found"}), 404
+
+            params.append(invoice_id)
+            query = f"UPDATE INVOICE SET {update_fields} WHERE invoice_id = %s"
+
+            cursor.execute(query, params)
         
         return jsonify({"message": "Invoice updated successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
+    except DBError as e:
+        return db_error_response(e)
 
 # DELETE - Void invoice
 @trainers.route('/invoices/<int:invoice_id>', methods=['DELETE'])
 def void_invoice(invoice_id):
     try:
-        cursor = db.get_db().cursor()
-        
-        cursor.execute(
-            "UPDATE INVOICE SET status = 'voided' WHERE invoice_id = %s", 
-            (invoice_id,)
-        )
-        
-        db.get_db().commit()
-        cursor.close()
+        with unit_of_work() as cursor:
+            cursor.execute(
+                "UPDATE INVOICE SET status = 'voided' WHERE invoice_id = %s", 
+                (invoice_id,)
+            )
         
         return jsonify({"message": "Invoice voided successfully"}), 200
-    except Error as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+    except DBError as e:
+        return db_error_response(e)
+
+# GET live stream of new messages from a trainer's clients (Server-Sent Events)
+# Reconnecting clients send Last-Event-ID to receive what they missed
+@trainers.route('/<int:trainer_id>/messages/stream', methods=['GET'])
+def stream_trainer_messages(trainer_id):
+    try:
+        return message_stream(trainer_channel(current_gym_id(), trainer_id), "trainer_id = %s", (trainer_id,))
+    except DBError as e:
+        return db_error_response(e)
@@ -0,0 +1,29 @@
+#------------------------------------------------------------
+# Request body validation (see schema.py). Each blueprint keeps
+# its schemas in a schemas.py next to its routes:
+#
+#   data, errors = schemas.CREATE_X.load(request.get_json(silent=True))
+#   if errors:
+#       return validation_error(errors)
+#
+# List routes declare their query strings the same way (see
+# listing.py):
+#
+#   listing, errors = schemas.LIST_X.parse(request.args)
+#   if errors:
+#       return validation_error(errors, "Invalid query parameters")
+#------------------------------------------------------------
+from flask import jsonify
+
+from backend.metrics import metrics
+from backend.validation.schema import (Date, DateTime, Decimal, Field, Int, Invalid,
+                                       List, Schema, Str)
+from backend.validation.listing import Filter, ListQuery
+
+
+def validation_error(errors, message="Invalid request body"):
+    """400 naming every field (or query parameter) that failed and why."""
+    metrics.incr("validation.rejected")
+    response = jsonify({"error": message, "error_type": "validation", "fields": errors})
+    response.status_code = 400
+    return response
@@ -0,0 +1,247 @@
+#------------------------------------------------------------
+# Declarative query strings for list routes: projection,
+# sorting and filtering, translated to one SQL statement.
+#
+#   LIST_WORKOUT_PLANS = ListQuery(
+#       "WORKOUT_PLAN wp JOIN GYM_MEMBER gm ON wp.member_id = gm.member_id",
+#       columns={"plan_id": "wp.plan_id", "date": "wp.date", ...},
+#       filters={"member_id": Int(min=1), "date": Date()},
+#       sort=("date", "plan_id"),
+#       default_sort="-date",
+#   )
+#
+#   listing, errors = schemas.LIST_WORKOUT_PLANS.parse(request.args)
+#   if errors:
+#       return validation_error(errors, "Invalid query parameters")
+#   query, params = listing.sql("gm.trainer_id = %s", [trainer_id])
+#
+# Clients then choose, for example,
+#
+#   ?fields=plan_id,date,goals           only these columns
+#   &sort=-date,plan_id                  "-" for descending
+#   &member_id=7  &date__gte=2025-01-01  filters, field__op=value
+#
+# Only declared columns can be selected or sorted on and only
+# declared filters with their operators are accepted, so every
+# identifier in the SQL comes from this file; values are always
+# bound parameters, converted by the filter's validation Field
+# (an Int filter rejects "abc" with a 400 instead of a full scan).
+# Filters are plain comparisons on columns, so they use the
+# table's indexes. Query parameters the list doesn't know (expand,
+# since, ...) are left to the route.
+#
+# derived= names output fields the route fills in after the query
+# (member names from backend.cache.member_names, ...) and the column
+# each needs; the SELECT then reads that column instead:
+#
+#   rows = cursor.fetchall()
+#   if listing.wants('first_name', 'last_name'):
+#       member_names.decorate(db.get_db(), rows, 'member_id')
+#   return jsonify(listing.project(rows)), 200
+#------------------------------------------------------------
+from backend.validation.schema import Invalid, Str
+
+# operator -> SQL template; the value placeholder(s) go in {}
+OPERATORS = {
+    'eq': "{column} = {value}",
+    'ne': "{column} <> {value}",
+    'gt': "{column} > {value}",
+    'gte': "{column} >= {value}",
+    'lt': "{column} < {value}",
+    'lte': "{column} <= {value}",
+    'in': "{column} IN ({value})",
+    'prefix': "{column} LIKE {value}",
+}
+# default operators: ids are looked up, values compared, text matched
+KEY_OPERATORS = ('eq', 'in')
+COMPARISONS = ('eq', 'gt', 'gte', 'lt', 'lte', 'in')
+TEXT_OPERATORS = ('eq', 'in', 'prefix')
+
+MAX_IN_VALUES = 100
+SEPARATOR = '__'
+
+
+class Filter:
+    """One filterable column: its validation Field and allowed operators."""
+
+    def __init__(self, field, ops=None, column=None):
+        self.field = field
+        self.ops = tuple(ops) if ops is not None else None
+        self.column = column
+
+    def default_ops(self, name):
+        if name.endswith('_id'):
+            return KEY_OPERATORS
+        return TEXT_OPERATORS if isinstance(self.field, Str) else COMPARISONS
+
+
+class Listing:
+    """A parsed list query string."""
+
+    def __init__(self, query, fields, conditions, params, order):
+        self._query = query
+        self.fields = fields
+        self.conditions = conditions
+        self.params = params
+        self.order = order
+
+    def wants(self, *names):
+        """Whether any of these (derived) fields was asked for."""
+        return any(name in self.fields for name in names)
+
+    def _selected(self):
+        """Requested columns, plus the ones derived fields are computed from."""
+        columns = self._query.columns
+        derived = self._query.derived
+        names = [name for name in self.fields if name in columns]
+        for name in self.fields:
+            if name in derived and derived[name] not in names:
+                names.append(derived[name])
+        return names
+
+    def sql(self, where=None, params=()):
+        """(SELECT statement, params); where/params are the route's own conditions."""
+        query = self._query
+        select = ", ".join(
+            column if column == name or column.endswith(f".{name}") else f"{column} AS {name}"
+            for name, column in ((name, query.columns[name]) for name in self._selected())
+        )
+        conditions = ([where] if where else []) + self.conditions
+        sql = f"SELECT {select} FROM {query.source}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if query.group_by:
+            sql += f" GROUP BY {query.group_by}"
+        if self.order:
+            sql += " ORDER BY " + ", ".join(self.order)
+        return sql, list(params) + self.params
+
+    def project(self, rows):
+        """rows without the columns only read for derived fields (or filled in unasked); returns rows."""
+        extra = [name for name in self._selected() + list(self._query.derived) if name not in self.fields]
+        for row in rows:
+            for name in extra:
+                row.pop(name, None)
+        return rows
+
+
+class ListQuery:
+    def __init__(self, source, columns, filters=None, sort=(), default_sort=None,
+                 group_by=None, aliases=None, derived=None):
+        """
+        source: the FROM clause; columns: output name -> SQL expression
+        (or just the names, when they are the table's own columns);
+        filters: name -> Field or Filter (column defaults to columns[name];
+        operators default to eq/in for *_id, eq/in/prefix for Str, else
+        comparisons);
+        sort: names clients may sort on; aliases: old parameter -> "name__op";
+        derived: field the route fills in -> the column it is computed from.
+        """
+        self.source = source
+        self.columns = dict(columns) if isinstance(columns, dict) else {name: name for name in columns}
+        self.filters = {}
+        for name, spec in (filters or {}).items():
+            spec = spec if isinstance(spec, Filter) else Filter(spec)
+            if spec.ops is None:
+                spec.ops = spec.default_ops(name)
+            self.filters[name] = spec
+        self.checks = {name: spec.field.compile(name) for name, spec in self.filters.items()}
+        self.sortable = tuple(sort)
+        self.default_sort = default_sort
+        self.group_by = group_by
+        self.aliases = dict(aliases or {})
+        self.derived = dict(derived or {})
+        self.fields = list(self.columns) + [name for name in self.derived if name not in self.columns]
+
+    def parse(self, args):
+        """(Listing, None) or (None, {parameter: message}). args is request.args (a MultiDict)."""
+        errors = {}
+        fields = self._parse_fields(args.get('fields'), errors)
+        order = self._parse_sort(args.get('sort') or self.default_sort, errors)
+
+        conditions = []
+        params = []
+        for key in args:
+            name, _, op = (self.aliases.get(key) or key).partition(SEPARATOR)
+            if name not in self.filters:
+                continue
+            op = op or 'eq'
+            # ?status__in=a,b and ?status__in=a&status__in=b are the same
+            raw = ','.join(args.getlist(key)) if op == 'in' else args.get(key)
+            try:
+                condition, values = self._condition(name, op, raw)
+            except Invalid as e:
+                errors[key] = str(e)
+                continue
+            conditions.append(condition)
+            params.extend(values)
+
+        if errors:
+            return None, errors
+        return Listing(self, fields, conditions, params, order), None
+
+    def _parse_fields(self, value, errors):
+        if not value:
+            return list(self.fields)
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown or not names:
+            errors['fields'] = f"must be a comma-separated list of: {', '.join(self.fields)}"
+            return None
+        # keep the requested order, once each
+        return list(dict.fromkeys(names))
+
+    def _parse_sort(self, value, errors):
+        if not value:
+            return []
+        order = []
+        for item in value.split(','):
+            item = item.strip()
+            name = item.lstrip('-')
+            if name not in self.sortable:
+                errors['sort'] = f"must be a comma-separated list of: {', '.join(self.sortable)} (prefix - for descending)"
+                return None
+            order.append(f"{self.columns[name]} {'DESC' if item.startswith('-') else 'ASC'}")
+        return order
+
+    def _condition(self, name, op, raw):
+        spec = self.filters[name]
+        if op not in spec.ops:
+            raise Invalid(f"operator must be one of: {', '.join(spec.ops)}")
+        check = self.checks[name]
+        column = spec.column or self.columns[name]
+
+        if op == 'in':
+            items = [item.strip() for item in raw.split(',') if item.strip()]
+            if not items or len(items) > MAX_IN_VALUES:
+                raise Invalid(f"must be a comma-separated list of 1 to {MAX_IN_VALUES} values")
+            values = [check(item) for item in items]
+            placeholder = ", ".join(["%s"] * len(values))
+        elif op == 'prefix':
+            value = check(raw)
+            # match the prefix literally: % and _ typed by the client are not wildcards
+            values = [value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%']
+            placeholder = "%s"
+        else:
+            values = [check(raw)]
+            placeholder = "%s"
+        return OPERATORS[op].format(column=column, value=placeholder), values
+
+    def parameters(self):
+        """(name, Field, description) for each query parameter parse() accepts (OpenAPI)."""
+        params = [
+            ('fields', None, f"Comma-separated columns to return: {', '.join(self.fields)}"),
+        ]
+        if self.sortable:
+            params.append(('sort', None, f"Comma-separated sort columns, - for descending: "
+                                         f"{', '.join(self.sortable)}"
+                                         + (f" (default {self.default_sort})" if self.default_sort else "")))
+        for name, spec in self.filters.items():
+            for op in spec.ops:
+                key = name if op == 'eq' else f"{name}{SEPARATOR}{op}"
+                description = "Comma-separated values" if op == 'in' else None
+                params.append((key, None if op in ('in', 'prefix') else spec.field, description))
+        for alias, target in self.aliases.items():
+            name = target.partition(SEPARATOR)[0]
+            params.append((alias, self.filters[name].field, f"Same as {target}"))
+        return params
@@ -0,0 +1,304 @@
+#------------------------------------------------------------
+# Declarative request body schemas.
+#
+#   CREATE_FOOD_LOG = Schema({
+#       "member_id": Int(required=True, min=1),
+#       "calories":  Int(min=0),
+#       "log_timestamp": DateTime(required=True, column="timestamp"),
+#   })
+#
+#   data, errors = CREATE_FOOD_LOG.load(request.get_json(silent=True))
+#
+# A Schema is compiled when the module is imported: each field
+# becomes one converter function, so load() is a single pass over
+# those with no per-request interpretation. Values are coerced to
+# what the column holds (ints from numeric strings, Decimals,
+# dates, datetimes); keys the schema doesn't know are ignored.
+#
+# update_clause() builds the "col = %s, ..." part of an UPDATE
+# from the fields present in loaded data, so PUT routes use the
+# same schema as their POST instead of an allowed_fields list.
+#
+# json_schema() describes the same rules for the OpenAPI document
+# (backend/openapi).
+#------------------------------------------------------------
+from datetime import date, datetime
+from decimal import Decimal as _Decimal, InvalidOperation
+
+_MISSING = object()
+
+
+class Invalid(ValueError):
+    """One field's value is unusable; the message is shown to the client."""
+
+
+class Field:
+    def __init__(self, required=False, nullable=None, default=_MISSING, column=None, aliases=(), choices=None):
+        self.required = required
+        # optional fields may be sent as null unless told otherwise
+        self.nullable = (not required) if nullable is None else nullable
+        self.default = default
+        self.column = column
+        self.aliases = tuple(aliases)
+        self.choices = tuple(choices) if choices else None
+
+    def convert(self, value):
+        return value
+
+    def describe(self):
+        """The type-specific part of json_schema()."""
+        return {}
+
+    def json_schema(self):
+        schema = self.describe()
+        if self.choices is not None:
+            schema["enum"] = list(self.choices)
+        if self.nullable:
+            schema["nullable"] = True
+        if self.default is not _MISSING:
+            schema["default"] = self.default
+        return schema
+
+    def compile(self, name):
+        """A function value -> clean value (raises Invalid)."""
+        convert = self.convert
+        nullable = self.nullable
+        choices = self.choices
+
+        def check(value):
+            if value is None:
+                if nullable:
+                    return None
+                raise Invalid("must not be null")
+            value = convert(value)
+            if choices is not None and value not in choices:
+                raise Invalid(f"must be one of: {', '.join(map(str, choices))}")
+            return value
+
+        return check
+
+
+class Str(Field):
+    def __init__(self, max_length=None, min_length=None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_length = max_length
+        self.min_length = 1 if min_length is None and self.required else min_length
+
+    def convert(self, value):
+        if not isinstance(value, str):
+            raise Invalid("must be a string")
+        if self.max_length is not None and len(value) > self.max_length:
+            raise Invalid(f"must be at most {self.max_length} characters")
+        if self.min_length is not None and len(value.strip()) < self.min_length:
+            raise Invalid("must not be empty" if self.min_length == 1 else
+                          f"must be at least {self.min_length} characters")
+        return value
+
+    def describe(self):
+        schema = {"type": "string"}
+        if self.max_length is not None:
+            schema["maxLength"] = self.max_length
+        if self.min_length is not None:
+            schema["minLength"] = self.min_length
+        return schema
+
+
+class Int(Field):
+    def __init__(self, min=None, max=None, **kwargs):
+        super().__init__(**kwargs)
+        self.min = min
+        self.max = max
+
+    def convert(self, value):
+        if isinstance(value, bool):
+            raise Invalid("must be an integer")
+        if isinstance(value, str):
+            try:
+                value = int(value.strip())
+            except ValueError:
+                raise Invalid("must be an integer")
+        elif isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if not isinstance(value, int):
+            raise Invalid("must be an integer")
+        if self.min is not None and value < self.min:
+            raise Invalid(f"must be at least {self.min}")
+        if self.max is not None and value > self.max:
+            raise Invalid(f"must be at most {self.max}")
+        return value
+
+    def describe(self):
+        schema = {"type": "integer"}
+        if self.min is not None:
+            schema["minimum"] = self.min
+        if self.max is not None:
+            schema["maximum"] = self.max
+        return schema
+
+
+class Decimal(Field):
+    """A DECIMAL(digits, places) column: at most digits - places before the point."""
+
+    def __init__(self, digits=10, places=2, min=None, max=None, **kwargs):
+        super().__init__(**kwargs)
+        self.places = places
+        self.quantum = _Decimal(1).scaleb(-places)
+        self.limit = _Decimal(10) ** (digits - places)
+        self.min = min
+        self.max = max
+
+    def convert(self, value):
+        if isinstance(value, bool) or not isinstance(value, (int, float, str, _Decimal)):
+            raise Invalid("must be a number")
+        try:
+            number = _Decimal(str(value).strip())
+        except InvalidOperation:
+            raise Invalid("must be a number")
+        if not number.is_finite():
+            raise Invalid("must be a number")
+        if number.as_tuple().exponent < -self.places:
+            raise Invalid(f"must have at most {self.places} decimal places")
+        if abs(number) >= self.limit:
+            raise Invalid(f"must be less than {self.limit}")
+        if self.min is not None and number < self.min:
+            raise Invalid(f"must be at least {self.min}")
+        if self.max is not None and number > self.max:
+            raise Invalid(f"must be at most {self.max}")
+        return number.quantize(self.quantum)
+
+    def describe(self):
+        # sent as a number or a numeric string; returned as a string
+        schema = {"type": "number", "multipleOf": float(self.quantum),
+                  "exclusiveMaximum": True, "maximum": int(self.limit)}
+        if self.min is not None:
+            schema["minimum"] = self.min
+        if self.max is not None:
+            schema["maximum"] = self.max
+            del schema["exclusiveMaximum"]
+        return schema
+
+
+class Date(Field):
+    def convert(self, value):
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        if isinstance(value, str):
+            try:
+                # also accepts a full timestamp and keeps its day
+                return datetime.fromisoformat(value.strip()).date()
+            except ValueError:
+                pass
+        raise Invalid("must be a date (YYYY-MM-DD)")
+
+    def describe(self):
+        return {"type": "string", "format": "date"}
+
+
+class DateTime(Field):
+    def convert(self, value):
+        if isinstance(value, datetime):
+            return value
+        if isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value.strip())
+            except ValueError:
+                pass
+        raise Invalid("must be a date and time (YYYY-MM-DD HH:MM:SS)")
+
+    def describe(self):
+        return {"type": "string", "format": "date-time"}
+
+
+class List(Field):
+    def __init__(self, item, **kwargs):
+        super().__init__(**kwargs)
+        self.item_field = item
+        self.item = item.compile('item')
+
+    def convert(self, value):
+        if not isinstance(value, list):
+            raise Invalid("must be a list")
+        converted = []
+        for index, item in enumerate(value):
+            try:
+                converted.append(self.item(item))
+            except Invalid as e:
+                raise Invalid(f"item {index} {e}")
+        return converted
+
+    def describe(self):
+        return {"type": "array", "items": self.item_field.json_schema()}
+
+
+class Schema:
+    def __init__(self, fields):
+        self.fields = dict(fields)
+        # (name, keys to look for, check, required, default) per field
+        self._compiled = [
+            (name, (name,) + field.aliases, field.compile(name), field.required, field.default)
+            for name, field in self.fields.items()
+        ]
+        self.columns = {name: field.column or name for name, field in self.fields.items()}
+
+    def partial(self, *names):
+        """
+        The same fields (only `names`, if given) with nothing required and
+        no defaults - for PUT routes that change some columns of a row.
+        A field that was required still can't be set to null or "".
+        """
+        fields = {}
+        for name, field in self.fields.items():
+            if names and name not in names:
+                continue
+            copy = object.__new__(type(field))
+            copy.__dict__.update(field.__dict__, required=False, default=_MISSING)
+            fields[name] = copy
+        return Schema(fields)
+
+    def load(self, data):
+        """(clean data, None) or (None, {field: message}). Absent optional fields are left out."""
+        if not isinstance(data, dict):
+            return None, {"_body": "must be a JSON object"}
+
+        clean = {}
+        errors = {}
+        for name, keys, check, required, default in self._compiled:
+            for key in keys:
+                if key in data:
+                    value = data[key]
+                    break
+            else:
+                if required:
+                    errors[name] = "is required"
+                elif default is not _MISSING:
+                    clean[name] = default
+                continue
+            try:
+                clean[name] = check(value)
+            except Invalid as e:
+                errors[name] = str(e)
+
+        return (None, errors) if errors else (clean, None)
+
+    def json_schema(self):
+        """A JSON Schema (OpenAPI 3.0 dialect) object for request bodies."""
+        schema = {
+            "type": "object",
+            "properties": {name: field.json_schema() for name, field in self.fields.items()},
+        }
+        required = [name for name, field in self.fields.items() if field.required]
+        if required:
+            schema["required"] = required
+        return schema
+
+    def update_clause(self, data):
+        """("col_a = %s, col_b = %s", [a, b]) for the schema fields present in data."""
+        assignments = []
+        params = []
+        for name in self.fields:
+            if name in data:
+                assignments.append(f"{self.columns[name]} = %s")
+                params.append(data[name])
+        return ', '.join(assignments), params
@@ -2,6 +2,8 @@
 # Main application interface
 ###
 
+import os
+
 # import the create app function 
 # that lives in src/__init__.py
 from backend.rest_entry import create_app
@@ -10,6 +12,11 @@ from backend.rest_entry import create_app
 app = create_app()
 
 if __name__ == '__main__':
+    # with debug = True the reloader runs this file twice; only start
+    # the background jobs in the child process that serves requests
+    if app.config["SCHEDULER_ENABLED"] and os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        app.extensions["scheduler"].start()
+
     # we want to run in debug mode (for hot reloading) 
     # this app will be bound to port 4000. 
     # Take a look at the docker-compose.yml to see 
@@ -0,0 +1,6 @@
+# The API imports its code as `backend.x` from the api folder (the
+# container's working directory), so the tests do the same.
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
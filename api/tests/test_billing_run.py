@@ -0,0 +1,146 @@
+import pytest
+
+from backend.billing.billing_run import parse_period, run_billing
+
+
+class Cursor:
+    """Answers the billing run queries from in-memory GYM_MEMBER, INVOICE and BILLING_RUN rows."""
+
+    def __init__(self, db):
+        self.db = db
+        self.row = None
+        self.rowcount = 0
+
+    def _active(self, gym_id, after, upto=None):
+        return [m for m in sorted(self.db.members)
+                if self.db.members[m] == gym_id and m > after and (upto is None or m <= upto)]
+
+    def execute(self, sql, params=()):
+        sql = ' '.join(sql.split())
+        runs = self.db.runs
+        if sql.startswith("SELECT COUNT(*) AS total FROM GYM_MEMBER"):
+            self.row = {"total": len(self._active(params[0], 0))}
+        elif sql.startswith("INSERT INTO BILLING_RUN"):
+            gym_id, period, category, amount, total = params
+            runs.setdefault((gym_id, period, category), {
+                "run_id": len(runs) + 1, "amount": amount, "status": 'running', "members_total": total,
+                "last_member_id": 0, "members_scanned": 0, "invoices_created": 0,
+            })
+        elif sql.startswith("SELECT * FROM BILLING_RUN"):
+            run = runs.get(tuple(params))
+            self.row = dict(run) if run else None
+        elif sql.startswith("UPDATE BILLING_RUN SET status = 'running'"):
+            self._run(params[1]).update(status='running', members_total=params[0])
+        elif sql.startswith("SELECT MAX(member_id)"):
+            gym_id, after, limit = params
+            chunk = self._active(gym_id, after)[:limit]
+            self.row = {"upper_id": chunk[-1] if chunk else None, "scanned": len(chunk)}
+        elif sql.startswith("INSERT INTO INVOICE"):
+            if self.db.fail_after is not None and len(self.db.invoices) >= self.db.fail_after:
+                raise RuntimeError("connection lost")
+            period, gym_id, after, upto = params[4:]
+            new = {(m, period) for m in self._active(gym_id, after, upto)} - self.db.invoices
+            self.db.invoices |= new
+            self.rowcount = len(new)
+        elif sql.startswith("UPDATE BILLING_RUN SET last_member_id"):
+            upper_id, scanned, created, run_id = params
+            run = self._run(run_id)
+            run.update(last_member_id=upper_id, members_scanned=run['members_scanned'] + scanned,
+                       invoices_created=run['invoices_created'] + created)
+        elif sql.startswith("UPDATE BILLING_RUN SET status = 'completed'"):
+            self._run(params[0])['status'] = 'completed'
+        elif sql.startswith("UPDATE BILLING_RUN SET status = 'failed'"):
+            self._run(params[0])['status'] = 'failed'
+        else:
+            raise AssertionError(f"unexpected query: {sql}")
+
+    def _run(self, run_id):
+        return next(run for run in self.db.runs.values() if run['run_id'] == run_id)
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        pass
+
+
+class Conn:
+    def __init__(self, members):
+        self.members = members        # member_id -> gym_id (all active)
+        self.invoices = set()         # (member_id, billing_period)
+        self.runs = {}                # (gym_id, period, category) -> BILLING_RUN row
+        self.fail_after = None        # raise once this many invoices exist
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def _run_row(conn):
+    (run,) = conn.runs.values()
+    return run
+
+
+def test_bills_every_active_member_of_the_gym_once():
+    conn = Conn({1: 1, 2: 1, 3: 2, 4: 1, 5: 1})
+
+    summary = run_billing(conn, '2025-11', 50, chunk_size=2)
+
+    assert summary['invoices_created'] == 4
+    assert conn.invoices == {(m, '2025-11') for m in (1, 2, 4, 5)}
+    assert _run_row(conn)['status'] == 'completed'
+
+
+def test_failed_run_resumes_from_its_checkpoint():
+    conn = Conn({m: 1 for m in range(1, 8)})
+    conn.fail_after = 4
+
+    with pytest.raises(RuntimeError):
+        run_billing(conn, '2025-11', 50, chunk_size=2)
+    run = _run_row(conn)
+    assert run['status'] == 'failed'
+    assert run['last_member_id'] == 4
+
+    conn.fail_after = None
+    summary = run_billing(conn, '2025-11', 50, chunk_size=2)
+
+    assert summary['invoices_created'] == 3
+    assert len(conn.invoices) == 7
+    assert _run_row(conn)['invoices_created'] == 7
+
+
+def test_completed_run_is_not_repeated():
+    conn = Conn({1: 1, 2: 1})
+    run_billing(conn, '2025-11', 50)
+
+    summary = run_billing(conn, '2025-11', 50)
+
+    assert summary['status'] == 'completed'
+    assert summary['invoices_created'] == 0
+
+
+def test_unpadded_month_is_the_same_run():
+    conn = Conn({1: 1, 2: 1})
+    run_billing(conn, '2025-1', 50)
+
+    summary = run_billing(conn, '2025-01', 50)
+
+    assert summary['invoices_created'] == 0
+    assert conn.invoices == {(1, '2025-01'), (2, '2025-01')}
+    assert list(conn.runs) == [(1, '2025-01', 'Monthly Membership')]
+
+
+def test_chunk_size_must_be_positive():
+    with pytest.raises(ValueError):
+        run_billing(Conn({1: 1}), '2025-11', 50, chunk_size=0)
+
+
+@pytest.mark.parametrize("period", ['2025-13', '11-2025', '', None])
+def test_bad_periods_are_rejected(period):
+    with pytest.raises(ValueError):
+        parse_period(period)
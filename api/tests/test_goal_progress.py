@@ -0,0 +1,70 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from backend.members.goals import goal_progress
+
+
+def _goal(goal_type='weight', target=70, start=80, current=75, deadline=None, **dates):
+    goal = {
+        "goal_type": goal_type,
+        "target_value": Decimal(target),
+        "start_value": None if start is None else Decimal(start),
+        "current_value": None if current is None else Decimal(current),
+        "start_date": date(2025, 1, 1),
+        "last_event_at": datetime(2025, 1, 11, 7, 30),
+        "updated_at": datetime(2025, 1, 21, 9, 0),
+        "deadline": deadline,
+    }
+    goal.update(dates)
+    return goal
+
+
+def test_eta_extends_the_pace_so_far():
+    # 5 kg lost in 10 days, 5 kg to go
+    progress = goal_progress(_goal(deadline=date(2025, 2, 1)))
+
+    assert progress == {"completion_pct": 50.0, "achieved": False,
+                        "eta": date(2025, 1, 21), "on_track": True}
+
+
+def test_late_eta_is_off_track():
+    progress = goal_progress(_goal(deadline=date(2025, 1, 15)))
+
+    assert progress["on_track"] is False
+
+
+def test_moving_away_from_the_target_has_no_eta():
+    progress = goal_progress(_goal(current=82))
+
+    assert progress["completion_pct"] == 0.0
+    assert progress["eta"] is None
+
+
+def test_reached_goal_is_achieved_and_capped():
+    progress = goal_progress(_goal(current=68))
+
+    assert progress == {"completion_pct": 100.0, "achieved": True, "eta": None, "on_track": None}
+
+
+def test_counting_goal_from_zero():
+    progress = goal_progress(_goal('workout_sessions', target=20, start=None, current=5))
+
+    assert progress["completion_pct"] == 25.0
+    assert progress["eta"] == date(2025, 2, 10)
+
+
+def test_daily_goals_have_no_eta():
+    progress = goal_progress(_goal('daily_calories', target=2000, start=0, current=1500))
+
+    assert progress["completion_pct"] == 75.0
+    assert progress["eta"] is None
+
+
+def test_hand_tracked_goals_use_the_last_update():
+    progress = goal_progress(_goal('bench_press', target=100, start=60, current=80, last_event_at=None))
+
+    assert progress["eta"] == date(2025, 2, 10)
+
+
+def test_goal_without_a_value_yet():
+    assert goal_progress(_goal(current=None))["completion_pct"] is None
@@ -0,0 +1,69 @@
+from datetime import date
+
+from werkzeug.datastructures import MultiDict
+
+from backend.validation import Date, Int, ListQuery, Str
+
+LIST_PLANS = ListQuery(
+    "WORKOUT_PLAN wp JOIN GYM_MEMBER gm ON wp.member_id = gm.member_id",
+    columns={"plan_id": "wp.plan_id", "member_id": "wp.member_id", "date": "wp.date", "goals": "wp.goals"},
+    filters={"member_id": Int(min=1), "date": Date(), "goals": Str()},
+    sort=("date", "plan_id"),
+    default_sort="-date",
+    aliases={"since": "date__gte"},
+    derived={"first_name": "member_id"},
+)
+
+
+def _parse(**args):
+    return LIST_PLANS.parse(MultiDict(args))
+
+
+def test_defaults_select_every_column_newest_first():
+    listing, errors = _parse()
+
+    assert errors is None
+    assert listing.sql("gm.trainer_id = %s", [3]) == (
+        "SELECT wp.plan_id, wp.member_id, wp.date, wp.goals FROM WORKOUT_PLAN wp "
+        "JOIN GYM_MEMBER gm ON wp.member_id = gm.member_id "
+        "WHERE gm.trainer_id = %s ORDER BY wp.date DESC",
+        [3],
+    )
+
+
+def test_fields_sort_and_filters_become_sql():
+    listing, errors = LIST_PLANS.parse(MultiDict([
+        ("fields", "goals,plan_id"), ("sort", "plan_id"), ("member_id__in", "7,8"),
+        ("member_id__in", "9"), ("since", "2025-01-01"), ("expand", "exercises"),
+    ]))
+
+    assert errors is None
+    sql, params = listing.sql()
+    assert sql == ("SELECT wp.goals, wp.plan_id FROM WORKOUT_PLAN wp "
+                   "JOIN GYM_MEMBER gm ON wp.member_id = gm.member_id "
+                   "WHERE wp.member_id IN (%s, %s, %s) AND wp.date >= %s ORDER BY wp.plan_id ASC")
+    assert params == [7, 8, 9, date(2025, 1, 1)]
+
+
+def test_prefix_is_matched_literally():
+    listing, _ = _parse(goals__prefix="50%_")
+
+    assert listing.conditions == ["wp.goals LIKE %s"]
+    assert listing.params == ["50\\%\\_%"]
+
+
+def test_bad_parameters_are_reported_together():
+    listing, errors = _parse(fields="plan_id,secret", sort="goals", member_id="abc", date__prefix="2025")
+
+    assert listing is None
+    assert set(errors) == {"fields", "sort", "member_id", "date__prefix"}
+    assert errors["member_id"] == "must be an integer"
+
+
+def test_derived_fields_read_their_column_and_are_projected_away():
+    listing, _ = _parse(fields="plan_id,first_name")
+
+    assert listing.sql()[0].startswith("SELECT wp.plan_id, wp.member_id FROM")
+    assert listing.wants("first_name")
+    rows = [{"plan_id": 1, "member_id": 7, "first_name": "Alex"}]
+    assert listing.project(rows) == [{"plan_id": 1, "first_name": "Alex"}]
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from backend.messaging.message_hub import MessageHub, member_channel, trainer_channel
+
+
+class App:
+    def __init__(self):
+        self.config = {"MESSAGE_BACKPLANE": "local"}
+        self.extensions = {}
+
+
+def _hub():
+    hub = MessageHub()
+    hub.init_app(App())
+    return hub
+
+
+def _message(member_id, trainer_id=None):
+    return {"message_id": 1, "member_id": member_id, "trainer_id": trainer_id,
+            "content": "hi", "message_timestamp": datetime(2025, 1, 1, 9, 30)}
+
+
+def test_same_member_id_in_two_gyms_is_two_channels():
+    hub = _hub()
+    main = hub.subscribe(member_channel(1, 7))
+    north = hub.subscribe(member_channel(2, 7))
+
+    hub.publish(_message(7), gym_id=2)
+
+    assert main.get(timeout=0) is None
+    event = north.get(timeout=0)
+    assert event["gym_id"] == 2
+    assert event["message_timestamp"] == "2025-01-01 09:30:00"
+
+
+def test_trainer_hears_their_gyms_members():
+    hub = _hub()
+    trainer = hub.subscribe(trainer_channel(1, 3))
+    other_gym = hub.subscribe(trainer_channel(2, 3))
+
+    hub.publish(_message(7, trainer_id=3), gym_id=1)
+
+    assert trainer.get(timeout=0)["member_id"] == 7
+    assert other_gym.get(timeout=0) is None
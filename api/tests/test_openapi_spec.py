@@ -0,0 +1,30 @@
+from flask import Flask, jsonify, request
+
+from backend.openapi import build_spec
+from backend.validation import Int, Schema
+
+QUERY = Schema({"batch_size": Int(min=1, max=100, nullable=False, default=10)})
+
+
+class schemas:
+    QUERY = QUERY
+
+
+# Upload a file
+def upload():
+    query, errors = schemas.QUERY.load(request.args.to_dict())
+    upload = request.files.get('file')
+    return jsonify({"batch_size": query["batch_size"], "name": upload.filename}), 200
+
+
+def test_query_schema_becomes_query_parameters():
+    app = Flask(__name__)
+    app.add_url_rule('/upload', view_func=upload, methods=['POST'])
+
+    operation = build_spec(app)["paths"]["/upload"]["post"]
+
+    assert operation["parameters"] == [{
+        "name": "batch_size", "in": "query", "required": False,
+        "schema": {"type": "integer", "minimum": 1, "maximum": 100, "default": 10},
+    }]
+    assert list(operation["requestBody"]["content"]) == ["multipart/form-data"]
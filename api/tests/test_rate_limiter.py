@@ -0,0 +1,118 @@
+import sys
+
+import pytest
+from flask import Blueprint, Flask
+
+from backend.metrics import metrics
+from backend.ops.ops_routes import ops
+from backend.ratelimit.limiter import CLIENTS_PER_ADDRESS, RateLimiter
+
+
+def _limiter(rate=1, burst=2):
+    limiter = RateLimiter()
+    limiter.update_limits({"roles": {"member": {"rate": rate, "burst": burst}}})
+    return limiter
+
+
+def test_bucket_empties_after_burst():
+    limiter = _limiter(rate=1, burst=2)
+
+    assert limiter._take_token(1, 'member', 'members.get_member', 'a') == 0
+    assert limiter._take_token(1, 'member', 'members.get_member', 'a') == 0
+    wait = limiter._take_token(1, 'member', 'members.get_member', 'a')
+    assert 0 < wait <= 1
+
+
+def test_clients_and_gyms_have_their_own_buckets():
+    limiter = _limiter(rate=0, burst=1)
+
+    assert limiter._take_token(1, 'member', 'members.get_member', 'a') == 0
+    assert limiter._take_token(1, 'member', 'members.get_member', 'a') > 0
+    assert limiter._take_token(1, 'member', 'members.get_member', 'b') == 0
+    assert limiter._take_token(2, 'member', 'members.get_member', 'a') == 0
+
+
+def test_endpoint_limit_overrides_role():
+    limiter = _limiter(rate=10, burst=10)
+    limiter.update_limits({"endpoints": {"members.get_member": {"rate": 0, "burst": 1}}})
+
+    assert limiter._take_token(1, 'member', 'members.get_member', 'a') == 0
+    assert limiter._take_token(1, 'member', 'members.get_member', 'a') > 0
+    assert limiter._take_token(1, 'member', 'members.get_goals', 'a') == 0
+
+
+def _limited_client(limiter):
+    app = Flask(__name__)
+    members = Blueprint('members', __name__)
+    members.add_url_rule('/<int:member_id>', 'get_member', lambda member_id: "ok")
+    app.register_blueprint(members, url_prefix='/m')
+    limiter.init_app(app)
+    return app.test_client()
+
+
+def test_role_comes_from_the_blueprint_not_the_request():
+    limiter = RateLimiter()
+    limiter.update_limits({"roles": {"member": {"rate": 0, "burst": 1},
+                                     "trainer": {"rate": 100, "burst": 100}}})
+    client = _limited_client(limiter)
+
+    assert client.get('/m/1', headers={"X-Role": "trainer"}).status_code == 200
+    assert client.get('/m/1', headers={"X-Role": "trainer"}).status_code == 429
+
+
+def test_rotating_client_ids_share_the_address_bucket():
+    limiter = _limiter(rate=0, burst=1)
+    client = _limited_client(limiter)
+
+    codes = [client.get('/m/1', headers={"X-Client-Id": str(n)}).status_code
+             for n in range(CLIENTS_PER_ADDRESS + 1)]
+
+    assert codes[:-1] == [200] * CLIENTS_PER_ADDRESS
+    assert codes[-1] == 429
+
+
+def test_evicted_buckets_are_counted(monkeypatch):
+    monkeypatch.setattr(sys.modules[RateLimiter.__module__], "MAX_BUCKETS", 2)
+    limiter = _limiter()
+    before = metrics.counter("ratelimit.buckets_evicted")
+
+    for client in 'abc':
+        limiter._take_token(1, 'member', 'members.get_member', client)
+
+    assert len(limiter._buckets) == 2
+    assert metrics.counter("ratelimit.buckets_evicted") == before + 1
+
+
+@pytest.mark.parametrize("changes", [
+    {"roles": {"member": {"rate": -1, "burst": 5}}},
+    {"concurrency": {"analytics": 0}},
+    {"gym_share": 0},
+    {"no_such_limit": 1},
+])
+def test_bad_limits_are_rejected(changes):
+    limiter = RateLimiter()
+    with pytest.raises(ValueError):
+        limiter.update_limits(changes)
+    assert limiter.get_limits()["gym_share"] == 0.5
+
+
+def _ops_client(token):
+    app = Flask(__name__)
+    app.config["OPS_TOKEN"] = token
+    app.register_blueprint(ops, url_prefix='/ops')
+    return app.test_client()
+
+
+def test_ops_changes_refused_without_token():
+    client = _ops_client("")
+
+    assert client.get('/ops/limits').status_code == 200
+    assert client.put('/ops/limits', json={"max_in_flight": 1}).status_code == 403
+
+
+def test_ops_token_required_when_set():
+    client = _ops_client("secret")
+
+    assert client.get('/ops/limits').status_code == 403
+    assert client.put('/ops/limits', json={"max_in_flight": 10},
+                      headers={"X-Ops-Token": "secret"}).status_code == 200
@@ -0,0 +1,133 @@
+from decimal import Decimal
+
+import pytest
+
+from backend.billing.reconcile import _Recent, reconcile
+
+
+class Cursor:
+    """Answers the reconcile queries from in-memory INVOICE and PAYMENT rows."""
+
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+
+    def execute(self, sql, params=()):
+        sql = ' '.join(sql.split())
+        if sql.startswith("SELECT invoice_id, amount, status FROM INVOICE"):
+            ids, gym = (params[:-1], params[-1]) if "gym_id" in sql else (params, None)
+            self.rows = [dict(invoice_id=i, amount=inv['amount'], status=inv['status'])
+                         for i, inv in self.db.invoices.items()
+                         if i in ids and (gym is None or inv['gym_id'] == gym)]
+        elif sql.startswith("SELECT reference FROM PAYMENT"):
+            self.rows = [{"reference": r} for r in self.db.references if r in params]
+        elif sql.startswith("UPDATE INVOICE SET status = 'paid'"):
+            for invoice_id in params:
+                self.db.invoices[invoice_id]['status'] = 'paid'
+        else:
+            raise AssertionError(f"unexpected query: {sql}")
+
+    def executemany(self, sql, rows):
+        self.db.references.update(row[-1] for row in rows)
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class Conn:
+    def __init__(self, invoices, references=()):
+        self.invoices = invoices
+        self.references = set(references)
+        self.commits = 0
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+def _invoice(amount, status='pending', gym_id=1):
+    return {"amount": Decimal(amount), "status": status, "gym_id": gym_id}
+
+
+def _file(*lines):
+    return ["reference,invoice_id,amount,paid_date\n"] + [line + "\n" for line in lines]
+
+
+def test_lines_are_classified():
+    conn = Conn({1: _invoice('50.00'), 2: _invoice('50.00', 'paid'), 3: _invoice('80.00')},
+                references={'R-OLD'})
+    report = reconcile(conn, _file(
+        "R1,1,50.00,2025-11-03",
+        "R-OLD,3,80.00,2025-11-03",
+        "R2,2,50.00,2025-11-03",
+        "R3,3,70.00,2025-11-03",
+        "R4,9,10.00,2025-11-03",
+        "R5,x,10.00,2025-11-03",
+    ))
+
+    assert report['counts'] == {"matched": 1, "invalid": 1, "not_found": 1, "duplicate": 1,
+                                "already_paid": 1, "amount_mismatch": 1}
+    assert report['matched_amount'] == Decimal('50.00')
+    assert report['unmatched_amount'] == Decimal('210.00')
+    assert conn.invoices[1]['status'] == 'paid'
+    assert conn.invoices[3]['status'] == 'pending'
+
+
+def test_repeats_in_later_batches_are_caught_in_dry_run():
+    conn = Conn({1: _invoice('50.00'), 2: _invoice('50.00')})
+    report = reconcile(conn, _file(
+        "R1,1,50.00,2025-11-03",
+        "R1,2,50.00,2025-11-03",
+        "R2,1,50.00,2025-11-03",
+    ), dry_run=True, batch_size=1)
+
+    assert report['counts']['matched'] == 1
+    assert report['counts']['duplicate'] == 1
+    assert report['counts']['already_paid'] == 1
+    assert conn.commits == 0
+    assert conn.invoices[1]['status'] == 'pending'
+
+
+def test_repeats_in_later_batches_are_caught_from_the_database():
+    conn = Conn({1: _invoice('50.00'), 2: _invoice('50.00')})
+    report = reconcile(conn, _file(
+        "R1,1,50.00,2025-11-03",
+        "R1,2,50.00,2025-11-03",
+        "R2,1,50.00,2025-11-03",
+    ), batch_size=1)
+
+    assert report['counts']['matched'] == 1
+    assert report['counts']['duplicate'] == 1
+    assert report['counts']['already_paid'] == 1
+    assert conn.references == {'R1'}
+
+
+def test_dry_run_memory_is_bounded():
+    recent = _Recent(2)
+    for reference in ('R1', 'R2', 'R1', 'R3'):
+        recent.add(reference)
+
+    assert 'R1' in recent and 'R3' in recent
+    assert 'R2' not in recent
+
+
+def test_other_gyms_invoices_are_not_found():
+    conn = Conn({1: _invoice('50.00', gym_id=2)})
+    report = reconcile(conn, _file("R1,1,50.00,2025-11-03"), gym_id=1)
+
+    assert report['counts']['not_found'] == 1
+    assert conn.invoices[1]['status'] == 'pending'
+
+
+@pytest.mark.parametrize("batch_size", [0, -1])
+def test_batch_size_must_be_positive(batch_size):
+    with pytest.raises(ValueError):
+        reconcile(Conn({}), _file(), batch_size=batch_size)
@@ -0,0 +1,76 @@
+from datetime import date, datetime
+from decimal import Decimal as D
+
+from backend.validation import Date, DateTime, Decimal, Int, List, Schema, Str
+
+CREATE_LOG = Schema({
+    "member_id": Int(required=True, min=1),
+    "calories": Int(min=0),
+    "amount": Decimal(digits=6, places=2, min=0),
+    "status": Str(nullable=False, choices=('active', 'paused'), default='active'),
+    "log_timestamp": DateTime(column="timestamp"),
+    "day": Date(aliases=("date",)),
+    "tags": List(Str(max_length=5)),
+})
+
+
+def test_values_are_coerced_and_defaults_filled():
+    data, errors = CREATE_LOG.load({
+        "member_id": "7", "amount": 12.5, "log_timestamp": "2025-11-03 08:15:00",
+        "date": "2025-11-03", "tags": ["leg"], "unknown": 1,
+    })
+
+    assert errors is None
+    assert data == {
+        "member_id": 7, "amount": D('12.50'), "status": 'active',
+        "log_timestamp": datetime(2025, 11, 3, 8, 15), "day": date(2025, 11, 3), "tags": ["leg"],
+    }
+
+
+def test_every_bad_field_is_reported():
+    data, errors = CREATE_LOG.load({
+        "calories": -1, "amount": "1.234", "status": None, "day": "soon", "tags": ["toolong"],
+    })
+
+    assert data is None
+    assert errors == {
+        "member_id": "is required",
+        "calories": "must be at least 0",
+        "amount": "must have at most 2 decimal places",
+        "status": "must not be null",
+        "day": "must be a date (YYYY-MM-DD)",
+        "tags": "item 0 must be at most 5 characters",
+    }
+
+
+def test_int_rejects_bools_and_fractions():
+    assert CREATE_LOG.load({"member_id": True})[1] == {"member_id": "must be an integer"}
+    assert CREATE_LOG.load({"member_id": 1.5})[1] == {"member_id": "must be an integer"}
+    assert CREATE_LOG.load({"member_id": 2.0})[0]["member_id"] == 2
+
+
+def test_decimal_keeps_to_the_column_size():
+    assert CREATE_LOG.load({"member_id": 1, "amount": "9999.99"})[0]["amount"] == D('9999.99')
+    assert CREATE_LOG.load({"member_id": 1, "amount": "10000"})[1] == {"amount": "must be less than 10000"}
+
+
+def test_body_must_be_an_object():
+    assert CREATE_LOG.load(None) == (None, {"_body": "must be a JSON object"})
+
+
+def test_partial_schema_builds_the_update_clause():
+    update = CREATE_LOG.partial()
+    data, errors = update.load({"calories": 300, "log_timestamp": "2025-11-03T09:00"})
+
+    assert errors is None
+    assert "status" not in data
+    assert update.update_clause(data) == ("calories = %s, timestamp = %s", [300, datetime(2025, 11, 3, 9, 0)])
+    assert update.load({"status": None})[1] == {"status": "must not be null"}
+
+
+def test_json_schema_describes_the_fields():
+    schema = CREATE_LOG.json_schema()
+
+    assert schema["required"] == ["member_id"]
+    assert schema["properties"]["member_id"] == {"type": "integer", "minimum": 1}
+    assert schema["properties"]["status"] == {"type": "string", "enum": ["active", "paused"], "default": "active"}
@@ -12,6 +12,7 @@ logger = logging.getLogger(__name__)
 # as SideBarLinks function from src/modules folder
 import streamlit as st
 from modules.nav import SideBarLinks
+from modules.prefetch import prefetch
 
 # streamlit supports reguarl and wide layout (how the controls
 # are organized/displayed on the screen).
@@ -55,6 +56,9 @@ if st.button("Act as Stephanie Huang, a gym member",
     # subsequent pages). 
     st.session_state['first_name'] = 'Stephanie'
     st.session_state['member_id'] = 1
+    # start loading the data this user's pages will ask for first, in the
+    # background, so those pages don't have to wait for the API
+    prefetch('member')
     # finally, we ask streamlit to switch to another page, in this case, the 
     # landing page for this particular user type
     logger.info("Logging in as Gym Member Persona")
@@ -66,6 +70,8 @@ if st.button('Act as Jade Smith, a personal trainer',
     st.session_state['authenticated'] = True
     st.session_state['role'] = 'trainer'
     st.session_state['first_name'] = 'Jade'
+    st.session_state['trainer_id'] = 1
+    prefetch('trainer')
     st.switch_page('pages/10_Trainer_Home.py')
 
 if st.button('Act as Jack Perez, a gym owner', 
@@ -74,6 +80,7 @@ if st.button('Act as Jack Perez, a gym owner',
     st.session_state['authenticated'] = True
     st.session_state['role'] = 'owner'
     st.session_state['first_name'] = 'Jack'
+    prefetch('owner')
     st.switch_page('pages/20_Owner_Home.py')
 
 if st.button('Act as Sofia Martinez, a nutritionist', 
@@ -82,6 +89,8 @@ if st.button('Act as Sofia Martinez, a nutritionist',
     st.session_state['authenticated'] = True
     st.session_state['role'] = 'nutritionist'
     st.session_state['first_name'] = 'Sofia'
+    st.session_state['nutritionist_id'] = 1
+    prefetch('nutritionist')
     st.switch_page('pages/30_Nutritionist_Home.py')
 
 
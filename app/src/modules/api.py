@@ -0,0 +1,46 @@
+# The API client for the current browser session.
+#
+# api_client.py is generated from the API's OpenAPI document
+# (`flask openapi client` in the api folder), so its methods and
+# arguments always match the routes. Pages call get_api() and
+# catch ApiError:
+#
+#   api = get_api()
+#   try:
+#       clients = api.trainers.get_trainer_clients(trainer_id)
+#   except ApiError as e:
+#       show_api_error(e, "Could not load clients")
+
+import uuid
+
+import requests
+import streamlit as st
+
+from modules.api_client import ApiClient, ApiError
+
+
+@st.cache_resource
+def _http_session():
+    """One connection pool to the API shared by every browser session."""
+    return requests.Session()
+
+
+def get_api():
+    """An ApiClient that identifies this browser session (and its gym) to the API."""
+    if "api_client_id" not in st.session_state:
+        st.session_state["api_client_id"] = str(uuid.uuid4())
+    return ApiClient(
+        client_id=st.session_state["api_client_id"],
+        gym_id=st.session_state.get("gym_id"),
+        session=_http_session(),
+    )
+
+
+def show_api_error(error, message="Request failed"):
+    """st.error for an ApiError, listing each invalid field of a 400."""
+    st.error(f"{message}: {error.message}")
+    for field, problem in error.fields.items():
+        st.caption(f"• {field} {problem}")
+
+
+__all__ = ["ApiError", "get_api", "show_api_error"]
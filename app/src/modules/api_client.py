@@ -0,0 +1,713 @@
+#------------------------------------------------------------
+# Typed client for the gym API.
+#
+# GENERATED by `flask openapi client` from the OpenAPI document
+# the API serves at /ops/openapi.json. Don't edit it by hand:
+# change the routes or their schemas and regenerate.
+#
+#   api = ApiClient(client_id="session-1")
+#   clients = api.trainers.get_trainer_clients(trainer_id)
+#   api.trainers.create_session(trainer_id, class_name="Spin",
+#                               session_date="2025-03-01 09:00:00")
+#
+# Each ApiClient keeps one requests.Session, so connections to
+# the API are reused. Answers other than 2xx raise ApiError with
+# the API's message (and per-field problems for a 400).
+#------------------------------------------------------------
+
+
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import IO, Any, TypedDict
+
+import requests
+
+DEFAULT_BASE_URL = os.getenv("API_BASE_URL", "http://api:4000")
+DEFAULT_TIMEOUT_SECONDS = 10
+
+# marks keyword arguments that were not passed (None is sent as null)
+_UNSET: Any = object()
+
+
+class ApiError(Exception):
+    """The API answered with an error status, or could not be reached (status None)."""
+
+    def __init__(self, status, message, error_type=None, fields=None, retry_after=None, response=None):
+        super().__init__(f"{status}: {message}" if status else message)
+        self.status = status
+        self.message = message
+        self.error_type = error_type
+        self.fields = fields or {}
+        self.retry_after = retry_after
+        self.response = response
+
+
+def _jsonable(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    return value
+
+
+def _fields(**values):
+    return {name: _jsonable(value) for name, value in values.items() if value is not _UNSET}
+
+
+class _Transport:
+    def __init__(self, base_url, timeout, session, headers):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = session if session is not None else requests.Session()
+        self.headers = {name: value for name, value in headers.items() if value}
+
+    def request(self, method, path, params=None, json=None, files=None, headers=None, stream=False):
+        request_headers = dict(self.headers)
+        request_headers.update({name: value for name, value in (headers or {}).items() if value})
+        try:
+            response = self.session.request(
+                method,
+                self.base_url + path,
+                params={name: _jsonable(value) for name, value in (params or {}).items() if value is not None},
+                json=json,
+                files=files,
+                headers=request_headers,
+                timeout=self.timeout,
+                stream=stream,
+            )
+        except requests.RequestException as e:
+            raise ApiError(None, f"Could not reach the API: {e}") from e
+
+        if response.status_code >= 400:
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+            body = body if isinstance(body, dict) else {}
+            retry_after = response.headers.get("Retry-After", "")
+            raise ApiError(
+                response.status_code,
+                body.get("error") or response.reason,
+                error_type=body.get("error_type"),
+                fields=body.get("fields"),
+                retry_after=int(retry_after) if retry_after.isdigit() else None,
+                response=response,
+            )
+        if stream:
+            return response
+        return response.json() if response.content else None
+
+
+class RevenueByCategoryResult(TypedDict, total=False):
+    start_date: Any
+    end_date: Any
+    data: Any
+
+
+class RevenueTrendByClassResult(TypedDict, total=False):
+    start_date: Any
+    end_date: Any
+    trainer_id: Any
+    data: Any
+
+
+class StartBillingRunResult(TypedDict, total=False):
+    message: str
+    billing_period: Any
+    category: Any
+    status_url: str
+
+
+class TrainerRevenueResult(TypedDict, total=False):
+    start_date: Any
+    end_date: Any
+    trainers: Any
+
+
+class CreateGoalResult(TypedDict, total=False):
+    message: str
+    goal_id: int
+
+
+class CreateMemberResult(TypedDict, total=False):
+    message: str
+    member_id: int
+
+
+class CreateMessageResult(TypedDict, total=False):
+    message: str
+    message_id: int
+
+
+class CreateProgressResult(TypedDict, total=False):
+    message: str
+    progress_id: int
+
+
+class CreateWorkoutLogResult(TypedDict, total=False):
+    message: str
+    log_id: int
+
+
+class CreateWorkoutPlanResult(TypedDict, total=False):
+    message: str
+    plan_id: int
+
+
+class DeactivateMemberResult(TypedDict, total=False):
+    message: str
+
+
+class DeleteGoalResult(TypedDict, total=False):
+    message: str
+
+
+class DeleteProgressResult(TypedDict, total=False):
+    message: str
+
+
+class MarkMessagesReadResult(TypedDict, total=False):
+    message: str
+    marked_read: Any
+
+
+class UpdateGoalResult(TypedDict, total=False):
+    message: str
+
+
+class UpdateMemberResult(TypedDict, total=False):
+    message: str
+
+
+class UpdateMessageResult(TypedDict, total=False):
+    message: str
+
+
+class UpdateProgressResult(TypedDict, total=False):
+    message: str
+
+
+class UpdateWorkoutPlanResult(TypedDict, total=False):
+    message: str
+
+
+class CreateFoodLogResult(TypedDict, total=False):
+    message: str
+    log_id: int
+
+
+class CreateMealPlanResult(TypedDict, total=False):
+    message: str
+    plan_id: int
+
+
+class CreateNutritionistResult(TypedDict, total=False):
+    message: str
+    nutritionist_id: int
+
+
+class DeleteFoodLogResult(TypedDict, total=False):
+    message: str
+
+
+class DeleteMealPlanResult(TypedDict, total=False):
+    message: str
+
+
+class UpdateFoodLogResult(TypedDict, total=False):
+    message: str
+
+
+class UpdateMealPlanResult(TypedDict, total=False):
+    message: str
+
+
+class UpdateNutritionistResult(TypedDict, total=False):
+    message: str
+
+
+class SearchCaseloadResult(TypedDict, total=False):
+    q: Any
+    scope: Any
+    page: Any
+    per_page: Any
+    has_more: Any
+    results: Any
+
+
+class CancelSessionResult(TypedDict, total=False):
+    message: str
+
+
+class CreateExerciseResult(TypedDict, total=False):
+    message: str
+    exercise_id: int
+
+
+class CreateInvoiceResult(TypedDict, total=False):
+    message: str
+    invoice_id: int
+
+
+class CreateSessionResult(TypedDict, total=False):
+    message: str
+    session_id: int
+
+
+class CreateTrainerResult(TypedDict, total=False):
+    message: str
+    trainer_id: int
+
+
+class CreateTrainerWorkoutLogResult(TypedDict, total=False):
+    message: str
+    log_id: int
+
+
+class CreateTrainerWorkoutPlanResult(TypedDict, total=False):
+    message: str
+    plan_id: int
+
+
+class DeleteWorkoutLogResult(TypedDict, total=False):
+    message: str
+
+
+class UpdateClientProfileResult(TypedDict, total=False):
+    message: str
+
+
+class UpdateExerciseResult(TypedDict, total=False):
+    message: str
+
+
+class UpdateInvoiceResult(TypedDict, total=False):
+    message: str
+
+
+class UpdateSessionResult(TypedDict, total=False):
+    message: str
+
+
+class UpdateTrainerResult(TypedDict, total=False):
+    message: str
+
+
+class UpdateTrainerWorkoutPlanResult(TypedDict, total=False):
+    message: str
+
+
+class UpdateWorkoutLogResult(TypedDict, total=False):
+    message: str
+
+
+class VoidInvoiceResult(TypedDict, total=False):
+    message: str
+
+
+class ManagersApi:
+    """The /managers routes."""
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    def attendance_log(self, *, trainer_id: str | None = None, start_date: str | None = None, end_date: str | None = None) -> Any:
+        """GET /managers/class-attendance - Attendance: Class attendance logs"""
+        return self._transport.request("GET", "/managers/class-attendance", params={"trainer_id": trainer_id, "start_date": start_date, "end_date": end_date})
+
+    def class_utilization(self, *, trainer_id: int | None = None, end_date: str | None = None, start_date: str | None = None) -> Any:
+        """GET /managers/class-utilization - Class Utilization: weekday x hour heatmap and per-class fill / no-show rates"""
+        return self._transport.request("GET", "/managers/class-utilization", params={"trainer_id": trainer_id, "end_date": end_date, "start_date": start_date})
+
+    def get_billing_run(self, period: str, *, category: str | None = None) -> Any:
+        """GET /managers/billing/runs/{period} - get billing run"""
+        return self._transport.request("GET", f"/managers/billing/runs/{period}", params={"category": category})
+
+    def gyms_summary(self, *, start_date: str | None = None, end_date: str | None = None) -> Any:
+        """GET /managers/gyms/summary - Gyms: totals per location, for the owner"""
+        return self._transport.request("GET", "/managers/gyms/summary", params={"start_date": start_date, "end_date": end_date})
+
+    def reconcile_payments(self, *, file: IO[bytes] | bytes, batch_size: int | None = None, dry_run: str | None = None) -> Any:
+        """POST /managers/payments/reconcile - Payment Reconciliation: upload a settlement CSV as the 'file' form field"""
+        return self._transport.request("POST", "/managers/payments/reconcile", params={"batch_size": batch_size, "dry_run": dry_run}, files={"file": file})
+
+    def retention(self, *, from_: str | None = None, to: str | None = None, max_months: int | None = None) -> Any:
+        """GET /managers/retention - Retention: monthly signup cohorts x share still active N months later"""
+        return self._transport.request("GET", "/managers/retention", params={"from": from_, "to": to, "max_months": max_months})
+
+    def revenue_aging(self, *, as_of: str | None = None) -> Any:
+        """GET /managers/revenue/aging - Revenue Aging: overdue totals per aging bucket (0-30, 31-60, 61-90, 90+ days)"""
+        return self._transport.request("GET", "/managers/revenue/aging", params={"as_of": as_of})
+
+    def revenue_by_category(self, *, start_date: str | None = None, end_date: str | None = None) -> RevenueByCategoryResult:
+        """GET /managers/revenue/by-category - Revenue by Category: Analyze different revenue streams"""
+        return self._transport.request("GET", "/managers/revenue/by-category", params={"start_date": start_date, "end_date": end_date})
+
+    def revenue_summary(self, *, start_date: str | None = None, end_date: str | None = None) -> Any:
+        """GET /managers/revenue/summary - Revenue Summary: Basic dashboard totals"""
+        return self._transport.request("GET", "/managers/revenue/summary", params={"start_date": start_date, "end_date": end_date})
+
+    def revenue_trend_by_class(self, *, start_date: str | None = None, end_date: str | None = None, trainer_id: str | None = None) -> RevenueTrendByClassResult:
+        """GET /managers/revenue/class-trend - revenue trend by class"""
+        return self._transport.request("GET", "/managers/revenue/class-trend", params={"start_date": start_date, "end_date": end_date, "trainer_id": trainer_id})
+
+    def start_billing_run(self, *, billing_period: str, idempotency_key: str | None = None, amount: float | Decimal | None = _UNSET, category: str = _UNSET, chunk_size: int = _UNSET) -> StartBillingRunResult:
+        """POST /managers/billing/runs - Billing Runs: month-end invoices for every active member"""
+        return self._transport.request("POST", "/managers/billing/runs", json=_fields(billing_period=billing_period, amount=amount, category=category, chunk_size=chunk_size), headers={"Idempotency-Key": idempotency_key})
+
+    def trainer_revenue(self, *, start_date: str | None = None, end_date: str | None = None) -> TrainerRevenueResult:
+        """GET /managers/revenue/by-trainer - Trainer Revenue: Lists revenue per trainer"""
+        return self._transport.request("GET", "/managers/revenue/by-trainer", params={"start_date": start_date, "end_date": end_date})
+
+
+class MembersApi:
+    """The /members routes."""
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    def create_goal(self, member_id: int, *, goal_type: str, target_value: float | Decimal, idempotency_key: str | None = None, current_value: float | Decimal | None = _UNSET, start_date: str | date = _UNSET, deadline: str | date | None = _UNSET) -> CreateGoalResult:
+        """POST /members/{member_id}/goals - Create new goal"""
+        return self._transport.request("POST", f"/members/{member_id}/goals", json=_fields(goal_type=goal_type, target_value=target_value, current_value=current_value, start_date=start_date, deadline=deadline), headers={"Idempotency-Key": idempotency_key})
+
+    def create_member(self, *, first_name: str, last_name: str, idempotency_key: str | None = None, trainer_id: int | None = _UNSET, nutritionist_id: int | None = _UNSET, status: str = _UNSET, joined_date: str | date | None = _UNSET) -> CreateMemberResult:
+        """POST /members/members - Create new member"""
+        return self._transport.request("POST", "/members/members", json=_fields(first_name=first_name, last_name=last_name, trainer_id=trainer_id, nutritionist_id=nutritionist_id, status=status, joined_date=joined_date), headers={"Idempotency-Key": idempotency_key})
+
+    def create_message(self, member_id: int, *, content: str, idempotency_key: str | None = None, trainer_id: int | None = _UNSET, read_status: str = _UNSET) -> CreateMessageResult:
+        """POST /members/{member_id}/messages - Send new message"""
+        return self._transport.request("POST", f"/members/{member_id}/messages", json=_fields(content=content, trainer_id=trainer_id, read_status=read_status), headers={"Idempotency-Key": idempotency_key})
+
+    def create_progress(self, member_id: int, *, progress_date: str | date, idempotency_key: str | None = None, weight: float | Decimal | None = _UNSET, body_fat_percentage: float | Decimal | None = _UNSET, measurements: str | None = _UNSET, photos: str | None = _UNSET) -> CreateProgressResult:
+        """POST /members/{member_id}/progress - Create new progress entry"""
+        return self._transport.request("POST", f"/members/{member_id}/progress", json=_fields(progress_date=progress_date, weight=weight, body_fat_percentage=body_fat_percentage, measurements=measurements, photos=photos), headers={"Idempotency-Key": idempotency_key})
+
+    def create_workout_log(self, member_id: int, *, workout_date: str | date, idempotency_key: str | None = None, trainer_id: int | None = _UNSET, notes: str | None = _UNSET, sessions: int = _UNSET) -> CreateWorkoutLogResult:
+        """POST /members/{member_id}/workout-logs - Log new workout"""
+        return self._transport.request("POST", f"/members/{member_id}/workout-logs", json=_fields(workout_date=workout_date, trainer_id=trainer_id, notes=notes, sessions=sessions), headers={"Idempotency-Key": idempotency_key})
+
+    def create_workout_plan(self, member_id: int, *, goals: str, plan_date: str | date, idempotency_key: str | None = None) -> CreateWorkoutPlanResult:
+        """POST /members/{member_id}/workout-plans - Create new workout plan"""
+        return self._transport.request("POST", f"/members/{member_id}/workout-plans", json=_fields(goals=goals, plan_date=plan_date), headers={"Idempotency-Key": idempotency_key})
+
+    def deactivate_member(self, member_id: int) -> DeactivateMemberResult:
+        """DELETE /members/{member_id} - Deactivate member (soft delete)"""
+        return self._transport.request("DELETE", f"/members/{member_id}")
+
+    def delete_goal(self, goal_id: int) -> DeleteGoalResult:
+        """DELETE /members/goals/{goal_id} - Delete goal"""
+        return self._transport.request("DELETE", f"/members/goals/{goal_id}")
+
+    def delete_progress(self, progress_id: int) -> DeleteProgressResult:
+        """DELETE /members/progress/{progress_id} - Delete progress entry"""
+        return self._transport.request("DELETE", f"/members/progress/{progress_id}")
+
+    def get_all_members(self, *, fields: str | None = None, sort: str | None = None, member_id: int | None = None, member_id__in: str | None = None, first_name: str | None = None, first_name__in: str | None = None, first_name__prefix: str | None = None, last_name: str | None = None, last_name__in: str | None = None, last_name__prefix: str | None = None, trainer_id: int | None = None, trainer_id__in: str | None = None, nutritionist_id: int | None = None, nutritionist_id__in: str | None = None, status: str | None = None, status__ne: str | None = None, status__in: str | None = None, joined_date: str | date | None = None, joined_date__gt: str | date | None = None, joined_date__gte: str | date | None = None, joined_date__lt: str | date | None = None, joined_date__lte: str | date | None = None, joined_date__in: str | None = None) -> list[dict[str, Any]]:
+        """GET /members/members - All members"""
+        return self._transport.request("GET", "/members/members", params={"fields": fields, "sort": sort, "member_id": member_id, "member_id__in": member_id__in, "first_name": first_name, "first_name__in": first_name__in, "first_name__prefix": first_name__prefix, "last_name": last_name, "last_name__in": last_name__in, "last_name__prefix": last_name__prefix, "trainer_id": trainer_id, "trainer_id__in": trainer_id__in, "nutritionist_id": nutritionist_id, "nutritionist_id__in": nutritionist_id__in, "status": status, "status__ne": status__ne, "status__in": status__in, "joined_date": joined_date, "joined_date__gt": joined_date__gt, "joined_date__gte": joined_date__gte, "joined_date__lt": joined_date__lt, "joined_date__lte": joined_date__lte, "joined_date__in": joined_date__in})
+
+    def get_member(self, member_id: int) -> dict[str, Any]:
+        """GET /members/{member_id} - Specific member profile"""
+        return self._transport.request("GET", f"/members/{member_id}")
+
+    def get_member_goals(self, member_id: int) -> list[dict[str, Any]]:
+        """GET /members/{member_id}/goals - All goals for a member, with completion_pct, achieved, eta and on_track"""
+        return self._transport.request("GET", f"/members/{member_id}/goals")
+
+    def get_member_messages(self, member_id: int, *, since: str | None = None) -> list[dict[str, Any]]:
+        """GET /members/{member_id}/messages - Messages for a member"""
+        return self._transport.request("GET", f"/members/{member_id}/messages", params={"since": since})
+
+    def get_message(self, message_id: int) -> dict[str, Any]:
+        """GET /members/messages/{message_id} - Specific message"""
+        return self._transport.request("GET", f"/members/messages/{message_id}")
+
+    def get_progress(self, member_id: int, *, fields: str | None = None, sort: str | None = None, date: str | date | None = None, date__gt: str | date | None = None, date__gte: str | date | None = None, date__lt: str | date | None = None, date__lte: str | date | None = None, date__in: str | None = None, weight: float | Decimal | None = None, weight__gt: float | Decimal | None = None, weight__gte: float | Decimal | None = None, weight__lt: float | Decimal | None = None, weight__lte: float | Decimal | None = None, weight__in: str | None = None, body_fat_percentage: float | Decimal | None = None, body_fat_percentage__gt: float | Decimal | None = None, body_fat_percentage__gte: float | Decimal | None = None, body_fat_percentage__lt: float | Decimal | None = None, body_fat_percentage__lte: float | Decimal | None = None, body_fat_percentage__in: str | None = None) -> list[dict[str, Any]]:
+        """GET /members/{member_id}/progress - Progress for a member"""
+        return self._transport.request("GET", f"/members/{member_id}/progress", params={"fields": fields, "sort": sort, "date": date, "date__gt": date__gt, "date__gte": date__gte, "date__lt": date__lt, "date__lte": date__lte, "date__in": date__in, "weight": weight, "weight__gt": weight__gt, "weight__gte": weight__gte, "weight__lt": weight__lt, "weight__lte": weight__lte, "weight__in": weight__in, "body_fat_percentage": body_fat_percentage, "body_fat_percentage__gt": body_fat_percentage__gt, "body_fat_percentage__gte": body_fat_percentage__gte, "body_fat_percentage__lt": body_fat_percentage__lt, "body_fat_percentage__lte": body_fat_percentage__lte, "body_fat_percentage__in": body_fat_percentage__in})
+
+    def get_unread_counts(self, member_id: int) -> Any:
+        """GET /members/{member_id}/messages/unread - Unread message counts for a member, per trainer"""
+        return self._transport.request("GET", f"/members/{member_id}/messages/unread")
+
+    def get_workout_log(self, log_id: int, *, expand: str | None = None) -> dict[str, Any]:
+        """GET /members/workout-logs/{log_id} - Specific workout log"""
+        return self._transport.request("GET", f"/members/workout-logs/{log_id}", params={"expand": expand})
+
+    def get_workout_logs(self, member_id: int, *, fields: str | None = None, sort: str | None = None, trainer_id: int | None = None, trainer_id__in: str | None = None, date: str | date | None = None, date__gt: str | date | None = None, date__gte: str | date | None = None, date__lt: str | date | None = None, date__lte: str | date | None = None, date__in: str | None = None, sessions: int | None = None, sessions__gt: int | None = None, sessions__gte: int | None = None, sessions__lt: int | None = None, sessions__lte: int | None = None, sessions__in: str | None = None) -> list[dict[str, Any]]:
+        """GET /members/{member_id}/workout-logs - Workout logs for a member"""
+        return self._transport.request("GET", f"/members/{member_id}/workout-logs", params={"fields": fields, "sort": sort, "trainer_id": trainer_id, "trainer_id__in": trainer_id__in, "date": date, "date__gt": date__gt, "date__gte": date__gte, "date__lt": date__lt, "date__lte": date__lte, "date__in": date__in, "sessions": sessions, "sessions__gt": sessions__gt, "sessions__gte": sessions__gte, "sessions__lt": sessions__lt, "sessions__lte": sessions__lte, "sessions__in": sessions__in})
+
+    def get_workout_plan(self, plan_id: int, *, expand: str | None = None) -> dict[str, Any]:
+        """GET /members/workout-plans/{plan_id} - Specific workout plan details"""
+        return self._transport.request("GET", f"/members/workout-plans/{plan_id}", params={"expand": expand})
+
+    def get_workout_plans(self, member_id: int, *, fields: str | None = None, sort: str | None = None, date: str | date | None = None, date__gt: str | date | None = None, date__gte: str | date | None = None, date__lt: str | date | None = None, date__lte: str | date | None = None, date__in: str | None = None) -> list[dict[str, Any]]:
+        """GET /members/{member_id}/workout-plans - Workout plans for a member"""
+        return self._transport.request("GET", f"/members/{member_id}/workout-plans", params={"fields": fields, "sort": sort, "date": date, "date__gt": date__gt, "date__gte": date__gte, "date__lt": date__lt, "date__lte": date__lte, "date__in": date__in})
+
+    def mark_messages_read(self, member_id: int, *, trainer_id: int | None = _UNSET, message_ids: list[int] | None = _UNSET, up_to_id: int | None = _UNSET) -> MarkMessagesReadResult:
+        """PUT /members/{member_id}/messages/read - Mark many messages as read at once"""
+        return self._transport.request("PUT", f"/members/{member_id}/messages/read", json=_fields(trainer_id=trainer_id, message_ids=message_ids, up_to_id=up_to_id))
+
+    def stream_member_messages(self, member_id: int) -> requests.Response:
+        """GET /members/{member_id}/messages/stream - Live stream of new messages for a member (Server-Sent Events)"""
+        return self._transport.request("GET", f"/members/{member_id}/messages/stream", stream=True)
+
+    def update_goal(self, goal_id: int, *, goal_type: str = _UNSET, target_value: float | Decimal = _UNSET, current_value: float | Decimal | None = _UNSET, start_date: str | date = _UNSET, deadline: str | date | None = _UNSET) -> UpdateGoalResult:
+        """PUT /members/goals/{goal_id} - Update goal"""
+        return self._transport.request("PUT", f"/members/goals/{goal_id}", json=_fields(goal_type=goal_type, target_value=target_value, current_value=current_value, start_date=start_date, deadline=deadline))
+
+    def update_member(self, member_id: int, *, first_name: str = _UNSET, last_name: str = _UNSET, trainer_id: int | None = _UNSET, nutritionist_id: int | None = _UNSET, status: str = _UNSET) -> UpdateMemberResult:
+        """PUT /members/{member_id} - Update an existing member's information"""
+        return self._transport.request("PUT", f"/members/{member_id}", json=_fields(first_name=first_name, last_name=last_name, trainer_id=trainer_id, nutritionist_id=nutritionist_id, status=status))
+
+    def update_message(self, message_id: int, *, read_status: str = _UNSET) -> UpdateMessageResult:
+        """PUT /members/messages/{message_id} - Mark message as read/archived"""
+        return self._transport.request("PUT", f"/members/messages/{message_id}", json=_fields(read_status=read_status))
+
+    def update_progress(self, progress_id: int, *, weight: float | Decimal | None = _UNSET, body_fat_percentage: float | Decimal | None = _UNSET, measurements: str | None = _UNSET, photos: str | None = _UNSET) -> UpdateProgressResult:
+        """PUT /members/progress/{progress_id} - Update progress entry"""
+        return self._transport.request("PUT", f"/members/progress/{progress_id}", json=_fields(weight=weight, body_fat_percentage=body_fat_percentage, measurements=measurements, photos=photos))
+
+    def update_workout_plan(self, plan_id: int, *, goals: str = _UNSET, plan_date: str | date = _UNSET) -> UpdateWorkoutPlanResult:
+        """PUT /members/workout-plans/{plan_id} - Update workout plan"""
+        return self._transport.request("PUT", f"/members/workout-plans/{plan_id}", json=_fields(goals=goals, plan_date=plan_date))
+
+
+class NutritionistsApi:
+    """The /nutritionists routes."""
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    def create_food_log(self, *, member_id: int, food: str, log_timestamp: str | datetime, idempotency_key: str | None = None, portion_size: str | None = _UNSET, calories: int | None = _UNSET, proteins: float | Decimal | None = _UNSET, carbs: float | Decimal | None = _UNSET, fats: float | Decimal | None = _UNSET) -> CreateFoodLogResult:
+        """POST /nutritionists/food-logs - Create new food log entry"""
+        return self._transport.request("POST", "/nutritionists/food-logs", json=_fields(member_id=member_id, food=food, log_timestamp=log_timestamp, portion_size=portion_size, calories=calories, proteins=proteins, carbs=carbs, fats=fats), headers={"Idempotency-Key": idempotency_key})
+
+    def create_meal_plan(self, *, member_id: int, calorie_goals: int, plan_date: str | date, idempotency_key: str | None = None, macro_goals: str | None = _UNSET) -> CreateMealPlanResult:
+        """POST /nutritionists/meal-plans - Create new meal plan"""
+        return self._transport.request("POST", "/nutritionists/meal-plans", json=_fields(member_id=member_id, calorie_goals=calorie_goals, plan_date=plan_date, macro_goals=macro_goals), headers={"Idempotency-Key": idempotency_key})
+
+    def create_nutritionist(self, *, first_name: str, last_name: str, idempotency_key: str | None = None) -> CreateNutritionistResult:
+        """POST /nutritionists/ - Create new nutritionist profile"""
+        return self._transport.request("POST", "/nutritionists/", json=_fields(first_name=first_name, last_name=last_name), headers={"Idempotency-Key": idempotency_key})
+
+    def delete_food_log(self, log_id: int) -> DeleteFoodLogResult:
+        """DELETE /nutritionists/food-logs/{log_id} - Delete food log entry"""
+        return self._transport.request("DELETE", f"/nutritionists/food-logs/{log_id}")
+
+    def delete_meal_plan(self, plan_id: int) -> DeleteMealPlanResult:
+        """DELETE /nutritionists/meal-plans/{plan_id} - Delete meal plan"""
+        return self._transport.request("DELETE", f"/nutritionists/meal-plans/{plan_id}")
+
+    def get_all_nutritionists(self, *, fields: str | None = None, sort: str | None = None, nutritionist_id: int | None = None, nutritionist_id__in: str | None = None, first_name: str | None = None, first_name__in: str | None = None, first_name__prefix: str | None = None, last_name: str | None = None, last_name__in: str | None = None, last_name__prefix: str | None = None) -> list[dict[str, Any]]:
+        """GET /nutritionists/ - All nutritionists"""
+        return self._transport.request("GET", "/nutritionists/", params={"fields": fields, "sort": sort, "nutritionist_id": nutritionist_id, "nutritionist_id__in": nutritionist_id__in, "first_name": first_name, "first_name__in": first_name__in, "first_name__prefix": first_name__prefix, "last_name": last_name, "last_name__in": last_name__in, "last_name__prefix": last_name__prefix})
+
+    def get_food_logs(self, *, fields: str | None = None, sort: str | None = None, member_id: int | None = None, member_id__in: str | None = None, food: str | None = None, food__in: str | None = None, food__prefix: str | None = None, timestamp: str | datetime | None = None, timestamp__gt: str | datetime | None = None, timestamp__gte: str | datetime | None = None, timestamp__lt: str | datetime | None = None, timestamp__lte: str | datetime | None = None, timestamp__in: str | None = None, calories: int | None = None, calories__gt: int | None = None, calories__gte: int | None = None, calories__lt: int | None = None, calories__lte: int | None = None, calories__in: str | None = None) -> list[dict[str, Any]]:
+        """GET /nutritionists/food-logs - Food log entries for a member"""
+        return self._transport.request("GET", "/nutritionists/food-logs", params={"fields": fields, "sort": sort, "member_id": member_id, "member_id__in": member_id__in, "food": food, "food__in": food__in, "food__prefix": food__prefix, "timestamp": timestamp, "timestamp__gt": timestamp__gt, "timestamp__gte": timestamp__gte, "timestamp__lt": timestamp__lt, "timestamp__lte": timestamp__lte, "timestamp__in": timestamp__in, "calories": calories, "calories__gt": calories__gt, "calories__gte": calories__gte, "calories__lt": calories__lt, "calories__lte": calories__lte, "calories__in": calories__in})
+
+    def get_meal_plan(self, plan_id: int) -> dict[str, Any]:
+        """GET /nutritionists/meal-plans/{plan_id} - Specific meal plan details"""
+        return self._transport.request("GET", f"/nutritionists/meal-plans/{plan_id}")
+
+    def get_meal_plans(self, *, fields: str | None = None, sort: str | None = None, member_id: int | None = None, member_id__in: str | None = None, calorie_goals: int | None = None, calorie_goals__gt: int | None = None, calorie_goals__gte: int | None = None, calorie_goals__lt: int | None = None, calorie_goals__lte: int | None = None, calorie_goals__in: str | None = None, date: str | date | None = None, date__gt: str | date | None = None, date__gte: str | date | None = None, date__lt: str | date | None = None, date__lte: str | date | None = None, date__in: str | None = None) -> list[dict[str, Any]]:
+        """GET /nutritionists/meal-plans - Meal plans by nutritionist or member"""
+        return self._transport.request("GET", "/nutritionists/meal-plans", params={"fields": fields, "sort": sort, "member_id": member_id, "member_id__in": member_id__in, "calorie_goals": calorie_goals, "calorie_goals__gt": calorie_goals__gt, "calorie_goals__gte": calorie_goals__gte, "calorie_goals__lt": calorie_goals__lt, "calorie_goals__lte": calorie_goals__lte, "calorie_goals__in": calorie_goals__in, "date": date, "date__gt": date__gt, "date__gte": date__gte, "date__lt": date__lt, "date__lte": date__lte, "date__in": date__in})
+
+    def get_nutritionist(self, nutritionist_id: int) -> dict[str, Any]:
+        """GET /nutritionists/{nutritionist_id} - Specific nutritionist profile"""
+        return self._transport.request("GET", f"/nutritionists/{nutritionist_id}")
+
+    def update_food_log(self, log_id: int, *, food: str = _UNSET, portion_size: str | None = _UNSET, calories: int | None = _UNSET, proteins: float | Decimal | None = _UNSET, carbs: float | Decimal | None = _UNSET, fats: float | Decimal | None = _UNSET) -> UpdateFoodLogResult:
+        """PUT /nutritionists/food-logs/{log_id} - Update food log entry"""
+        return self._transport.request("PUT", f"/nutritionists/food-logs/{log_id}", json=_fields(food=food, portion_size=portion_size, calories=calories, proteins=proteins, carbs=carbs, fats=fats))
+
+    def update_meal_plan(self, plan_id: int, *, calorie_goals: int = _UNSET, macro_goals: str | None = _UNSET, plan_date: str | date = _UNSET) -> UpdateMealPlanResult:
+        """PUT /nutritionists/meal-plans/{plan_id} - Update meal plan"""
+        return self._transport.request("PUT", f"/nutritionists/meal-plans/{plan_id}", json=_fields(calorie_goals=calorie_goals, macro_goals=macro_goals, plan_date=plan_date))
+
+    def update_nutritionist(self, nutritionist_id: int, *, first_name: str = _UNSET, last_name: str = _UNSET) -> UpdateNutritionistResult:
+        """PUT /nutritionists/{nutritionist_id} - Update nutritionist profile"""
+        return self._transport.request("PUT", f"/nutritionists/{nutritionist_id}", json=_fields(first_name=first_name, last_name=last_name))
+
+
+class OpsApi:
+    """The /ops routes."""
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    def get_limits(self) -> Any:
+        """GET /ops/limits - Current rate, concurrency and load shedding limits"""
+        return self._transport.request("GET", "/ops/limits")
+
+    def get_metrics(self) -> Any:
+        """GET /ops/metrics - Counters and gauges for the API process"""
+        return self._transport.request("GET", "/ops/metrics")
+
+    def get_openapi(self) -> Any:
+        """GET /ops/openapi.json - The OpenAPI document for every route (built once per process)"""
+        return self._transport.request("GET", "/ops/openapi.json")
+
+    def update_limits(self, *, body: dict[str, Any]) -> Any:
+        """PUT /ops/limits - Change limits at runtime (only the keys sent are changed)"""
+        return self._transport.request("PUT", "/ops/limits", json=body)
+
+
+class SearchApi:
+    """The /search routes."""
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    def search_caseload(self, *, q: str | None = None, scope: str | None = None, trainer_id: int | None = None, page: int | None = None, nutritionist_id: int | None = None, per_page: int | None = None) -> SearchCaseloadResult:
+        """GET /search - Search across messages, workout notes and food entries"""
+        return self._transport.request("GET", "/search", params={"q": q, "scope": scope, "trainer_id": trainer_id, "page": page, "nutritionist_id": nutritionist_id, "per_page": per_page})
+
+
+class TrainersApi:
+    """The /trainers routes."""
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    def cancel_session(self, session_id: int) -> CancelSessionResult:
+        """DELETE /trainers/sessions/{session_id} - Cancel session"""
+        return self._transport.request("DELETE", f"/trainers/sessions/{session_id}")
+
+    def create_exercise(self, *, category: str, idempotency_key: str | None = None, sets: int | None = _UNSET, reps: int | None = _UNSET, weight: float | Decimal | None = _UNSET) -> CreateExerciseResult:
+        """POST /trainers/exercises - Add an exercise to the catalog"""
+        return self._transport.request("POST", "/trainers/exercises", json=_fields(category=category, sets=sets, reps=reps, weight=weight), headers={"Idempotency-Key": idempotency_key})
+
+    def create_invoice(self, trainer_id: int, *, member_id: int, amount: float | Decimal, invoice_date: str | date, category: str, idempotency_key: str | None = None, status: str = _UNSET) -> CreateInvoiceResult:
+        """POST /trainers/{trainer_id}/invoices - Create invoice"""
+        return self._transport.request("POST", f"/trainers/{trainer_id}/invoices", json=_fields(member_id=member_id, amount=amount, invoice_date=invoice_date, category=category, status=status), headers={"Idempotency-Key": idempotency_key})
+
+    def create_session(self, trainer_id: int, *, class_name: str, session_date: str | datetime, idempotency_key: str | None = None, cost: float | Decimal | None = _UNSET, capacity: int = _UNSET) -> CreateSessionResult:
+        """POST /trainers/{trainer_id}/sessions - Create session"""
+        return self._transport.request("POST", f"/trainers/{trainer_id}/sessions", json=_fields(class_name=class_name, session_date=session_date, cost=cost, capacity=capacity), headers={"Idempotency-Key": idempotency_key})
+
+    def create_trainer(self, *, first_name: str, last_name: str, idempotency_key: str | None = None) -> CreateTrainerResult:
+        """POST /trainers/ - Create new trainer"""
+        return self._transport.request("POST", "/trainers/", json=_fields(first_name=first_name, last_name=last_name), headers={"Idempotency-Key": idempotency_key})
+
+    def create_trainer_workout_log(self, trainer_id: int, *, member_id: int, workout_date: str | date, idempotency_key: str | None = None, notes: str | None = _UNSET, sessions: int = _UNSET) -> CreateTrainerWorkoutLogResult:
+        """POST /trainers/{trainer_id}/workout-logs - Record workout log"""
+        return self._transport.request("POST", f"/trainers/{trainer_id}/workout-logs", json=_fields(member_id=member_id, workout_date=workout_date, notes=notes, sessions=sessions), headers={"Idempotency-Key": idempotency_key})
+
+    def create_trainer_workout_plan(self, trainer_id: int, *, member_id: int, goals: str, plan_date: str | date, idempotency_key: str | None = None) -> CreateTrainerWorkoutPlanResult:
+        """POST /trainers/{trainer_id}/workout-plans - Create workout plan"""
+        return self._transport.request("POST", f"/trainers/{trainer_id}/workout-plans", json=_fields(member_id=member_id, goals=goals, plan_date=plan_date), headers={"Idempotency-Key": idempotency_key})
+
+    def delete_workout_log(self, log_id: int) -> DeleteWorkoutLogResult:
+        """DELETE /trainers/workout-logs/{log_id} - Delete workout log"""
+        return self._transport.request("DELETE", f"/trainers/workout-logs/{log_id}")
+
+    def get_all_trainers(self, *, fields: str | None = None, sort: str | None = None, trainer_id: int | None = None, trainer_id__in: str | None = None, first_name: str | None = None, first_name__in: str | None = None, first_name__prefix: str | None = None, last_name: str | None = None, last_name__in: str | None = None, last_name__prefix: str | None = None) -> list[dict[str, Any]]:
+        """GET /trainers/ - All trainers"""
+        return self._transport.request("GET", "/trainers/", params={"fields": fields, "sort": sort, "trainer_id": trainer_id, "trainer_id__in": trainer_id__in, "first_name": first_name, "first_name__in": first_name__in, "first_name__prefix": first_name__prefix, "last_name": last_name, "last_name__in": last_name__in, "last_name__prefix": last_name__prefix})
+
+    def get_client_profile(self, trainer_id: int, client_id: int) -> dict[str, Any]:
+        """GET /trainers/{trainer_id}/clients/{client_id} - Specific client profile"""
+        return self._transport.request("GET", f"/trainers/{trainer_id}/clients/{client_id}")
+
+    def get_client_volume(self, trainer_id: int, client_id: int, *, category: str | None = None, weeks: int | None = None) -> Any:
+        """GET /trainers/{trainer_id}/clients/{client_id}/volume - Weekly training volume for a client (tonnage, per-category volume, est. 1RM)"""
+        return self._transport.request("GET", f"/trainers/{trainer_id}/clients/{client_id}/volume", params={"category": category, "weeks": weeks})
+
+    def get_exercises(self) -> Any:
+        """GET /trainers/exercises - EXERCISE catalog commands"""
+        return self._transport.request("GET", "/trainers/exercises")
+
+    def get_trainer(self, trainer_id: int) -> dict[str, Any]:
+        """GET /trainers/{trainer_id} - Specific trainer profile"""
+        return self._transport.request("GET", f"/trainers/{trainer_id}")
+
+    def get_trainer_clients(self, trainer_id: int, *, fields: str | None = None, sort: str | None = None, member_id: int | None = None, member_id__in: str | None = None, last_name: str | None = None, last_name__in: str | None = None, last_name__prefix: str | None = None, status: str | None = None, status__ne: str | None = None, status__in: str | None = None, joined_date: str | date | None = None, joined_date__gt: str | date | None = None, joined_date__gte: str | date | None = None, joined_date__lt: str | date | None = None, joined_date__lte: str | date | None = None, joined_date__in: str | None = None) -> list[dict[str, Any]]:
+        """GET /trainers/{trainer_id}/clients - All clients for a specific trainer"""
+        return self._transport.request("GET", f"/trainers/{trainer_id}/clients", params={"fields": fields, "sort": sort, "member_id": member_id, "member_id__in": member_id__in, "last_name": last_name, "last_name__in": last_name__in, "last_name__prefix": last_name__prefix, "status": status, "status__ne": status__ne, "status__in": status__in, "joined_date": joined_date, "joined_date__gt": joined_date__gt, "joined_date__gte": joined_date__gte, "joined_date__lt": joined_date__lt, "joined_date__lte": joined_date__lte, "joined_date__in": joined_date__in})
+
+    def get_trainer_invoices(self, trainer_id: int, *, fields: str | None = None, sort: str | None = None, member_id: int | None = None, member_id__in: str | None = None, status: str | None = None, status__ne: str | None = None, status__in: str | None = None, category: str | None = None, category__in: str | None = None, category__prefix: str | None = None, amount: float | Decimal | None = None, amount__gt: float | Decimal | None = None, amount__gte: float | Decimal | None = None, amount__lt: float | Decimal | None = None, amount__lte: float | Decimal | None = None, amount__in: str | None = None, date_issued: str | date | None = None, date_issued__gt: str | date | None = None, date_issued__gte: str | date | None = None, date_issued__lt: str | date | None = None, date_issued__lte: str | date | None = None, date_issued__in: str | None = None) -> Any:
+        """GET /trainers/{trainer_id}/invoices - Invoices for trainer"""
+        return self._transport.request("GET", f"/trainers/{trainer_id}/invoices", params={"fields": fields, "sort": sort, "member_id": member_id, "member_id__in": member_id__in, "status": status, "status__ne": status__ne, "status__in": status__in, "category": category, "category__in": category__in, "category__prefix": category__prefix, "amount": amount, "amount__gt": amount__gt, "amount__gte": amount__gte, "amount__lt": amount__lt, "amount__lte": amount__lte, "amount__in": amount__in, "date_issued": date_issued, "date_issued__gt": date_issued__gt, "date_issued__gte": date_issued__gte, "date_issued__lt": date_issued__lt, "date_issued__lte": date_issued__lte, "date_issued__in": date_issued__in})
+
+    def get_trainer_sessions(self, trainer_id: int, *, fields: str | None = None, sort: str | None = None, session_id: int | None = None, session_id__in: str | None = None, class_name: str | None = None, class_name__in: str | None = None, class_name__prefix: str | None = None, date: str | datetime | None = None, date__gt: str | datetime | None = None, date__gte: str | datetime | None = None, date__lt: str | datetime | None = None, date__lte: str | datetime | None = None, date__in: str | None = None, cost: float | Decimal | None = None, cost__gt: float | Decimal | None = None, cost__gte: float | Decimal | None = None, cost__lt: float | Decimal | None = None, cost__lte: float | Decimal | None = None, cost__in: str | None = None, date_from: str | datetime | None = None, date_to: str | datetime | None = None) -> list[dict[str, Any]]:
+        """GET /trainers/{trainer_id}/sessions - Sessions for a trainer"""
+        return self._transport.request("GET", f"/trainers/{trainer_id}/sessions", params={"fields": fields, "sort": sort, "session_id": session_id, "session_id__in": session_id__in, "class_name": class_name, "class_name__in": class_name__in, "class_name__prefix": class_name__prefix, "date": date, "date__gt": date__gt, "date__gte": date__gte, "date__lt": date__lt, "date__lte": date__lte, "date__in": date__in, "cost": cost, "cost__gt": cost__gt, "cost__gte": cost__gte, "cost__lt": cost__lt, "cost__lte": cost__lte, "cost__in": cost__in, "date_from": date_from, "date_to": date_to})
+
+    def get_trainer_workout_logs(self, trainer_id: int, *, fields: str | None = None, sort: str | None = None, member_id: int | None = None, member_id__in: str | None = None, date: str | date | None = None, date__gt: str | date | None = None, date__gte: str | date | None = None, date__lt: str | date | None = None, date__lte: str | date | None = None, date__in: str | None = None, sessions: int | None = None, sessions__gt: int | None = None, sessions__gte: int | None = None, sessions__lt: int | None = None, sessions__lte: int | None = None, sessions__in: str | None = None) -> Any:
+        """GET /trainers/{trainer_id}/workout-logs - Workout logs for trainer's clients"""
+        return self._transport.request("GET", f"/trainers/{trainer_id}/workout-logs", params={"fields": fields, "sort": sort, "member_id": member_id, "member_id__in": member_id__in, "date": date, "date__gt": date__gt, "date__gte": date__gte, "date__lt": date__lt, "date__lte": date__lte, "date__in": date__in, "sessions": sessions, "sessions__gt": sessions__gt, "sessions__gte": sessions__gte, "sessions__lt": sessions__lt, "sessions__lte": sessions__lte, "sessions__in": sessions__in})
+
+    def get_trainer_workout_plans(self, trainer_id: int, *, fields: str | None = None, sort: str | None = None, member_id: int | None = None, member_id__in: str | None = None, date: str | date | None = None, date__gt: str | date | None = None, date__gte: str | date | None = None, date__lt: str | date | None = None, date__lte: str | date | None = None, date__in: str | None = None) -> list[dict[str, Any]]:
+        """GET /trainers/{trainer_id}/workout-plans - Workout plans created by trainer"""
+        return self._transport.request("GET", f"/trainers/{trainer_id}/workout-plans", params={"fields": fields, "sort": sort, "member_id": member_id, "member_id__in": member_id__in, "date": date, "date__gt": date__gt, "date__gte": date__gte, "date__lt": date__lt, "date__lte": date__lte, "date__in": date__in})
+
+    def stream_trainer_messages(self, trainer_id: int) -> requests.Response:
+        """GET /trainers/{trainer_id}/messages/stream - Live stream of new messages from a trainer's clients (Server-Sent Events)"""
+        return self._transport.request("GET", f"/trainers/{trainer_id}/messages/stream", stream=True)
+
+    def update_client_profile(self, trainer_id: int, client_id: int, *, first_name: str = _UNSET, last_name: str = _UNSET, status: str = _UNSET) -> UpdateClientProfileResult:
+        """PUT /trainers/{trainer_id}/clients/{client_id} - Update client profile"""
+        return self._transport.request("PUT", f"/trainers/{trainer_id}/clients/{client_id}", json=_fields(first_name=first_name, last_name=last_name, status=status))
+
+    def update_exercise(self, exercise_id: int, *, category: str = _UNSET, sets: int | None = _UNSET, reps: int | None = _UNSET, weight: float | Decimal | None = _UNSET) -> UpdateExerciseResult:
+        """PUT /trainers/exercises/{exercise_id} - Update an exercise"""
+        return self._transport.request("PUT", f"/trainers/exercises/{exercise_id}", json=_fields(category=category, sets=sets, reps=reps, weight=weight))
+
+    def update_invoice(self, invoice_id: int, *, amount: float | Decimal = _UNSET, status: str = _UNSET, category: str = _UNSET) -> UpdateInvoiceResult:
+        """PUT /trainers/invoices/{invoice_id} - Update invoice status"""
+        return self._transport.request("PUT", f"/trainers/invoices/{invoice_id}", json=_fields(amount=amount, status=status, category=category))
+
+    def update_session(self, session_id: int, *, class_name: str = _UNSET, session_date: str | datetime = _UNSET, cost: float | Decimal | None = _UNSET, capacity: int = _UNSET) -> UpdateSessionResult:
+        """PUT /trainers/sessions/{session_id} - Update session"""
+        return self._transport.request("PUT", f"/trainers/sessions/{session_id}", json=_fields(class_name=class_name, session_date=session_date, cost=cost, capacity=capacity))
+
+    def update_trainer(self, trainer_id: int, *, first_name: str = _UNSET, last_name: str = _UNSET) -> UpdateTrainerResult:
+        """PUT /trainers/{trainer_id} - Update trainer information"""
+        return self._transport.request("PUT", f"/trainers/{trainer_id}", json=_fields(first_name=first_name, last_name=last_name))
+
+    def update_trainer_workout_plan(self, plan_id: int, *, goals: str = _UNSET, plan_date: str | date = _UNSET) -> UpdateTrainerWorkoutPlanResult:
+        """PUT /trainers/workout-plans/{plan_id} - Update workout plan"""
+        return self._transport.request("PUT", f"/trainers/workout-plans/{plan_id}", json=_fields(goals=goals, plan_date=plan_date))
+
+    def update_workout_log(self, log_id: int, *, workout_date: str | date = _UNSET, notes: str | None = _UNSET, sessions: int = _UNSET) -> UpdateWorkoutLogResult:
+        """PUT /trainers/workout-logs/{log_id} - Update workout log"""
+        return self._transport.request("PUT", f"/trainers/workout-logs/{log_id}", json=_fields(workout_date=workout_date, notes=notes, sessions=sessions))
+
+    def void_invoice(self, invoice_id: int) -> VoidInvoiceResult:
+        """DELETE /trainers/invoices/{invoice_id} - Void invoice"""
+        return self._transport.request("DELETE", f"/trainers/invoices/{invoice_id}")
+
+
+class ApiClient:
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        client_id: str | None = None,
+        ops_token: str | None = None,
+        gym_id: int | None = None,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        session: requests.Session | None = None,
+    ):
+        # client_id splits the API's rate limit for this address by caller (X-Client-Id)
+        transport = _Transport(base_url, timeout, session, {
+            "X-Client-Id": client_id,
+            "X-Ops-Token": ops_token,
+            # the gym (location) every request is for; the API's default gym if None
+            "X-Gym-Id": None if gym_id is None else str(gym_id),
+        })
+        self.managers = ManagersApi(transport)
+        self.members = MembersApi(transport)
+        self.nutritionists = NutritionistsApi(transport)
+        self.ops = OpsApi(transport)
+        self.search = SearchApi(transport)
+        self.trainers = TrainersApi(transport)
@@ -0,0 +1,192 @@
+# A cache for API reads, shared by every browser session.
+#
+#   clients = cached("members", api.trainers.get_trainer_clients, trainer_id)
+#   ...
+#   api.trainers.update_client_profile(trainer_id, client_id, status="inactive")
+#   invalidate("members", member_id=client_id)
+#
+# Entries are keyed by the client's gym, the client method (one per
+# API endpoint) and its arguments, and live for the TTL of their
+# resource type. After a
+# write, invalidate() drops only that resource's entries that could
+# hold the changed row: entries read with the same value for each
+# given parameter, and entries that weren't filtered on it at all
+# (e.g. the all-clients list of a trainer when one member changes).
+# Entries for other members, or other resources, stay cached.
+#
+# Unlike st.cache_data.clear(), nothing else is thrown away, and
+# cache_stats() shows how well each resource is doing (Owner Home).
+#
+# Only one caller fetches a missing entry; others asking for the same
+# entry meanwhile wait for that result, so a page that opens while
+# modules/prefetch.py is still loading its data doesn't ask twice.
+
+import copy
+import inspect
+import threading
+import time
+
+import streamlit as st
+
+# seconds an entry is served before the API is asked again
+RESOURCE_TTLS = {
+    "members": 300,
+    "trainers": 600,
+    "nutritionists": 600,
+    "workout_logs": 60,
+    "workout_plans": 120,
+    "meal_plans": 120,
+    "food_logs": 60,
+    "progress": 120,
+    "sessions": 60,
+    "invoices": 60,
+    "revenue": 300,
+    "utilization": 300,
+}
+DEFAULT_TTL = 60
+
+# longest a caller waits on someone else's fetch before trying itself
+PENDING_WAIT_SECONDS = 15
+
+
+class _ResourceStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidated = 0
+
+
+class ApiCache:
+    def __init__(self, ttls=None, default_ttl=DEFAULT_TTL):
+        self.ttls = dict(RESOURCE_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        # (resource, gym, endpoint, params) -> (expires_at, params dict, value)
+        self._entries = {}
+        # key -> Event set when the fetch for that key finishes
+        self._pending = {}
+        self._stats = {}
+
+    def _stats_for(self, resource):
+        if resource not in self._stats:
+            self._stats[resource] = _ResourceStats()
+        return self._stats[resource]
+
+    def get(self, resource, fetch, *args, **kwargs):
+        """fetch(*args, **kwargs), from the cache while it is fresh. Errors are not cached."""
+        params = _params(fetch, args, kwargs)
+        key = (resource, _gym(fetch), fetch.__qualname__,
+               tuple(sorted((name, repr(value)) for name, value in params.items())))
+        now = time.monotonic()
+
+        with self._lock:
+            stats = self._stats_for(resource)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                stats.hits += 1
+                return copy.deepcopy(entry[2])
+            if entry is not None:
+                stats.expired += 1
+                del self._entries[key]
+            pending = self._pending.get(key)
+            if pending is None:
+                stats.misses += 1
+                self._pending[key] = threading.Event()
+
+        if pending is not None:
+            # someone else is fetching it; if their fetch failed, fetch it ourselves
+            pending.wait(PENDING_WAIT_SECONDS)
+            return self.get(resource, fetch, *args, **kwargs)
+
+        # outside the lock: other sessions keep being served while this one waits on the API
+        try:
+            value = fetch(*args, **kwargs)
+            ttl = self.ttls.get(resource, self.default_ttl)
+            with self._lock:
+                self._entries[key] = (time.monotonic() + ttl, params, value)
+        finally:
+            with self._lock:
+                self._pending.pop(key).set()
+        return copy.deepcopy(value)
+
+    def invalidate(self, resource, **params):
+        """
+        Drop resource's entries that may include rows matching params
+        (all of the resource's entries when no params are given).
+        """
+        with self._lock:
+            stale = [
+                key for key, (_, entry_params, _) in self._entries.items()
+                if key[0] == resource and all(
+                    name not in entry_params or entry_params[name] == value
+                    for name, value in params.items()
+                )
+            ]
+            for key in stale:
+                del self._entries[key]
+            self._stats_for(resource).invalidated += len(stale)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            for key in self._entries:
+                self._stats_for(key[0]).invalidated += 1
+            self._entries.clear()
+
+    def stats(self):
+        """One row per resource: TTL, live entries, hits, misses, expired, invalidated, hit rate."""
+        now = time.monotonic()
+        with self._lock:
+            live = {}
+            for (resource, *_), (expires_at, _, _) in self._entries.items():
+                if expires_at > now:
+                    live[resource] = live.get(resource, 0) + 1
+            rows = []
+            for resource in sorted(self._stats):
+                stats = self._stats[resource]
+                lookups = stats.hits + stats.misses
+                rows.append({
+                    "resource": resource,
+                    "ttl_seconds": self.ttls.get(resource, self.default_ttl),
+                    "entries": live.get(resource, 0),
+                    "hits": stats.hits,
+                    "misses": stats.misses,
+                    "expired": stats.expired,
+                    "invalidated": stats.invalidated,
+                    "hit_rate": round(stats.hits / lookups, 3) if lookups else None,
+                })
+        return rows
+
+
+def _params(fetch, args, kwargs):
+    """fetch's arguments by parameter name, leaving out the ones not passed (None)."""
+    try:
+        bound = inspect.signature(fetch).bind(*args, **kwargs).arguments
+    except (TypeError, ValueError):
+        bound = dict(enumerate(args), **kwargs)
+    return {name: value for name, value in bound.items() if value is not None}
+
+
+def _gym(fetch):
+    """X-Gym-Id of the ApiClient fetch is a method of: gyms never see each other's entries."""
+    transport = getattr(getattr(fetch, "__self__", None), "_transport", None)
+    return transport.headers.get("X-Gym-Id") if transport is not None else None
+
+
+@st.cache_resource
+def api_cache():
+    """The process-wide ApiCache."""
+    return ApiCache()
+
+
+def cached(resource, fetch, *args, **kwargs):
+    return api_cache().get(resource, fetch, *args, **kwargs)
+
+
+def invalidate(resource, **params):
+    return api_cache().invalidate(resource, **params)
+
+
+def cache_stats():
+    return api_cache().stats()
@@ -0,0 +1,53 @@
+# Helpers for submitting forms exactly once.
+#
+# Each form gets an Idempotency-Key kept in st.session_state. The key
+# is reused when the same submission is retried (dropped connection,
+# double click, resubmit after a timeout) so the API replays the first
+# result instead of inserting a duplicate row. It is replaced once the
+# API gives a final answer, so the next submission is a new request.
+
+import time
+import uuid
+
+import streamlit as st
+
+from modules.api_client import ApiError
+
+RETRIES = 2
+
+
+def form_key(form_name):
+    state_key = f"idempotency_key_{form_name}"
+    if state_key not in st.session_state:
+        st.session_state[state_key] = str(uuid.uuid4())
+    return st.session_state[state_key]
+
+
+def reset_form_key(form_name):
+    st.session_state.pop(f"idempotency_key_{form_name}", None)
+
+
+def submit_once(form_name, send):
+    """
+    Call send(idempotency_key), e.g.
+        lambda key: api.members.create_workout_log(member_id, ..., idempotency_key=key)
+    retrying dropped connections and "still in progress" answers with
+    the same key. Returns send's result; raises the last ApiError.
+    """
+    key = form_key(form_name)
+
+    for attempt in range(RETRIES + 1):
+        try:
+            result = send(key)
+        except ApiError as e:
+            # status None: no answer at all; 409 + Retry-After: the first try is still running
+            in_progress = e.status == 409 and e.retry_after
+            if (e.status is None or in_progress) and attempt < RETRIES:
+                time.sleep(e.retry_after or 1)
+                continue
+            # keep the key after server errors so a resubmit is still de-duplicated
+            if e.status is not None and e.status < 500 and not in_progress:
+                reset_form_key(form_name)
+            raise
+        reset_form_key(form_name)
+        return result
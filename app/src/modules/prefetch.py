@@ -0,0 +1,120 @@
+# Warms the API cache (modules/cache.py) when a persona is picked on
+# Home.py, so the pages that role usually opens first don't start
+# cold. The reads run on a small shared thread pool while Streamlit
+# switches to the role's home page; prefetch() itself doesn't wait.
+#
+# Each plan below makes exactly the cached() calls its pages make
+# (same client method, same arguments), otherwise the pages would
+# miss the entries it filled. Keep them in step when a page changes.
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import streamlit as st
+
+from modules.api import get_api
+from modules.cache import api_cache
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_WORKERS = 4
+
+
+@st.cache_resource
+def _executor():
+    return ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+
+
+def _member_plan(api, state):
+    member_id = state["member_id"]
+    return [
+        ("workout_logs", api.members.get_workout_logs, (member_id,), {}),
+        ("food_logs", api.nutritionists.get_food_logs, (), {"member_id": member_id}),
+        ("workout_plans", api.members.get_workout_plans, (member_id,), {}),
+        ("meal_plans", api.nutritionists.get_meal_plans, (), {"member_id": member_id}),
+        ("progress", api.members.get_progress, (member_id,), {}),
+    ]
+
+
+def _trainer_plan(api, state):
+    trainer_id = state["trainer_id"]
+    # 10_Trainer_Home: sessions in the coming week
+    today = datetime.now().date()
+    week_from_now = today + timedelta(days=7)
+    return [
+        ("trainers", api.trainers.get_trainer, (trainer_id,), {}),
+        ("members", api.trainers.get_trainer_clients, (trainer_id,), {"status": "active", "fields": "member_id"}),
+        ("members", api.trainers.get_trainer_clients, (trainer_id,), {}),
+        ("sessions", api.trainers.get_trainer_sessions, (trainer_id,),
+         {"date_from": str(today), "date_to": str(week_from_now), "fields": "session_id"}),
+        ("invoices", api.trainers.get_trainer_invoices, (trainer_id,), {"status": "pending", "fields": "invoice_id"}),
+        ("workout_logs", api.trainers.get_trainer_workout_logs, (trainer_id,), {}),
+        ("workout_plans", api.trainers.get_trainer_workout_plans, (trainer_id,), {}),
+    ]
+
+
+def _owner_plan(api, state):
+    # 22_Revenue's default range: the last 30 days, end date exclusive
+    today = date.today()
+    start_iso = (today - timedelta(days=30)).isoformat()
+    end_iso_plus1 = (today + timedelta(days=1)).isoformat()
+    return [
+        ("members", api.members.get_all_members, (), {"status": "active"}),
+        ("trainers", api.trainers.get_all_trainers, (), {}),
+        ("nutritionists", api.nutritionists.get_all_nutritionists, (), {}),
+        ("revenue", api.managers.trainer_revenue, (), {"start_date": start_iso, "end_date": end_iso_plus1}),
+        ("revenue", api.managers.revenue_trend_by_class, (), {"start_date": start_iso, "end_date": end_iso_plus1}),
+        ("revenue", api.managers.revenue_by_category, (), {"start_date": start_iso, "end_date": end_iso_plus1}),
+        ("utilization", api.managers.class_utilization, (), {}),
+    ]
+
+
+def _nutritionist_plan(api, state):
+    nutritionist_id = state["nutritionist_id"]
+
+    def caseload(cache):
+        members = cache.get("members", api.members.get_all_members, status="active",
+                            nutritionist_id=nutritionist_id)
+        if not members:
+            return
+        # the member the nutritionist pages select first
+        member_id = members[0].get("member_id")
+        cache.get("meal_plans", api.nutritionists.get_meal_plans, member_id=member_id)
+        cache.get("food_logs", api.nutritionists.get_food_logs, member_id=member_id)
+        cache.get("progress", api.members.get_progress, member_id)
+
+    return [caseload]
+
+
+PLANS = {
+    "member": _member_plan,
+    "trainer": _trainer_plan,
+    "owner": _owner_plan,
+    "nutritionist": _nutritionist_plan,
+}
+
+
+def _run(cache, step):
+    try:
+        if callable(step):
+            step(cache)
+        else:
+            resource, fetch, args, kwargs = step
+            cache.get(resource, fetch, *args, **kwargs)
+    except Exception as e:
+        # the page will fetch (and report) it itself
+        logger.info(f"Prefetch skipped: {e}")
+
+
+def prefetch(role):
+    """Start warming the cache for role's first pages. Call after filling st.session_state."""
+    plan = PLANS.get(role)
+    if plan is None:
+        return
+    # session state, the client and the cache are looked up here: the
+    # worker threads run outside the Streamlit script
+    cache = api_cache()
+    executor = _executor()
+    for step in plan(get_api(), st.session_state):
+        executor.submit(_run, cache, step)
@@ -1,7 +1,7 @@
 import streamlit as st
-import requests
-
-BASE_URL = "http://api:4000"
+from modules.api import ApiError, get_api, show_api_error
+from modules.idempotency import submit_once
+from modules.cache import cached, invalidate
 
 st.title("Log Workouts & Meals")
 
@@ -11,6 +11,8 @@ if not member_id:
     st.error("No member logged in. Please return to Home page.")
     st.stop()
 
+api = get_api()
+
 st.header("Log a Workout")
 
 with st.form("log_workout_form"):
@@ -20,49 +22,42 @@ with st.form("log_workout_form"):
     
     submitted = st.form_submit_button("Log Workout")
     if submitted:
-        payload = {
-            "workout_date": str(workout_date),
-            "notes": notes,
-            "sessions": sessions
-        }
-
-        # FIX: Call the MEMBERS workout-logs endpoint!
-        r = requests.post(f"{BASE_URL}/members/{member_id}/workout-logs", json=payload)
-        
-        if r.status_code == 201:
+        try:
+            submit_once("log_workout_form", lambda key: api.members.create_workout_log(
+                member_id,
+                workout_date=workout_date,
+                notes=notes,
+                sessions=sessions,
+                idempotency_key=key,
+            ))
+            invalidate("workout_logs", member_id=member_id)
             st.success("Workout logged successfully!")
             st.balloons()
             import time
             time.sleep(1)
             st.rerun()
-        else:
-            st.error(f"Failed to log workout. Status: {r.status_code}")
-            st.error(f"Error: {r.text}")
+        except ApiError as e:
+            show_api_error(e, "Failed to log workout")
 
 st.divider()
 st.header("Your Recent Workout Logs")
 
 try:
-    logs_response = requests.get(f"{BASE_URL}/members/{member_id}/workout-logs")
-    
-    if logs_response.status_code == 200:
-        logs = logs_response.json()
-        
-        if logs:
-            st.write(f"Total logs: {len(logs)}")
-            
-            # Display each log
-            for log in logs[:10]:  # Show last 10 logs
-                with st.expander(f"Workout on {log.get('date', 'N/A')}"):
-                    st.write(f"**Sessions:** {log.get('sessions', 1)}")
-                    st.write(f"**Notes:** {log.get('notes', 'No notes')}")
-        else:
-            st.info("No workout logs yet. Log your first workout above!")
+    logs = cached("workout_logs", api.members.get_workout_logs, member_id)
+
+    if logs:
+        st.write(f"Total logs: {len(logs)}")
+
+        # Display each log
+        for log in logs[:10]:  # Show last 10 logs
+            with st.expander(f"Workout on {log.get('date', 'N/A')}"):
+                st.write(f"**Sessions:** {log.get('sessions', 1)}")
+                st.write(f"**Notes:** {log.get('notes', 'No notes')}")
     else:
-        st.error("Failed to load workout logs")
-        
-except Exception as e:
-    st.error(f"Error loading workout logs: {str(e)}")
+        st.info("No workout logs yet. Log your first workout above!")
+
+except ApiError as e:
+    show_api_error(e, "Failed to load workout logs")
 
 
 st.divider()
@@ -80,55 +75,47 @@ with st.form("log_meal_form"):
     submitted = st.form_submit_button("Log Meal")
     
     if submitted:
-        payload = {
-            "member_id": member_id,
-            "food": food,
-            "portion_size": portion_size,
-            "calories": calories,
-            "proteins": proteins,
-            "carbs": carbs,
-            "fats": fats,
-            "log_timestamp": str(log_time)
-        }
-
-        # FIX: Add /nutritionists prefix!
-        r = requests.post(f"{BASE_URL}/nutritionists/food-logs", json=payload)
-
-        if r.status_code == 201:
+        try:
+            submit_once("log_meal_form", lambda key: api.nutritionists.create_food_log(
+                member_id=member_id,
+                food=food,
+                portion_size=portion_size,
+                calories=calories,
+                proteins=proteins,
+                carbs=carbs,
+                fats=fats,
+                log_timestamp=log_time,
+                idempotency_key=key,
+            ))
+            invalidate("food_logs", member_id=member_id)
             st.success("Meal logged successfully!")
             st.balloons()
             import time
             time.sleep(1)
             st.rerun()
-        else:
-            st.error(f"Failed to log meal. Status: {r.status_code}")
-            st.error(f"Error: {r.text}")
+        except ApiError as e:
+            show_api_error(e, "Failed to log meal")
 
 
 st.divider()
 st.header("Your Recent Meal Logs")
 
 try:
-    meal_logs_response = requests.get(f"{BASE_URL}/nutritionists/food-logs?member_id={member_id}")
-    
-    if meal_logs_response.status_code == 200:
-        meal_logs = meal_logs_response.json()
-        
-        if meal_logs:
-            st.write(f"Total meal logs: {len(meal_logs)}")
-            
-            # Display each meal log
-            for meal in meal_logs[:10]:  # Show last 10 meals
-                with st.expander(f"{meal.get('food', 'Unknown')} - {meal.get('timestamp', 'N/A')}"):
-                    st.write(f"**Portion:** {meal.get('portion_size', 'N/A')}")
-                    st.write(f"**Calories:** {meal.get('calories', 0)}")
-                    st.write(f"**Protein:** {meal.get('proteins', 0)}g")
-                    st.write(f"**Carbs:** {meal.get('carbs', 0)}g")
-                    st.write(f"**Fats:** {meal.get('fats', 0)}g")
-        else:
-            st.info("No meal logs yet. Log your first meal above!")
+    meal_logs = cached("food_logs", api.nutritionists.get_food_logs, member_id=member_id)
+
+    if meal_logs:
+        st.write(f"Total meal logs: {len(meal_logs)}")
+
+        # Display each meal log
+        for meal in meal_logs[:10]:  # Show last 10 meals
+            with st.expander(f"{meal.get('food', 'Unknown')} - {meal.get('timestamp', 'N/A')}"):
+                st.write(f"**Portion:** {meal.get('portion_size', 'N/A')}")
+                st.write(f"**Calories:** {meal.get('calories', 0)}")
+                st.write(f"**Protein:** {meal.get('proteins', 0)}g")
+                st.write(f"**Carbs:** {meal.get('carbs', 0)}g")
+                st.write(f"**Fats:** {meal.get('fats', 0)}g")
     else:
-        st.error("Failed to load meal logs")
-        
-except Exception as e:
-    st.error(f"Error loading meal logs: {str(e)}")
\ No newline at end of file
+        st.info("No meal logs yet. Log your first meal above!")
+
+except ApiError as e:
+    show_api_error(e, "Failed to load meal logs")
\ No newline at end of file
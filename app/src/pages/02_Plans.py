@@ -1,8 +1,7 @@
 import streamlit as st
-import requests
 import pandas as pd
-
-BASE_URL = "http://api:4000"  #
+from modules.api import ApiError, get_api, show_api_error
+from modules.cache import cached
 
 
 st.title("View Workout & Meal Plans")
@@ -12,26 +11,29 @@ if not member_id:
     st.error("No member logged in. Please return to Home page.")
     st.stop()
 
+api = get_api()
 
 # Workout Plans
 st.header("Your Workout Plans")
 
-wp = requests.get(f"{BASE_URL}/members/{member_id}/workout-plans")
-
-if wp.status_code == 200 and len(wp.json()) > 0:
-    df_wp = pd.DataFrame(wp.json())
-    st.dataframe(df_wp)
-else:
-    st.info("You currently have no workout plans.")
+try:
+    workout_plans = cached("workout_plans", api.members.get_workout_plans, member_id)
+    if workout_plans:
+        st.dataframe(pd.DataFrame(workout_plans))
+    else:
+        st.info("You currently have no workout plans.")
+except ApiError as e:
+    show_api_error(e, "Failed to load workout plans")
 
 
 # Meal Plans
 st.header("Your Meal Plans")
 
-mp = requests.get(f"{BASE_URL}/meal-plans", params={"member_id": member_id})
-
-if mp.status_code == 200 and len(mp.json()) > 0:
-    df_mp = pd.DataFrame(mp.json())
-    st.dataframe(df_mp)
-else:
-    st.info("You currently have no meal plans.")
\ No newline at end of file
+try:
+    meal_plans = cached("meal_plans", api.nutritionists.get_meal_plans, member_id=member_id)
+    if meal_plans:
+        st.dataframe(pd.DataFrame(meal_plans))
+    else:
+        st.info("You currently have no meal plans.")
+except ApiError as e:
+    show_api_error(e, "Failed to load meal plans")
\ No newline at end of file
@@ -1,9 +1,9 @@
 import streamlit as st
-import requests
 import pandas as pd
 import matplotlib.pyplot as plt
-
-BASE_URL = "http://api:4000" 
+from modules.api import ApiError, get_api, show_api_error
+from modules.idempotency import submit_once
+from modules.cache import cached
 
 st.title("Progress Tracking & Messaging")
 member_id = st.session_state.get("member_id")
@@ -12,14 +12,19 @@ if not member_id:
     st.error("No member logged in. Please return to Home page.")
     st.stop()
 
+api = get_api()
 
 # PROGRESS 
 st.header("Your Progress Over Time")
 
-progress = requests.get(f"{BASE_URL}/members/{member_id}/progress")
+try:
+    progress = cached("progress", api.members.get_progress, member_id)
+except ApiError as e:
+    show_api_error(e, "Failed to load progress")
+    progress = []
 
-if progress.status_code == 200 and len(progress.json()) > 0:
-    df = pd.DataFrame(progress.json())
+if progress:
+    df = pd.DataFrame(progress)
     st.dataframe(df)
 
     # Weight trend chart
@@ -40,10 +45,34 @@ else:
 # MESSAGE
 st.header("Messages With Your Trainer")
 
-messages = requests.get(f"{BASE_URL}/members/{member_id}/messages")
-
-if messages.status_code == 200 and len(messages.json()) > 0:
-    df_msgs = pd.DataFrame(messages.json())
+# Keep the messages we already have and only ask the API for newer ones
+if st.session_state.get("messages_member_id") != member_id:
+    st.session_state["messages_member_id"] = member_id
+    st.session_state["messages"] = []
+
+known_messages = st.session_state["messages"]
+since = max(m["message_id"] for m in known_messages) if known_messages else None
+
+try:
+    known_messages = api.members.get_member_messages(member_id, since=since) + known_messages
+    st.session_state["messages"] = known_messages
+except ApiError as e:
+    show_api_error(e, "Failed to load new messages")
+
+try:
+    total_unread = api.members.get_unread_counts(member_id).get("total_unread", 0)
+    st.metric("Unread Messages", total_unread)
+
+    if total_unread and st.button("Mark all as read"):
+        api.members.mark_messages_read(member_id)
+        for m in known_messages:
+            m["read_status"] = "read"
+        st.rerun()
+except ApiError as e:
+    show_api_error(e, "Failed to update unread messages")
+
+if len(known_messages) > 0:
+    df_msgs = pd.DataFrame(known_messages)
     st.dataframe(df_msgs)
 else:
     st.info("No messages yet.")
@@ -56,14 +85,13 @@ with st.form("send_msg"):
     submitted = st.form_submit_button("Send Message")
 
     if submitted:
-        payload = {
-            "content": content,
-            "trainer_id": trainer_id if trainer_id else None
-        }
-        # logger.info("payload: %s", payload)
-        r = requests.post(f"{BASE_URL}/members/{member_id}/messages", json=payload)
-
-        if r.status_code == 201:
+        try:
+            submit_once("send_msg", lambda key: api.members.create_message(
+                member_id,
+                content=content,
+                trainer_id=trainer_id if trainer_id else None,
+                idempotency_key=key,
+            ))
             st.success("Message sent!")
-        else:
-            st.error("Failed to send message.")
\ No newline at end of file
+        except ApiError as e:
+            show_api_error(e, "Failed to send message")
\ No newline at end of file
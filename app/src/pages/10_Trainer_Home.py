@@ -2,9 +2,10 @@
 import logging
 logger = logging.getLogger(__name__)
 import streamlit as st
-import requests
 import pandas as pd
 from modules.nav import SideBarLinks
+from modules.api import ApiError, get_api
+from modules.cache import cached
 
 # Call the SideBarLinks from the nav module in the modules directory
 SideBarLinks()
@@ -20,16 +21,15 @@ if 'trainer_id' not in st.session_state:
     st.session_state['trainer_id'] = 1  # Default for testing
 
 trainer_id = st.session_state['trainer_id']
+api = get_api()
 
 # Fetch trainer info
 try:
-    trainer_response = requests.get(f'http://api:4000/trainers//{trainer_id}')
-    if trainer_response.status_code == 200:
-        trainer = trainer_response.json()
-        st.write(f"## Hello, {st.session_state['first_name']}!")
-        if trainer.get('specialization'):
-            st.write(f"**Specialization:** {trainer['specialization']}")
-except:
+    trainer = cached("trainers", api.trainers.get_trainer, trainer_id)
+    st.write(f"## Hello, {st.session_state['first_name']}!")
+    if trainer.get('specialization'):
+        st.write(f"**Specialization:** {trainer['specialization']}")
+except ApiError:
     st.error("Could not load trainer information")
 
 st.write('---')
@@ -39,12 +39,10 @@ col1, col2, col3 = st.columns(3)
 
 # Get active clients count
 try:
-    clients_response = requests.get(f'http://api:4000/trainers/{trainer_id}/clients')
-    if clients_response.status_code == 200:
-        clients = clients_response.json()
-        active_clients = [c for c in clients if c.get('status') == 'active']
-        col1.metric("Active Clients", len(active_clients))
-except:
+    active_clients = cached("members", api.trainers.get_trainer_clients, trainer_id,
+                            status='active', fields='member_id')
+    col1.metric("Active Clients", len(active_clients))
+except ApiError:
     col1.metric("Active Clients", "N/A")
 
 # Get upcoming sessions count
@@ -53,29 +51,24 @@ try:
     today = datetime.now().date()
     week_from_now = today + timedelta(days=7)
     
-    sessions_response = requests.get(
-        f'http://api:4000/trainers/{trainer_id}/sessions',
-        params={
-            'date_from': str(today),
-            'date_to': str(week_from_now)
-        }
+    sessions = cached(
+        "sessions",
+        api.trainers.get_trainer_sessions,
+        trainer_id,
+        date_from=str(today),
+        date_to=str(week_from_now),
+        fields='session_id'
     )
-    if sessions_response.status_code == 200:
-        sessions = sessions_response.json()
-        col2.metric("Upcoming Sessions (7 days)", len(sessions))
-except:
+    col2.metric("Upcoming Sessions (7 days)", len(sessions))
+except ApiError:
     col2.metric("Upcoming Sessions", "N/A")
 
 # Get pending invoices count
 try:
-    invoices_response = requests.get(
-        f'http://api:4000/trainers/{trainer_id}/invoices',
-        params={'status': 'pending'}
-    )
-    if invoices_response.status_code == 200:
-        pending_invoices = invoices_response.json()
-        col3.metric("Pending Invoices", len(pending_invoices))
-except:
+    pending_invoices = cached("invoices", api.trainers.get_trainer_invoices, trainer_id,
+                              status='pending', fields='invoice_id')
+    col3.metric("Pending Invoices", len(pending_invoices))
+except ApiError:
     col3.metric("Pending Invoices", "N/A")
 
 st.write('---')
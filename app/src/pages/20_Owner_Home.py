@@ -3,6 +3,7 @@ logger = logging.getLogger(__name__)
 
 import streamlit as st
 from modules.nav import SideBarLinks
+from modules.cache import api_cache, cache_stats
 import requests
 
 st.set_page_config(layout = 'wide')
@@ -27,4 +28,16 @@ if st.button('View Revenue Analytics',
 if st.button('View Equipment and Class Performance', 
              type='primary',
              use_container_width=True):
-  st.switch_page('pages/23_Performance.py')
\ No newline at end of file
+  st.switch_page('pages/23_Performance.py')
+
+st.write('')
+with st.expander('App data cache'):
+  st.caption('API reads cached by the app, per resource type. Writes only drop the entries they affect.')
+  stats = cache_stats()
+  if stats:
+    st.dataframe(stats, use_container_width=True, hide_index=True)
+  else:
+    st.info('Nothing has been cached yet.')
+  if st.button('Clear cache'):
+    api_cache().clear()
+    st.rerun()
@@ -6,17 +6,18 @@ import world_bank_data as wb  # not used currently, but maybe in future?
 import matplotlib.pyplot as plt  # unused here too, might clean later
 import numpy as np
 import plotly.express as px
-import requests
 from datetime import date, timedelta
 
 from modules.nav import SideBarLinks
+from modules.api import ApiError, get_api
+from modules.cache import cached
 
 # Quick init of sidebar nav links
 SideBarLinks()
 
 st.header("Revenue Analytics Dashboard")
 
-API_BASE_URL = "http://api:4000/managers"
+api = get_api()
 
 # Default date range: last 30 days
 today = date.today()
@@ -37,17 +38,10 @@ end_iso_plus1 = (end_date + timedelta(days=1)).isoformat()
 
 st.subheader("Filter by Trainer")
 
-trainer_params = {
-    "start_date": start_iso,
-    "end_date": end_iso_plus1,
-}
-
 try:
-    resp = requests.get(f"{API_BASE_URL}/revenue/by-trainer", params=trainer_params, timeout=10)
-    resp.raise_for_status()
-    trainers_payload = resp.json()
+    trainers_payload = cached("revenue", api.managers.trainer_revenue, start_date=start_iso, end_date=end_iso_plus1)
     trainers = trainers_payload.get("trainers", [])
-except Exception as e:
+except ApiError as e:
     st.error(f"Could not load trainer list: {e}")
     st.stop()
 
@@ -64,19 +58,15 @@ selected_label = st.selectbox("Choose trainer", trainer_labels)
 selected_trainer_id = None if selected_label == "All trainers" else trainer_map[selected_label]
 
 # --- Class Revenue Trend ---
-trend_params = {
-    "start_date": start_iso,
-    "end_date": end_iso_plus1,
-}
-
-if selected_trainer_id:
-    trend_params["trainer_id"] = selected_trainer_id
-
 try:
-    trend_response = requests.get(f"{API_BASE_URL}/revenue/class-trend", params=trend_params, timeout=10)
-    trend_response.raise_for_status()
-    trend_data = trend_response.json().get("data", [])
-except Exception as e:
+    trend_data = cached(
+        "revenue",
+        api.managers.revenue_trend_by_class,
+        start_date=start_iso,
+        end_date=end_iso_plus1,
+        trainer_id=selected_trainer_id,
+    ).get("data", [])
+except ApiError as e:
     st.error(f"Could not load revenue trend data: {e}")
     st.stop()
 
@@ -125,16 +115,9 @@ st.divider()
 st.subheader("Revenue by Category")
 st.write("View how different business areas contributed over time (classes, memberships, etc.)")
 
-category_params = {
-    "start_date": start_iso,
-    "end_date": end_iso_plus1,
-}
-
 try:
-    cat_response = requests.get(f"{API_BASE_URL}/revenue/by-category", params=category_params, timeout=10)
-    cat_response.raise_for_status()
-    category_data = cat_response.json().get("data", [])
-except Exception as e:
+    category_data = cached("revenue", api.managers.revenue_by_category, start_date=start_iso, end_date=end_iso_plus1).get("data", [])
+except ApiError as e:
     st.error(f"Could not load revenue by category: {e}")
     category_data = []
 
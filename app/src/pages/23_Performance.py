@@ -1,25 +1,21 @@
 import streamlit as st
-import requests
 import pandas as pd
 import plotly.express as px
+from modules.api import ApiError, get_api
+from modules.cache import cached
 
-
-API_ROOT = "http://api:4000"
+api = get_api()
 
 st.title("Class Performance & Attendance Tracker")
 
 st.write("""
-This dashboard shows how many members attended training sessions, filtered by trainer and optional date ranges.
+This dashboard shows how full classes are and how often booked members don't show up, by weekday and hour and by class, filtered by trainer and optional date ranges (the last 90 days by default).
 """)
 
-@st.cache_data
 def load_trainers():
     try:
-        resp = requests.get(f"{API_ROOT}/trainers", timeout=10)
-        if resp.status_code == 200:
-            return resp.json()
-        return []
-    except Exception:
+        return cached("trainers", api.trainers.get_all_trainers)
+    except ApiError:
         return []
 
 trainers_data = load_trainers()
@@ -51,94 +47,85 @@ end_date = None
 if isinstance(selected_dates, (list, tuple)) and len(selected_dates) == 2:
     start_date, end_date = selected_dates
 
-# Attendance data pull – cached so we don’t keep re-fetching the same thing
-@st.cache_data
-def fetch_attendance(trainer_id=None, start=None, end=None):
-    filters = {}
-    if trainer_id:
-        filters["trainer_id"] = trainer_id
-    if start and end:
-        filters["start_date"] = str(start)
-        filters["end_date"] = str(end)
+# Utilization is aggregated by the API (weekday x hour and per class), so this is a small payload
+def fetch_utilization(trainer_id=None, start=None, end=None):
+    # the date range only applies when both ends are picked
+    if not (start and end):
+        start = end = None
 
     try:
-        res = requests.get(f"{API_ROOT}/managers/class-attendance", params=filters, timeout=10)
-        if res.status_code == 200:
-            return res.json()
-        else:
-            st.error(f"API error: {res.status_code}")
-            return []
-    except Exception as err:
-        st.error(f"Couldn’t fetch attendance data: {err}")
-        return []
+        return cached("utilization", api.managers.class_utilization, trainer_id=trainer_id, start_date=start, end_date=end)
+    except ApiError as err:
+        st.error(f"Couldn’t fetch utilization data: {err}")
+        return None
 
-attendance_data = fetch_attendance(trainer_id, start_date, end_date)
+utilization = fetch_utilization(trainer_id, start_date, end_date)
 
-if not attendance_data:
-    st.warning("No attendance data found. Try changing the filters.")
+if not utilization or not utilization.get("heatmap"):
+    st.warning("No class sessions found. Try changing the filters.")
     st.stop()
 
-# Put it into a dataframe to make it easier to handle
-df = pd.DataFrame(attendance_data)
+totals = utilization["totals"]
 
-st.subheader("Raw Attendance Snapshot")
-st.dataframe(df.head())  # Just showing the first few rows for sanity check
+def as_percent(rate):
+    return f"{rate:.0%}" if rate is not None else "–"
 
-if "status" not in df.columns:
-    st.error("The 'status' column is missing in the dataset. Cannot continue.")
-    st.stop()
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Sessions", totals["sessions"])
+col2.metric("Booked", totals["booked"])
+col3.metric("Fill Rate", as_percent(totals["fill_rate"]))
+col4.metric("No-Show Rate", as_percent(totals["no_show_rate"]))
 
-df["status"] = df["status"].astype(str)  # convert just in case it's not already a string
+st.caption(f"{utilization['start_date']} to {utilization['end_date']}")
 
-# Only look at records where members actually attended
-df_attended = df[df["status"].str.lower() == "attended"]
+st.subheader("Peak Hours")
 
-if df_attended.empty:
-    st.info("Nobody attended any sessions in the selected period.")
-    st.stop()
+heatmap = pd.DataFrame(utilization["heatmap"])
+weekdays = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+hours = list(range(heatmap["hour"].min(), heatmap["hour"].max() + 1))
 
-timestamp_col = "class_datetime" if "class_datetime" in df_attended.columns else None
-if timestamp_col:
-    df_attended[timestamp_col] = pd.to_datetime(df_attended[timestamp_col])  # just to be safe
-
-group_columns = ["session_id"]
-if "class_name" in df_attended.columns:
-    group_columns.append("class_name")
-if timestamp_col:
-    group_columns.append(timestamp_col)
-
-# Aggregating attendance count per session
-summary = (
-    df_attended
-    .groupby(group_columns)["member_id"]
-    .nunique()
-    .reset_index(name="attendee_count")
+fill_grid = (
+    heatmap.pivot(index="weekday_name", columns="hour", values="fill_rate")
+    .reindex(index=weekdays, columns=hours)
+    .astype(float)
 )
 
-st.subheader("Session Attendance Summary")
-st.dataframe(summary)
+fig = px.imshow(
+    fill_grid,
+    labels={"x": "Hour of Day", "y": "Weekday", "color": "Fill Rate"},
+    color_continuous_scale="Blues",
+    zmin=0,
+    zmax=1,
+    aspect="auto",
+    title="Fill Rate by Weekday and Hour"
+)
+fig.update_xaxes(tickmode="linear", dtick=1)
 
-st.subheader("Attendance Over Time")
+st.plotly_chart(fig, use_container_width=True)
 
-# Choose what to use for X-axis
-x_col = timestamp_col if timestamp_col else "session_id"
-x_label = "Session Time" if timestamp_col else "Session ID"
+st.subheader("By Class")
 
-# Add color grouping if class name is present
-color_by = "class_name" if "class_name" in summary.columns else None
+by_class = pd.DataFrame(utilization["by_class"])
 
-fig = px.line(
-    summary.sort_values(x_col),
-    x=x_col,
-    y="attendee_count",
-    color=color_by,
-    markers=True,
+fig = px.bar(
+    by_class.melt(id_vars="class_name", value_vars=["fill_rate", "no_show_rate"],
+                  var_name="measure", value_name="rate"),
+    x="class_name",
+    y="rate",
+    color="measure",
+    barmode="group",
     labels={
-        x_col: x_label,
-        "attendee_count": "Attendees",
-        "class_name": "Class Type"
+        "class_name": "Class Type",
+        "rate": "Rate",
+        "measure": ""
     },
-    title="Attendance Trend by Session"
+    title="Fill and No-Show Rate by Class"
 )
+fig.update_yaxes(tickformat=".0%")
 
 st.plotly_chart(fig, use_container_width=True)
+
+st.dataframe(
+    by_class[["class_name", "sessions", "capacity", "booked", "attended", "no_shows", "fill_rate", "no_show_rate"]],
+    hide_index=True
+)
@@ -1,30 +1,35 @@
 import streamlit as st
-import requests
 import pandas as pd
 from modules.nav import SideBarLinks
+from modules.api import ApiError, get_api, show_api_error
+from modules.idempotency import submit_once
+from modules.cache import cached, invalidate
 
 st.set_page_config(layout='wide')
 SideBarLinks()
 
-BASE_URL = "http://api:4000"
+api = get_api()
 
 st.title("Nutritionist Meal Plans")
 
-# Get active members
-@st.cache_data
+# Get nutritionist_id from session
+if 'nutritionist_id' not in st.session_state:
+    st.session_state['nutritionist_id'] = 1  # Default for testing
+
+nutritionist_id = st.session_state['nutritionist_id']
+
+# Get the nutritionist's active members
 def get_active_members():
     try:
-        r = requests.get(f"{BASE_URL}/members/members", params={"status": "active"})
-        if r.status_code == 200:
-            return r.json()
-        return []
-    except Exception as e:
+        return cached("members", api.members.get_all_members, status="active",
+                      nutritionist_id=nutritionist_id)
+    except ApiError as e:
         st.error(f"Error: {e}")
         return []
 
 members = get_active_members()
 if not members:
-    st.warning("No active members found or failed to load members.")
+    st.warning("No active members assigned to you, or failed to load members.")
     st.stop()
 
 # Build label for dropdown
@@ -44,14 +49,9 @@ st.markdown(f"### Meal Plans for {format_member(selected_member)}")
 # Get meal plans for member 
 def load_meal_plans(member_id: int):
     try:
-        r = requests.get(f"{BASE_URL}/nutritionists/meal-plans", params={"member_id": member_id})
-        if r.status_code == 200:
-            return r.json()
-        else:
-            st.error("Failed to load meal plans.")
-            return []
-    except Exception as e:
-        st.error(f"Error loading meal plans: {e}")
+        return cached("meal_plans", api.nutritionists.get_meal_plans, member_id=member_id)
+    except ApiError as e:
+        show_api_error(e, "Failed to load meal plans")
         return []
 
 plans = load_meal_plans(member_id)
@@ -74,26 +74,22 @@ with st.form("create_meal_plan_form"):
 
     submitted = st.form_submit_button("Create Meal Plan")
     if submitted:
-        payload = {
-            "member_id": member_id,
-            "calorie_goals": calorie_goals,
-            "macro_goals": macro_goals if macro_goals.strip() else None,
-            "plan_date": str(plan_date),
-        }
         try:
-            r = requests.post(f"{BASE_URL}/nutritionists/meal-plans", json=payload)
-            if r.status_code == 201:
-                st.success("Meal plan created successfully!")
-                st.balloons()
-                st.cache_data.clear()
-                import time
-                time.sleep(1)
-                st.rerun()
-            else:
-                st.error(f"Failed to create meal plan. Status: {r.status_code}")
-                st.error(f"Response: {r.text}")
-        except Exception as e:
-            st.error(f"Error creating meal plan: {e}")
+            submit_once("create_meal_plan_form", lambda key: api.nutritionists.create_meal_plan(
+                member_id=member_id,
+                calorie_goals=calorie_goals,
+                macro_goals=macro_goals if macro_goals.strip() else None,
+                plan_date=plan_date,
+                idempotency_key=key,
+            ))
+            st.success("Meal plan created successfully!")
+            st.balloons()
+            invalidate("meal_plans", member_id=member_id)
+            import time
+            time.sleep(1)
+            st.rerun()
+        except ApiError as e:
+            show_api_error(e, "Failed to create meal plan")
 
 st.divider()
 
@@ -132,34 +128,24 @@ if plans:
             delete_btn = st.form_submit_button("Delete Plan")
 
         if save_btn:
-            payload = {
-                "calorie_goals": edit_calories,
-                "macro_goals": edit_macro,
-                "date": str(edit_date),  
-            }
             try:
-                r = requests.put(
-                    f"{BASE_URL}/nutritionists/meal-plans/{selected_plan['plan_id']}",
-                    json=payload,
+                api.nutritionists.update_meal_plan(
+                    selected_plan['plan_id'],
+                    calorie_goals=edit_calories,
+                    macro_goals=edit_macro,
+                    plan_date=edit_date,
                 )
-                if r.status_code == 200:
-                    st.success("Meal plan updated successfully!")
-                    st.rerun()
-                else:
-                    st.error(f"Failed to update meal plan. Status: {r.status_code}")
-                    st.error(f"Response: {r.text}")
-            except Exception as e:
-                st.error(f"Error updating meal plan: {e}")
+                invalidate("meal_plans", member_id=member_id)
+                st.success("Meal plan updated successfully!")
+                st.rerun()
+            except ApiError as e:
+                show_api_error(e, "Failed to update meal plan")
 
         if delete_btn:
             try:
-                r = requests.delete(
-                    f"{BASE_URL}/nutritionists/meal-plans/{selected_plan['plan_id']}"
-                )
-                if r.status_code == 200:
-                    st.success("Meal plan deleted.")
-                    st.rerun()
-                else:
-                    st.error(f"Failed to delete meal plan. Status: {r.status_code}")
-            except Exception as e:
-                st.error(f"Error deleting meal plan: {e}")
\ No newline at end of file
+                api.nutritionists.delete_meal_plan(selected_plan['plan_id'])
+                invalidate("meal_plans", member_id=member_id)
+                st.success("Meal plan deleted.")
+                st.rerun()
+            except ApiError as e:
+                show_api_error(e, "Failed to delete meal plan")
\ No newline at end of file
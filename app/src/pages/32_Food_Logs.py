@@ -1,30 +1,35 @@
 import streamlit as st
-import requests
 import pandas as pd
 from modules.nav import SideBarLinks
+from modules.api import ApiError, get_api, show_api_error
+from modules.idempotency import submit_once
+from modules.cache import cached, invalidate
 
 st.set_page_config(layout='wide')
 SideBarLinks()
 
-BASE_URL = "http://api:4000"
+api = get_api()
 
 st.title("Nutritionist Food Logs")
 
-# Get active members 
-@st.cache_data
+# Get nutritionist_id from session
+if 'nutritionist_id' not in st.session_state:
+    st.session_state['nutritionist_id'] = 1  # Default for testing
+
+nutritionist_id = st.session_state['nutritionist_id']
+
+# Get the nutritionist's active members 
 def get_active_members():
     try:
-        r = requests.get(f"{BASE_URL}/members/members", params={"status": "active"})
-        if r.status_code == 200:
-            return r.json()
-        return []
-    except Exception as e:
+        return cached("members", api.members.get_all_members, status="active",
+                      nutritionist_id=nutritionist_id)
+    except ApiError as e:
         st.error(f"Error: {e}")
         return []
 
 members = get_active_members()
 if not members:
-    st.warning("No active members found or failed to load members.")
+    st.warning("No active members assigned to you, or failed to load members.")
     st.stop()
 
 def format_member(m):
@@ -42,14 +47,9 @@ st.markdown(f"### Food Logs for {format_member(selected_member)}")
 # Load food logs 
 def load_food_logs(member_id: int):
     try:
-        r = requests.get(f"{BASE_URL}/nutritionists/food-logs", params={"member_id": member_id})
-        if r.status_code == 200:
-            return r.json()
-        else:
-            st.error("Failed to load food logs.")
-            return []
-    except Exception as e:
-        st.error(f"Error loading food logs: {e}")
+        return cached("food_logs", api.nutritionists.get_food_logs, member_id=member_id)
+    except ApiError as e:
+        show_api_error(e, "Failed to load food logs")
         return []
 
 logs = load_food_logs(member_id)
@@ -88,26 +88,23 @@ with st.form("log_meal_form"):
         if not food.strip():
             st.error("Food name is required.")
         else:
-            payload = {
-                "member_id": member_id,
-                "food": food,
-                "portion_size": portion_size if portion_size.strip() else None,
-                "calories": calories,
-                "proteins": proteins,
-                "carbs": carbs,
-                "fats": fats,
-                "log_timestamp": str(log_time),  
-            }
             try:
-                r = requests.post(f"{BASE_URL}/nutritionists/food-logs", json=payload)
-                if r.status_code == 201:
-                    st.success("Meal logged successfully!")
-                    st.balloons()
-                    import time
-                    time.sleep(1)
-                    st.rerun()
-                else:
-                    st.error(f"Failed to log meal. Status: {r.status_code}")
-                    st.error(f"Response: {r.text}")
-            except Exception as e:
-                st.error(f"Error logging meal: {e}")
\ No newline at end of file
+                submit_once("nutritionist_log_meal_form", lambda key: api.nutritionists.create_food_log(
+                    member_id=member_id,
+                    food=food,
+                    portion_size=portion_size if portion_size.strip() else None,
+                    calories=calories,
+                    proteins=proteins,
+                    carbs=carbs,
+                    fats=fats,
+                    log_timestamp=log_time,
+                    idempotency_key=key,
+                ))
+                invalidate("food_logs", member_id=member_id)
+                st.success("Meal logged successfully!")
+                st.balloons()
+                import time
+                time.sleep(1)
+                st.rerun()
+            except ApiError as e:
+                show_api_error(e, "Failed to log meal")
\ No newline at end of file
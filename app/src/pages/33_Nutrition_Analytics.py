@@ -1,16 +1,17 @@
 import streamlit as st
-import requests
 import pandas as pd
 import traceback
 import logging
 from modules.nav import SideBarLinks
+from modules.api import ApiError, get_api, show_api_error
+from modules.cache import cached
 
 logging.basicConfig(format='%(filename)s:%(lineno)s:%(levelname)s -- %(message)s', level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 SideBarLinks()
 
-BASE_URL = "http://api:4000"
+api = get_api()
 
 st.title("Nutritionist Progress Dashboard")
 
@@ -20,17 +21,13 @@ if 'nutritionist_id' not in st.session_state:
 
 nutritionist_id = st.session_state['nutritionist_id']
 
-# Get active members 
-@st.cache_data
+# Get the nutritionist's active members 
 def get_active_members():
     try:
         logger.info("Getting active members")
-        r = requests.get(f"{BASE_URL}/members/members", params={"status": "active"})
-        
-        if r.status_code == 200:
-            return r.json()
-        return []
-    except Exception as e:
+        return cached("members", api.members.get_all_members, status="active",
+                      nutritionist_id=nutritionist_id)
+    except ApiError as e:
         logger.error(f"Error in get_active_members: {e}")
         traceback.print_exc()
         return []
@@ -38,7 +35,7 @@ def get_active_members():
 members = get_active_members()
 
 if not members:
-    st.warning("No active members found or failed to load members.")
+    st.warning("No active members assigned to you, or failed to load members.")
     st.stop()
 
 def format_member(m):
@@ -55,14 +52,9 @@ st.markdown(f"### Progress for {format_member(selected_member)}")
 
 def load_progress(member_id: int):
     try:
-        r = requests.get(f"{BASE_URL}/members/{member_id}/progress")
-        if r.status_code == 200:
-            return r.json()
-        else:
-            st.error("Failed to load progress data.")
-            return []
-    except Exception as e:
-        st.error(f"Error loading progress: {e}")
+        return cached("progress", api.members.get_progress, member_id)
+    except ApiError as e:
+        show_api_error(e, "Failed to load progress data")
         return []
 
 progress = load_progress(member_id)
@@ -92,12 +84,8 @@ st.subheader("Adherence – Meal Logging Frequency")
 
 def load_food_logs(member_id: int):
     try:
-        r = requests.get(f"{BASE_URL}/nutritionists/food-logs", params={"member_id": member_id})
-        if r.status_code == 200:
-            return r.json()
-        else:
-            return []
-    except Exception:
+        return cached("food_logs", api.nutritionists.get_food_logs, member_id=member_id)
+    except ApiError:
         return []
 
 logs = load_food_logs(member_id)
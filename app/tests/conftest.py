@@ -0,0 +1,6 @@
+# The app imports its modules as `modules.x` from app/src (the
+# Streamlit working directory), so the tests do the same.
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
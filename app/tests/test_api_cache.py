@@ -0,0 +1,97 @@
+from modules.cache import ApiCache
+
+
+class _Transport:
+    def __init__(self, gym_id=None):
+        self.headers = {"X-Gym-Id": gym_id} if gym_id else {}
+
+
+class FakeApi:
+    """Stands in for a generated *Api class: methods bound to a transport."""
+
+    def __init__(self, gym_id=None):
+        self._transport = _Transport(gym_id)
+        self.calls = 0
+
+    def get_members(self, trainer_id=None, status=None):
+        self.calls += 1
+        return [{"trainer_id": trainer_id, "status": status, "gym": self._transport.headers.get("X-Gym-Id")}]
+
+
+def test_stats_counts_live_entries():
+    cache = ApiCache(ttls={"members": 60})
+    api = FakeApi("1")
+    cache.get("members", api.get_members, 3)
+    cache.get("members", api.get_members, 3)
+
+    (row,) = cache.stats()
+    assert row["resource"] == "members"
+    assert row["entries"] == 1
+    assert row["hits"] == 1
+    assert row["misses"] == 1
+    assert row["hit_rate"] == 0.5
+
+
+def test_gyms_do_not_share_entries():
+    cache = ApiCache()
+    main, north = FakeApi("1"), FakeApi("2")
+
+    assert cache.get("members", main.get_members, 3)[0]["gym"] == "1"
+    assert cache.get("members", north.get_members, 3)[0]["gym"] == "2"
+    assert main.calls == north.calls == 1
+    assert cache.stats()[0]["entries"] == 2
+
+
+def test_callers_get_their_own_copy():
+    cache = ApiCache()
+    api = FakeApi()
+    cache.get("members", api.get_members, 3)[0]["status"] = "changed"
+
+    assert cache.get("members", api.get_members, 3)[0]["status"] is None
+    assert api.calls == 1
+
+
+def test_errors_are_not_cached():
+    cache = ApiCache()
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("API down")
+        return "ok"
+
+    try:
+        cache.get("members", flaky)
+    except RuntimeError:
+        pass
+    assert cache.get("members", flaky) == "ok"
+    assert len(calls) == 2
+
+
+def test_expired_entries_are_fetched_again():
+    cache = ApiCache(ttls={"members": 0})
+    api = FakeApi()
+    cache.get("members", api.get_members, 3)
+    cache.get("members", api.get_members, 3)
+
+    assert api.calls == 2
+    assert cache.stats()[0]["expired"] == 1
+
+
+def test_invalidate_drops_only_entries_that_could_hold_the_row():
+    cache = ApiCache()
+    api = FakeApi()
+    cache.get("members", api.get_members, 3)
+    cache.get("members", api.get_members, 4)
+    cache.get("members", api.get_members)
+    cache.get("trainers", api.get_members, 3)
+
+    # trainer 3's list and the unfiltered list; trainer 4's and other resources stay
+    assert cache.invalidate("members", trainer_id=3) == 2
+    cache.get("members", api.get_members, 4)
+    cache.get("trainers", api.get_members, 3)
+    assert api.calls == 4
+
+    assert cache.invalidate("members") == 1
+    assert {row["resource"]: row["invalidated"] for row in cache.stats()} == {"members": 3, "trainers": 0}
@@ -5,35 +5,75 @@ USE gym_management;
 
 
 -- part b: creation of all tables
+-- gym locations; schema_name is set for a gym whose rows live in their
+-- own schema (same tables), NULL for gyms sharing this one
+DROP TABLE IF EXISTS GYM;
+CREATE TABLE GYM (
+   gym_id INT AUTO_INCREMENT PRIMARY KEY,
+   name VARCHAR(100) NOT NULL,
+   schema_name VARCHAR(64),
+   created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO GYM (gym_id, name) VALUES (1, 'Main');
+
+
+-- gym_id: the gym a row belongs to (no foreign key, see GYM.schema_name);
+-- rows hanging off a member, trainer or class belong to its gym
 DROP TABLE IF EXISTS TRAINER;
 CREATE TABLE TRAINER (
    trainer_id INT AUTO_INCREMENT PRIMARY KEY,
+   gym_id INT NOT NULL DEFAULT 1,
    first_name VARCHAR(50) NOT NULL,
-   last_name VARCHAR(50) NOT NULL
+   last_name VARCHAR(50) NOT NULL,
+   INDEX idx_trainer_gym_name (gym_id, last_name)
 );
 
 
 DROP TABLE IF EXISTS NUTRITIONIST;
 CREATE TABLE NUTRITIONIST (
    nutritionist_id INT AUTO_INCREMENT PRIMARY KEY,
+   gym_id INT NOT NULL DEFAULT 1,
    first_name VARCHAR(50) NOT NULL,
-   last_name VARCHAR(50) NOT NULL
+   last_name VARCHAR(50) NOT NULL,
+   INDEX idx_nutritionist_gym_name (gym_id, last_name)
 );
 
 
 DROP TABLE IF EXISTS GYM_MEMBER;
 CREATE TABLE GYM_MEMBER (
    member_id INT AUTO_INCREMENT PRIMARY KEY,
+   gym_id INT NOT NULL DEFAULT 1,
    first_name VARCHAR(50) NOT NULL,
    last_name VARCHAR(50) NOT NULL,
    trainer_id INT,
    nutritionist_id INT,
    status VARCHAR(20) DEFAULT 'active',
+   -- signup date; members are grouped into retention cohorts by its month
+   joined_date DATE NOT NULL DEFAULT (CURRENT_DATE),
+   INDEX idx_member_joined (joined_date),
+   -- a trainer's clients and the member list, by status then name
+   INDEX idx_member_trainer_status (trainer_id, status, last_name),
+   INDEX idx_member_status_name (status, last_name),
+   INDEX idx_member_gym_status (gym_id, status, last_name),
    FOREIGN KEY (trainer_id) REFERENCES TRAINER(trainer_id) ON DELETE SET NULL,
    FOREIGN KEY (nutritionist_id) REFERENCES NUTRITIONIST(nutritionist_id) ON DELETE SET NULL
 );
 
 
+-- every change of GYM_MEMBER.status (old_status is NULL for the signup row)
+DROP TABLE IF EXISTS MEMBER_STATUS_HISTORY;
+CREATE TABLE MEMBER_STATUS_HISTORY (
+   history_id INT AUTO_INCREMENT PRIMARY KEY,
+   member_id INT NOT NULL,
+   old_status VARCHAR(20),
+   new_status VARCHAR(20) NOT NULL,
+   changed_at DATETIME NOT NULL,
+   INDEX idx_status_history_member (member_id, changed_at),
+   FOREIGN KEY (member_id) REFERENCES GYM_MEMBER(member_id) ON DELETE CASCADE
+);
+
+
 DROP TABLE IF EXISTS MESSAGE;
 CREATE TABLE MESSAGE (
    message_id INT AUTO_INCREMENT PRIMARY KEY,
@@ -42,10 +82,42 @@ CREATE TABLE MESSAGE (
    content TEXT NOT NULL,
    message_timestamp DATETIME NOT NULL,
    read_status VARCHAR(20) DEFAULT 'unread',
+   INDEX idx_message_member_time (member_id, message_timestamp),
+   FULLTEXT INDEX ft_message_content (content),
    FOREIGN KEY (member_id) REFERENCES GYM_MEMBER(member_id) ON DELETE CASCADE,
    FOREIGN KEY (trainer_id) REFERENCES TRAINER(trainer_id) ON DELETE SET NULL
 );
 
+-- unread MESSAGE count per member/trainer conversation, kept current by
+-- the message routes (trainer_id 0 holds messages without a trainer)
+DROP TABLE IF EXISTS MESSAGE_UNREAD;
+CREATE TABLE MESSAGE_UNREAD (
+   member_id INT NOT NULL,
+   trainer_id INT NOT NULL DEFAULT 0,
+   unread_count INT NOT NULL DEFAULT 0,
+   PRIMARY KEY (member_id, trainer_id),
+   FOREIGN KEY (member_id) REFERENCES GYM_MEMBER(member_id) ON DELETE CASCADE
+);
+
+DROP TABLE IF EXISTS GOAL;
+CREATE TABLE GOAL (
+   goal_id INT AUTO_INCREMENT PRIMARY KEY,
+   member_id INT NOT NULL,
+   goal_type VARCHAR(50) NOT NULL,
+   target_value DECIMAL(10,2) NOT NULL,
+   -- kept current from PROGRESS, WORKOUT_LOG and FOOD_LOG for the
+   -- goal types in backend/members/goals.py, set by hand otherwise
+   start_value DECIMAL(10,2),
+   current_value DECIMAL(10,2),
+   start_date DATE NOT NULL DEFAULT (CURRENT_DATE),
+   deadline DATE,
+   last_event_at DATETIME,
+   created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+   updated_at DATETIME,
+   INDEX idx_goal_member_type (member_id, goal_type),
+   FOREIGN KEY (member_id) REFERENCES GYM_MEMBER(member_id) ON DELETE CASCADE
+);
+
 DROP TABLE IF EXISTS PROGRESS;
 CREATE TABLE PROGRESS (
    progress_id INT AUTO_INCREMENT PRIMARY KEY,
@@ -55,6 +127,7 @@ CREATE TABLE PROGRESS (
    body_fat_percentage DECIMAL(4,2),
    measurements VARCHAR(200),
    photos VARCHAR(500),
+   INDEX idx_progress_member_date (member_id, date),
    FOREIGN KEY (member_id) REFERENCES GYM_MEMBER(member_id) ON DELETE CASCADE
 );
 
@@ -70,6 +143,8 @@ CREATE TABLE FOOD_LOG (
    proteins DECIMAL(6,2),
    carbs DECIMAL(6,2),
    fats DECIMAL(6,2),
+   FULLTEXT INDEX ft_food_log_food (food),
+   INDEX idx_food_log_member_time (member_id, timestamp),
    FOREIGN KEY (member_id) REFERENCES GYM_MEMBER(member_id) ON DELETE CASCADE
 );
 
@@ -81,6 +156,7 @@ CREATE TABLE MEAL_PLAN (
    calorie_goals INT,
    macro_goals VARCHAR(200),
    date DATE NOT NULL,
+   INDEX idx_meal_plan_member_date (member_id, date),
    FOREIGN KEY (member_id) REFERENCES GYM_MEMBER(member_id) ON DELETE CASCADE
 );
 
@@ -91,6 +167,7 @@ CREATE TABLE WORKOUT_PLAN (
    member_id INT NOT NULL,
    goals VARCHAR(500),
    date DATE NOT NULL,
+   INDEX idx_workout_plan_member_date (member_id, date),
    FOREIGN KEY (member_id) REFERENCES GYM_MEMBER(member_id) ON DELETE CASCADE
 );
 
@@ -103,6 +180,12 @@ CREATE TABLE WORKOUT_LOG (
    date DATE NOT NULL,
    notes TEXT,
    sessions INT DEFAULT 1,
+   FULLTEXT INDEX ft_workout_log_notes (notes),
+   -- monthly activity scans (retention cohorts)
+   INDEX idx_workout_log_date_member (date, member_id),
+   -- a member's or a trainer's logs, newest first
+   INDEX idx_workout_log_member_date (member_id, date),
+   INDEX idx_workout_log_trainer_date (trainer_id, date),
    FOREIGN KEY (member_id) REFERENCES GYM_MEMBER(member_id) ON DELETE CASCADE,
    FOREIGN KEY (trainer_id) REFERENCES TRAINER(trainer_id) ON DELETE SET NULL
 );
@@ -141,10 +224,15 @@ CREATE TABLE LOG_EXERCISE (
 DROP TABLE IF EXISTS CLASS_SESSION;
 CREATE TABLE CLASS_SESSION (
    session_id INT AUTO_INCREMENT PRIMARY KEY,
+   gym_id INT NOT NULL DEFAULT 1,
    trainer_id INT NOT NULL,
    class_name VARCHAR(100) NOT NULL,
    date DATETIME NOT NULL,
    cost DECIMAL(8,2),
+   capacity INT NOT NULL DEFAULT 20,
+   INDEX idx_class_session_date (date),
+   INDEX idx_class_session_trainer_date (trainer_id, date),
+   INDEX idx_class_session_gym_date (gym_id, date),
    FOREIGN KEY (trainer_id) REFERENCES TRAINER(trainer_id) ON DELETE CASCADE
 );
 
@@ -163,6 +251,7 @@ CREATE TABLE CLASS_ATTENDANCE (
 DROP TABLE IF EXISTS INVOICE;
 CREATE TABLE INVOICE (
    invoice_id INT AUTO_INCREMENT PRIMARY KEY,
+   gym_id INT NOT NULL DEFAULT 1,
    member_id INT NOT NULL,
    trainer_id INT,
    amount DECIMAL(10,2) NOT NULL,
@@ -170,6 +259,13 @@ CREATE TABLE INVOICE (
    status VARCHAR(20) DEFAULT 'pending',
    category VARCHAR(50),
    date DATE NOT NULL,
+   billing_period CHAR(7),
+   -- one invoice per member, category and billing period (NULL for ad-hoc invoices)
+   UNIQUE KEY uq_invoice_billing_period (member_id, billing_period, category),
+   -- lets the aging job find pending invoices past their due date
+   INDEX idx_invoice_status_issued (status, date_issued),
+   INDEX idx_invoice_trainer_status (trainer_id, status, date_issued),
+   INDEX idx_invoice_gym_date (gym_id, date),
    FOREIGN KEY (member_id) REFERENCES GYM_MEMBER(member_id) ON DELETE CASCADE,
    FOREIGN KEY (trainer_id) REFERENCES TRAINER(trainer_id) ON DELETE SET NULL
 );
@@ -182,10 +278,175 @@ CREATE TABLE PAYMENT (
    paid_date DATE NOT NULL,
    card_details VARCHAR(100),
    bank_info VARCHAR(100),
+   amount DECIMAL(10,2),
+   -- settlement reference from the bank/processor file; keeps reconciliation re-runs idempotent
+   reference VARCHAR(100),
+   UNIQUE KEY uq_payment_reference (reference),
    FOREIGN KEY (invoice_id) REFERENCES INVOICE(invoice_id) ON DELETE CASCADE
 );
 
 
+-- month-end billing runs; last_member_id is the checkpoint used to resume a run
+DROP TABLE IF EXISTS BILLING_RUN;
+CREATE TABLE BILLING_RUN (
+   run_id INT AUTO_INCREMENT PRIMARY KEY,
+   gym_id INT NOT NULL DEFAULT 1,
+   billing_period CHAR(7) NOT NULL,
+   category VARCHAR(50) NOT NULL,
+   amount DECIMAL(10,2) NOT NULL,
+   status VARCHAR(20) DEFAULT 'running',
+   members_total INT DEFAULT 0,
+   members_scanned INT DEFAULT 0,
+   invoices_created INT DEFAULT 0,
+   last_member_id INT DEFAULT 0,
+   started_at DATETIME NOT NULL,
+   updated_at DATETIME NOT NULL,
+   finished_at DATETIME,
+   UNIQUE KEY uq_billing_run_gym (gym_id, billing_period, category)
+);
+
+
+-- unpaid (overdue) invoice totals per aging bucket, one snapshot per day
+DROP TABLE IF EXISTS INVOICE_AGING;
+CREATE TABLE INVOICE_AGING (
+   gym_id INT NOT NULL DEFAULT 1,
+   as_of DATE NOT NULL,
+   bucket VARCHAR(10) NOT NULL,
+   invoice_count INT NOT NULL DEFAULT 0,
+   total_amount DECIMAL(12,2) NOT NULL DEFAULT 0,
+   computed_at DATETIME NOT NULL,
+   PRIMARY KEY (gym_id, as_of, bucket)
+);
+
+
+-- weekly training volume per member and exercise category, built from
+-- LOG_EXERCISE x EXERCISE (week_start is the Monday of WORKOUT_LOG.date)
+DROP TABLE IF EXISTS MEMBER_WEEKLY_VOLUME;
+CREATE TABLE MEMBER_WEEKLY_VOLUME (
+   member_id INT NOT NULL,
+   week_start DATE NOT NULL,
+   category VARCHAR(50) NOT NULL,
+   exercise_count INT NOT NULL DEFAULT 0,
+   total_sets INT NOT NULL DEFAULT 0,
+   total_reps INT NOT NULL DEFAULT 0,
+   tonnage DECIMAL(14,2) NOT NULL DEFAULT 0,
+   best_est_1rm DECIMAL(8,2),
+   updated_at DATETIME NOT NULL,
+   PRIMARY KEY (member_id, week_start, category),
+   FOREIGN KEY (member_id) REFERENCES GYM_MEMBER(member_id) ON DELETE CASCADE
+);
+
+
+-- member weeks whose MEMBER_WEEKLY_VOLUME rows must be recomputed
+-- (workout logs or exercises changed after they were summarised)
+DROP TABLE IF EXISTS VOLUME_DIRTY_WEEK;
+CREATE TABLE VOLUME_DIRTY_WEEK (
+   member_id INT NOT NULL,
+   week_start DATE NOT NULL,
+   PRIMARY KEY (member_id, week_start)
+);
+
+
+-- high-water marks of incremental jobs (e.g. last LOG_EXERCISE id summarised)
+DROP TABLE IF EXISTS JOB_WATERMARK;
+CREATE TABLE JOB_WATERMARK (
+   job_name VARCHAR(50) PRIMARY KEY,
+   last_id BIGINT NOT NULL DEFAULT 0,
+   updated_at DATETIME NOT NULL
+);
+
+
+-- monthly signup cohorts x months since signup: how many of the cohort
+-- logged a workout or attended a class in that month
+DROP TABLE IF EXISTS COHORT_RETENTION;
+CREATE TABLE COHORT_RETENTION (
+   gym_id INT NOT NULL DEFAULT 1,
+   cohort_month CHAR(7) NOT NULL,
+   months_since INT NOT NULL,
+   cohort_size INT NOT NULL,
+   active_members INT NOT NULL DEFAULT 0,
+   retention_rate DECIMAL(5,4) NOT NULL DEFAULT 0,
+   computed_at DATETIME NOT NULL,
+   PRIMARY KEY (gym_id, cohort_month, months_since)
+);
+
+
+-- class sessions, capacity, bookings and attendance per day, trainer,
+-- class and start hour; completed days only (today is computed live)
+DROP TABLE IF EXISTS CLASS_UTILIZATION_DAILY;
+CREATE TABLE CLASS_UTILIZATION_DAILY (
+   gym_id INT NOT NULL DEFAULT 1,
+   day DATE NOT NULL,
+   trainer_id INT NOT NULL,
+   class_name VARCHAR(100) NOT NULL,
+   hour TINYINT NOT NULL,
+   weekday TINYINT NOT NULL,
+   sessions INT NOT NULL DEFAULT 0,
+   capacity INT NOT NULL DEFAULT 0,
+   booked INT NOT NULL DEFAULT 0,
+   attended INT NOT NULL DEFAULT 0,
+   no_shows INT NOT NULL DEFAULT 0,
+   computed_at DATETIME NOT NULL,
+   PRIMARY KEY (gym_id, day, trainer_id, class_name, hour)
+);
+
+
+-- per gym and day: signups, classes held, attendance and invoiced /
+-- paid amounts (rolled up by the gym-rollup job for the owner
+-- dashboards); active_members as of the day's last rollup
+DROP TABLE IF EXISTS GYM_DAILY_STATS;
+CREATE TABLE GYM_DAILY_STATS (
+   gym_id INT NOT NULL,
+   day DATE NOT NULL,
+   active_members INT,
+   new_members INT NOT NULL DEFAULT 0,
+   classes INT NOT NULL DEFAULT 0,
+   class_attendance INT NOT NULL DEFAULT 0,
+   billed_amount DECIMAL(12,2) NOT NULL DEFAULT 0,
+   paid_amount DECIMAL(12,2) NOT NULL DEFAULT 0,
+   updated_at DATETIME NOT NULL,
+   PRIMARY KEY (gym_id, day),
+   INDEX idx_gym_daily_stats_day (day)
+);
+
+
+-- version counters for data cached in the API processes; a write bumps
+-- the counter and every process reloads its copy on the next check
+DROP TABLE IF EXISTS CACHE_VERSION;
+CREATE TABLE CACHE_VERSION (
+   name VARCHAR(50) PRIMARY KEY,
+   version INT NOT NULL DEFAULT 0,
+   updated_at DATETIME NOT NULL
+);
+
+
+-- schema migrations applied to this database (api/backend/migrations);
+-- the tables above already contain versions 1-13
+DROP TABLE IF EXISTS SCHEMA_MIGRATIONS;
+CREATE TABLE SCHEMA_MIGRATIONS (
+   version INT PRIMARY KEY,
+   name VARCHAR(100) NOT NULL,
+   checksum CHAR(64),
+   applied_at DATETIME NOT NULL,
+   execution_ms INT
+);
+
+INSERT INTO SCHEMA_MIGRATIONS (version, name, applied_at) VALUES
+(1,  'baseline',                NOW()),
+(2,  'billing_runs',            NOW()),
+(3,  'payment_reconciliation',  NOW()),
+(4,  'invoice_aging',           NOW()),
+(5,  'search_fulltext',         NOW()),
+(6,  'message_unread',          NOW()),
+(7,  'cache_version',           NOW()),
+(8,  'training_volume',         NOW()),
+(9,  'member_retention',        NOW()),
+(10, 'class_utilization',       NOW()),
+(11, 'list_indexes',            NOW()),
+(12, 'goals',                   NOW()),
+(13, 'gyms',                    NOW());
+
+
 -- -- part c: creation of a small amount of sample data
 -- INSERT INTO TRAINER (first_name, last_name) VALUES
 -- ('John', 'Smith'),
@@ -793,3 +793,30 @@ INSERT INTO LOG_EXERCISE (log_id, exercise_id) VALUES
 (1, 3),
 (1, 4),
 (1, 5);
+
+
+-- derived tables: rebuild the unread counters from the messages above
+REPLACE INTO MESSAGE_UNREAD (member_id, trainer_id, unread_count)
+SELECT member_id, COALESCE(trainer_id, 0), COUNT(*)
+FROM MESSAGE
+WHERE read_status = 'unread'
+GROUP BY member_id, COALESCE(trainer_id, 0);
+
+
+-- derived: sample members joined when their history starts (first workout
+-- log or invoice), and their current status is their first history row
+UPDATE GYM_MEMBER gm
+JOIN (
+   SELECT member_id, MIN(first_date) AS first_date
+   FROM (
+      SELECT member_id, MIN(date) AS first_date FROM WORKOUT_LOG GROUP BY member_id
+      UNION ALL
+      SELECT member_id, MIN(date_issued) FROM INVOICE GROUP BY member_id
+   ) firsts
+   GROUP BY member_id
+) f ON f.member_id = gm.member_id
+SET gm.joined_date = f.first_date;
+
+INSERT INTO MEMBER_STATUS_HISTORY (member_id, old_status, new_status, changed_at)
+SELECT member_id, NULL, status, joined_date
+FROM GYM_MEMBER;